@@ -0,0 +1,85 @@
+"""
+Mantenimiento de los acumulados derivados del libro de movimientos de caja.
+
+Los movimientos (`MovimientoCaja`) siguen siendo la fuente de verdad; los
+acumulados son una copia materializada que se actualiza en la misma transacción
+en la que se inserta cada movimiento, de modo que los cierres y resúmenes se
+resuelven leyendo una sola fila.
+"""
+from django.core.exceptions import ValidationError
+from django.db.models import F, Sum, Count
+
+from apps.turnos.models import Turno
+from .signals import movimientos_registrados
+
+
+# Relación entre el método de pago de un movimiento y el acumulado del turno que lo suma.
+CAMPO_TOTAL_POR_METODO = {
+    "EFECTIVO": "total_efectivo",
+    "TRANSFERENCIA": "total_transferencia",
+    "TARJETA": "total_tarjeta",
+}
+
+
+def acumular_en_turno(*, turno, tipo, metodo_pago, monto, cantidad=1):
+    """
+    Suma un movimiento (o un lote de movimientos del mismo tipo y método de pago)
+    a los acumulados del turno y notifica a los demás acumulados mediante la
+    señal `movimientos_registrados`.
+
+    La actualización es condicional a que el turno siga activo: si otro proceso
+    cerró el turno mientras se registraba el movimiento, no se actualiza ninguna
+    fila y se lanza un error para que la transacción completa se revierta.
+    """
+    campo = CAMPO_TOTAL_POR_METODO[metodo_pago]
+    incrementos = {
+        campo: F(campo) + monto,
+        "cantidad_movimientos": F("cantidad_movimientos") + cantidad,
+    }
+    turno_activo = Turno.objects.filter(pk=turno.pk, activo=True)
+    if not turno_activo.update(**incrementos):
+        raise ValidationError("No se pueden registrar movimientos en un turno cerrado")
+
+    # La fila queda bloqueada por la actualización hasta el fin de la
+    # transacción, así que el contador leído es el que esta dejó: si coincide
+    # con `cantidad`, el turno deja de estar "sin ingresos" con este registro.
+    cantidad_movimientos = Turno.objects.filter(pk=turno.pk).values_list("cantidad_movimientos", flat=True).get()
+    primer_movimiento = cantidad_movimientos == cantidad
+
+    movimientos_registrados.send(
+        sender=Turno,
+        turno=turno,
+        tipo=tipo,
+        metodo_pago=metodo_pago,
+        monto=monto,
+        cantidad=cantidad,
+        primer_movimiento=primer_movimiento,
+    )
+
+
+def totales_desde_movimientos(turnos):
+    """
+    Recalcula los acumulados de los turnos indicados directamente desde el libro
+    de caja. Devuelve un diccionario `{turno_id: {campo: valor}}` con una entrada
+    por cada turno, incluso si no tiene movimientos.
+    """
+    from .models import MovimientoCaja
+
+    totales = {
+        turno_id: {campo: 0 for campo in Turno.CAMPOS_ACUMULADOS}
+        for turno_id in turnos.values_list("id", flat=True)
+    }
+
+    agrupados = (
+        MovimientoCaja.objects
+        .filter(turno__in=turnos)
+        .values("turno_id", "metodo_pago")
+        .annotate(total=Sum("monto"), cantidad=Count("id"))
+        .order_by()
+    )
+    for fila in agrupados:
+        acumulado = totales[fila["turno_id"]]
+        acumulado[CAMPO_TOTAL_POR_METODO[fila["metodo_pago"]]] += fila["total"]
+        acumulado["cantidad_movimientos"] += fila["cantidad"]
+
+    return totales
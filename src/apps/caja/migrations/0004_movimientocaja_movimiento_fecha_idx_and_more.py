@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('caja', '0003_initial'),
+        ('estancias', '0002_initial'),
+        ('productos', '0002_producto_stock'),
+        ('turnos', '0004_turno_turno_fecha_inicio_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movimientocaja',
+            index=models.Index(fields=['fecha'], name='movimiento_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movimientocaja',
+            index=models.Index(fields=['turno', 'metodo_pago'], name='movimiento_turno_metodo_idx'),
+        ),
+    ]
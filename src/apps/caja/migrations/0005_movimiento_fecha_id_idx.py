@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('caja', '0004_movimientocaja_movimiento_fecha_idx_and_more'),
+        ('estancias', '0002_initial'),
+        ('productos', '0002_producto_stock'),
+        ('turnos', '0004_turno_turno_fecha_inicio_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='movimientocaja',
+            name='movimiento_fecha_idx',
+        ),
+        migrations.AddIndex(
+            model_name='movimientocaja',
+            index=models.Index(fields=['fecha', 'id'], name='movimiento_fecha_id_idx'),
+        ),
+    ]
@@ -1,9 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 
 from apps.turnos.models import Turno
 from apps.estancias.models import Estancia
 from apps.productos.models import Producto
+from .acumulados import acumular_en_turno
 
 
 class MovimientoCaja(models.Model):
@@ -13,6 +14,15 @@ class MovimientoCaja(models.Model):
     anclado a un turno específico.
     """
 
+    class Meta:
+        indexes = [
+            # Listados y reportes por rango de fechas, y paginación por cursor
+            # sobre (fecha, id): el id desempata los movimientos con la misma fecha.
+            models.Index(fields=["fecha", "id"], name="movimiento_fecha_id_idx"),
+            # Totales de un turno por método de pago (cierres y recálculo de acumulados).
+            models.Index(fields=["turno", "metodo_pago"], name="movimiento_turno_metodo_idx"),
+        ]
+
     class TipoMovimiento(models.TextChoices):
         """Define el origen o la razón del movimiento de dinero."""
         ESTANCIA = "ESTANCIA", "Estancia"
@@ -102,9 +112,20 @@ class MovimientoCaja(models.Model):
         """
         Sobrescribe el método save para asegurar que las validaciones del `clean`
         se ejecuten siempre antes de guardar el objeto en la base de datos.
+        Al insertar un movimiento nuevo, también actualiza los acumulados del
+        turno dentro de la misma transacción.
         """
         self.full_clean()
-        super().save(*args, **kwargs)
+        es_nuevo = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if es_nuevo:
+                acumular_en_turno(
+                    turno=self.turno,
+                    tipo=self.tipo,
+                    metodo_pago=self.metodo_pago,
+                    monto=self.monto,
+                )
 
     def __str__(self):
         return f"{self.tipo} - ${self.monto} ({self.metodo_pago})"
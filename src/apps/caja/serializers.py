@@ -1,10 +1,11 @@
 from rest_framework import serializers
+from apps.core.medicion import MedicionSerializerMixin
 from .models import MovimientoCaja
 from apps.productos.models import Producto
 from apps.estancias.models import Estancia
 
 
-class MovimientoCajaSerializer(serializers.ModelSerializer):
+class MovimientoCajaSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     """
     Serializador de solo lectura para listar y detallar movimientos de caja.
     Usa `StringRelatedField` para mostrar una representación legible de los
@@ -19,7 +20,37 @@ class MovimientoCajaSerializer(serializers.ModelSerializer):
         fields = '__all__'  # Muestra todos los campos del modelo.
 
 
-class CrearVentaProductoSerializer(serializers.Serializer):
+class MovimientoCajaListaSerializer(MedicionSerializerMixin, serializers.Serializer):
+    """
+    Representación compacta de un movimiento para el listado. Lee los
+    diccionarios de `movimientos_para_listado`, cuyas etiquetas de objetos
+    relacionados ya vienen calculadas en la consulta.
+    Con `campos` se muestran solo los campos indicados.
+
+    A diferencia de `MovimientoCajaSerializer`, no incluye los textos `turno`,
+    `estancia` y `producto` (el `__str__` de cada modelo): los reemplazan los
+    ids y las etiquetas `empleado`, `habitacion` y `producto_nombre`.
+    """
+    id = serializers.IntegerField()
+    tipo = serializers.CharField()
+    monto = serializers.DecimalField(max_digits=10, decimal_places=2)
+    metodo_pago = serializers.CharField()
+    fecha = serializers.DateTimeField()
+    turno_id = serializers.IntegerField()
+    estancia_id = serializers.IntegerField(allow_null=True)
+    producto_id = serializers.IntegerField(allow_null=True)
+    empleado = serializers.CharField()
+    habitacion = serializers.IntegerField(allow_null=True)
+    producto_nombre = serializers.CharField(allow_null=True)
+
+    def __init__(self, *args, campos=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if campos is not None:
+            for nombre in set(self.fields) - set(campos):
+                self.fields.pop(nombre)
+
+
+class CrearVentaProductoSerializer(MedicionSerializerMixin, serializers.Serializer):
     """
     Serializador de escritura para validar los datos de entrada al registrar
     la venta de un producto. No está ligado a un modelo directamente, solo
@@ -38,4 +69,28 @@ class CrearVentaProductoSerializer(serializers.Serializer):
         queryset=Estancia.objects.filter(activa=True),
         required=False,
         allow_null=True
-    )
\ No newline at end of file
+    )
+
+
+class ItemCarritoSerializer(MedicionSerializerMixin, serializers.Serializer):
+    """
+    Un producto del carrito. La existencia y disponibilidad de los productos se
+    valida en el servicio con una sola consulta para todo el carrito.
+    """
+    producto_id = serializers.IntegerField(min_value=1)
+    cantidad = serializers.IntegerField(min_value=1)
+
+
+class VentaCarritoSerializer(MedicionSerializerMixin, serializers.Serializer):
+    """
+    Serializador de escritura para registrar la venta de varios productos en
+    una sola petición, con un mismo método de pago.
+    """
+    items = ItemCarritoSerializer(many=True, allow_empty=False, max_length=100)
+    metodo_pago = serializers.ChoiceField(choices=MovimientoCaja.MetodoPago.choices)
+    # Permite asociar las ventas a una estancia activa, pero no es obligatorio.
+    estancia_id = serializers.PrimaryKeyRelatedField(
+        queryset=Estancia.objects.filter(activa=True),
+        required=False,
+        allow_null=True
+    )
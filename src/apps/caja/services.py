@@ -1,7 +1,11 @@
+from collections import Counter
+
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import Case, F, When, PositiveIntegerField
 from apps.productos.models import Producto
 from apps.turnos.models import Turno
+from .acumulados import acumular_en_turno
 from .models import MovimientoCaja
 
 @transaction.atomic
@@ -18,7 +22,7 @@ def vender_producto(
 
     Este servicio encapsula toda la lógica para una venta:
     1. Valida que el producto esté disponible y tenga stock suficiente.
-    2. Disminuye el stock del producto.
+    2. Disminuye el stock del producto de forma atómica en la base de datos.
     3. Calcula el monto total de la transacción.
     4. Crea el registro contable (MovimientoCaja) correspondiente.
     5. Se ejecuta dentro de una transacción para garantizar la atomicidad.
@@ -42,21 +46,29 @@ def vender_producto(
         raise ValidationError(f"El producto '{producto.nombre}' no está activo y no se puede vender.")
 
     # Regla de negocio: Debe haber suficiente stock para la venta.
-    if producto.stock < cantidad:
+    # La validación y el descuento son una sola sentencia condicional
+    # (UPDATE ... SET stock = stock - n WHERE stock >= n), así que dos ventas
+    # concurrentes no pueden leer el mismo stock y vender de más.
+    vendido = Producto.objects.filter(
+        pk=producto.pk, activo=True, stock__gte=cantidad
+    ).update(stock=F("stock") - cantidad)
+
+    if not vendido:
+        # No se actualizó ninguna fila: se lee el estado actual para informar el motivo.
+        producto.refresh_from_db(fields=["stock", "activo"])
+        if not producto.activo:
+            raise ValidationError(f"El producto '{producto.nombre}' no está activo y no se puede vender.")
         raise ValidationError(
             f"Stock insuficiente para '{producto.nombre}'. Disponible: {producto.stock}, Solicitado: {cantidad}."
         )
 
-    # Disminuir el stock del producto.
-    # Usar F() podría ser una opción para evitar race conditions, pero para este caso es suficiente.
     producto.stock -= cantidad
-    producto.save(update_fields=['stock'])
 
     # Cálculo del monto total basado en el precio del producto y la cantidad.
     monto_total = producto.precio * cantidad
 
-    # Creación del registro contable. Este es el único punto donde se crean
-    # movimientos de tipo 'PRODUCTO', centralizando la lógica.
+    # Creación del registro contable. Los movimientos de tipo 'PRODUCTO' solo
+    # se crean aquí y en `vender_carrito`, que aplica las mismas reglas.
     movimiento = MovimientoCaja.objects.create(
         turno=turno,
         tipo=MovimientoCaja.TipoMovimiento.PRODUCTO,
@@ -69,20 +81,111 @@ def vender_producto(
     # Se devuelve el objeto creado para que la vista pueda serializarlo y
     # enviarlo como respuesta al cliente.
     return movimiento
-    # Cálculo del monto total basado en el precio del producto y la cantidad.
-    monto_total = producto.precio * cantidad
 
-    # Creación del registro contable. Este es el único punto donde se crean
-    # movimientos de tipo 'PRODUCTO', centralizando la lógica.
-    movimiento = MovimientoCaja.objects.create(
+
+@transaction.atomic
+def vender_carrito(
+    *,
+    items,
+    metodo_pago: str,
+    turno: Turno,
+    estancia=None
+) -> list[MovimientoCaja]:
+    """
+    Servicio de negocio para registrar la venta de varios productos a la vez
+    (por ejemplo, el consumo del minibar de una habitación).
+
+    Aplica las mismas reglas que `vender_producto`, pero con un número fijo de
+    consultas sin importar cuántos productos tenga el carrito:
+    1. Bloquea todos los productos en una sola consulta, ordenada por id para
+       que dos carritos concurrentes no se bloqueen mutuamente.
+    2. Disminuye el stock de todos ellos con un solo UPDATE.
+    3. Inserta un movimiento por producto con `bulk_create`.
+    4. Suma los movimientos a los acumulados del turno de una sola vez.
+
+    Args:
+        items: Lista de diccionarios con `producto_id` y `cantidad`. Si un
+            producto aparece varias veces, se suman sus cantidades.
+        metodo_pago: El método de pago utilizado para todo el carrito.
+        turno: El turno activo en el que se realiza la venta.
+        estancia (opcional): La estancia a la que se asocian las ventas.
+
+    Returns:
+        La lista de movimientos creados, uno por producto.
+
+    Raises:
+        ValidationError: Si algún producto no existe, no está activo o no tiene stock.
+    """
+    cantidades = Counter()
+    for item in items:
+        cantidades[item["producto_id"]] += item["cantidad"]
+
+    if not cantidades:
+        raise ValidationError("El carrito está vacío.")
+
+    productos = list(
+        Producto.objects.select_for_update()
+        .filter(pk__in=cantidades.keys())
+        .order_by("id")
+    )
+
+    # Regla de negocio: Todos los productos deben existir.
+    faltantes = set(cantidades) - {producto.pk for producto in productos}
+    if faltantes:
+        raise ValidationError(f"Productos no encontrados: {', '.join(map(str, sorted(faltantes)))}.")
+
+    for producto in productos:
+        cantidad = cantidades[producto.pk]
+
+        # Regla de negocio: Solo se pueden vender productos que están marcados como activos.
+        if not producto.activo:
+            raise ValidationError(f"El producto '{producto.nombre}' no está activo y no se puede vender.")
+
+        # Regla de negocio: Debe haber suficiente stock para la venta.
+        if producto.stock < cantidad:
+            raise ValidationError(
+                f"Stock insuficiente para '{producto.nombre}'. Disponible: {producto.stock}, Solicitado: {cantidad}."
+            )
+
+    # Disminuye el stock de todos los productos con un solo UPDATE ... CASE.
+    # Los productos están bloqueados, así que el stock validado no cambia entre tanto.
+    Producto.objects.filter(pk__in=cantidades.keys()).update(
+        stock=Case(
+            *(When(pk=producto_id, then=F("stock") - cantidad) for producto_id, cantidad in cantidades.items()),
+            output_field=PositiveIntegerField(),
+        )
+    )
+    for producto in productos:
+        producto.stock -= cantidades[producto.pk]
+
+    movimientos = [
+        MovimientoCaja(
+            turno=turno,
+            tipo=MovimientoCaja.TipoMovimiento.PRODUCTO,
+            monto=producto.precio * cantidades[producto.pk],
+            metodo_pago=metodo_pago,
+            producto=producto,
+            estancia=estancia,
+        )
+        for producto in productos
+    ]
+    # `bulk_create` no ejecuta `save()`, así que las validaciones del modelo
+    # (`MovimientoCaja.clean` y las de cada campo) se aplican aquí. Se omite la
+    # comprobación de existencia de las relaciones, que costaría una consulta
+    # por movimiento: los productos se acaban de bloquear y el turno y la
+    # estancia los resolvió quien llama.
+    for movimiento in movimientos:
+        movimiento.full_clean(exclude=["turno", "producto", "estancia"])
+    movimientos = MovimientoCaja.objects.bulk_create(movimientos)
+
+    # Tampoco se actualizan los acumulados: se suman todos los movimientos en una
+    # sola operación, que además rechaza la venta si el turno ya se cerró.
+    acumular_en_turno(
         turno=turno,
         tipo=MovimientoCaja.TipoMovimiento.PRODUCTO,
-        monto=monto_total,
         metodo_pago=metodo_pago,
-        producto=producto, # Es mejor pasar la instancia completa.
-        estancia=estancia # Pasa la instancia directamente.
+        monto=sum(movimiento.monto for movimiento in movimientos),
+        cantidad=len(movimientos),
     )
 
-    # Se devuelve el objeto creado para que la vista pueda serializarlo y
-    # enviarlo como respuesta al cliente.
-    return movimiento
+    return movimientos
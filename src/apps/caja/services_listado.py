@@ -0,0 +1,66 @@
+"""
+Consulta del listado de movimientos de caja.
+
+El listado se construye con `values()`: solo se leen las columnas que se van a
+mostrar y las etiquetas de los objetos relacionados (empleado, habitación,
+producto) se calculan en la misma consulta con joins, en lugar de cargar cada
+objeto relacionado y llamar a su `__str__` fila por fila.
+"""
+from django.core.exceptions import ValidationError
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Concat, NullIf, Trim
+
+from .models import MovimientoCaja
+
+
+# Columnas propias del movimiento, tal como se leen de la tabla.
+CAMPOS_DIRECTOS = ["id", "tipo", "monto", "metodo_pago", "fecha", "turno_id", "estancia_id", "producto_id"]
+
+# Etiquetas de los objetos relacionados, calculadas en SQL.
+CAMPOS_CALCULADOS = {
+    # Igual que `Usuario.get_full_name()`, o el username si no tiene nombre.
+    "empleado": Coalesce(
+        NullIf(
+            Trim(Concat("turno__usuario__first_name", Value(" "), "turno__usuario__last_name")),
+            Value(""),
+        ),
+        "turno__usuario__username",
+    ),
+    "habitacion": F("estancia__habitacion__numero"),
+    "producto_nombre": F("producto__nombre"),
+}
+
+CAMPOS_LISTADO = CAMPOS_DIRECTOS + list(CAMPOS_CALCULADOS)
+
+# Se leen siempre porque la paginación por cursor ordena y continúa sobre ellos.
+CAMPOS_REQUERIDOS = ["id", "fecha"]
+
+
+def campos_de_listado(parametro):
+    """
+    Interpreta el parámetro `fields` (nombres separados por comas). Devuelve la
+    lista de campos a mostrar, o todos si no se indicó ninguno.
+    """
+    if not parametro:
+        return list(CAMPOS_LISTADO)
+
+    campos = [campo.strip() for campo in parametro.split(",") if campo.strip()]
+    desconocidos = [campo for campo in campos if campo not in CAMPOS_LISTADO]
+    if desconocidos:
+        raise ValidationError(
+            f"Campos desconocidos: {', '.join(desconocidos)}. "
+            f"Campos disponibles: {', '.join(CAMPOS_LISTADO)}."
+        )
+    return campos
+
+
+def movimientos_para_listado(campos=None):
+    """
+    Queryset de diccionarios con los `campos` indicados (todos por defecto),
+    del movimiento más reciente al más antiguo. Solo se hacen los joins que
+    requieren las etiquetas solicitadas.
+    """
+    campos = campos or CAMPOS_LISTADO
+    directos = [c for c in CAMPOS_DIRECTOS if c in campos or c in CAMPOS_REQUERIDOS]
+    calculados = {c: expresion for c, expresion in CAMPOS_CALCULADOS.items() if c in campos}
+    return MovimientoCaja.objects.values(*directos, **calculados).order_by("-fecha", "-id")
@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+# Se envía, dentro de la transacción, cada vez que se suman movimientos a los
+# acumulados de un turno. Argumentos: `turno`, `tipo`, `metodo_pago`, `monto`
+# (suma de los montos), `cantidad` (número de movimientos) y `primer_movimiento`
+# (True si son los primeros movimientos registrados en el turno).
+movimientos_registrados = Signal()
@@ -1,13 +1,21 @@
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
+from datetime import timedelta
 from decimal import Decimal
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from apps.users.models import Usuario
 from apps.turnos.models import Turno
 from apps.productos.models import Producto
+from apps.habitaciones.models import Habitacion, TipoHabitacion
+from apps.tarifas.models import Tarifa
+from apps.estancias.models import Estancia
 from .models import MovimientoCaja
+from .services import vender_carrito, vender_producto
 
 
 class CajaAPITests(APITestCase):
@@ -72,3 +80,208 @@ class CajaAPITests(APITestCase):
             MovimientoCaja.objects.create(
                 turno=self.turno_activo, tipo="ESTANCIA", monto=100, metodo_pago="EFECTIVO"
             )
+
+    def test_venta_con_stock_desactualizado_no_vende_de_mas(self):
+        """El stock se valida en la base de datos, no en la instancia que se cargó antes."""
+        producto = Producto.objects.create(nombre="Agua", precio="20.00", stock=2, activo=True)
+        # Otra venta descuenta el stock después de que se cargó `producto`.
+        Producto.objects.filter(pk=producto.pk).update(stock=1)
+
+        with self.assertRaisesMessage(ValidationError, "Disponible: 1, Solicitado: 2"):
+            vender_producto(turno=self.turno_activo, producto=producto, cantidad=2, metodo_pago="EFECTIVO")
+
+        producto.refresh_from_db()
+        self.assertEqual(producto.stock, 1)
+        self.assertFalse(MovimientoCaja.objects.exists())
+
+    def test_venta_descuenta_stock_en_la_base_de_datos(self):
+        """La venta descuenta la cantidad del stock actual en la base, no del de la instancia."""
+        producto = Producto.objects.create(nombre="Agua", precio="20.00", stock=5, activo=True)
+        Producto.objects.filter(pk=producto.pk).update(stock=4)
+
+        vender_producto(turno=self.turno_activo, producto=producto, cantidad=3, metodo_pago="EFECTIVO")
+
+        producto.refresh_from_db()
+        self.assertEqual(producto.stock, 1)
+
+
+class PaginacionCursorMovimientosTests(APITestCase):
+    def setUp(self):
+        self.admin_user = Usuario.objects.create_user(username='admin', password='password123', rol=Usuario.Rol.ADMINISTRADOR)
+        turno = Turno.objects.create(usuario=self.admin_user, tipo_turno="DIA", activo=True)
+        producto = Producto.objects.create(nombre="Refresco", precio="50.00", activo=True)
+        for _ in range(25):
+            MovimientoCaja.objects.create(turno=turno, tipo="PRODUCTO", monto=50, metodo_pago="EFECTIVO", producto=producto)
+        # Varios movimientos con la misma fecha: el id debe desempatarlos.
+        primeros = MovimientoCaja.objects.order_by('id').values_list('id', flat=True)[:8]
+        fecha = MovimientoCaja.objects.get(id=primeros[0]).fecha
+        MovimientoCaja.objects.filter(id__in=list(primeros)).update(fecha=fecha)
+
+        self.url = reverse('movimientos-list-create') + '?paginacion=cursor'
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_recorre_todas_las_paginas_sin_repetir_ni_contar(self):
+        esperados = list(MovimientoCaja.objects.order_by('-fecha', '-id').values_list('id', flat=True))
+        vistos, url = [], self.url
+        while url:
+            with CaptureQueriesContext(connection) as consultas:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            self.assertFalse(any('COUNT(' in q['sql'].upper() for q in consultas.captured_queries))
+            vistos += [m['id'] for m in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(vistos, esperados)
+
+    def test_enlace_previous_regresa_a_la_pagina_anterior(self):
+        primera = self.client.get(self.url).data
+        self.assertIsNone(primera['previous'])
+        segunda = self.client.get(primera['next']).data
+        regreso = self.client.get(segunda['previous']).data
+        self.assertEqual(
+            [m['id'] for m in regreso['results']],
+            [m['id'] for m in primera['results']],
+        )
+
+    def test_cursor_invalido(self):
+        response = self.client.get(self.url + '&cursor=no-es-un-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ListadoMovimientosTests(APITestCase):
+    def setUp(self):
+        self.admin_user = Usuario.objects.create_user(
+            username='admin', password='password123', rol=Usuario.Rol.ADMINISTRADOR, first_name='Ana', last_name='López'
+        )
+        self.tipo = TipoHabitacion.objects.create(nombre="Sencilla")
+        self.tarifa = Tarifa.objects.create(nombre="3 Horas", horas=3, precio=500, tipo_habitacion=self.tipo, activa=True)
+        self.url = reverse('movimientos-list-create')
+        self.client.force_authenticate(user=self.admin_user)
+
+    def _crear_movimientos(self, cantidad):
+        """Cada movimiento en un turno, estancia y producto distintos."""
+        for _ in range(cantidad):
+            empleado = Usuario.objects.create_user(username=f'empleado{Usuario.objects.count()}', rol=Usuario.Rol.EMPLEADO)
+            turno = Turno.objects.create(usuario=empleado, tipo_turno="DIA", activo=True)
+            habitacion = Habitacion.objects.create(numero=Habitacion.objects.count() + 100, tipo=self.tipo, activa=True)
+            estancia = Estancia.objects.create(
+                habitacion=habitacion, tarifa=self.tarifa, turno_inicio=turno,
+                hora_salida_programada=timezone.now() + timedelta(hours=3)
+            )
+            producto = Producto.objects.create(nombre=f"Producto {Producto.objects.count()}", precio="10.00", activo=True)
+            MovimientoCaja.objects.create(
+                turno=turno, tipo="PRODUCTO", monto=10, metodo_pago="EFECTIVO", producto=producto, estancia=estancia
+            )
+
+    def test_etiquetas_calculadas_en_la_consulta(self):
+        turno = Turno.objects.create(usuario=self.admin_user, tipo_turno="DIA", activo=True)
+        producto = Producto.objects.create(nombre="Refresco", precio="50.00", activo=True)
+        MovimientoCaja.objects.create(turno=turno, tipo="PRODUCTO", monto=50, metodo_pago="EFECTIVO", producto=producto)
+
+        movimiento = self.client.get(self.url).data['results'][0]
+        self.assertEqual(movimiento['empleado'], "Ana López")
+        self.assertEqual(movimiento['producto_nombre'], "Refresco")
+        self.assertEqual(movimiento['turno_id'], turno.id)
+        self.assertIsNone(movimiento['habitacion'])
+
+    def test_head_usa_el_listado_compacto(self):
+        self._crear_movimientos(1)
+        response = self.client.head(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, b"")
+
+    def test_consultas_constantes_por_pagina(self):
+        self._crear_movimientos(1)
+        with CaptureQueriesContext(connection) as un_movimiento:
+            self.client.get(self.url)
+        self._crear_movimientos(9)
+        with CaptureQueriesContext(connection) as diez_movimientos:
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(len(diez_movimientos), len(un_movimiento))
+
+    def test_fields_limita_los_campos(self):
+        self._crear_movimientos(2)
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(self.url, {'fields': 'monto,habitacion'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['results'][0]), {'monto', 'habitacion'})
+        # Solo se une con las tablas que requieren los campos solicitados.
+        self.assertNotIn('users_usuario', consultas.captured_queries[-1]['sql'])
+
+    def test_fields_desconocido(self):
+        response = self.client.get(self.url, {'fields': 'monto,contrasena'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("contrasena", response.data['error'])
+
+
+class VentaCarritoAPITests(APITestCase):
+    def setUp(self):
+        self.employee_user = Usuario.objects.create_user(username='employee', password='password123', rol=Usuario.Rol.EMPLEADO)
+        self.turno_activo = Turno.objects.create(usuario=self.employee_user, tipo_turno="DIA", activo=True)
+        self.productos = [
+            Producto.objects.create(nombre=f"Producto {i}", precio="10.00", stock=5, activo=True)
+            for i in range(10)
+        ]
+        self.url = reverse('venta-carrito')
+        self.client.force_authenticate(user=self.employee_user)
+
+    def _vender(self, productos, cantidad=1):
+        return self.client.post(self.url, {
+            "metodo_pago": "EFECTIVO",
+            "items": [{"producto_id": p.id, "cantidad": cantidad} for p in productos],
+        }, format='json')
+
+    def test_venta_de_carrito(self):
+        """Se crea un movimiento por producto, se descuenta el stock y se actualizan los acumulados."""
+        response = self._vender(self.productos[:3], cantidad=2)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Decimal(response.data['total']), Decimal("60.00"))
+        self.assertEqual(len(response.data['movimientos']), 3)
+
+        self.assertEqual(MovimientoCaja.objects.filter(turno=self.turno_activo).count(), 3)
+        for producto in self.productos[:3]:
+            producto.refresh_from_db()
+            self.assertEqual(producto.stock, 3)
+
+        self.turno_activo.refresh_from_db()
+        self.assertEqual(self.turno_activo.total_efectivo, Decimal("60.00"))
+        self.assertEqual(self.turno_activo.cantidad_movimientos, 3)
+
+    def test_consultas_no_dependen_del_tamano_del_carrito(self):
+        # La primera venta del turno crea las filas de los acumulados; se excluye de la comparación.
+        self._vender(self.productos[:1])
+        with CaptureQueriesContext(connection) as dos_productos:
+            self._vender(self.productos[:2])
+        with CaptureQueriesContext(connection) as diez_productos:
+            self._vender(self.productos)
+        self.assertEqual(len(diez_productos), len(dos_productos))
+
+    def test_stock_insuficiente_no_vende_nada(self):
+        response = self._vender(self.productos[:2], cantidad=6)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(MovimientoCaja.objects.exists())
+        self.productos[0].refresh_from_db()
+        self.assertEqual(self.productos[0].stock, 5)
+
+    def test_valida_cada_movimiento_antes_de_insertarlos(self):
+        """Las reglas de `MovimientoCaja` también aplican a la venta en lote."""
+        Producto.objects.filter(pk=self.productos[1].pk).update(precio=0)
+        items = [{"producto_id": p.id, "cantidad": 1} for p in self.productos[:2]]
+
+        with self.assertRaises(ValidationError):
+            vender_carrito(items=items, metodo_pago="EFECTIVO", turno=self.turno_activo)
+        with self.assertRaises(ValidationError):
+            vender_carrito(items=items[:1], metodo_pago="CHEQUE", turno=self.turno_activo)
+        self.assertFalse(MovimientoCaja.objects.exists())
+
+    def test_producto_repetido_suma_cantidades(self):
+        producto = self.productos[0]
+        response = self.client.post(self.url, {
+            "metodo_pago": "TRANSFERENCIA",
+            "items": [{"producto_id": producto.id, "cantidad": 2}, {"producto_id": producto.id, "cantidad": 3}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        producto.refresh_from_db()
+        self.assertEqual(producto.stock, 0)
+        self.assertEqual(Decimal(response.data['total']), Decimal("50.00"))
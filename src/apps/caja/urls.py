@@ -1,9 +1,11 @@
 # Define las rutas de la API para la aplicación 'caja'.
 
 from django.urls import path
-from .views import MovimientoCajaListCreateAPIView
+from .views import MovimientoCajaListCreateAPIView, VentaCarritoAPIView
 
 urlpatterns = [
     # Endpoint para listar (GET) y crear (POST) movimientos de caja.
     path("movimientos/", MovimientoCajaListCreateAPIView.as_view(), name="movimientos-list-create"),
+    # Endpoint para registrar la venta de varios productos en una sola petición (POST).
+    path("carrito/", VentaCarritoAPIView.as_view(), name="venta-carrito"),
 ]
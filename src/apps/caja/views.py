@@ -1,46 +1,89 @@
 from rest_framework import generics, status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
 from rest_framework.response import Response
 from django.core.exceptions import ValidationError
 
 from .models import MovimientoCaja
-from .serializers import MovimientoCajaSerializer, CrearVentaProductoSerializer
-from .services import vender_producto
+from .serializers import (
+    MovimientoCajaSerializer,
+    MovimientoCajaListaSerializer,
+    CrearVentaProductoSerializer,
+    VentaCarritoSerializer,
+)
+from .services import vender_producto, vender_carrito
+from .services_listado import campos_de_listado, movimientos_para_listado
+from apps.core.idempotencia import idempotente
+from apps.core.paginacion import PaginacionPorCursor
 from apps.core.permissions import IsAdminUser, IsEmpleado, IsOnlyInvitado
-from apps.turnos.models import Turno
+from apps.core.medicion import MedicionRenderMixin
+from apps.turnos.turno_activo import obtener_turno_activo
 
 
-class MovimientoCajaListCreateAPIView(generics.ListCreateAPIView):
+class MovimientoCajaListCreateAPIView(MedicionRenderMixin, generics.ListCreateAPIView):
     """
     - GET: Lista todos los movimientos de caja. (Cualquier usuario autenticado)
+      Usa una representación compacta con un número fijo de consultas por
+      página; `?fields=id,monto,empleado` limita los campos (y columnas) leídos.
+      Con `?paginacion=cursor` pagina por cursor sobre (fecha, id): sin conteo
+      total ni OFFSET, para recorrer el historial a cualquier profundidad.
     - POST: Registra la venta de un producto. (Admins, Empleados e Invitados)
     """
-    queryset = MovimientoCaja.objects.select_related('turno', 'estancia', 'producto').order_by('-fecha')
+    queryset = MovimientoCaja.objects.order_by('-fecha', '-id')
     filterset_fields = ['turno', 'tipo', 'metodo_pago', 'estancia']
+    campos = None
+
+    def get_queryset(self):
+        if self.request.method in SAFE_METHODS:
+            return movimientos_para_listado(self.campos)
+        return super().get_queryset()
+
+    @property
+    def paginator(self):
+        """Usa la paginación por cursor si la petición la solicita."""
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('paginacion') == 'cursor':
+                self._paginator = PaginacionPorCursor()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
 
     def get_serializer_class(self):
         """
         Determina qué serializador usar según el método de la petición.
         - POST (crear): Usa un serializador específico para validar la entrada.
-        - GET (listar): Usa un serializador detallado para mostrar la salida.
+        - GET/HEAD (listar): Usa la representación compacta del listado.
         """
         if self.request.method == 'POST':
             return CrearVentaProductoSerializer
-        return MovimientoCajaSerializer
+        return MovimientoCajaListaSerializer
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method in SAFE_METHODS:
+            kwargs['campos'] = self.campos
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        try:
+            self.campos = campos_de_listado(request.query_params.get('fields'))
+        except ValidationError as e:
+            return Response({"error": e.message}, status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
 
     def get_permissions(self):
         """
         Define permisos específicos por acción.
-        - GET (listar): Cualquier usuario autenticado puede ver el historial de caja.
+        - GET/HEAD (listar): Cualquier usuario autenticado puede ver el historial de caja.
         - POST (crear): Administradores, Empleados e Invitados pueden registrar una venta.
         """
-        if self.request.method == 'GET':
+        if self.request.method in SAFE_METHODS:
             return [IsAuthenticated()]
         
         # Para POST, se permite a cualquier usuario con rol (Admin, Empleado, Invitado).
         # IsEmpleado cubre a Admins y Empleados. IsOnlyInvitado cubre a los invitados.
         return [IsAuthenticated(), (IsEmpleado | IsOnlyInvitado)()]
 
+    @idempotente
     def create(self, request, *args, **kwargs):
         """
         Procesa la petición POST para registrar una nueva venta de producto.
@@ -48,10 +91,9 @@ class MovimientoCajaListCreateAPIView(generics.ListCreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        try:
-            # Regla de negocio: Toda venta debe ocurrir dentro de un turno activo.
-            turno_activo = Turno.objects.get(activo=True)
-        except Turno.DoesNotExist:
+        # Regla de negocio: Toda venta debe ocurrir dentro de un turno activo.
+        turno_activo = obtener_turno_activo(request.user)
+        if turno_activo is None:
             return Response({"error": "No hay un turno activo para registrar la venta."}, status=status.HTTP_400_BAD_REQUEST)
 
         # Mapea los nombres de campo del serializador a los que espera la función de servicio.
@@ -73,3 +115,40 @@ class MovimientoCajaListCreateAPIView(generics.ListCreateAPIView):
 
         except ValidationError as e:
             return Response({"error": e.message}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class VentaCarritoAPIView(MedicionRenderMixin, APIView):
+    """
+    Endpoint para registrar la venta de varios productos en una sola petición
+    (ej. el consumo del minibar). Crea un movimiento de caja por producto.
+    - POST: Admins, Empleados e Invitados.
+    """
+    permission_classes = [IsAuthenticated, (IsEmpleado | IsOnlyInvitado)]
+
+    @idempotente
+    def post(self, request):
+        serializer = VentaCarritoSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Regla de negocio: Toda venta debe ocurrir dentro de un turno activo.
+        turno_activo = obtener_turno_activo(request.user)
+        if turno_activo is None:
+            return Response({"error": "No hay un turno activo para registrar la venta."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            movimientos = vender_carrito(
+                items=serializer.validated_data["items"],
+                metodo_pago=serializer.validated_data["metodo_pago"],
+                estancia=serializer.validated_data.get("estancia_id"),
+                turno=turno_activo,
+            )
+        except ValidationError as e:
+            return Response({"error": e.message}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {
+                "total": sum(movimiento.monto for movimiento in movimientos),
+                "movimientos": MovimientoCajaSerializer(movimientos, many=True).data,
+            },
+            status=status.HTTP_201_CREATED
+        )
@@ -4,3 +4,10 @@ class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.core"
     label = 'core'
+
+    def ready(self):
+        # Conecta los receptores que publican en el flujo de eventos.
+        from . import signals  # noqa: F401
+        # Instala la medición de consultas de `MedicionMiddleware`.
+        from .medicion import instrumentar
+        instrumentar()
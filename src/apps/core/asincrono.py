@@ -0,0 +1,224 @@
+"""
+Vistas de DRF asíncronas para el servidor ASGI.
+
+Bajo ASGI, Django ejecuta cada petición a una vista síncrona en un hilo propio
+de la petición, que queda ocupado hasta que la petición termina, aunque esté
+esperando a la base de datos. `VistaAsincronaMixin` despacha una vista de DRF
+en el event loop con las mismas piezas de `APIView`:
+- `initial`: autenticación (`DEFAULT_AUTHENTICATION_CLASSES` o las de la
+  vista), permisos, throttling y negociación del formato;
+- `handle_exception`: las mismas respuestas de error;
+- `finalize_response`: el mismo renderizado y los mismos encabezados.
+Solo los handlers (`get`) son corrutinas. El mixin se pone delante de la
+vista síncrona equivalente, así que la variante asíncrona hereda sus
+permisos, serializers, filtros y paginación, y `ReplicaMiddleware` la trata
+igual (ver replicas.py).
+
+Lo que toca la base corre con `en_hilo`: en el pool de hilos compartido del
+event loop, liberando la conexión al terminar (vuelve al pool de conexiones o
+se cierra, como al final de una petición). Un hilo se ocupa mientras dura la
+consulta, no mientras dura la petición; un flujo de eventos abierto durante
+horas no retiene ninguno. El ORM asíncrono de Django no sirve para esto:
+ejecuta cada consulta en el hilo propio de la petición.
+
+Para que Django tampoco cree ese hilo antes de llegar a la vista:
+- `MIDDLEWARE` usa las variantes de este módulo de los middlewares de Django,
+  que se ejecutan en el event loop y solo pasan a un hilo cuando hay E/S
+  (guardar la sesión o los mensajes);
+- config/asgi.py llama a `retirar_receptores_sincronos`.
+Al terminar la petición, Django sigue cerrando la respuesta en un hilo
+(`request_finished`), solo durante ese momento.
+"""
+import functools
+import inspect
+
+from asgiref.sync import AsyncToSync, sync_to_async
+from django.conf import settings
+from django.contrib.auth import middleware as auth
+from django.contrib.messages import middleware as messages
+from django.contrib.sessions import middleware as sessions
+from django.core.signals import request_started
+from django.db import close_old_connections, reset_queries
+from django.http import HttpResponse
+from django.middleware import clickjacking, common, csrf, security
+from rest_framework.response import Response
+
+
+def _liberando_conexiones(funcion):
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return envoltura
+
+
+def en_hilo(funcion):
+    """
+    Versión asíncrona de `funcion`, que puede tocar la base de datos.
+
+    Si la petición viene de código síncrono (WSGI o el cliente de pruebas), el
+    hilo que la llamó está bloqueado esperando la respuesta: se usa ese, con
+    su conexión y su transacción. Si no, corre en el pool de hilos compartido.
+    """
+    propio = sync_to_async(funcion)
+    compartido = sync_to_async(_liberando_conexiones(funcion), thread_sensitive=False)
+
+    async def envoltura(*args, **kwargs):
+        if getattr(AsyncToSync.executors, "current", None) is not None:
+            return await propio(*args, **kwargs)
+        return await compartido(*args, **kwargs)
+    return envoltura
+
+
+# ==========================
+# Vistas
+# ==========================
+
+def _renderizar(response):
+    """
+    Renderiza una respuesta de DRF y la entrega como `HttpResponse`. El
+    renderizado no hace E/S, pero Django pasaría a un hilo para renderizar una
+    respuesta con render diferido.
+    """
+    if not isinstance(response, Response):
+        return response
+    response.render()
+    final = HttpResponse(response.content, status=response.status_code)
+    for encabezado, valor in response.items():
+        final[encabezado] = valor
+    final.cookies = response.cookies
+    return final
+
+
+class VistaAsincronaMixin:
+    """
+    Primera base de una vista de DRF cuyos handlers son corrutinas (ver el
+    comentario del módulo).
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Lo mismo que `APIView.dispatch`, esperando al handler.
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # La autenticación consulta la base (el usuario del token).
+            await en_hilo(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return _renderizar(self.response)
+
+
+# ==========================
+# Middlewares
+# ==========================
+
+class _EnEventLoopMixin:
+    """
+    Para los middlewares de Django basados en `MiddlewareMixin`, que en modo
+    asíncrono pasan cada método a un hilo: los ejecuta en el event loop. Solo
+    sirve si los métodos no hacen E/S; los que la hacen a veces lo indican con
+    `requiere_hilo`, y los que la harían siempre con la configuración actual,
+    con `en_event_loop`.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if self.async_mode and self.en_event_loop() and hasattr(self, "process_view"):
+            # Django pasaría a un hilo un `process_view` síncrono.
+            process_view = self.process_view
+
+            async def aprocess_view(request, view_func, view_args, view_kwargs):
+                return process_view(request, view_func, view_args, view_kwargs)
+
+            self.process_view = aprocess_view
+
+    def en_event_loop(self):
+        return True
+
+    def requiere_hilo(self, request, response):
+        return False
+
+    async def __acall__(self, request):
+        if not self.en_event_loop():
+            return await super().__acall__(request)
+        response = None
+        if hasattr(self, "process_request"):
+            response = self.process_request(request)
+        response = response or await self.get_response(request)
+        if hasattr(self, "process_response"):
+            if self.requiere_hilo(request, response):
+                response = await sync_to_async(self.process_response, thread_sensitive=True)(request, response)
+            else:
+                response = self.process_response(request, response)
+        return response
+
+
+class SecurityMiddleware(_EnEventLoopMixin, security.SecurityMiddleware):
+    pass
+
+
+class SessionMiddleware(_EnEventLoopMixin, sessions.SessionMiddleware):
+    """La sesión se carga al usarla (en la vista) y se guarda en un hilo."""
+
+    def requiere_hilo(self, request, response):
+        sesion = getattr(request, "session", None)
+        return sesion is not None and (sesion.modified or settings.SESSION_SAVE_EVERY_REQUEST)
+
+
+class CommonMiddleware(_EnEventLoopMixin, common.CommonMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(_EnEventLoopMixin, csrf.CsrfViewMiddleware):
+    """Con `CSRF_USE_SESSIONS`, el token está en la sesión: se comporta como el de Django."""
+
+    def en_event_loop(self):
+        return not settings.CSRF_USE_SESSIONS
+
+
+class AuthenticationMiddleware(_EnEventLoopMixin, auth.AuthenticationMiddleware):
+    """`request.user` se carga al usarlo (en la vista)."""
+
+
+class MessageMiddleware(_EnEventLoopMixin, messages.MessageMiddleware):
+    """Los mensajes se guardan en un hilo solo si la petición los leyó o agregó."""
+
+    def requiere_hilo(self, request, response):
+        almacen = getattr(request, "_messages", None)
+        return almacen is not None and (almacen.used or almacen.added_new)
+
+
+class XFrameOptionsMiddleware(_EnEventLoopMixin, clickjacking.XFrameOptionsMiddleware):
+    pass
+
+
+def retirar_receptores_sincronos():
+    """
+    Bajo ASGI, Django envía `request_started` en el event loop y, si hay un
+    receptor síncrono, crea el hilo de la petición para ejecutarlo. Los de
+    Django (`reset_queries` y `close_old_connections`) no tienen efecto ahí: el
+    hilo de cada petición es nuevo y no tiene conexiones. Las conexiones se
+    siguen cerrando al terminar cada petición. Bajo WSGI los hilos se
+    reutilizan y estos receptores sí hacen falta: solo se llama desde
+    config/asgi.py.
+    """
+    request_started.disconnect(reset_queries)
+    request_started.disconnect(close_old_connections)
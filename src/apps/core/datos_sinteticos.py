@@ -0,0 +1,354 @@
+"""
+Generación de datos sintéticos con volúmenes de operación real, para pruebas
+de carga y para los benchmarks de la API (ver benchmarks/api.py).
+
+Los datos se generan con un generador aleatorio con semilla: con la misma
+semilla, los mismos parámetros y el mismo `hasta`, el resultado es idéntico.
+Simulan la operación de un hotel:
+- Dos turnos por día (08:00 y 20:00, hora local) rotando entre los empleados;
+  todos cerrados salvo el último, que queda activo.
+- Estancias que no se traslapan en una misma habitación, con su cobro, horas
+  extra en una parte de ellas y cierre en el turno en el que salen.
+- Ventas de productos, algunas asociadas a una estancia.
+- Acumulados de los turnos y acumulados diarios de los reportes consistentes
+  con el libro de caja.
+
+Todo se inserta con `bulk_create` en lotes de turnos, sin pasar por `save()`
+ni por las señales; al final se incrementan los sellos de versión para que
+los procesos en ejecución descarten sus cachés.
+"""
+import random
+from contextlib import contextmanager
+from datetime import time as hora, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from apps.caja.models import MovimientoCaja
+from apps.core.versiones import incrementar_version
+from apps.estancias.models import Estancia
+from apps.habitaciones import tablero
+from apps.habitaciones.models import Habitacion, TipoHabitacion
+from apps.productos.models import Producto
+from apps.reportes.acumulados import reconstruir_acumulados_diarios
+from apps.tarifas import resolucion
+from apps.tarifas.models import Tarifa
+from apps.turnos import turno_activo
+from apps.turnos.models import Turno
+from apps.users.models import Usuario
+
+
+PREFIJO_USUARIO = "sint_"
+HORAS_TURNO = 12
+HABITACIONES_POR_PISO = 30
+# (nombre, factor de precio)
+TIPOS_HABITACION = [
+    ("Sencilla", Decimal("1.0")),
+    ("Doble", Decimal("1.3")),
+    ("Ejecutiva", Decimal("1.5")),
+    ("Jacuzzi", Decimal("1.8")),
+    ("Suite", Decimal("2.5")),
+]
+# (nombre, horas, precio base)
+TARIFAS_DIURNAS = [("3 Horas", 3, 250), ("6 Horas", 6, 400), ("12 Horas", 12, 650)]
+TARIFA_NOCTURNA = ("Noche", 12, 700)
+INICIO_NOCTURNA, FIN_NOCTURNA = hora(21, 0), hora(10, 0)
+PRODUCTOS = 40
+PRECIO_HORA_EXTRA = Decimal(100)
+# Proporción de estancias con horas extra y de ventas asociadas a una estancia.
+PROPORCION_HORAS_EXTRA = 0.25
+PROPORCION_VENTAS_A_ESTANCIA = 0.3
+
+
+@contextmanager
+def _fechas_explicitas(*campos):
+    """Permite asignar campos `auto_now_add`, que `bulk_create` sobrescribiría."""
+    for campo in campos:
+        campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo in campos:
+            campo.auto_now_add = True
+
+
+def _metodo_pago(aleatorio):
+    return MovimientoCaja.MetodoPago.EFECTIVO if aleatorio.random() < 0.65 else MovimientoCaja.MetodoPago.TRANSFERENCIA
+
+
+def _crear_catalogos(*, habitaciones, empleados):
+    tipos = TipoHabitacion.objects.bulk_create(
+        TipoHabitacion(nombre=nombre) for nombre, _ in TIPOS_HABITACION
+    )
+
+    tarifas_por_tipo = {}
+    for tipo, (_, factor) in zip(tipos, TIPOS_HABITACION):
+        tarifas = [
+            Tarifa(nombre=nombre, horas=horas, precio=Decimal(precio) * factor, tipo_habitacion=tipo)
+            for nombre, horas, precio in TARIFAS_DIURNAS
+        ]
+        nombre, horas, precio = TARIFA_NOCTURNA
+        tarifas.append(Tarifa(
+            nombre=nombre, horas=horas, precio=Decimal(precio) * factor, tipo_habitacion=tipo,
+            es_nocturna=True, hora_inicio_nocturna=INICIO_NOCTURNA, hora_fin_nocturna=FIN_NOCTURNA,
+        ))
+        tarifas_por_tipo[tipo.id] = Tarifa.objects.bulk_create(tarifas)
+
+    cuartos = Habitacion.objects.bulk_create(
+        Habitacion(
+            numero=(i // HABITACIONES_POR_PISO + 1) * 100 + i % HABITACIONES_POR_PISO + 1,
+            tipo=tipos[i % len(tipos)],
+        )
+        for i in range(habitaciones)
+    )
+
+    productos = Producto.objects.bulk_create(
+        Producto(nombre=f"Producto {i + 1:02d}", precio=Decimal(20 + (i * 37) % 130), stock=1000)
+        for i in range(PRODUCTOS)
+    )
+
+    sin_contrasena = make_password(None)
+    Usuario.objects.bulk_create([
+        Usuario(username=f"{PREFIJO_USUARIO}admin", rol=Usuario.Rol.ADMINISTRADOR, password=sin_contrasena),
+    ])
+    personal = Usuario.objects.bulk_create(
+        Usuario(username=f"{PREFIJO_USUARIO}empleado_{i + 1:02d}", rol=Usuario.Rol.EMPLEADO, password=sin_contrasena)
+        for i in range(empleados)
+    )
+    return cuartos, tarifas_por_tipo, productos, personal
+
+
+def _crear_turnos(*, personal, inicio, cantidad):
+    """Turnos consecutivos de 12 horas; el último queda activo."""
+    with _fechas_explicitas(Turno._meta.get_field("fecha_inicio")):
+        fechas = [inicio + timedelta(hours=HORAS_TURNO * i) for i in range(cantidad)]
+        return Turno.objects.bulk_create(
+            (
+                Turno(
+                    usuario=personal[i % len(personal)],
+                    tipo_turno=(
+                        Turno.TipoTurno.DIA if timezone.localtime(fechas[i]).hour == 8 else Turno.TipoTurno.NOCHE
+                    ),
+                    fecha_inicio=fechas[i],
+                    activo=i == cantidad - 1,
+                    caja_inicial=Decimal(1000),
+                )
+                for i in range(cantidad)
+            ),
+            batch_size=1000,
+        )
+
+
+class _Simulacion:
+    """Estado de la simulación entre lotes de turnos."""
+
+    def __init__(self, *, aleatorio, turnos, cuartos, tarifas_por_tipo, productos, momento_final):
+        self.aleatorio = aleatorio
+        self.turnos = turnos
+        self.inicio = turnos[0].fecha_inicio
+        self.cuartos = cuartos
+        self.tarifas_por_tipo = tarifas_por_tipo
+        self.productos = productos
+        self.momento_final = momento_final
+        self.libre_desde = {cuarto.id: self.inicio for cuarto in cuartos}
+        self.ultima_salida = {}
+        self.estancias_activas = {}  # habitacion_id -> estancia
+        # turno_id -> [efectivo, transferencia, cantidad]
+        self.totales = {turno.id: [Decimal(0), Decimal(0), 0] for turno in turnos}
+        self.estancias = 0
+        self.movimientos = 0
+
+    def turno_en(self, momento):
+        indice = int((momento - self.inicio).total_seconds() // (HORAS_TURNO * 3600))
+        return self.turnos[min(indice, len(self.turnos) - 1)]
+
+    def _movimiento(self, movimientos, *, turno, fecha, **campos):
+        # Se asignan ids en lugar de instancias: crear millones de objetos es
+        # lo más costoso de la generación.
+        movimiento = MovimientoCaja(turno_id=turno.id, fecha=fecha, metodo_pago=_metodo_pago(self.aleatorio), **campos)
+        totales = self.totales[turno.id]
+        totales[0 if movimiento.metodo_pago == MovimientoCaja.MetodoPago.EFECTIVO else 1] += movimiento.monto
+        totales[2] += 1
+        movimientos.append(movimiento)
+
+    def _tarifa(self, cuarto, entrada):
+        tarifas = self.tarifas_por_tipo[cuarto.tipo_id]
+        hora_local = timezone.localtime(entrada).time()
+        if (hora_local >= INICIO_NOCTURNA or hora_local < FIN_NOCTURNA) and self.aleatorio.random() < 0.5:
+            return tarifas[-1]
+        return self.aleatorio.choice(tarifas[:-1])
+
+    def simular(self, turnos, *, estancias_por_turno, ventas_por_turno):
+        aleatorio = self.aleatorio
+        nuevas, pendientes = [], []  # pendientes: (estancia, [(turno, fecha, monto, tipo)])
+        for turno in turnos:
+            fin_turno = min(turno.fecha_inicio + timedelta(hours=HORAS_TURNO), self.momento_final)
+            duracion = (fin_turno - turno.fecha_inicio).total_seconds()
+            cantidad = aleatorio.randint(int(estancias_por_turno * 0.7), int(estancias_por_turno * 1.3))
+            entradas = sorted(turno.fecha_inicio + timedelta(seconds=aleatorio.uniform(0, duracion)) for _ in range(cantidad))
+            for entrada in entradas:
+                cuarto = next(
+                    (c for c in (aleatorio.choice(self.cuartos) for _ in range(8)) if self.libre_desde[c.id] <= entrada),
+                    None,
+                )
+                if cuarto is None:
+                    continue
+                tarifa = self._tarifa(cuarto, entrada)
+                salida_programada = entrada + timedelta(hours=tarifa.horas)
+                cobros = [(turno, entrada, tarifa.precio, MovimientoCaja.TipoMovimiento.ESTANCIA)]
+                if aleatorio.random() < PROPORCION_HORAS_EXTRA:
+                    horas_extra = aleatorio.randint(1, 3)
+                    momento_extra = salida_programada - timedelta(minutes=aleatorio.randint(5, 30))
+                    salida_programada += timedelta(hours=horas_extra)
+                    if momento_extra <= self.momento_final:
+                        cobros.append((
+                            self.turno_en(momento_extra), momento_extra,
+                            PRECIO_HORA_EXTRA * horas_extra, MovimientoCaja.TipoMovimiento.EXTRA,
+                        ))
+                salida_real = salida_programada - timedelta(minutes=aleatorio.randint(0, 40))
+
+                estancia = Estancia(
+                    habitacion=cuarto, tarifa=tarifa, turno_inicio=turno,
+                    hora_entrada=entrada, hora_salida_programada=salida_programada,
+                )
+                if salida_real <= self.momento_final:
+                    estancia.activa = False
+                    estancia.hora_salida_real = salida_real
+                    estancia.turno_cierre = self.turno_en(salida_real)
+                    self.ultima_salida[cuarto.id] = salida_real
+                else:
+                    self.estancias_activas[cuarto.id] = estancia
+                # La habitación se limpia 15 minutos antes de la siguiente estancia.
+                self.libre_desde[cuarto.id] = salida_real + timedelta(minutes=15)
+                nuevas.append(estancia)
+                pendientes.append((estancia, cobros))
+
+        Estancia.objects.bulk_create(nuevas, batch_size=2000)
+        self.estancias += len(nuevas)
+
+        movimientos = []
+        for estancia, cobros in pendientes:
+            for turno, fecha, monto, tipo in cobros:
+                self._movimiento(movimientos, turno=turno, fecha=fecha, monto=monto, tipo=tipo, estancia_id=estancia.id)
+
+        for turno in turnos:
+            fin_turno = min(turno.fecha_inicio + timedelta(hours=HORAS_TURNO), self.momento_final)
+            duracion = (fin_turno - turno.fecha_inicio).total_seconds()
+            del_turno = [e for e in nuevas if e.turno_inicio_id == turno.id]
+            for _ in range(aleatorio.randint(int(ventas_por_turno * 0.7), int(ventas_por_turno * 1.3))):
+                producto = aleatorio.choice(self.productos)
+                estancia_id = (
+                    aleatorio.choice(del_turno).id
+                    if del_turno and aleatorio.random() < PROPORCION_VENTAS_A_ESTANCIA else None
+                )
+                self._movimiento(
+                    movimientos, turno=turno,
+                    fecha=turno.fecha_inicio + timedelta(seconds=aleatorio.uniform(0, duracion)),
+                    monto=producto.precio * aleatorio.randint(1, 3),
+                    tipo=MovimientoCaja.TipoMovimiento.PRODUCTO, producto_id=producto.id, estancia_id=estancia_id,
+                )
+
+        with _fechas_explicitas(MovimientoCaja._meta.get_field("fecha")):
+            MovimientoCaja.objects.bulk_create(movimientos, batch_size=5000)
+        self.movimientos += len(movimientos)
+
+    def cerrar_turnos(self):
+        """Asigna a cada turno sus acumulados y, a los cerrados, su cierre de caja."""
+        for turno in self.turnos:
+            efectivo, transferencia, cantidad = self.totales[turno.id]
+            turno.total_efectivo = efectivo
+            turno.total_transferencia = transferencia
+            turno.cantidad_movimientos = cantidad
+            if turno.activo:
+                continue
+            turno.fecha_fin = turno.fecha_inicio + timedelta(hours=HORAS_TURNO)
+            turno.sueldo = Decimal(self.aleatorio.choice([0, 200, 300]))
+            turno.efectivo_esperado = turno.caja_inicial + efectivo - turno.sueldo
+            turno.efectivo_reportado = turno.efectivo_esperado + Decimal(self.aleatorio.randint(-20, 20))
+            turno.diferencia = turno.efectivo_reportado - turno.efectivo_esperado
+            turno.caja_final = turno.efectivo_reportado
+        Turno.objects.bulk_update(
+            self.turnos,
+            [
+                "total_efectivo", "total_transferencia", "cantidad_movimientos", "fecha_fin", "sueldo",
+                "efectivo_esperado", "efectivo_reportado", "diferencia", "caja_final",
+            ],
+            batch_size=500,
+        )
+
+    def actualizar_habitaciones(self):
+        """Ocupadas las de estancias activas; en limpieza las desocupadas hace menos de 20 minutos."""
+        limite_limpieza = self.momento_final - timedelta(minutes=20)
+        Habitacion.objects.filter(pk__in=list(self.estancias_activas)).update(estado=Habitacion.Estado.OCUPADA)
+        Habitacion.objects.filter(pk__in=[
+            habitacion_id for habitacion_id, salida in self.ultima_salida.items()
+            if salida >= limite_limpieza and habitacion_id not in self.estancias_activas
+        ]).update(estado=Habitacion.Estado.LIMPIEZA)
+
+
+def generar_datos_sinteticos(
+    *,
+    habitaciones=300,
+    dias=730,
+    empleados=12,
+    estancias_por_turno=150,
+    ventas_por_turno=1000,
+    hasta=None,
+    semilla=0,
+    turnos_por_lote=20,
+    progreso=None,
+):
+    """
+    Genera `dias` días de operación que terminan en `hasta` (ahora, por
+    defecto) sobre una base sin turnos. `progreso(turnos_procesados, total)`
+    se llama después de cada lote. Devuelve la cantidad de filas creadas.
+    """
+    aleatorio = random.Random(semilla)
+    momento_final = hasta or timezone.now()
+
+    # El último turno es el que contiene `momento_final`: empieza a las 08:00 o a las 20:00.
+    local = timezone.localtime(momento_final)
+    inicio_ultimo = local.replace(hour=8, minute=0, second=0, microsecond=0)
+    if local < inicio_ultimo:
+        inicio_ultimo -= timedelta(hours=HORAS_TURNO)
+    elif local >= inicio_ultimo + timedelta(hours=HORAS_TURNO):
+        inicio_ultimo += timedelta(hours=HORAS_TURNO)
+    cantidad_turnos = dias * 2
+    inicio = inicio_ultimo - timedelta(hours=HORAS_TURNO * (cantidad_turnos - 1))
+
+    with transaction.atomic():
+        cuartos, tarifas_por_tipo, productos, personal = _crear_catalogos(
+            habitaciones=habitaciones, empleados=empleados,
+        )
+        turnos = _crear_turnos(personal=personal, inicio=inicio, cantidad=cantidad_turnos)
+
+    simulacion = _Simulacion(
+        aleatorio=aleatorio, turnos=turnos, cuartos=cuartos, tarifas_por_tipo=tarifas_por_tipo,
+        productos=productos, momento_final=momento_final,
+    )
+    for desde in range(0, cantidad_turnos, turnos_por_lote):
+        with transaction.atomic():
+            simulacion.simular(
+                turnos[desde:desde + turnos_por_lote],
+                estancias_por_turno=estancias_por_turno, ventas_por_turno=ventas_por_turno,
+            )
+        if progreso:
+            progreso(min(desde + turnos_por_lote, cantidad_turnos), cantidad_turnos)
+
+    with transaction.atomic():
+        simulacion.cerrar_turnos()
+        simulacion.actualizar_habitaciones()
+        reconstruir_acumulados_diarios()
+        for clave in (turno_activo.CLAVE_VERSION, tablero.CLAVE_VERSION, resolucion.CLAVE_VERSION):
+            incrementar_version(clave)
+
+    return {
+        "habitaciones": len(cuartos),
+        "empleados": len(personal),
+        "turnos": len(turnos),
+        "estancias": simulacion.estancias,
+        "estancias_activas": len(simulacion.estancias_activas),
+        "movimientos": simulacion.movimientos,
+    }
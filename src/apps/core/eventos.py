@@ -0,0 +1,266 @@
+"""
+Flujo de eventos de estado para las terminales de recepción (Server-Sent Events).
+
+Los servicios publican eventos (cambios de estado de habitaciones, movimientos
+de caja, apertura y cierre de turnos) con `publicar`. Al confirmarse la
+transacción, el evento se guarda en la tabla `Evento` y se avisa a los
+clientes conectados a este mismo proceso.
+
+Cada event loop tiene un solo `Canal` que lee los eventos nuevos de la base y
+los reparte a todos sus clientes:
+- Los eventos de este proceso despiertan al canal en cuanto se guardan.
+- Los eventos de otros procesos (varios workers) se detectan consultando la
+  tabla cada `EVENTOS_INTERVALO_SONDEO_SEGUNDOS`.
+
+Así, el número de consultas no depende del número de terminales conectadas.
+El flujo es asíncrono: requiere un servidor ASGI. Las consultas corren con
+`en_hilo` (ver asincrono.py), así que un cliente conectado no ocupa un hilo.
+
+`EventSource` no permite enviar encabezados. La terminal pide un ticket de un
+solo uso con su token (`emitir_ticket`) y abre el flujo con `?ticket=`; el
+token de acceso nunca va en la URL, que queda en los registros de acceso.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import secrets
+import threading
+import weakref
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .asincrono import en_hilo
+from .models import Evento, TicketEventos
+
+logger = logging.getLogger(__name__)
+
+
+# Eventos leídos de la base por consulta.
+TAMANO_LOTE = 100
+# Eventos pendientes por cliente; si un cliente no los consume, se desconecta
+# y al reconectarse los recupera con `Last-Event-ID`.
+MAXIMO_PENDIENTES = 1000
+# Cada cuántos eventos guardados se eliminan los que superan la retención.
+PURGAR_CADA = 1000
+# Segundos sin eventos tras los cuales se envía un comentario para mantener viva la conexión.
+SEGUNDOS_ENTRE_LATIDOS = 15
+
+_candado = threading.Lock()
+_canales = weakref.WeakKeyDictionary()  # event loop -> Canal
+
+
+def _intervalo_sondeo():
+    return getattr(settings, "EVENTOS_INTERVALO_SONDEO_SEGUNDOS", 2)
+
+
+# ==========================
+# Publicación
+# ==========================
+
+def publicar(tipo, datos):
+    """
+    Publica un evento cuando se confirme la transacción actual (o de inmediato
+    si no hay una). Si la transacción se revierte, el evento no se publica.
+    """
+    transaction.on_commit(lambda: guardar_evento(tipo, datos))
+
+
+def guardar_evento(tipo, datos):
+    """Guarda el evento y despierta a los canales de este proceso."""
+    evento = Evento.objects.create(tipo=tipo, datos=datos)
+    if evento.id % PURGAR_CADA == 0:
+        purgar_eventos_antiguos()
+    _despertar_canales()
+    return evento
+
+
+def purgar_eventos_antiguos():
+    limite = timezone.now() - timedelta(hours=getattr(settings, "EVENTOS_RETENCION_HORAS", 24))
+    return Evento.objects.filter(fecha__lt=limite).delete()[0]
+
+
+def _despertar_canales():
+    with _candado:
+        canales = list(_canales.values())
+    for canal in canales:
+        canal.despertar()
+
+
+# ==========================
+# Tickets de conexión
+# ==========================
+
+def vigencia_ticket():
+    return timedelta(seconds=getattr(settings, "EVENTOS_TICKET_SEGUNDOS", 30))
+
+
+def _huella_ticket(ticket):
+    return hashlib.sha256(ticket.encode()).hexdigest()
+
+
+def emitir_ticket(usuario):
+    """Ticket para abrir el flujo de eventos una sola vez, dentro de su vigencia."""
+    ticket = secrets.token_urlsafe(32)
+    TicketEventos.objects.create(huella=_huella_ticket(ticket), usuario=usuario)
+    # Los tickets vencidos que nadie canjeó se eliminan al emitir los nuevos.
+    TicketEventos.objects.filter(fecha__lt=timezone.now() - vigencia_ticket()).delete()
+    return ticket
+
+
+def canjear_ticket(ticket):
+    """Usuario del ticket, o None si no existe, ya venció o ya se usó."""
+    registro = (
+        TicketEventos.objects.select_related("usuario")
+        .filter(huella=_huella_ticket(ticket), fecha__gte=timezone.now() - vigencia_ticket())
+        .first()
+    )
+    if registro is None:
+        return None
+    # Borrado condicional: si dos conexiones presentan el mismo ticket, solo una lo canjea.
+    if not TicketEventos.objects.filter(pk=registro.pk).delete()[0]:
+        return None
+    return registro.usuario if registro.usuario.is_active else None
+
+
+# ==========================
+# Lectura
+# ==========================
+
+def ultimo_evento_id():
+    return Evento.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def eventos_desde(ultimo_id, limite=TAMANO_LOTE):
+    """Eventos posteriores a `ultimo_id`, en orden."""
+    return list(
+        Evento.objects.filter(id__gt=ultimo_id).order_by("id").values("id", "tipo", "datos")[:limite]
+    )
+
+
+def formatear_evento(evento):
+    """Texto de un evento en el formato de Server-Sent Events."""
+    datos = json.dumps(evento["datos"], cls=DjangoJSONEncoder)
+    return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {datos}\n\n"
+
+
+class Canal:
+    """
+    Lector compartido de eventos de un event loop. Una sola tarea consulta la
+    base y reparte los eventos a las colas de los clientes suscritos; termina
+    cuando no queda ningún cliente.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.aviso = asyncio.Event()
+        self.colas = set()
+        self.ultimo_id = None
+        self.tarea = None
+
+    def despertar(self):
+        """Puede llamarse desde cualquier hilo."""
+        try:
+            self.loop.call_soon_threadsafe(self.aviso.set)
+        except RuntimeError:
+            # El event loop ya se cerró.
+            pass
+
+    async def suscribir(self):
+        cola = asyncio.Queue(maxsize=MAXIMO_PENDIENTES)
+        if not self.colas:
+            # Sin clientes nadie leyó los eventos guardados mientras tanto: el
+            # canal retoma desde el último, no desde donde se quedó.
+            self.ultimo_id = await en_hilo(ultimo_evento_id)()
+        self.colas.add(cola)
+        if self.tarea is None or self.tarea.done():
+            self.tarea = self.loop.create_task(self._repartir())
+        return cola
+
+    def cancelar(self, cola):
+        self.colas.discard(cola)
+        if not self.colas:
+            # Sin clientes, la tarea de reparto termina sin esperar al siguiente sondeo.
+            self.aviso.set()
+
+    async def _repartir(self):
+        while self.colas:
+            # El aviso se limpia antes de consultar: un evento guardado durante
+            # la consulta vuelve a despertar al canal.
+            self.aviso.clear()
+            try:
+                eventos = await en_hilo(eventos_desde)(self.ultimo_id)
+            except DatabaseError:
+                # Se reintenta en el siguiente sondeo sin desconectar a los clientes.
+                logger.exception("No se pudieron leer los eventos nuevos.")
+                eventos = []
+            for evento in eventos:
+                self.ultimo_id = evento["id"]
+                for cola in list(self.colas):
+                    try:
+                        cola.put_nowait(evento)
+                    except asyncio.QueueFull:
+                        # Cliente demasiado lento: se le avisa que debe reconectarse.
+                        self.colas.discard(cola)
+                        cola.get_nowait()
+                        cola.put_nowait(None)
+            if len(eventos) == TAMANO_LOTE:
+                continue
+            try:
+                await asyncio.wait_for(self.aviso.wait(), timeout=_intervalo_sondeo())
+            except asyncio.TimeoutError:
+                pass
+
+
+def _canal_actual():
+    loop = asyncio.get_running_loop()
+    with _candado:
+        canal = _canales.get(loop)
+        if canal is None:
+            canal = _canales[loop] = Canal(loop)
+    return canal
+
+
+async def flujo_de_eventos(ultimo_id=None):
+    """
+    Generador asíncrono con el texto SSE de los eventos posteriores a
+    `ultimo_id` (o solo de los nuevos, si no se indica) y de los que se
+    publiquen mientras el cliente siga conectado.
+    """
+    canal = _canal_actual()
+    cola = await canal.suscribir()
+    try:
+        # Indica al navegador cuánto esperar antes de reconectarse.
+        yield "retry: 3000\n\n"
+
+        # Eventos que el cliente no alcanzó a recibir antes de reconectarse.
+        if ultimo_id is not None:
+            while ultimo_id < canal.ultimo_id:
+                pendientes = await en_hilo(eventos_desde)(ultimo_id)
+                pendientes = [e for e in pendientes if e["id"] <= canal.ultimo_id]
+                if not pendientes:
+                    break
+                for evento in pendientes:
+                    yield formatear_evento(evento)
+                ultimo_id = pendientes[-1]["id"]
+        else:
+            ultimo_id = canal.ultimo_id
+
+        while True:
+            try:
+                evento = await asyncio.wait_for(cola.get(), timeout=SEGUNDOS_ENTRE_LATIDOS)
+            except asyncio.TimeoutError:
+                yield ": latido\n\n"
+                continue
+            if evento is None:
+                return
+            # Los eventos ya enviados como pendientes pueden llegar también por la cola.
+            if evento["id"] > ultimo_id:
+                ultimo_id = evento["id"]
+                yield formatear_evento(evento)
+    finally:
+        canal.cancelar(cola)
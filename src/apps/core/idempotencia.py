@@ -0,0 +1,129 @@
+"""
+Soporte del encabezado `Idempotency-Key` en los endpoints que mueven dinero.
+
+Las terminales con conexión inestable reintentan las peticiones cuyo resultado
+no recibieron; sin una clave, un reintento cobra dos veces. Con el decorador
+`idempotente`:
+- La primera petición con una clave se ejecuta en una transacción que, si la
+  respuesta es exitosa, también guarda la respuesta (`RespuestaIdempotente`).
+- Un reintento con la misma clave y la misma petición recibe la respuesta
+  guardada sin volver a ejecutar el servicio.
+- Si dos reintentos llegan a la vez, la restricción única (usuario, clave)
+  hace que solo uno se confirme: el otro se revierte por completo y devuelve
+  la respuesta del primero. No se toma ningún bloqueo.
+
+Las respuestas con error no se guardan (los servicios no dejan cambios cuando
+fallan), así que la petición puede reintentarse con la misma clave.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import RespuestaIdempotente
+
+
+ENCABEZADO = "Idempotency-Key"
+# Se indica en las respuestas repetidas desde la tabla.
+ENCABEZADO_REPETIDA = "Idempotent-Replayed"
+LONGITUD_MAXIMA_CLAVE = 255
+# Cada cuántas respuestas guardadas se eliminan las que superan la retención.
+PURGAR_CADA = 1000
+
+
+def _retencion():
+    return timedelta(hours=getattr(settings, "IDEMPOTENCIA_RETENCION_HORAS", 24))
+
+
+def huella_de_peticion(request):
+    """SHA-256 del método, la ruta y el cuerpo (ya interpretado) de la petición."""
+    datos = request.data
+    if hasattr(datos, "lists"):
+        # Formularios: un QueryDict puede tener varios valores por campo.
+        datos = dict(datos.lists())
+    contenido = json.dumps(
+        [request.method, request.path, datos],
+        cls=DjangoJSONEncoder, sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(contenido.encode()).hexdigest()
+
+
+def purgar_respuestas_antiguas():
+    limite = timezone.now() - _retencion()
+    return RespuestaIdempotente.objects.filter(fecha__lt=limite).delete()[0]
+
+
+def _buscar(usuario, clave):
+    guardada = RespuestaIdempotente.objects.filter(usuario=usuario, clave=clave).first()
+    if guardada is not None and guardada.fecha < timezone.now() - _retencion():
+        # Vencida: la clave vuelve a estar libre.
+        guardada.delete()
+        return None
+    return guardada
+
+
+def _repetir(guardada, huella):
+    if guardada.huella != huella:
+        return Response(
+            {"error": "La clave de idempotencia ya se usó con una petición diferente."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    response = Response(guardada.respuesta, status=guardada.estado_http)
+    response[ENCABEZADO_REPETIDA] = "true"
+    return response
+
+
+def idempotente(handler):
+    """
+    Decorador para el método de una vista de DRF (`post`, `create`). Se ejecuta
+    después de la autenticación y los permisos, así que las claves son por
+    usuario. Sin el encabezado, la petición se procesa como siempre.
+    """
+    @wraps(handler)
+    def envoltura(view, request, *args, **kwargs):
+        clave = request.headers.get(ENCABEZADO)
+        if not clave:
+            return handler(view, request, *args, **kwargs)
+        if len(clave) > LONGITUD_MAXIMA_CLAVE:
+            return Response(
+                {"error": f"La clave de idempotencia no puede tener más de {LONGITUD_MAXIMA_CLAVE} caracteres."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        huella = huella_de_peticion(request)
+        guardada = _buscar(request.user, clave)
+        if guardada is not None:
+            return _repetir(guardada, huella)
+
+        try:
+            with transaction.atomic():
+                response = handler(view, request, *args, **kwargs)
+                if status.is_success(response.status_code):
+                    guardada = RespuestaIdempotente.objects.create(
+                        usuario=request.user,
+                        clave=clave,
+                        huella=huella,
+                        estado_http=response.status_code,
+                        # Se guarda ya convertido a JSON, como lo recibió el cliente.
+                        respuesta=json.loads(json.dumps(response.data, cls=DjangoJSONEncoder)),
+                    )
+        except IntegrityError:
+            # Otra petición con la misma clave se confirmó primero; esta se
+            # revirtió por completo. Si no hay tal petición, el error es de la operación.
+            guardada = _buscar(request.user, clave)
+            if guardada is None:
+                raise
+            return _repetir(guardada, huella)
+
+        if guardada is not None and guardada.id % PURGAR_CADA == 0:
+            purgar_respuestas_antiguas()
+        return response
+
+    return envoltura
@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from django.utils import timezone
+
+from apps.core.datos_sinteticos import generar_datos_sinteticos
+from apps.turnos.models import Turno
+
+
+class Command(BaseCommand):
+    """
+    Llena una base vacía con datos sintéticos de operación (ver
+    apps/core/datos_sinteticos.py). Con los valores por defecto genera 300
+    habitaciones y dos años de turnos, con unas 220 mil estancias y cerca de
+    dos millones de movimientos de caja.
+
+    Uso:
+        python manage.py generar_datos_sinteticos
+        python manage.py generar_datos_sinteticos --dias 30 --habitaciones 50 --hasta 2026-01-01T12:00
+    """
+    help = "Genera datos sintéticos deterministas (habitaciones, turnos, estancias y movimientos) en una base vacía."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--habitaciones", type=int, default=300)
+        parser.add_argument("--dias", type=int, default=730, help="Días de operación (dos turnos por día).")
+        parser.add_argument("--empleados", type=int, default=12)
+        parser.add_argument("--estancias-por-turno", type=int, default=150, help="Promedio de estancias por turno.")
+        parser.add_argument("--ventas-por-turno", type=int, default=1000, help="Promedio de ventas de productos por turno.")
+        parser.add_argument("--semilla", type=int, default=0)
+        parser.add_argument(
+            "--hasta",
+            help="Fecha y hora (ISO 8601) en que termina la operación simulada. Por defecto, ahora.",
+        )
+
+    def handle(self, *args, **options):
+        if Turno.objects.exists():
+            raise CommandError("La base ya tiene turnos: los datos sintéticos solo se generan en una base vacía.")
+
+        hasta = None
+        if options["hasta"]:
+            hasta = parse_datetime(options["hasta"])
+            if hasta is None:
+                raise CommandError(f"Fecha inválida para --hasta: {options['hasta']}")
+            if timezone.is_naive(hasta):
+                hasta = timezone.make_aware(hasta)
+
+        def progreso(procesados, total):
+            self.stdout.write(f"  {procesados}/{total} turnos", ending="\r")
+            self.stdout.flush()
+
+        inicio = time.perf_counter()
+        creados = generar_datos_sinteticos(
+            habitaciones=options["habitaciones"],
+            dias=options["dias"],
+            empleados=options["empleados"],
+            estancias_por_turno=options["estancias_por_turno"],
+            ventas_por_turno=options["ventas_por_turno"],
+            semilla=options["semilla"],
+            hasta=hasta,
+            progreso=progreso if options["verbosity"] > 0 else None,
+        )
+        if options["verbosity"] == 0:
+            return
+        resumen = ", ".join(f"{cantidad} {nombre}" for nombre, cantidad in creados.items())
+        self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS(
+            f"Datos generados en {time.perf_counter() - inicio:.1f} s: {resumen}."
+        ))
@@ -0,0 +1,360 @@
+"""
+Medición del tiempo de las peticiones.
+
+`MedicionMiddleware` registra por petición el tiempo total, el tiempo y número
+de consultas a la base de datos, y los tiempos de serialización y renderizado
+de DRF:
+- Los devuelve en el encabezado `Server-Timing` (visible en las herramientas
+  de desarrollo del navegador y, para los orígenes de `CORS_ALLOWED_ORIGINS`,
+  en la API de Resource Timing de los frontends).
+- Registra en el log las peticiones que superan `MEDICION_UMBRAL_LENTO_MS`,
+  con su consulta más lenta.
+- Acumula en memoria las últimas `MEDICION_MUESTRAS_POR_RUTA` peticiones de
+  cada ruta (por nombre de URL) para calcular percentiles, y un histograma
+  acumulado desde el inicio del proceso para las métricas (ver metricas.py).
+  Los datos son de este proceso: cada worker tiene los suyos y se pierden al
+  reiniciarlo.
+
+El tiempo de serialización es el de `serializer.data`: convertir los objetos
+en datos primitivos. Lo mide `MedicionSerializerMixin`, que usan los
+serializers de la API. El de renderizado es el de convertir esos datos en el
+cuerpo de la respuesta (JSON, etc.); lo mide `MedicionRenderMixin`, que usan
+las vistas de la API.
+
+La medición en curso se guarda en una variable de contexto, que se propaga a
+los hilos de `sync_to_async`: las consultas se atribuyen a su petición tanto
+en vistas síncronas como asíncronas.
+"""
+import logging
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+
+PERCENTILES = (50, 90, 95, 99)
+# Límites superiores (en segundos) de las cubetas del histograma de duración.
+LIMITES_HISTOGRAMA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Caracteres de la consulta más lenta que se incluyen en el log.
+LONGITUD_MAXIMA_SQL = 1000
+
+_medicion_actual = ContextVar("medicion_actual", default=None)
+
+
+def _umbral_lento_ms():
+    return getattr(settings, "MEDICION_UMBRAL_LENTO_MS", 500)
+
+
+def _muestras_por_ruta():
+    return getattr(settings, "MEDICION_MUESTRAS_POR_RUTA", 1000)
+
+
+class Medicion:
+    """Tiempos de una petición, en segundos."""
+    __slots__ = (
+        "inicio", "total", "tiempo_db", "consultas", "tiempo_serializacion", "tiempo_render",
+        "sql_mas_lento", "tiempo_sql_mas_lento", "serializando",
+    )
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.total = 0.0
+        self.tiempo_db = 0.0
+        self.consultas = 0
+        self.tiempo_serializacion = 0.0
+        self.tiempo_render = 0.0
+        self.sql_mas_lento = None
+        self.tiempo_sql_mas_lento = 0.0
+        self.serializando = False
+
+    def terminar(self):
+        self.total = time.perf_counter() - self.inicio
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.tiempo_db * 1000:.1f};desc="{self.consultas} consultas", '
+            f"ser;dur={self.tiempo_serializacion * 1000:.1f}, "
+            f"render;dur={self.tiempo_render * 1000:.1f}, "
+            f"total;dur={self.total * 1000:.1f}"
+        )
+
+
+# ==========================
+# Instrumentación
+# ==========================
+
+def _registrar_consulta(execute, sql, params, many, context):
+    """`execute_wrapper` instalado en todas las conexiones."""
+    medicion = _medicion_actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duracion = time.perf_counter() - inicio
+        medicion.tiempo_db += duracion
+        medicion.consultas += 1
+        if duracion > medicion.tiempo_sql_mas_lento:
+            medicion.tiempo_sql_mas_lento = duracion
+            medicion.sql_mas_lento = sql
+
+
+def _instalar_en_conexion(connection, **kwargs):
+    global _conexiones_abiertas
+    with _candado:
+        _conexiones_abiertas += 1
+    if _registrar_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_registrar_consulta)
+
+
+def instrumentar():
+    """Instala la medición de consultas. Se llama en `CoreConfig.ready`."""
+    connection_created.connect(_instalar_en_conexion, dispatch_uid="medicion_consultas")
+    for connection in connections.all(initialized_only=True):
+        _instalar_en_conexion(connection)
+
+
+class MedicionSerializerMixin:
+    """
+    Mixin para los serializers de DRF: mide `serializer.data`, es decir,
+    `to_representation`. Solo cuenta el serializer más externo (los anidados
+    ya están dentro de su tiempo); con `many=True`, cada elemento. Las
+    consultas que se hagan mientras tanto (relaciones sin `select_related`)
+    cuentan como tiempo de base de datos y se descuentan.
+    """
+
+    def to_representation(self, instance):
+        medicion = _medicion_actual.get()
+        if medicion is None or medicion.serializando:
+            return super().to_representation(instance)
+        medicion.serializando = True
+        tiempo_db = medicion.tiempo_db
+        inicio = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            duracion = time.perf_counter() - inicio - (medicion.tiempo_db - tiempo_db)
+            medicion.tiempo_serializacion += duracion
+            medicion.serializando = False
+
+
+class MedicionRenderMixin:
+    """
+    Mixin para las vistas de DRF: mide el renderizado de la respuesta en el
+    formato negociado, desde que la vista la entrega (`finalize_response`)
+    hasta que su contenido está listo.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        medicion = _medicion_actual.get()
+        if medicion is not None and not getattr(response, "is_rendered", True):
+            inicio = time.perf_counter()
+
+            def registrar(respuesta):
+                medicion.tiempo_render += time.perf_counter() - inicio
+
+            response.add_post_render_callback(registrar)
+        return response
+
+
+# ==========================
+# Estadísticas por ruta
+# ==========================
+
+_candado = threading.Lock()
+_rutas = {}  # nombre de la ruta -> EstadisticasRuta
+_conexiones_abiertas = 0
+
+
+class EstadisticasRuta:
+    """
+    Últimas muestras (total, db, consultas, serialización y renderizado) de
+    una ruta, y sus totales desde el inicio del proceso: peticiones por cubeta
+    del histograma de duración, suma de duraciones, consultas y tiempo de base
+    de datos.
+    """
+    __slots__ = ("peticiones", "muestras", "cubetas", "suma_total", "consultas", "tiempo_db")
+
+    def __init__(self, maximo_muestras):
+        self.peticiones = 0
+        self.muestras = deque(maxlen=maximo_muestras)
+        # Una cubeta por límite más la de +Inf; no acumuladas.
+        self.cubetas = [0] * (len(LIMITES_HISTOGRAMA) + 1)
+        self.suma_total = 0.0
+        self.consultas = 0
+        self.tiempo_db = 0.0
+
+
+def percentil(valores_ordenados, p):
+    """Percentil `p` (0-100) por rango más cercano de una lista ordenada."""
+    if not valores_ordenados:
+        return None
+    indice = max(math.ceil(p / 100 * len(valores_ordenados)) - 1, 0)
+    return valores_ordenados[indice]
+
+
+def registrar_muestra(ruta, medicion):
+    with _candado:
+        estadisticas = _rutas.get(ruta)
+        if estadisticas is None:
+            estadisticas = _rutas[ruta] = EstadisticasRuta(_muestras_por_ruta())
+        estadisticas.peticiones += 1
+        estadisticas.muestras.append((
+            medicion.total, medicion.tiempo_db, medicion.consultas, medicion.tiempo_serializacion,
+            medicion.tiempo_render,
+        ))
+        estadisticas.cubetas[bisect_left(LIMITES_HISTOGRAMA, medicion.total)] += 1
+        estadisticas.suma_total += medicion.total
+        estadisticas.consultas += medicion.consultas
+        estadisticas.tiempo_db += medicion.tiempo_db
+
+
+def reiniciar_estadisticas():
+    with _candado:
+        _rutas.clear()
+
+
+def contadores_por_ruta():
+    """
+    Totales de cada ruta desde el inicio del proceso: `peticiones`,
+    `cubetas` (acumuladas, una por límite de `LIMITES_HISTOGRAMA` más +Inf),
+    `suma_total`, `consultas` y `tiempo_db` (segundos).
+    """
+    with _candado:
+        copia = {
+            ruta: (e.peticiones, list(e.cubetas), e.suma_total, e.consultas, e.tiempo_db)
+            for ruta, e in _rutas.items()
+        }
+
+    contadores = {}
+    for ruta, (peticiones, cubetas, suma_total, consultas, tiempo_db) in copia.items():
+        acumuladas, acumulado = [], 0
+        for cantidad in cubetas:
+            acumulado += cantidad
+            acumuladas.append(acumulado)
+        contadores[ruta] = {
+            "peticiones": peticiones,
+            "cubetas": acumuladas,
+            "suma_total": suma_total,
+            "consultas": consultas,
+            "tiempo_db": tiempo_db,
+        }
+    return contadores
+
+
+def conexiones_abiertas():
+    """Conexiones a la base de datos abiertas por este proceso desde su inicio."""
+    return _conexiones_abiertas
+
+
+def _resumen(valores, escala=1000, decimales=1):
+    valores = sorted(valores)
+    resumen = {f"p{p}": round(percentil(valores, p) * escala, decimales) for p in PERCENTILES}
+    resumen["max"] = round(valores[-1] * escala, decimales)
+    return resumen
+
+
+def estadisticas_por_ruta():
+    """
+    Percentiles de las muestras de cada ruta (tiempos en milisegundos), de la
+    ruta más lenta a la más rápida según su p95.
+    """
+    with _candado:
+        copia = {ruta: (e.peticiones, list(e.muestras)) for ruta, e in _rutas.items()}
+
+    resultado = []
+    for ruta, (peticiones, muestras) in copia.items():
+        totales, tiempos_db, consultas, serializacion, render = zip(*muestras)
+        resultado.append({
+            "ruta": ruta,
+            "peticiones": peticiones,
+            "muestras": len(muestras),
+            "total_ms": _resumen(totales),
+            "db_ms": _resumen(tiempos_db),
+            "consultas": _resumen(consultas, escala=1, decimales=0),
+            "serializacion_ms": _resumen(serializacion),
+            "render_ms": _resumen(render),
+        })
+    resultado.sort(key=lambda r: r["total_ms"]["p95"], reverse=True)
+    return resultado
+
+
+# ==========================
+# Middleware
+# ==========================
+
+def _nombre_de_ruta(request):
+    """Nombre de la URL (o su patrón, si no tiene nombre); None si no se resolvió."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    return match.url_name or match.route
+
+
+class MedicionMiddleware:
+    """
+    Debe ser el primer middleware de `MIDDLEWARE` para que el tiempo total
+    incluya a los demás.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        medicion = Medicion()
+        token = _medicion_actual.set(medicion)
+        try:
+            response = self.get_response(request)
+        finally:
+            _medicion_actual.reset(token)
+        return self._terminar(request, response, medicion)
+
+    async def __acall__(self, request):
+        medicion = Medicion()
+        token = _medicion_actual.set(medicion)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _medicion_actual.reset(token)
+        return self._terminar(request, response, medicion)
+
+    def _terminar(self, request, response, medicion):
+        medicion.terminar()
+        response["Server-Timing"] = medicion.server_timing()
+        # Sin este encabezado el navegador oculta los tiempos a los frontends de otro origen.
+        origen = request.headers.get("Origin")
+        if origen and origen in getattr(settings, "CORS_ALLOWED_ORIGINS", ()):
+            response["Timing-Allow-Origin"] = origen
+
+        ruta = _nombre_de_ruta(request)
+        if ruta is not None:
+            registrar_muestra(ruta, medicion)
+
+        if medicion.total * 1000 >= _umbral_lento_ms():
+            logger.warning(
+                "Petición lenta: %s %s (%s) %d %.1f ms, %d consultas en %.1f ms, serialización %.1f ms, "
+                "renderizado %.1f ms. Consulta más lenta (%.1f ms): %s",
+                request.method, request.path, ruta, response.status_code,
+                medicion.total * 1000, medicion.consultas, medicion.tiempo_db * 1000,
+                medicion.tiempo_serializacion * 1000, medicion.tiempo_render * 1000,
+                medicion.tiempo_sql_mas_lento * 1000,
+                (medicion.sql_mas_lento or "")[:LONGITUD_MAXIMA_SQL],
+            )
+        return response
@@ -0,0 +1,187 @@
+"""
+Métricas en el formato de texto de Prometheus (`api/metrics/`).
+
+Cada lectura debe ser barata, porque Prometheus consulta el endpoint cada
+pocos segundos:
+- Las métricas de peticiones y de base de datos son contadores en memoria de
+  `medicion.py`, sin consultas. Son de este proceso: con varios workers, cada
+  uno expone los suyos.
+- Los turnos abiertos salen de la caché de turnos activos.
+- Las estancias activas se cuentan sobre el índice parcial de estancias
+  activas, y los movimientos del último minuto sobre el índice (fecha, id):
+  su costo depende de la actividad actual, no del historial.
+- Las habitaciones se agrupan por estado (una fila por habitación).
+- Las exportaciones en cola y las terminadas en las últimas 24 horas se leen
+  con el índice (estado, fecha_creacion).
+"""
+from datetime import timedelta
+
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from apps.caja.models import MovimientoCaja
+from apps.estancias.models import Estancia
+from apps.habitaciones.models import Habitacion
+from apps.reportes.models import ExportacionReporte
+from apps.turnos.turno_activo import turnos_activos
+from .medicion import LIMITES_HISTOGRAMA, conexiones_abiertas, contadores_por_ruta, percentil
+
+
+TIPO_CONTENIDO = "text/plain; version=0.0.4; charset=utf-8"
+CUANTILES_EXPORTACION = (50, 95, 100)
+
+
+class Familia:
+    """Una métrica con su tipo, descripción y muestras `(sufijo, etiquetas, valor)`."""
+
+    def __init__(self, nombre, tipo, ayuda):
+        self.nombre = nombre
+        self.tipo = tipo
+        self.ayuda = ayuda
+        self.muestras = []
+
+    def agregar(self, valor, sufijo="", **etiquetas):
+        self.muestras.append((sufijo, etiquetas, valor))
+        return self
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _numero(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def formatear(familias):
+    """Texto de las familias en el formato de exposición de Prometheus."""
+    lineas = []
+    for familia in familias:
+        lineas.append(f"# HELP {familia.nombre} {familia.ayuda}")
+        lineas.append(f"# TYPE {familia.nombre} {familia.tipo}")
+        for sufijo, etiquetas, valor in familia.muestras:
+            texto_etiquetas = ",".join(f'{clave}="{_escapar(v)}"' for clave, v in etiquetas.items())
+            if texto_etiquetas:
+                texto_etiquetas = "{" + texto_etiquetas + "}"
+            lineas.append(f"{familia.nombre}{sufijo}{texto_etiquetas} {_numero(valor)}")
+    return "\n".join(lineas) + "\n"
+
+
+# ==========================
+# Proceso
+# ==========================
+
+def _metricas_de_peticiones():
+    duracion = Familia(
+        "hotel_http_peticion_duracion_segundos", "histogram",
+        "Duración de las peticiones por ruta atendidas por este proceso.",
+    )
+    consultas = Familia(
+        "hotel_db_consultas_total", "counter",
+        "Consultas a la base de datos hechas por las peticiones de cada ruta.",
+    )
+    tiempo_db = Familia(
+        "hotel_db_consultas_segundos_total", "counter",
+        "Tiempo de base de datos de las peticiones de cada ruta.",
+    )
+    for ruta, contadores in sorted(contadores_por_ruta().items()):
+        limites = [*LIMITES_HISTOGRAMA, float("inf")]
+        for limite, cantidad in zip(limites, contadores["cubetas"]):
+            duracion.agregar(cantidad, "_bucket", ruta=ruta, le=_numero(limite))
+        duracion.agregar(contadores["suma_total"], "_sum", ruta=ruta)
+        duracion.agregar(contadores["peticiones"], "_count", ruta=ruta)
+        consultas.agregar(contadores["consultas"], ruta=ruta)
+        tiempo_db.agregar(contadores["tiempo_db"], ruta=ruta)
+
+    conexiones = Familia(
+        "hotel_db_conexiones_abiertas_total", "counter",
+        "Conexiones a la base de datos abiertas por este proceso.",
+    ).agregar(conexiones_abiertas())
+    return [duracion, consultas, tiempo_db, conexiones]
+
+
+# ==========================
+# Negocio
+# ==========================
+
+def _metricas_de_operacion(momento):
+    turnos = Familia("hotel_turnos_abiertos", "gauge", "Turnos abiertos.").agregar(len(turnos_activos()))
+    estancias = Familia("hotel_estancias_activas", "gauge", "Estancias activas.").agregar(
+        Estancia.objects.filter(activa=True).count()
+    )
+
+    habitaciones = Familia("hotel_habitaciones", "gauge", "Habitaciones activas por estado.")
+    por_estado = dict(
+        Habitacion.objects.filter(activa=True)
+        .values_list("estado").annotate(cantidad=Count("id")).order_by()
+    )
+    for estado in Habitacion.Estado.values:
+        habitaciones.agregar(por_estado.get(estado, 0), estado=estado)
+
+    movimientos = Familia(
+        "hotel_movimientos_caja_ultimo_minuto", "gauge",
+        "Movimientos de caja registrados en el último minuto por método de pago.",
+    )
+    montos = Familia(
+        "hotel_movimientos_caja_monto_ultimo_minuto", "gauge",
+        "Monto de los movimientos de caja del último minuto por método de pago.",
+    )
+    por_metodo = {
+        fila["metodo_pago"]: fila
+        for fila in MovimientoCaja.objects.filter(fecha__gte=momento - timedelta(minutes=1))
+        .values("metodo_pago").annotate(cantidad=Count("id"), monto=Sum("monto")).order_by()
+    }
+    for metodo in MovimientoCaja.MetodoPago.values:
+        fila = por_metodo.get(metodo, {"cantidad": 0, "monto": 0})
+        movimientos.agregar(fila["cantidad"], metodo_pago=metodo)
+        montos.agregar(float(fila["monto"]), metodo_pago=metodo)
+
+    return [turnos, estancias, habitaciones, movimientos, montos]
+
+
+def _metricas_de_exportaciones(momento):
+    Estado = ExportacionReporte.Estado
+    en_cola = Familia("hotel_exportaciones_en_cola", "gauge", "Exportaciones de reportes pendientes o en proceso.")
+    por_estado = dict(
+        ExportacionReporte.objects.filter(estado__in=[Estado.PENDIENTE, Estado.PROCESANDO])
+        .values_list("estado").annotate(cantidad=Count("id")).order_by()
+    )
+    for estado in (Estado.PENDIENTE, Estado.PROCESANDO):
+        en_cola.agregar(por_estado.get(estado, 0), estado=estado)
+
+    terminadas = list(
+        ExportacionReporte.objects.filter(
+            estado__in=[Estado.COMPLETADA, Estado.FALLIDA],
+            fecha_creacion__gte=momento - timedelta(hours=24),
+            fecha_inicio__isnull=False,
+            fecha_fin__isnull=False,
+        ).values_list("estado", F("fecha_fin") - F("fecha_inicio"))
+    )
+    cantidad = Familia(
+        "hotel_exportaciones_terminadas_24h", "gauge",
+        "Exportaciones solicitadas en las últimas 24 horas que ya terminaron, por resultado.",
+    )
+    for estado in (Estado.COMPLETADA, Estado.FALLIDA):
+        cantidad.agregar(sum(1 for e, _ in terminadas if e == estado), estado=estado)
+
+    duracion = Familia(
+        "hotel_exportacion_duracion_segundos_24h", "gauge",
+        "Percentiles de la duración de las exportaciones terminadas en las últimas 24 horas.",
+    )
+    duraciones = sorted(d.total_seconds() for _, d in terminadas)
+    for p in CUANTILES_EXPORTACION:
+        duracion.agregar(percentil(duraciones, p) or 0.0, cuantil=_numero(p / 100))
+
+    return [en_cola, cantidad, duracion]
+
+
+def metricas():
+    """Texto con todas las métricas."""
+    momento = timezone.now()
+    return formatear(
+        _metricas_de_peticiones()
+        + _metricas_de_operacion(momento)
+        + _metricas_de_exportaciones(momento)
+    )
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Version',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(help_text='Nombre del conjunto de datos versionado.', max_length=50, unique=True)),
+                ('valor', models.PositiveBigIntegerField(default=0, help_text='Versión actual. Se incrementa con cada cambio.')),
+            ],
+        ),
+    ]
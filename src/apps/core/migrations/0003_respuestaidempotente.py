@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:04
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_evento'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RespuestaIdempotente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=255)),
+                ('huella', models.CharField(help_text='SHA-256 del método, la ruta y el cuerpo de la petición original.', max_length=64)),
+                ('estado_http', models.PositiveSmallIntegerField()),
+                ('respuesta', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('fecha', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'clave'), name='respuesta_idempotente_unica')],
+            },
+        ),
+    ]
@@ -1,3 +1,127 @@
+from django.conf import settings
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 
-# Create your models here.
+
+class Version(models.Model):
+    """
+    Contador de versión compartido entre procesos. Cada vez que cambia un
+    conjunto de datos que los procesos guardan en caché (por ejemplo, los
+    turnos activos), se incrementa su contador; los procesos comparan el valor
+    con el de su copia local para saber si deben descartarla.
+    """
+
+    clave = models.CharField(
+        max_length=50,
+        unique=True,
+        help_text="Nombre del conjunto de datos versionado."
+    )
+
+    valor = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Versión actual. Se incrementa con cada cambio."
+    )
+
+    def __str__(self):
+        return f"{self.clave}: {self.valor}"
+
+
+class Evento(models.Model):
+    """
+    Cambio de estado publicado para las terminales conectadas al flujo de
+    eventos (habitaciones, caja y turnos). El id es la posición del evento en
+    el flujo: los clientes reanudan la conexión a partir del último id recibido.
+    Los eventos antiguos se eliminan periódicamente.
+    """
+
+    tipo = models.CharField(max_length=50)
+
+    datos = models.JSONField(encoder=DjangoJSONEncoder, default=dict)
+
+    fecha = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"#{self.id} {self.tipo}"
+
+
+class RespuestaIdempotente(models.Model):
+    """
+    Respuesta guardada de una petición enviada con el encabezado
+    `Idempotency-Key`. Si la terminal reintenta la petición con la misma clave,
+    se devuelve esta respuesta sin volver a ejecutar la operación. La
+    restricción única (usuario, clave) impide que dos reintentos concurrentes
+    se confirmen ambos. Las respuestas antiguas se eliminan periódicamente.
+    """
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+
+    clave = models.CharField(max_length=255)
+
+    huella = models.CharField(
+        max_length=64,
+        help_text="SHA-256 del método, la ruta y el cuerpo de la petición original."
+    )
+
+    estado_http = models.PositiveSmallIntegerField()
+
+    respuesta = models.JSONField(encoder=DjangoJSONEncoder)
+
+    fecha = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["usuario", "clave"], name="respuesta_idempotente_unica"),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id}:{self.clave} ({self.estado_http})"
+
+
+class EscrituraReciente(models.Model):
+    """
+    Última escritura exitosa de cada usuario a través de la API. Mientras sea
+    reciente, las lecturas del usuario van a la base principal y no a la
+    réplica, que puede ir unos segundos atrás (ver replicas.py).
+    """
+
+    usuario = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="+",
+    )
+
+    fecha = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.usuario_id}: {self.fecha}"
+
+
+class TicketEventos(models.Model):
+    """
+    Ticket de un solo uso para abrir el flujo de eventos. `EventSource` no
+    permite enviar encabezados, así que la terminal pide un ticket con su token
+    y lo envía en la URL, donde el token de acceso quedaría en los registros de
+    acceso. Se guarda solo la huella del ticket; vence a los pocos segundos.
+    """
+
+    huella = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text="SHA-256 del ticket entregado a la terminal."
+    )
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+
+    fecha = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.usuario_id}: {self.fecha}"
@@ -0,0 +1,143 @@
+"""
+Operaciones de recepción en lote.
+
+Una terminal envía en una sola petición una lista ordenada de operaciones
+(abrir estancia, agregar horas, vender producto, cerrar estancia y marcar una
+habitación como disponible). La autenticación, los permisos y la búsqueda del
+turno activo se hacen una sola vez, y cada operación reutiliza el serializador
+de entrada y el servicio de su endpoint individual.
+
+Todas las operaciones se ejecutan en una misma transacción, en orden: cada una
+ve los cambios de las anteriores (por ejemplo, cerrar una estancia y después
+marcar su habitación como disponible). Cada operación corre en su propio
+savepoint:
+- Lote atómico (por defecto): si una operación falla, se revierte todo el lote
+  y no se ejecutan las siguientes.
+- Lote no atómico: se revierte solo la operación que falló y se continúa.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from apps.caja.serializers import CrearVentaProductoSerializer, MovimientoCajaSerializer
+from apps.caja.services import vender_producto
+from apps.estancias.serializers import (
+    AbrirEstanciaSerializer,
+    AgregarHorasExtraSerializer,
+    CerrarEstanciaSerializer,
+    EstanciaDetalleSerializer,
+)
+from apps.estancias.services import abrir_estancia, agregar_horas_extra, cerrar_estancia
+from apps.habitaciones.serializers import HabitacionSerializer, MarcarDisponibleSerializer
+from apps.habitaciones.services import marcar_habitacion_disponible
+
+
+MAXIMO_OPERACIONES = 50
+
+
+class EstadoOperacion:
+    APLICADA = "APLICADA"
+    FALLIDA = "FALLIDA"
+    # Se ejecutó, pero otra operación del lote atómico falló y se revirtió todo.
+    REVERTIDA = "REVERTIDA"
+    # No se ejecutó porque una operación anterior del lote atómico falló.
+    OMITIDA = "OMITIDA"
+
+
+def _abrir_estancia(datos, turno):
+    estancia = abrir_estancia(**datos, turno=turno)
+    return EstanciaDetalleSerializer(estancia).data
+
+
+def _agregar_horas(datos, turno):
+    estancia = agregar_horas_extra(**datos, turno=turno)
+    return EstanciaDetalleSerializer(estancia).data
+
+
+def _vender_producto(datos, turno):
+    # Mismo mapeo de campos que el endpoint de movimientos.
+    datos = datos.copy()
+    datos['producto'] = datos.pop('producto_id')
+    if 'estancia_id' in datos:
+        datos['estancia'] = datos.pop('estancia_id')
+    movimiento = vender_producto(**datos, turno=turno)
+    return MovimientoCajaSerializer(movimiento).data
+
+
+def _cerrar_estancia(datos, turno):
+    estancia = cerrar_estancia(
+        estancia=datos["estancia"],
+        turno=turno,
+        hora_salida_real=datos.get("hora_salida_real"),
+    )
+    return EstanciaDetalleSerializer(estancia).data
+
+
+def _marcar_disponible(datos, turno):
+    habitacion = marcar_habitacion_disponible(habitacion=datos["habitacion"])
+    return HabitacionSerializer(habitacion).data
+
+
+# tipo -> (serializador de entrada, función que ejecuta el servicio)
+OPERACIONES = {
+    "abrir_estancia": (AbrirEstanciaSerializer, _abrir_estancia),
+    "agregar_horas": (AgregarHorasExtraSerializer, _agregar_horas),
+    "vender_producto": (CrearVentaProductoSerializer, _vender_producto),
+    "cerrar_estancia": (CerrarEstanciaSerializer, _cerrar_estancia),
+    "marcar_disponible": (MarcarDisponibleSerializer, _marcar_disponible),
+}
+
+
+class _LoteRevertido(Exception):
+    """Interrumpe la transacción del lote atómico cuando una operación falla."""
+
+
+def _ejecutar_operacion(indice, operacion, turno):
+    tipo = operacion["tipo"]
+    serializer_class, ejecutar = OPERACIONES[tipo]
+    resultado = {"indice": indice, "tipo": tipo}
+
+    serializer = serializer_class(data=operacion["datos"])
+    if not serializer.is_valid():
+        return {**resultado, "estado": EstadoOperacion.FALLIDA, "error": serializer.errors}
+
+    try:
+        # Savepoint: si el servicio falla, se revierte solo esta operación.
+        with transaction.atomic():
+            datos = ejecutar(serializer.validated_data, turno)
+    except ValidationError as e:
+        return {**resultado, "estado": EstadoOperacion.FALLIDA, "error": " ".join(e.messages)}
+
+    return {**resultado, "estado": EstadoOperacion.APLICADA, "datos": datos}
+
+
+def ejecutar_lote(*, operaciones, turno, atomico=True):
+    """
+    Ejecuta en orden las operaciones (diccionarios con `tipo` y `datos`) en el
+    turno indicado, dentro de una sola transacción.
+
+    Returns:
+        Una tupla `(resultados, confirmado)`: un resultado por operación, en el
+        mismo orden, y si la transacción se confirmó. Un lote atómico con una
+        operación fallida no se confirma.
+    """
+    resultados = []
+    try:
+        with transaction.atomic():
+            for indice, operacion in enumerate(operaciones):
+                resultado = _ejecutar_operacion(indice, operacion, turno)
+                resultados.append(resultado)
+                if atomico and resultado["estado"] == EstadoOperacion.FALLIDA:
+                    raise _LoteRevertido
+    except _LoteRevertido:
+        revertidos = [
+            {"indice": r["indice"], "tipo": r["tipo"], "estado": EstadoOperacion.REVERTIDA}
+            if r["estado"] == EstadoOperacion.APLICADA else r
+            for r in resultados
+        ]
+        omitidos = [
+            {"indice": indice, "tipo": operacion["tipo"], "estado": EstadoOperacion.OMITIDA}
+            for indice, operacion in enumerate(operaciones[len(resultados):], start=len(resultados))
+        ]
+        return revertidos + omitidos, False
+
+    return resultados, True
@@ -0,0 +1,128 @@
+"""
+Paginación por cursor (keyset) para listados grandes ordenados por fecha.
+
+A diferencia de `PageNumberPagination`, no cuenta todas las filas ni usa
+`OFFSET`: cada página continúa a partir de la última fila de la anterior,
+filtrando por `(fecha, id)`, así que su costo no crece con la profundidad
+del historial. Requiere un índice sobre ambos campos.
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _valor(fila, campo):
+    """Lee `campo` de una instancia de modelo o de un diccionario de `values()`."""
+    return fila[campo] if isinstance(fila, dict) else getattr(fila, campo)
+
+
+class PaginacionPorCursor(BasePagination):
+    """
+    Pagina de la fila más reciente a la más antigua sobre (`campo_fecha`, id).
+    El cursor es opaco para el cliente: se sigue con los enlaces `next` y
+    `previous` de la respuesta.
+    """
+    campo_fecha = "fecha"
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    invalid_cursor_message = "Cursor inválido."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        fecha, pk = self.campo_fecha, "id"
+        if self.cursor is None:
+            atras = False
+            queryset = queryset.order_by(f"-{fecha}", f"-{pk}")
+        else:
+            valor_fecha, valor_id, atras = self.cursor
+            if atras:
+                # Página anterior: filas más recientes que el cursor, en orden ascendente.
+                queryset = queryset.filter(
+                    Q(**{f"{fecha}__gt": valor_fecha}) | Q(**{fecha: valor_fecha, f"{pk}__gt": valor_id})
+                ).order_by(fecha, pk)
+            else:
+                queryset = queryset.filter(
+                    Q(**{f"{fecha}__lt": valor_fecha}) | Q(**{fecha: valor_fecha, f"{pk}__lt": valor_id})
+                ).order_by(f"-{fecha}", f"-{pk}")
+
+        # Se pide una fila de más para saber si hay otra página sin contar.
+        filas = list(queryset[:self.page_size + 1])
+        hay_mas = len(filas) > self.page_size
+        filas = filas[:self.page_size]
+        if atras:
+            filas.reverse()
+
+        self.next_cursor = self.previous_cursor = None
+        if filas:
+            if hay_mas or atras:
+                self.next_cursor = self._posicion(filas[-1], atras=False)
+            if (hay_mas and atras) or (self.cursor is not None and not atras):
+                self.previous_cursor = self._posicion(filas[0], atras=True)
+        return filas
+
+    def get_page_size(self, request):
+        try:
+            tamano = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.REST_FRAMEWORK.get("PAGE_SIZE") or 10
+        return min(max(tamano, 1), self.max_page_size)
+
+    def _posicion(self, fila, *, atras):
+        return (_valor(fila, self.campo_fecha), _valor(fila, "id"), atras)
+
+    def decode_cursor(self, request):
+        cifrado = request.query_params.get(self.cursor_query_param)
+        if cifrado is None:
+            return None
+        try:
+            fecha, pk, atras = json.loads(base64.urlsafe_b64decode(cifrado.encode("ascii")))
+            fecha = parse_datetime(fecha)
+            if fecha is None:
+                raise ValueError(cifrado)
+            return fecha, int(pk), bool(atras)
+        except (TypeError, ValueError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, posicion):
+        fecha, pk, atras = posicion
+        datos = json.dumps([fecha.isoformat(), pk, int(atras)]).encode("ascii")
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, base64.urlsafe_b64encode(datos).decode("ascii")
+        )
+
+    def get_next_link(self):
+        return self.encode_cursor(self.next_cursor) if self.next_cursor else None
+
+    def get_previous_link(self):
+        return self.encode_cursor(self.previous_cursor) if self.previous_cursor else None
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
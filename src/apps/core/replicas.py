@@ -0,0 +1,211 @@
+"""
+Lecturas en la réplica de la base de datos.
+
+Con `REPLICA_LECTURA` (alias de `DATABASES`), `ReplicaMiddleware` envía a la
+réplica las lecturas de las peticiones GET que no necesitan los datos más
+recientes:
+- las vistas de `apps.reportes`, que recorren el historial,
+- los listados de DRF (vistas con `ListModelMixin`).
+Una vista puede fijar el comportamiento con el atributo `lectura_en_replica`.
+Las escrituras, las lecturas dentro de una transacción abierta por la vista,
+los modelos de `core` (sellos de versión, eventos, idempotencia), con los que
+se coordinan los procesos, y el modelo de usuarios, que la autenticación lee
+en cada petición (un usuario invitado recién creado aún no está en la
+réplica), siempre van a la base principal.
+
+La réplica puede ir unos segundos atrás de la principal. Para que quien acaba
+de escribir vea sus propios cambios, cada escritura exitosa registra la fecha
+en `EscrituraReciente` para el usuario del JWT; durante los siguientes
+`REPLICA_PERMANENCIA_SEGUNDOS` sus lecturas van a la principal. El registro
+vive en la base principal para que lo vean todos los procesos. El usuario se
+toma de los claims del token ya validado, sin consultar la base: la
+autenticación de DRF ocurre después, dentro de la vista.
+
+Las exportaciones en segundo plano generan sus archivos con `leer_de_replica`.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+from django.utils import timezone
+from rest_framework.mixins import ListModelMixin
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .asincrono import en_hilo
+from .models import EscrituraReciente
+
+
+METODOS_DE_LECTURA = ("GET", "HEAD")
+
+# Cuántas transacciones tenía abiertas la base principal al empezar a leer de
+# la réplica, o None si las lecturas van a la principal. Las lecturas dentro de
+# una transacción abierta después van a la principal, junto a sus escrituras.
+_leer_de_replica = ContextVar("leer_de_replica", default=None)
+
+
+def alias_replica():
+    """Alias de la réplica, o None si no hay una configurada."""
+    alias = getattr(settings, "REPLICA_LECTURA", None)
+    return alias if alias and alias in settings.DATABASES else None
+
+
+def _permanencia_segundos():
+    return getattr(settings, "REPLICA_PERMANENCIA_SEGUNDOS", 10)
+
+
+def _transacciones_abiertas():
+    return len(connections[DEFAULT_DB_ALIAS].atomic_blocks)
+
+
+@contextmanager
+def leer_de_replica():
+    """Envía a la réplica (si la hay) las lecturas del bloque."""
+    token = _leer_de_replica.set(_transacciones_abiertas())
+    try:
+        yield
+    finally:
+        _leer_de_replica.reset(token)
+
+
+class EnrutadorReplica:
+    """Router de Django: decide en qué base se hace cada lectura."""
+
+    def db_for_read(self, model, **hints):
+        transacciones = _leer_de_replica.get()
+        if transacciones is None or model._meta.app_label == "core":
+            return None
+        if model._meta.label == settings.AUTH_USER_MODEL:
+            return None
+        if _transacciones_abiertas() > transacciones:
+            return None
+        return alias_replica()
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Son los mismos datos: un objeto leído de la réplica puede
+        # relacionarse con uno de la principal.
+        bases = {DEFAULT_DB_ALIAS, alias_replica()}
+        if obj1._state.db in bases and obj2._state.db in bases:
+            return True
+        return None
+
+
+def _usuario_del_jwt(request):
+    """Id del usuario del JWT válido de la petición, o None. No consulta la base."""
+    autenticador = JWTAuthentication()
+    encabezado = autenticador.get_header(request)
+    try:
+        token = encabezado and autenticador.get_raw_token(encabezado)
+        if not token:
+            return None
+        return autenticador.get_validated_token(token).get(api_settings.USER_ID_CLAIM)
+    except AuthenticationFailed:
+        return None
+
+
+def escribio_hace_poco(usuario_id):
+    """Si el usuario hizo una escritura exitosa en los últimos `REPLICA_PERMANENCIA_SEGUNDOS`."""
+    desde = timezone.now() - timedelta(seconds=_permanencia_segundos())
+    return EscrituraReciente.objects.filter(usuario_id=usuario_id, fecha__gt=desde).exists()
+
+
+def registrar_escritura(usuario_id):
+    """Guarda la fecha de la última escritura exitosa del usuario."""
+    ahora = timezone.now()
+    if EscrituraReciente.objects.filter(usuario_id=usuario_id).update(fecha=ahora):
+        return
+
+    try:
+        with transaction.atomic():
+            EscrituraReciente.objects.create(usuario_id=usuario_id, fecha=ahora)
+    except IntegrityError:
+        # Otra petición del usuario creó el registro entre la actualización y
+        # la inserción (o el usuario ya no existe).
+        EscrituraReciente.objects.filter(usuario_id=usuario_id).update(fecha=ahora)
+
+
+def _vista_lee_de_replica(view_func):
+    vista = getattr(view_func, "view_class", None)
+    if vista is None:
+        return False
+    preferencia = getattr(vista, "lectura_en_replica", None)
+    if preferencia is not None:
+        return preferencia
+    return vista.__module__.startswith("apps.reportes.") or issubclass(vista, ListModelMixin)
+
+
+def lectura_en_replica(request, view_func):
+    """Si las lecturas de la petición pueden ir a la réplica."""
+    if request.method not in METODOS_DE_LECTURA or not _vista_lee_de_replica(view_func):
+        return False
+    usuario_id = _usuario_del_jwt(request)
+    return usuario_id is None or not escribio_hace_poco(usuario_id)
+
+
+async def alectura_en_replica(request, view_func):
+    """Como `lectura_en_replica`; solo pasa a un hilo para consultar `EscrituraReciente`."""
+    if request.method not in METODOS_DE_LECTURA or not _vista_lee_de_replica(view_func):
+        return False
+    usuario_id = _usuario_del_jwt(request)
+    return usuario_id is None or not await en_hilo(escribio_hace_poco)(usuario_id)
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+            # Django pasaría a un hilo un `process_view` síncrono.
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _leer_de_replica.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _leer_de_replica.reset(token)
+        usuario_id = self._escritura_de(request, response)
+        if usuario_id is not None:
+            registrar_escritura(usuario_id)
+        return response
+
+    async def __acall__(self, request):
+        token = _leer_de_replica.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _leer_de_replica.reset(token)
+        usuario_id = self._escritura_de(request, response)
+        if usuario_id is not None:
+            await sync_to_async(registrar_escritura)(usuario_id)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if alias_replica() is not None and lectura_en_replica(request, view_func):
+            _leer_de_replica.set(_transacciones_abiertas())
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if alias_replica() is not None and await alectura_en_replica(request, view_func):
+            _leer_de_replica.set(_transacciones_abiertas())
+
+    def _escritura_de(self, request, response):
+        """Usuario del JWT si la petición fue una escritura exitosa, o None."""
+        if (
+            alias_replica() is None
+            or request.method in METODOS_DE_LECTURA
+            or not 200 <= response.status_code < 300
+        ):
+            return None
+        return _usuario_del_jwt(request)
@@ -0,0 +1,21 @@
+from rest_framework import serializers
+
+from .medicion import MedicionSerializerMixin
+from .operaciones import MAXIMO_OPERACIONES, OPERACIONES
+
+
+class OperacionSerializer(MedicionSerializerMixin, serializers.Serializer):
+    """
+    Una operación del lote. Los `datos` son los mismos que recibe el endpoint
+    individual de la operación y se validan al ejecutarla, para que vean los
+    cambios de las operaciones anteriores.
+    """
+    tipo = serializers.ChoiceField(choices=sorted(OPERACIONES))
+    datos = serializers.DictField()
+
+
+class LoteOperacionesSerializer(MedicionSerializerMixin, serializers.Serializer):
+    """Serializador de escritura para un lote de operaciones de recepción."""
+    operaciones = OperacionSerializer(many=True, allow_empty=False, max_length=MAXIMO_OPERACIONES)
+    # Si es falso, una operación fallida no revierte a las demás.
+    atomico = serializers.BooleanField(default=True)
@@ -0,0 +1,53 @@
+"""
+Receptores que publican en el flujo de eventos los cambios que muestran las
+terminales de recepción. Se conectan en `CoreConfig.ready`.
+"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.caja.signals import movimientos_registrados
+from apps.turnos.signals import turno_cerrado
+from .eventos import publicar
+
+
+@receiver(post_save, sender="habitaciones.Habitacion", dispatch_uid="eventos_estado_habitacion")
+def publicar_estado_habitacion(sender, instance, created, update_fields, **kwargs):
+    # Al abrir o cerrar una estancia y al marcar la habitación como disponible
+    # solo se guarda el estado; las ediciones completas también lo incluyen.
+    if update_fields is None or "estado" in update_fields:
+        publicar("habitacion.estado", {
+            "habitacion_id": instance.id,
+            "numero": instance.numero,
+            "estado": instance.estado,
+            "activa": instance.activa,
+        })
+
+
+@receiver(movimientos_registrados, dispatch_uid="eventos_movimientos_caja")
+def publicar_movimientos(sender, turno, tipo, metodo_pago, monto, cantidad, **kwargs):
+    publicar("caja.movimientos", {
+        "turno_id": turno.id,
+        "tipo": tipo,
+        "metodo_pago": metodo_pago,
+        "monto": monto,
+        "cantidad": cantidad,
+    })
+
+
+@receiver(post_save, sender="turnos.Turno", dispatch_uid="eventos_turno_abierto")
+def publicar_turno_abierto(sender, instance, created, **kwargs):
+    if created and instance.activo:
+        publicar("turno.abierto", {
+            "turno_id": instance.id,
+            "usuario_id": instance.usuario_id,
+            "tipo_turno": instance.tipo_turno,
+        })
+
+
+@receiver(turno_cerrado, dispatch_uid="eventos_turno_cerrado")
+def publicar_turno_cerrado(sender, turno, **kwargs):
+    publicar("turno.cerrado", {
+        "turno_id": turno.id,
+        "usuario_id": turno.usuario_id,
+        "tipo_turno": turno.tipo_turno,
+    })
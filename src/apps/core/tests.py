@@ -1,17 +1,43 @@
+import asyncio
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.db.models import Sum
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 from decimal import Decimal
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 
 from apps.users.models import Usuario
 from apps.habitaciones.models import TipoHabitacion, Habitacion
+from apps.habitaciones.serializers import HabitacionSerializer
 from apps.tarifas.models import Tarifa
 from apps.productos.models import Producto
 from apps.turnos.models import Turno
 from apps.estancias.models import Estancia
 from apps.caja.models import MovimientoCaja
+from apps.reportes.models import AcumuladoDiarioMovimiento, ExportacionReporte
+from apps.caja.services import vender_producto
+from apps.estancias.services import abrir_estancia
+from apps.turnos.services import iniciar_turno, cerrar_turno_service
+from config.base_de_datos import configuracion_postgres, configuracion_replica
+from config.servidor import configuracion_gunicorn
+from .asincrono import CsrfViewMiddleware, SessionMiddleware, en_hilo
+from .eventos import _canal_actual, canjear_ticket, emitir_ticket, flujo_de_eventos, guardar_evento
+from .idempotencia import ENCABEZADO_REPETIDA
+from .medicion import Medicion, _medicion_actual, percentil, reiniciar_estadisticas
+from .models import EscrituraReciente, Evento, RespuestaIdempotente, TicketEventos
 
 
 class EndToEndWorkflowTest(APITestCase):
@@ -97,4 +123,632 @@ class EndToEndWorkflowTest(APITestCase):
         resumen = response.data['resumen']
         self.assertEqual(Decimal(resumen['total_ingresos']), Decimal('750.00')) # 500 + 100 + 150
         self.assertEqual(Decimal(resumen['efectivo_esperado']), Decimal('1400.00'))
-        self.assertEqual(Decimal(resumen['diferencia']), Decimal('5.00'))
\ No newline at end of file
+        self.assertEqual(Decimal(resumen['diferencia']), Decimal('5.00'))
+
+class FlujoEventosTests(TestCase):
+    def setUp(self):
+        self.employee_user = Usuario.objects.create_user(username='employee', password='password123', rol=Usuario.Rol.EMPLEADO)
+        self.url = reverse('flujo-eventos')
+
+    def _tipos_publicados(self):
+        return list(Evento.objects.order_by('id').values_list('tipo', flat=True))
+
+    def test_operaciones_publican_eventos(self):
+        tipo = TipoHabitacion.objects.create(nombre="Sencilla")
+        habitacion = Habitacion.objects.create(numero=101, tipo=tipo)
+        Evento.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            turno = iniciar_turno(usuario=self.employee_user, tipo_turno="DIA")
+        with self.captureOnCommitCallbacks(execute=True):
+            habitacion.estado = Habitacion.Estado.LIMPIEZA
+            habitacion.save(update_fields=['estado'])
+        with self.captureOnCommitCallbacks(execute=True):
+            producto = Producto.objects.create(nombre="Agua", precio="20.00", stock=3, activo=True)
+            vender_producto(producto=producto, cantidad=1, metodo_pago="EFECTIVO", turno=turno)
+        with self.captureOnCommitCallbacks(execute=True):
+            cerrar_turno_service(usuario=self.employee_user, efectivo_reportado=Decimal("20.00"), sueldo=Decimal("0"))
+
+        self.assertEqual(
+            self._tipos_publicados(),
+            ["turno.abierto", "habitacion.estado", "caja.movimientos", "turno.cerrado"],
+        )
+        movimiento = Evento.objects.get(tipo="caja.movimientos")
+        self.assertEqual(movimiento.datos["monto"], "20.00")
+        self.assertEqual(Evento.objects.get(tipo="habitacion.estado").datos["estado"], Habitacion.Estado.LIMPIEZA)
+
+    def test_transaccion_revertida_no_publica(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    iniciar_turno(usuario=self.employee_user, tipo_turno="DIA")
+                    raise ValueError("revertir")
+        self.assertFalse(Evento.objects.exists())
+
+    async def test_flujo_entrega_pendientes_y_nuevos(self):
+        primero = await sync_to_async(guardar_evento)("prueba", {"n": 1})
+
+        flujo = flujo_de_eventos(ultimo_id=primero.id - 1)
+        self.assertEqual(await anext(flujo), "retry: 3000\n\n")
+        self.assertEqual(await anext(flujo), f'id: {primero.id}\nevent: prueba\ndata: {{"n": 1}}\n\n')
+
+        # Un evento guardado en este proceso despierta al canal sin esperar al sondeo.
+        segundo = await sync_to_async(guardar_evento)("prueba", {"n": 2})
+        texto = await asyncio.wait_for(anext(flujo), timeout=1)
+        self.assertEqual(texto, f'id: {segundo.id}\nevent: prueba\ndata: {{"n": 2}}\n\n')
+
+        await flujo.aclose()
+        await asyncio.wait_for(_canal_actual().tarea, timeout=1)
+
+    async def test_canal_sin_clientes_no_reenvia_eventos_antiguos(self):
+        """Un cliente sin Last-Event-ID no recibe lo guardado mientras nadie escuchaba."""
+        flujo = flujo_de_eventos()
+        await anext(flujo)
+        await flujo.aclose()
+        await asyncio.wait_for(_canal_actual().tarea, timeout=1)
+
+        await sync_to_async(guardar_evento)("viejo", {})
+        flujo = flujo_de_eventos()
+        self.assertEqual(await anext(flujo), "retry: 3000\n\n")
+        nuevo = await sync_to_async(guardar_evento)("nuevo", {})
+        texto = await asyncio.wait_for(anext(flujo), timeout=1)
+        self.assertEqual(texto, f'id: {nuevo.id}\nevent: nuevo\ndata: {{}}\n\n')
+
+        await flujo.aclose()
+        await asyncio.wait_for(_canal_actual().tarea, timeout=1)
+
+    async def test_endpoint_requiere_credenciales(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = await self.async_client.get(self.url, {'ticket': 'no-es-un-ticket'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_endpoint_no_acepta_el_token_en_la_consulta(self):
+        """El token de acceso en la URL quedaría en los registros de acceso."""
+        token = str(AccessToken.for_user(self.employee_user))
+        response = await self.async_client.get(self.url, {'token': token})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_endpoint_con_ticket_en_la_consulta(self):
+        ticket = await sync_to_async(emitir_ticket)(self.employee_user)
+        response = await self.async_client.get(self.url, {'ticket': ticket})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        contenido = aiter(response.streaming_content)
+        self.assertEqual(await anext(contenido), b"retry: 3000\n\n")
+        await contenido.aclose()
+
+        # El ticket es de un solo uso.
+        response = await self.async_client.get(self.url, {'ticket': ticket})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_emitir_ticket_requiere_autenticacion(self):
+        url = reverse('ticket-eventos')
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        token = str(AccessToken.for_user(self.employee_user))
+        response = self.client.post(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['expira_en'], 30)
+        self.assertEqual(canjear_ticket(response.json()['ticket']), self.employee_user)
+
+    def test_ticket_vencido_no_se_canjea(self):
+        ticket = emitir_ticket(self.employee_user)
+        TicketEventos.objects.update(fecha=timezone.now() - timedelta(seconds=31))
+        self.assertIsNone(canjear_ticket(ticket))
+
+        # Al emitir otro, los vencidos se eliminan.
+        emitir_ticket(self.employee_user)
+        self.assertEqual(TicketEventos.objects.count(), 1)
+
+    def test_ticket_de_usuario_inactivo_no_se_canjea(self):
+        ticket = emitir_ticket(self.employee_user)
+        Usuario.objects.filter(pk=self.employee_user.pk).update(is_active=False)
+        self.assertIsNone(canjear_ticket(ticket))
+
+
+class AsincronoTests(TestCase):
+    def test_en_hilo_bajo_asgi_usa_el_pool_compartido(self):
+        """Sin un hilo síncrono esperando, corre en el pool y libera la conexión."""
+        with mock.patch("apps.core.asincrono.close_old_connections") as liberar:
+            hilo = asyncio.run(en_hilo(threading.get_ident)())
+        self.assertNotEqual(hilo, threading.get_ident())
+        liberar.assert_called_once()
+
+    async def test_en_hilo_desde_codigo_sincrono_usa_ese_hilo(self):
+        """El hilo de la prueba espera la respuesta: se usa con su conexión y su transacción."""
+        self.assertEqual(await en_hilo(threading.get_ident)(), threading.main_thread().ident)
+
+    async def test_sesion_solo_pasa_a_un_hilo_si_se_modifico(self):
+        async def vista(request):
+            if request.path == "/modifica/":
+                request.session["clave"] = 1
+            return HttpResponse()
+
+        middleware = SessionMiddleware(vista)
+        with mock.patch("apps.core.asincrono.sync_to_async", wraps=sync_to_async) as a_hilo:
+            response = await middleware(RequestFactory().get("/"))
+            a_hilo.assert_not_called()
+            self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+            response = await middleware(RequestFactory().get("/modifica/"))
+            a_hilo.assert_called_once()
+            self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_csrf_process_view_asincrono_solo_bajo_asgi(self):
+        async def vista_asincrona(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(CsrfViewMiddleware(vista_asincrona).process_view))
+        self.assertFalse(iscoroutinefunction(CsrfViewMiddleware(lambda request: HttpResponse()).process_view))
+        # Con el token en la sesión, se comporta como el de Django.
+        with override_settings(CSRF_USE_SESSIONS=True):
+            self.assertFalse(iscoroutinefunction(CsrfViewMiddleware(vista_asincrona).process_view))
+
+
+class OperacionesLoteTests(APITestCase):
+    def setUp(self):
+        self.employee_user = Usuario.objects.create_user(username='employee', password='password123', rol=Usuario.Rol.EMPLEADO)
+        self.client.force_authenticate(user=self.employee_user)
+        self.url = reverse('operaciones-lote')
+
+        tipo = TipoHabitacion.objects.create(nombre="Sencilla")
+        self.habitacion = Habitacion.objects.create(numero=101, tipo=tipo)
+        self.tarifa = Tarifa.objects.create(nombre="3 Horas", horas=3, precio=500, tipo_habitacion=tipo)
+        self.producto = Producto.objects.create(nombre="Refresco", precio=50, stock=5)
+
+    def _abrir_turno(self):
+        return iniciar_turno(usuario=self.employee_user, tipo_turno="DIA")
+
+    def test_lote_atomico_aplica_todas_las_operaciones(self):
+        self._abrir_turno()
+        response = self.client.post(self.url, {"operaciones": [
+            {"tipo": "abrir_estancia", "datos": {"habitacion_id": self.habitacion.id, "tarifa_id": self.tarifa.id, "metodo_pago": "EFECTIVO"}},
+            {"tipo": "vender_producto", "datos": {"producto_id": self.producto.id, "cantidad": 2, "metodo_pago": "EFECTIVO"}},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["confirmado"])
+        self.assertEqual([r["estado"] for r in response.data["resultados"]], ["APLICADA", "APLICADA"])
+        estancia_id = response.data["resultados"][0]["datos"]["id"]
+        self.assertTrue(Estancia.objects.get(pk=estancia_id).activa)
+        self.assertEqual(MovimientoCaja.objects.count(), 2)
+
+        # Las operaciones ven los cambios de las anteriores del mismo lote.
+        response = self.client.post(self.url, {"operaciones": [
+            {"tipo": "cerrar_estancia", "datos": {"estancia_id": estancia_id}},
+            {"tipo": "marcar_disponible", "datos": {"habitacion_id": self.habitacion.id}},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.habitacion.refresh_from_db()
+        self.assertEqual(self.habitacion.estado, Habitacion.Estado.DISPONIBLE)
+
+    def test_lote_atomico_revierte_todo_si_una_operacion_falla(self):
+        self._abrir_turno()
+        response = self.client.post(self.url, {"operaciones": [
+            {"tipo": "abrir_estancia", "datos": {"habitacion_id": self.habitacion.id, "tarifa_id": self.tarifa.id, "metodo_pago": "EFECTIVO"}},
+            {"tipo": "vender_producto", "datos": {"producto_id": self.producto.id, "cantidad": 10, "metodo_pago": "EFECTIVO"}},
+            {"tipo": "marcar_disponible", "datos": {"habitacion_id": self.habitacion.id}},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data["confirmado"])
+        self.assertIn("Stock insuficiente", response.data["error"])
+        self.assertEqual([r["estado"] for r in response.data["resultados"]], ["REVERTIDA", "FALLIDA", "OMITIDA"])
+        self.assertFalse(Estancia.objects.exists())
+        self.assertFalse(MovimientoCaja.objects.exists())
+        self.habitacion.refresh_from_db()
+        self.assertEqual(self.habitacion.estado, Habitacion.Estado.DISPONIBLE)
+
+    def test_lote_no_atomico_confirma_las_operaciones_validas(self):
+        self._abrir_turno()
+        response = self.client.post(self.url, {"atomico": False, "operaciones": [
+            {"tipo": "marcar_disponible", "datos": {"habitacion_id": self.habitacion.id}},
+            {"tipo": "vender_producto", "datos": {"producto_id": self.producto.id, "cantidad": 1, "metodo_pago": "EFECTIVO"}},
+            {"tipo": "abrir_estancia", "datos": {"habitacion_id": 9999, "tarifa_id": self.tarifa.id, "metodo_pago": "EFECTIVO"}},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["confirmado"])
+        resultados = response.data["resultados"]
+        self.assertEqual([r["estado"] for r in resultados], ["FALLIDA", "APLICADA", "FALLIDA"])
+        self.assertIn("habitacion_id", resultados[2]["error"])
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 4)
+
+    def test_lote_sin_turno_activo(self):
+        response = self.client.post(self.url, {"operaciones": [
+            {"tipo": "marcar_disponible", "datos": {"habitacion_id": self.habitacion.id}},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["error"], "No hay un turno activo")
+
+    def test_tipo_de_operacion_desconocido(self):
+        self._abrir_turno()
+        response = self.client.post(self.url, {"operaciones": [{"tipo": "borrar_todo", "datos": {}}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class IdempotenciaTests(APITestCase):
+    def setUp(self):
+        self.employee_user = Usuario.objects.create_user(username='employee', password='password123', rol=Usuario.Rol.EMPLEADO)
+        self.client.force_authenticate(user=self.employee_user)
+        self.producto = Producto.objects.create(nombre="Refresco", precio=50, stock=5)
+        self.url = reverse('movimientos-list-create')
+        self.venta = {"producto_id": self.producto.id, "cantidad": 1, "metodo_pago": "EFECTIVO"}
+
+    def _vender(self, clave, datos=None):
+        return self.client.post(self.url, datos or self.venta, format='json', HTTP_IDEMPOTENCY_KEY=clave)
+
+    def test_reintento_repite_la_respuesta_sin_cobrar_dos_veces(self):
+        iniciar_turno(usuario=self.employee_user, tipo_turno="DIA")
+        primera = self._vender("venta-1")
+        repetida = self._vender("venta-1")
+
+        self.assertEqual(primera.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(repetida.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(repetida.data["id"], primera.data["id"])
+        self.assertEqual(repetida[ENCABEZADO_REPETIDA], "true")
+        self.assertFalse(primera.has_header(ENCABEZADO_REPETIDA))
+        self.assertEqual(MovimientoCaja.objects.count(), 1)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 4)
+
+        # Sin clave, cada petición es una venta nueva.
+        self.client.post(self.url, self.venta, format='json')
+        self.assertEqual(MovimientoCaja.objects.count(), 2)
+
+    def test_clave_reutilizada_con_otra_peticion(self):
+        iniciar_turno(usuario=self.employee_user, tipo_turno="DIA")
+        self._vender("venta-1")
+        response = self._vender("venta-1", {**self.venta, "cantidad": 2})
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(MovimientoCaja.objects.count(), 1)
+
+    def test_respuesta_con_error_no_se_guarda(self):
+        response = self._vender("venta-1")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(RespuestaIdempotente.objects.exists())
+
+        iniciar_turno(usuario=self.employee_user, tipo_turno="DIA")
+        response = self._vender("venta-1")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_reintento_concurrente_se_revierte_y_repite_la_respuesta(self):
+        iniciar_turno(usuario=self.employee_user, tipo_turno="DIA")
+        primera = self._vender("venta-1")
+        guardada = RespuestaIdempotente.objects.get()
+
+        # Simula un reintento que llegó antes de que la primera petición se
+        # confirmara: no ve la respuesta guardada y ejecuta la venta, pero la
+        # restricción única la revierte al guardar su respuesta.
+        with mock.patch("apps.core.idempotencia._buscar", side_effect=[None, guardada]):
+            repetida = self._vender("venta-1")
+
+        self.assertEqual(repetida.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(repetida.data["id"], primera.data["id"])
+        self.assertEqual(repetida[ENCABEZADO_REPETIDA], "true")
+        self.assertEqual(MovimientoCaja.objects.count(), 1)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 4)
+
+    def test_respuesta_vencida_se_vuelve_a_ejecutar(self):
+        iniciar_turno(usuario=self.employee_user, tipo_turno="DIA")
+        self._vender("venta-1")
+        RespuestaIdempotente.objects.update(fecha=timezone.now() - timedelta(hours=25))
+
+        response = self._vender("venta-1")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(response.has_header(ENCABEZADO_REPETIDA))
+        self.assertEqual(MovimientoCaja.objects.count(), 2)
+        self.assertEqual(RespuestaIdempotente.objects.count(), 1)
+
+
+class MedicionTests(APITestCase):
+    def setUp(self):
+        reiniciar_estadisticas()
+        self.admin_user = Usuario.objects.create_user(username='admin', password='password123', rol=Usuario.Rol.ADMINISTRADOR)
+        self.employee_user = Usuario.objects.create_user(username='employee', password='password123', rol=Usuario.Rol.EMPLEADO)
+        tipo = TipoHabitacion.objects.create(nombre="Sencilla")
+        Habitacion.objects.create(numero=101, tipo=tipo)
+
+    def test_encabezado_server_timing_y_percentiles_por_ruta(self):
+        self.client.force_authenticate(user=self.employee_user)
+        for _ in range(3):
+            response = self.client.get(reverse('habitaciones_list'))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ consultas", ser;dur=[\d.]+, render;dur=[\d.]+, total;dur=[\d.]+$')
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(reverse('rendimiento'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rutas = {r["ruta"]: r for r in response.data["rutas"]}
+        habitaciones = rutas['habitaciones_list']
+        self.assertEqual(habitaciones["peticiones"], 3)
+        self.assertGreater(habitaciones["consultas"]["p50"], 0)
+        self.assertGreater(habitaciones["serializacion_ms"]["max"], 0)
+        self.assertGreater(habitaciones["render_ms"]["max"], 0)
+        self.assertLessEqual(habitaciones["total_ms"]["p50"], habitaciones["total_ms"]["p99"])
+
+    def test_serializacion_mide_serializer_data(self):
+        """El tiempo de `serializer.data` se mide al construir los datos, no al renderizar."""
+        medicion = Medicion()
+        token = _medicion_actual.set(medicion)
+        try:
+            datos = HabitacionSerializer(Habitacion.objects.all(), many=True).data
+        finally:
+            _medicion_actual.reset(token)
+        self.assertEqual(len(datos), 1)
+        self.assertGreater(medicion.tiempo_serializacion, 0)
+        self.assertEqual(medicion.tiempo_render, 0)
+        self.assertFalse(medicion.serializando)
+
+    def test_server_timing_visible_para_los_frontends_permitidos(self):
+        self.client.force_authenticate(user=self.employee_user)
+        response = self.client.get(reverse('habitaciones_list'), HTTP_ORIGIN="http://localhost:5173")
+        self.assertEqual(response["Timing-Allow-Origin"], "http://localhost:5173")
+        self.assertIn("Server-Timing", response["Access-Control-Expose-Headers"])
+
+        response = self.client.get(reverse('habitaciones_list'), HTTP_ORIGIN="http://otro.example")
+        self.assertFalse(response.has_header("Timing-Allow-Origin"))
+
+    def test_solo_administradores_ven_las_estadisticas(self):
+        self.client.force_authenticate(user=self.employee_user)
+        response = self.client.get(reverse('rendimiento'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(MEDICION_UMBRAL_LENTO_MS=0)
+    def test_peticion_lenta_se_registra_con_su_consulta_mas_lenta(self):
+        self.client.force_authenticate(user=self.employee_user)
+        with self.assertLogs('apps.core.medicion', level='WARNING') as logs:
+            self.client.get(reverse('habitaciones_list'))
+        self.assertIn("habitaciones_list", logs.output[0])
+        self.assertIn("SELECT", logs.output[0])
+
+    def test_percentil(self):
+        valores = list(range(1, 101))
+        self.assertEqual(percentil(valores, 50), 50)
+        self.assertEqual(percentil(valores, 99), 99)
+        self.assertEqual(percentil([7], 95), 7)
+        self.assertIsNone(percentil([], 50))
+
+
+class MetricasTests(APITestCase):
+    def setUp(self):
+        reiniciar_estadisticas()
+        self.admin_user = Usuario.objects.create_user(username='admin', password='password123', rol=Usuario.Rol.ADMINISTRADOR)
+        self.employee_user = Usuario.objects.create_user(username='employee', password='password123', rol=Usuario.Rol.EMPLEADO)
+        self.url = reverse('metricas')
+
+        tipo = TipoHabitacion.objects.create(nombre="Sencilla")
+        self.habitacion = Habitacion.objects.create(numero=101, tipo=tipo)
+        Habitacion.objects.create(numero=102, tipo=tipo, estado=Habitacion.Estado.LIMPIEZA)
+        tarifa = Tarifa.objects.create(nombre="3 Horas", horas=3, precio=500, tipo_habitacion=tipo)
+        turno = iniciar_turno(usuario=self.employee_user, tipo_turno="DIA")
+        abrir_estancia(habitacion=self.habitacion, tarifa=tarifa, metodo_pago="TRANSFERENCIA", turno=turno)
+
+        inicio = timezone.now() - timedelta(minutes=5)
+        for segundos in (3, 8):
+            ExportacionReporte.objects.create(
+                usuario=self.admin_user, formato=ExportacionReporte.Formato.PDF,
+                estado=ExportacionReporte.Estado.COMPLETADA,
+                fecha_inicio=inicio, fecha_fin=inicio + timedelta(seconds=segundos),
+            )
+
+    def _metricas(self, **encabezados):
+        response = self.client.get(self.url, **encabezados)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        return response.content.decode()
+
+    def test_metricas_de_operacion(self):
+        texto = self._metricas(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.admin_user)}")
+        self.assertIn("hotel_turnos_abiertos 1\n", texto)
+        self.assertIn("hotel_estancias_activas 1\n", texto)
+        self.assertIn('hotel_habitaciones{estado="OCUPADA"} 1\n', texto)
+        self.assertIn('hotel_habitaciones{estado="LIMPIEZA"} 1\n', texto)
+        self.assertIn('hotel_movimientos_caja_ultimo_minuto{metodo_pago="TRANSFERENCIA"} 1\n', texto)
+        self.assertIn('hotel_movimientos_caja_monto_ultimo_minuto{metodo_pago="TRANSFERENCIA"} 500.0\n', texto)
+        self.assertIn('hotel_exportaciones_en_cola{estado="PENDIENTE"} 0\n', texto)
+        self.assertIn('hotel_exportaciones_terminadas_24h{estado="COMPLETADA"} 2\n', texto)
+        self.assertIn('hotel_exportacion_duracion_segundos_24h{cuantil="0.5"} 3.0\n', texto)
+        self.assertIn('hotel_exportacion_duracion_segundos_24h{cuantil="1.0"} 8.0\n', texto)
+        self.assertIn("# TYPE hotel_http_peticion_duracion_segundos histogram", texto)
+
+    @override_settings(METRICAS_TOKEN="secreto")
+    def test_histograma_de_peticiones_con_token_fijo(self):
+        self.client.force_authenticate(user=self.employee_user)
+        self.client.get(reverse('habitaciones_list'))
+        self.client.get(reverse('habitaciones_list'))
+        self.client.force_authenticate(user=None)
+
+        texto = self._metricas(HTTP_AUTHORIZATION="Bearer secreto")
+        self.assertIn('hotel_http_peticion_duracion_segundos_bucket{ruta="habitaciones_list",le="+Inf"} 2\n', texto)
+        self.assertIn('hotel_http_peticion_duracion_segundos_count{ruta="habitaciones_list"} 2\n', texto)
+        self.assertRegex(texto, r'hotel_db_consultas_total\{ruta="habitaciones_list"\} [1-9]')
+
+    def test_requiere_token_o_administrador(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+        token = AccessToken.for_user(self.employee_user)
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(METRICAS_TOKEN="secreto")
+    def test_token_malformado_o_en_la_url_no_autentica(self):
+        for parametros, encabezados in (
+            ({}, {"HTTP_AUTHORIZATION": "Bearer é"}),
+            ({"token": "é"}, {}),
+            ({"token": "secreto"}, {}),
+        ):
+            response = self.client.get(self.url, parametros, **encabezados)
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class DatosSinteticosTests(TestCase):
+    def _generar(self):
+        call_command(
+            "generar_datos_sinteticos", verbosity=0,
+            dias=2, habitaciones=10, empleados=3, estancias_por_turno=6, ventas_por_turno=10,
+            hasta="2026-01-01T12:00",
+        )
+
+    def test_datos_consistentes_con_el_libro_de_caja(self):
+        self._generar()
+
+        self.assertEqual(Turno.objects.count(), 4)
+        self.assertEqual(list(Turno.objects.filter(activo=True).values_list("tipo_turno", flat=True)), ["DIA"])
+        total_movimientos = MovimientoCaja.objects.aggregate(total=Sum("monto"))["total"]
+        turnos = Turno.objects.aggregate(
+            efectivo=Sum("total_efectivo"), transferencia=Sum("total_transferencia"),
+            movimientos=Sum("cantidad_movimientos"),
+        )
+        self.assertEqual(turnos["efectivo"] + turnos["transferencia"], total_movimientos)
+        self.assertEqual(turnos["movimientos"], MovimientoCaja.objects.count())
+        self.assertEqual(AcumuladoDiarioMovimiento.objects.aggregate(total=Sum("total"))["total"], total_movimientos)
+
+        # Las habitaciones con una estancia activa quedan ocupadas.
+        self.assertEqual(
+            Habitacion.objects.filter(estado=Habitacion.Estado.OCUPADA).count(),
+            Estancia.objects.filter(activa=True).count(),
+        )
+
+    def test_solo_en_una_base_sin_turnos(self):
+        self._generar()
+        with self.assertRaises(CommandError):
+            self._generar()
+
+
+class ConfiguracionBaseDeDatosTests(SimpleTestCase):
+    entorno = {"POSTGRES_DB": "hotel", "POSTGRES_USER": "hotel", "POSTGRES_HOST": "db"}
+
+    def test_conexiones_persistentes_con_limite_de_la_api(self):
+        configuracion = configuracion_postgres({**self.entorno, "SERVIDOR_INTERFAZ": "wsgi"})
+        self.assertEqual(configuracion["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(configuracion["HOST"], "db")
+        self.assertEqual(configuracion["CONN_MAX_AGE"], 60)
+        self.assertTrue(configuracion["CONN_HEALTH_CHECKS"])
+        self.assertEqual(configuracion["OPTIONS"]["options"], "-c statement_timeout=5000")
+        self.assertNotIn("pool", configuracion["OPTIONS"])
+
+    def test_pool_sin_conexiones_persistentes(self):
+        configuracion = configuracion_postgres({
+            **self.entorno, "DB_POOL": "true", "DB_POOL_MAXIMO": "20", "DB_CONN_MAX_AGE": "600",
+        })
+        self.assertEqual(configuracion["OPTIONS"]["pool"], {"min_size": 2, "max_size": 20, "timeout": 10.0})
+        self.assertEqual(configuracion["CONN_MAX_AGE"], 0)
+
+    def test_asgi_usa_el_pool_o_cierra_las_conexiones(self):
+        configuracion = configuracion_postgres(self.entorno)
+        self.assertIn("pool", configuracion["OPTIONS"])
+        self.assertEqual(configuracion["CONN_MAX_AGE"], 0)
+
+        sin_pool = configuracion_postgres({**self.entorno, "DB_POOL": "false"})
+        self.assertNotIn("pool", sin_pool["OPTIONS"])
+        self.assertEqual(sin_pool["CONN_MAX_AGE"], 0)
+
+        with self.assertRaises(ValueError):
+            configuracion_postgres({**self.entorno, "SERVIDOR_INTERFAZ": "asgi", "DB_POOL": "false", "DB_CONN_MAX_AGE": "60"})
+
+    def test_limite_por_rol(self):
+        reportes = configuracion_postgres({**self.entorno, "DB_ROL": "reportes"})
+        self.assertEqual(reportes["OPTIONS"]["options"], "-c statement_timeout=300000")
+        self.assertEqual(reportes["OPTIONS"]["application_name"], "hotel-reportes")
+
+        sin_limite = configuracion_postgres({**self.entorno, "DB_LIMITE_CONSULTA_MS": "0"})
+        self.assertNotIn("options", sin_limite["OPTIONS"])
+
+        with self.assertRaises(ValueError):
+            configuracion_postgres({**self.entorno, "DB_ROL": "otro"})
+
+    def test_replica_con_el_limite_de_los_reportes(self):
+        replica = configuracion_replica({**self.entorno, "POSTGRES_REPLICA_HOST": "replica"})
+        self.assertEqual(replica["HOST"], "replica")
+        self.assertEqual(replica["OPTIONS"]["options"], "-c statement_timeout=300000")
+        self.assertEqual(replica["OPTIONS"]["application_name"], "hotel-api")
+
+
+class ConfiguracionServidorTests(SimpleTestCase):
+    def test_asgi_por_defecto_con_precarga(self):
+        configuracion = configuracion_gunicorn({}, nucleos=2)
+        self.assertEqual(configuracion["wsgi_app"], "config.asgi:application")
+        self.assertEqual(configuracion["worker_class"], "uvicorn_worker.UvicornWorker")
+        self.assertEqual(configuracion["workers"], 5)
+        self.assertTrue(configuracion["preload_app"])
+        self.assertEqual(configuracion["max_requests_jitter"], 100)
+        self.assertNotIn("threads", configuracion)
+
+    def test_wsgi_con_hilos_desde_el_entorno(self):
+        configuracion = configuracion_gunicorn({
+            "SERVIDOR_INTERFAZ": "wsgi", "SERVIDOR_WORKERS": "3", "SERVIDOR_HILOS": "8",
+            "SERVIDOR_TIMEOUT_GRACIA": "10", "SERVIDOR_PRECARGA": "false",
+        })
+        self.assertEqual(configuracion["wsgi_app"], "config.wsgi:application")
+        self.assertEqual(configuracion["worker_class"], "gthread")
+        self.assertEqual((configuracion["workers"], configuracion["threads"]), (3, 8))
+        self.assertEqual(configuracion["graceful_timeout"], 10)
+        self.assertFalse(configuracion["preload_app"])
+
+        with self.assertRaises(ValueError):
+            configuracion_gunicorn({"SERVIDOR_INTERFAZ": "otra"})
+
+
+@override_settings(REPLICA_LECTURA="replica")
+class ReplicaLecturaTests(APITestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.admin_user = Usuario.objects.create_user(username='admin', password='password123', rol=Usuario.Rol.ADMINISTRADOR)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.admin_user)}")
+        self.habitacion = Habitacion.objects.create(numero=101, tipo=TipoHabitacion.objects.create(nombre="Sencilla"))
+        # En las pruebas la réplica es otra base: una habitación que solo existe
+        # en ella muestra de dónde se leyó.
+        tipo_replica = TipoHabitacion.objects.using("replica").create(nombre="Suite")
+        Habitacion.objects.using("replica").create(numero=901, tipo=tipo_replica)
+
+    def _numeros(self):
+        response = self.client.get(reverse('habitaciones_list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [h["numero"] for h in response.data["results"]]
+
+    def _escribir(self):
+        response = self.client.patch(
+            reverse('habitaciones_detail', args=[self.habitacion.id]), {"activa": True}, format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_listados_se_leen_de_la_replica(self):
+        self.assertEqual(self._numeros(), [901])
+
+        # Lo que no es un listado se lee de la principal.
+        response = self.client.get(reverse('habitaciones_detail', args=[self.habitacion.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_despues_de_escribir_el_usuario_lee_de_la_principal(self):
+        self._escribir()
+        self.assertTrue(EscrituraReciente.objects.filter(usuario=self.admin_user).exists())
+        self.assertEqual(self._numeros(), [101])
+
+        # La permanencia es por usuario, no por cliente: sin cookies sigue igual.
+        self.client.cookies.clear()
+        self.assertEqual(self._numeros(), [101])
+
+        # Otros usuarios siguen leyendo de la réplica.
+        otro = Usuario.objects.create_user(username='otro', password='password123', rol=Usuario.Rol.ADMINISTRADOR)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(otro)}")
+        self.assertEqual(self._numeros(), [901])
+
+    def test_pasada_la_permanencia_vuelve_a_la_replica(self):
+        self._escribir()
+        EscrituraReciente.objects.filter(usuario=self.admin_user).update(
+            fecha=timezone.now() - timedelta(seconds=11),
+        )
+        self.assertEqual(self._numeros(), [901])
+
+    @override_settings(REPLICA_LECTURA=None)
+    def test_sin_replica_todo_se_lee_de_la_principal(self):
+        self.assertEqual(self._numeros(), [101])
+        self._escribir()
+        self.assertFalse(EscrituraReciente.objects.exists())
+
@@ -1,6 +1,23 @@
 from django.urls import path
-from .views import HealthCheckView
+from .views import (
+    HealthCheckView,
+    OperacionesLoteAPIView,
+    RendimientoAPIView,
+    TicketEventosAPIView,
+    flujo_eventos,
+    metricas_prometheus,
+)
 
 urlpatterns = [
     path("health/", HealthCheckView.as_view()),
+    # Flujo de eventos (Server-Sent Events) para las terminales de recepción.
+    path("eventos/", flujo_eventos, name="flujo-eventos"),
+    # Ticket de un solo uso para abrir el flujo desde `EventSource`.
+    path("eventos/ticket/", TicketEventosAPIView.as_view(), name="ticket-eventos"),
+    # Varias operaciones de recepción en una sola petición y transacción.
+    path("operaciones/lote/", OperacionesLoteAPIView.as_view(), name="operaciones-lote"),
+    # Percentiles de tiempo por ruta de este proceso (solo administradores).
+    path("rendimiento/", RendimientoAPIView.as_view(), name="rendimiento"),
+    # Métricas en formato de Prometheus.
+    path("metrics/", metricas_prometheus, name="metricas"),
 ]
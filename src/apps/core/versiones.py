@@ -0,0 +1,101 @@
+"""
+Sellos de versión en la base de datos para invalidar cachés locales.
+
+`incrementar_version` se llama en la misma transacción que modifica los
+datos; `obtener_version` es una lectura por clave única que los procesos usan
+para detectar cambios hechos por otros procesos. `CacheVersionada` guarda una
+copia local al proceso que se descarta cuando cambia la versión.
+"""
+import threading
+import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .asincrono import en_hilo
+from .models import Version
+
+
+def obtener_version(clave):
+    """Versión actual de `clave` (0 si nunca ha cambiado)."""
+    valor = Version.objects.filter(clave=clave).values_list("valor", flat=True).first()
+    return valor or 0
+
+
+def incrementar_version(clave):
+    """Incrementa la versión de `clave`, creando el contador si no existe."""
+    if Version.objects.filter(clave=clave).update(valor=F("valor") + 1):
+        return
+
+    try:
+        with transaction.atomic():
+            Version.objects.create(clave=clave, valor=1)
+    except IntegrityError:
+        # Otra transacción creó el contador entre la actualización y la inserción.
+        Version.objects.filter(clave=clave).update(valor=F("valor") + 1)
+
+
+class CacheVersionada:
+    """
+    Copia local al proceso de un conjunto de datos, válida mientras el sello de
+    versión `clave` no cambie.
+
+    El sello se compara como máximo una vez cada `segundos_entre_verificaciones()`;
+    entre comparaciones se devuelve la copia sin consultar la base de datos. En
+    el proceso que hace el cambio, `invalidar()` descarta la copia de inmediato.
+    """
+
+    def __init__(self, clave, cargar, segundos_entre_verificaciones):
+        self.clave = clave
+        self.cargar = cargar
+        self.segundos_entre_verificaciones = segundos_entre_verificaciones
+        self._candado = threading.Lock()
+        self._datos = None         # Copia local, o None si no hay.
+        self._version = None       # Versión de la base de datos con la que se cargó.
+        self._verificado = 0.0     # Momento (time.monotonic) de la última comparación de versión.
+        self._generacion = 0       # Aumenta con cada invalidación local.
+
+    def invalidar(self):
+        """Descarta la copia local de este proceso."""
+        with self._candado:
+            self._datos = None
+            self._version = None
+            self._generacion += 1
+
+    def obtener(self):
+        ahora = time.monotonic()
+        with self._candado:
+            datos = self._datos
+            version = self._version
+            verificado = self._verificado
+            generacion = self._generacion
+
+        if datos is not None and ahora - verificado < self.segundos_entre_verificaciones():
+            return datos
+
+        version_actual = obtener_version(self.clave)
+        if datos is not None and version_actual == version:
+            with self._candado:
+                if self._generacion == generacion:
+                    self._verificado = ahora
+            return datos
+
+        # La versión se lee antes que los datos: si cambian en medio, la siguiente
+        # verificación detecta una versión más nueva y vuelve a cargarlos.
+        datos = self.cargar()
+        with self._candado:
+            # Si hubo una invalidación local mientras se cargaba, no se guarda la copia.
+            if self._generacion == generacion:
+                self._datos, self._version, self._verificado = datos, version_actual, ahora
+        return datos
+
+    async def aobtener(self):
+        """
+        Como `obtener`, para vistas asíncronas: mientras no toque comparar la
+        versión, devuelve la copia sin salir del event loop.
+        """
+        with self._candado:
+            datos, verificado = self._datos, self._verificado
+        if datos is not None and time.monotonic() - verificado < self.segundos_entre_verificaciones():
+            return datos
+        return await en_hilo(self.obtener)()
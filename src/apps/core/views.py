@@ -1,9 +1,185 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import HTTP_HEADER_ENCODING, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from apps.turnos.turno_activo import obtener_turno_activo
+from apps.users.models import Usuario
+from .asincrono import en_hilo
+from .eventos import canjear_ticket, emitir_ticket, flujo_de_eventos, vigencia_ticket
+from .idempotencia import idempotente
+from .medicion import MedicionRenderMixin, estadisticas_por_ruta
+from .metricas import TIPO_CONTENIDO, metricas
+from .operaciones import ejecutar_lote
+from .permissions import IsAdminUser, IsEmpleado, IsOnlyInvitado
+from .serializers import LoteOperacionesSerializer
 
-class HealthCheckView(APIView):
+class HealthCheckView(MedicionRenderMixin, APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
         return Response({"status": "ok"})
+
+
+class RendimientoAPIView(MedicionRenderMixin, APIView):
+    """
+    Percentiles de tiempo total, tiempo de base de datos, número de consultas
+    y tiempos de serialización y renderizado por ruta (ver
+    apps/core/medicion.py). Los datos son de las últimas peticiones atendidas
+    por este proceso.
+    - GET: Solo Administradores.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        return Response({"rutas": estadisticas_por_ruta()})
+
+
+class OperacionesLoteAPIView(MedicionRenderMixin, APIView):
+    """
+    Endpoint para ejecutar varias operaciones de recepción en una sola petición
+    y una sola transacción (ver apps/core/operaciones.py). Reduce la latencia de
+    las terminales con conexiones lentas: el token, los permisos y el turno
+    activo se validan una vez por lote y no una vez por operación.
+    - POST: Admins, Empleados e Invitados.
+    """
+    permission_classes = [IsAuthenticated, (IsEmpleado | IsOnlyInvitado)]
+
+    @idempotente
+    def post(self, request):
+        """
+        Recibe `operaciones` (lista de `{"tipo", "datos"}`) y `atomico`.
+        Devuelve un resultado por operación. Si el lote atómico no se pudo
+        confirmar, responde 400 con el error de la operación que falló.
+        """
+        serializer = LoteOperacionesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Regla de negocio: Toda operación debe ocurrir dentro de un turno activo.
+        turno_activo = obtener_turno_activo(request.user)
+        if turno_activo is None:
+            return Response({"error": "No hay un turno activo"}, status=status.HTTP_400_BAD_REQUEST)
+
+        resultados, confirmado = ejecutar_lote(
+            operaciones=serializer.validated_data["operaciones"],
+            turno=turno_activo,
+            atomico=serializer.validated_data["atomico"],
+        )
+        respuesta = {"confirmado": confirmado, "resultados": resultados}
+        if not confirmado:
+            fallida = next(r for r in resultados if "error" in r)
+            respuesta["error"] = fallida["error"]
+            return Response(respuesta, status=status.HTTP_400_BAD_REQUEST)
+        return Response(respuesta, status=status.HTTP_200_OK)
+
+
+class TicketEventosAPIView(MedicionRenderMixin, APIView):
+    """
+    Ticket de un solo uso para abrir el flujo de eventos con `?ticket=`
+    (ver apps/core/eventos.py). `EventSource` no permite enviar el token en un
+    encabezado, y en la URL quedaría en los registros de acceso.
+    - POST: Usuarios autenticados.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ticket = emitir_ticket(request.user)
+        return Response(
+            {"ticket": ticket, "expira_en": int(vigencia_ticket().total_seconds())},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+def _token_de_peticion(request):
+    """Token JWT del encabezado `Authorization`."""
+    autenticador = JWTAuthentication()
+    encabezado = autenticador.get_header(request)
+    if encabezado:
+        return autenticador.get_raw_token(encabezado)
+    return None
+
+
+def _usuario_del_token(token):
+    autenticador = JWTAuthentication()
+    try:
+        usuario = autenticador.get_user(autenticador.get_validated_token(token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return usuario if usuario.is_active else None
+
+
+async def _usuario_autenticado(request):
+    """
+    Usuario del token JWT del encabezado `Authorization` o del ticket de
+    `?ticket=`, o None. El token de acceso no se acepta en la URL.
+    """
+    token = _token_de_peticion(request)
+    if token:
+        return await en_hilo(_usuario_del_token)(token)
+    ticket = request.GET.get("ticket")
+    if ticket:
+        return await en_hilo(canjear_ticket)(ticket)
+    return None
+
+
+@require_GET
+async def flujo_eventos(request):
+    """
+    Flujo de Server-Sent Events para las terminales de recepción: cambios de
+    estado de habitaciones, movimientos de caja y apertura/cierre de turnos
+    (ver apps/core/eventos.py). Al reconectarse, el navegador envía
+    `Last-Event-ID` y recibe los eventos que se perdió. Desde el navegador se
+    abre con `?ticket=` (ver `TicketEventosAPIView`); cada reconexión necesita
+    un ticket nuevo.
+
+    Es una vista asíncrona de Django (DRF no admite respuestas asíncronas en
+    streaming) y requiere un servidor ASGI; bajo WSGI la conexión no termina.
+    """
+    if await _usuario_autenticado(request) is None:
+        return JsonResponse({"error": "Las credenciales de autenticación no se proveyeron o no son válidas."}, status=401)
+
+    ultimo_id = request.headers.get("Last-Event-ID") or request.GET.get("desde")
+    try:
+        ultimo_id = int(ultimo_id) if ultimo_id else None
+    except ValueError:
+        return JsonResponse({"error": "El id del último evento debe ser un número entero."}, status=400)
+
+    response = StreamingHttpResponse(flujo_de_eventos(ultimo_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Evita que un proxy (p. ej. nginx) acumule los eventos antes de enviarlos.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _puede_ver_metricas(request):
+    """
+    Prometheus se autentica con el token fijo `METRICAS_TOKEN` (si está
+    configurado); también se acepta el JWT de un administrador. Ambos solo en
+    el encabezado `Authorization`: la URL queda en los registros de acceso.
+    """
+    token = _token_de_peticion(request)
+    if not token:
+        return False
+    # Se comparan bytes: `compare_digest` no admite textos con caracteres no ASCII.
+    if settings.METRICAS_TOKEN and hmac.compare_digest(token, settings.METRICAS_TOKEN.encode(HTTP_HEADER_ENCODING)):
+        return True
+    usuario = _usuario_del_token(token)
+    return usuario is not None and usuario.rol == Usuario.Rol.ADMINISTRADOR
+
+
+@require_GET
+def metricas_prometheus(request):
+    """
+    Métricas de peticiones, base de datos y operación del hotel en el formato
+    de texto de Prometheus (ver apps/core/metricas.py).
+    """
+    if not _puede_ver_metricas(request):
+        return JsonResponse({"error": "Las credenciales de autenticación no se proveyeron o no son válidas."}, status=401)
+    return HttpResponse(metricas(), content_type=TIPO_CONTENIDO)
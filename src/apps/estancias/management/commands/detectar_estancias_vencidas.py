@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.estancias.services_vencimientos import notificar_estancias_vencidas
+
+
+class Command(BaseCommand):
+    """
+    Programador local de vencimientos. Revisa periódicamente las estancias
+    activas cuya hora de salida programada ya pasó y publica un evento
+    `estancia.vencida` por cada una (una sola vez por hora de salida). Pueden
+    ejecutarse varias instancias: cada vencimiento se notifica una sola vez.
+
+    Uso:
+        python manage.py detectar_estancias_vencidas
+        python manage.py detectar_estancias_vencidas --una-vez
+    """
+    help = "Detecta las estancias que superaron su hora de salida programada y publica su vencimiento."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--una-vez",
+            action="store_true",
+            help="Revisa las estancias una sola vez y termina, en lugar de quedarse en ciclo.",
+        )
+        parser.add_argument(
+            "--intervalo",
+            type=float,
+            default=30.0,
+            help="Segundos entre revisiones (por defecto 30).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            # El programador es de larga duración: se descartan las conexiones caídas o vencidas.
+            close_old_connections()
+
+            notificadas = notificar_estancias_vencidas()
+            if notificadas:
+                self.stdout.write(self.style.WARNING(f"{notificadas} estancias vencidas notificadas."))
+
+            if options["una_vez"]:
+                break
+            time.sleep(options["intervalo"])
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estancias', '0002_initial'),
+        ('habitaciones', '0002_habitacion_estado'),
+        ('tarifas', '0001_initial'),
+        ('turnos', '0004_turno_turno_fecha_inicio_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='estancia',
+            name='vencimiento_notificado',
+            field=models.DateTimeField(blank=True, help_text='Hora de salida programada cuyo vencimiento ya se notificó. Si se agregan horas extra, el nuevo vencimiento se vuelve a notificar.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='estancia',
+            index=models.Index(condition=models.Q(('activa', True)), fields=['hora_salida_programada'], name='estancia_activa_salida_idx'),
+        ),
+    ]
@@ -23,6 +23,15 @@ class Estancia(models.Model):
                 name="unique_estancia_activa_por_habitacion"
             )
         ]
+        indexes = [
+            # Estancias vencidas: índice parcial que solo contiene las estancias
+            # activas, así que su tamaño no depende del historial.
+            models.Index(
+                fields=["hora_salida_programada"],
+                condition=models.Q(activa=True),
+                name="estancia_activa_salida_idx"
+            ),
+        ]
         permissions = [
             ("abrir_estancia", "Puede abrir una estancia"),
             ("cerrar_estancia", "Puede cerrar una estancia"),
@@ -76,6 +85,13 @@ class Estancia(models.Model):
         help_text="Hora real en que el cliente salió"
     )
 
+    vencimiento_notificado = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Hora de salida programada cuyo vencimiento ya se notificó. "
+                  "Si se agregan horas extra, el nuevo vencimiento se vuelve a notificar."
+    )
+
     # ==========================
     # Estado
     # ==========================
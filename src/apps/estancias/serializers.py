@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from apps.core.medicion import MedicionSerializerMixin
 from apps.estancias.models import Estancia
 from apps.caja.models import MovimientoCaja
 from apps.habitaciones.models import Habitacion
@@ -8,7 +9,7 @@ from apps.tarifas.serializers import TarifaSerializer
 from apps.turnos.serializers import TurnoListSerializer
 
 
-class AbrirEstanciaSerializer(serializers.Serializer):
+class AbrirEstanciaSerializer(MedicionSerializerMixin, serializers.Serializer):
     """
     Serializador de escritura para validar los datos de entrada al abrir una estancia.
     No está ligado a un modelo, solo define la estructura de la petición.
@@ -23,7 +24,7 @@ class AbrirEstanciaSerializer(serializers.Serializer):
         choices=MovimientoCaja.MetodoPago.choices
     )
 
-class CerrarEstanciaSerializer(serializers.Serializer):
+class CerrarEstanciaSerializer(MedicionSerializerMixin, serializers.Serializer):
     """
     Serializador de escritura para validar los datos de entrada al cerrar una estancia.
     """
@@ -37,7 +38,7 @@ class CerrarEstanciaSerializer(serializers.Serializer):
     )
 
 
-class AgregarHorasExtraSerializer(serializers.Serializer):
+class AgregarHorasExtraSerializer(MedicionSerializerMixin, serializers.Serializer):
     """
     Serializador de escritura para validar los datos al agregar horas extra a una estancia.
     """
@@ -64,7 +65,7 @@ class AgregarHorasExtraSerializer(serializers.Serializer):
 
         return data
 
-class EstanciaDetalleSerializer(serializers.ModelSerializer):
+class EstanciaDetalleSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     """
     Serializador de solo lectura para devolver el estado completo y actualizado
     de una estancia después de una operación (abrir, cerrar, etc.).
@@ -5,6 +5,7 @@ from datetime import timedelta
 
 from apps.estancias.models import Estancia
 from apps.turnos.models import Turno
+from apps.turnos.turno_activo import confirmar_turno_activo
 from apps.caja.models import MovimientoCaja
 
 
@@ -88,6 +89,9 @@ def cerrar_estancia(
     # Regla: La operación debe realizarse dentro de un turno activo.
     if not turno.activo:
         raise ValidationError("No hay un turno activo")
+    # El cierre no registra movimientos de caja, así que se confirma en la base
+    # de datos que el turno no se haya cerrado mientras tanto.
+    confirmar_turno_activo(turno)
 
     # Delega la lógica de cambio de estado al método de dominio del modelo.
     estancia.cerrar(
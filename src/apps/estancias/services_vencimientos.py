@@ -0,0 +1,57 @@
+"""
+Detección de estancias vencidas (activas y con la hora de salida programada ya
+cumplida).
+
+Ambas consultas recorren el índice parcial `estancia_activa_salida_idx`, que
+solo contiene las estancias activas: su costo no depende del historial.
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.eventos import publicar
+from .models import Estancia
+
+
+def estancias_vencidas(momento=None):
+    """Estancias activas cuya salida programada ya pasó, de la más antigua a la más reciente."""
+    momento = momento or timezone.now()
+    return Estancia.objects.filter(
+        activa=True, hora_salida_programada__lte=momento
+    ).order_by("hora_salida_programada")
+
+
+def notificar_estancias_vencidas(momento=None):
+    """
+    Publica un evento `estancia.vencida` por cada estancia que venció desde la
+    última revisión y lo registra en `vencimiento_notificado`. Si se agregan
+    horas extra, la estancia vuelve a notificarse cuando venza la nueva hora.
+    Devuelve el número de estancias notificadas.
+    """
+    pendientes = (
+        estancias_vencidas(momento)
+        .exclude(vencimiento_notificado=F("hora_salida_programada"))
+        .values("id", "habitacion_id", "habitacion__numero", "hora_salida_programada")
+    )
+
+    notificadas = 0
+    for estancia in pendientes:
+        # Actualización condicional: si otro proceso ya la notificó, o se
+        # agregaron horas mientras tanto, no se vuelve a publicar.
+        marcada = Estancia.objects.filter(
+            pk=estancia["id"],
+            activa=True,
+            hora_salida_programada=estancia["hora_salida_programada"],
+        ).exclude(
+            vencimiento_notificado=estancia["hora_salida_programada"]
+        ).update(vencimiento_notificado=estancia["hora_salida_programada"])
+        if not marcada:
+            continue
+
+        publicar("estancia.vencida", {
+            "estancia_id": estancia["id"],
+            "habitacion_id": estancia["habitacion_id"],
+            "numero": estancia["habitacion__numero"],
+            "hora_salida_programada": estancia["hora_salida_programada"],
+        })
+        notificadas += 1
+    return notificadas
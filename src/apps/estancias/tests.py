@@ -1,3 +1,6 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -10,7 +13,9 @@ from apps.turnos.models import Turno
 from apps.habitaciones.models import TipoHabitacion, Habitacion
 from apps.tarifas.models import Tarifa
 from apps.caja.models import MovimientoCaja
+from apps.core.models import Evento
 from .models import Estancia
+from .services_vencimientos import notificar_estancias_vencidas
 
 
 class EstanciaAPITests(APITestCase):
@@ -173,3 +178,99 @@ class EstanciaAPITests(APITestCase):
         self.assertFalse(estancia.activa)
         self.assertEqual(estancia.turno_inicio, self.turno_activo)
         self.assertEqual(estancia.turno_cierre, turno_posterior)
+
+
+class EstanciasVencidasTests(APITestCase):
+    def setUp(self):
+        self.employee_user = Usuario.objects.create_user(username='employee', password='password123', rol=Usuario.Rol.EMPLEADO)
+        tipo = TipoHabitacion.objects.create(nombre="Sencilla")
+        self.tarifa = Tarifa.objects.create(nombre="3 Horas", horas=3, precio=500, tipo_habitacion=tipo, activa=True)
+        self.turno = Turno.objects.create(usuario=self.employee_user, tipo_turno="DIA", activo=True)
+        self.habitaciones = [Habitacion.objects.create(numero=101 + i, tipo=tipo) for i in range(4)]
+        ahora = timezone.now()
+
+        self.vencida = self._estancia(self.habitaciones[0], ahora - timedelta(minutes=10))
+        self.vencida_antes = self._estancia(self.habitaciones[1], ahora - timedelta(hours=2))
+        self._estancia(self.habitaciones[2], ahora + timedelta(hours=1))
+        cerrada = self._estancia(self.habitaciones[3], ahora - timedelta(hours=5))
+        Estancia.objects.filter(pk=cerrada.pk).update(activa=False)
+
+        self.url = reverse('estancias-vencidas')
+
+    def _estancia(self, habitacion, salida):
+        return Estancia.objects.create(
+            habitacion=habitacion, tarifa=self.tarifa, turno_inicio=self.turno, hora_salida_programada=salida
+        )
+
+    def test_lista_solo_estancias_activas_vencidas(self):
+        self.client.force_authenticate(user=self.employee_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data.get('results', response.data)
+        self.assertEqual([e['id'] for e in results], [self.vencida_antes.id, self.vencida.id])
+
+    def test_notifica_cada_vencimiento_una_sola_vez(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(notificar_estancias_vencidas(), 2)
+        self.assertEqual(notificar_estancias_vencidas(), 0)
+        self.assertEqual(Evento.objects.filter(tipo="estancia.vencida").count(), 2)
+
+        # Con horas extra, el nuevo vencimiento se vuelve a notificar cuando llega.
+        nueva_salida = timezone.now() + timedelta(minutes=30)
+        Estancia.objects.filter(pk=self.vencida.pk).update(hora_salida_programada=nueva_salida)
+        self.assertEqual(notificar_estancias_vencidas(), 0)
+        self.assertEqual(notificar_estancias_vencidas(momento=nueva_salida + timedelta(minutes=1)), 1)
+
+    def test_comando_detecta_vencidas(self):
+        salida = StringIO()
+        call_command('detectar_estancias_vencidas', '--una-vez', stdout=salida)
+        self.assertIn("2 estancias vencidas", salida.getvalue())
+
+
+class EstanciaListadoTests(APITestCase):
+    def setUp(self):
+        self.employee_user = Usuario.objects.create_user(username='employee', password='password123', rol=Usuario.Rol.EMPLEADO)
+        tipo = TipoHabitacion.objects.create(nombre="Sencilla")
+        self.tarifa = Tarifa.objects.create(nombre="3 Horas", horas=3, precio=500, tipo_habitacion=tipo, activa=True)
+        self.turno = Turno.objects.create(usuario=self.employee_user, tipo_turno="DIA", activo=True)
+        self.habitacion = Habitacion.objects.create(numero=101, tipo=tipo)
+        self.client.force_authenticate(user=self.employee_user)
+        self.url = reverse('estancias-list')
+
+    def _crear_estancias(self, cantidad):
+        ahora = timezone.now()
+        for i in range(cantidad):
+            Estancia.objects.create(
+                habitacion=self.habitacion, tarifa=self.tarifa, turno_inicio=self.turno, turno_cierre=self.turno,
+                hora_entrada=ahora - timedelta(hours=i + 3), hora_salida_programada=ahora - timedelta(hours=i),
+                activa=False,
+            )
+
+    def test_consultas_no_crecen_con_las_estancias(self):
+        """Los tipos y usuarios que anidan los serializadores llegan en la misma consulta."""
+        self._crear_estancias(1)
+        with self.assertNumQueries(2):  # conteo + página
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        self._crear_estancias(9)
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.url).json()["count"], 10)
+
+    def test_variante_asincrona(self):
+        self._crear_estancias(12)
+        url = reverse('estancias-list-async')
+        for params in ({}, {"page": 2}, {"activa": "false"}, {"habitacion": self.habitacion.id, "page": 2}):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            datos = response.json()
+            # Los enlaces de paginación apuntan a la ruta asíncrona.
+            for enlace in ("next", "previous"):
+                datos[enlace] = datos[enlace] and datos[enlace].replace("/async/", "/")
+            self.assertEqual(datos, self.client.get(self.url, params).json())
+
+        # Los mismos errores y permisos de DRF.
+        self.assertEqual(self.client.get(url, {"habitacion": 999}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {"page": 3}).status_code, status.HTTP_404_NOT_FOUND)
+        invitado = Usuario.objects.create_user(username='invitado', password='password123', rol=Usuario.Rol.INVITADO)
+        self.client.force_authenticate(user=invitado)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
@@ -6,11 +6,17 @@ from .views import (
     CerrarEstanciaAPIView,
     AgregarHorasExtraAPIView,
     EstanciaListAPIView,
+    EstanciaListAsincronoAPIView,
+    EstanciasVencidasAPIView,
 )
 
 urlpatterns = [
     # Endpoint para listar todas las estancias.
     path("", EstanciaListAPIView.as_view(), name="estancias-list"),
+    # Variante asíncrona del listado (servidor ASGI).
+    path("async/", EstanciaListAsincronoAPIView.as_view(), name="estancias-list-async"),
+    # Endpoint para listar las estancias activas que ya superaron su hora de salida.
+    path("vencidas/", EstanciasVencidasAPIView.as_view(), name="estancias-vencidas"),
     # Endpoint para abrir una nueva estancia.
     path("abrir/", AbrirEstanciaAPIView.as_view(), name="abrir-estancia"),
     # Endpoint para cerrar una estancia activa.
@@ -5,12 +5,16 @@ from rest_framework import status, generics
 from rest_framework.exceptions import ValidationError as DRFValidationError # Renombrar para evitar conflicto
 from django.core.exceptions import ValidationError
 
-from apps.turnos.models import Turno
+from apps.turnos.turno_activo import obtener_turno_activo
+from apps.core.asincrono import VistaAsincronaMixin, en_hilo
+from apps.core.idempotencia import idempotente
 from apps.core.permissions import IsEmpleado, IsOnlyInvitado
+from apps.core.medicion import MedicionRenderMixin
 from .models import Estancia
 from apps.estancias.services import abrir_estancia
 from apps.estancias.services import cerrar_estancia
 from apps.estancias.services import agregar_horas_extra
+from apps.estancias.services_vencimientos import estancias_vencidas
 from apps.estancias.serializers import (
     AbrirEstanciaSerializer,
     CerrarEstanciaSerializer,
@@ -19,7 +23,7 @@ from apps.estancias.serializers import (
 )
 
 
-class EstanciaListAPIView(generics.ListAPIView):
+class EstanciaListAPIView(MedicionRenderMixin, generics.ListAPIView):
     """
     Endpoint de solo lectura para listar todas las estancias (históricas y activas).
     - `GET`: Solo los empleados y administradores pueden ver la lista de estancias.
@@ -27,9 +31,11 @@ class EstanciaListAPIView(generics.ListAPIView):
     """
     serializer_class = EstanciaDetalleSerializer
     permission_classes = [IsAuthenticated, IsEmpleado]
-    # `select_related` optimiza la consulta para evitar N+1 queries.
+    # `select_related` optimiza la consulta para evitar N+1 queries; incluye las
+    # relaciones que anidan los serializadores (tipo y usuario).
     queryset = Estancia.objects.select_related(
-        'habitacion', 'tarifa', 'turno_inicio', 'turno_cierre'
+        'habitacion__tipo', 'tarifa__tipo_habitacion',
+        'turno_inicio__usuario', 'turno_cierre__usuario',
     ).order_by('-hora_entrada')
     filterset_fields = {
         'activa': ['exact'],
@@ -39,6 +45,35 @@ class EstanciaListAPIView(generics.ListAPIView):
     }
 
 
+class EstanciaListAsincronoAPIView(VistaAsincronaMixin, EstanciaListAPIView):
+    """
+    Variante asíncrona de `EstanciaListAPIView` para el servidor ASGI (ver
+    apps/core/asincrono.py). Los filtros y la paginación de DRF son
+    síncronos, así que la página se arma completa en un solo paso por un hilo.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        return await en_hilo(self.list)(request, *args, **kwargs)
+
+
+class EstanciasVencidasAPIView(MedicionRenderMixin, generics.ListAPIView):
+    """
+    Endpoint de solo lectura con las estancias activas que ya superaron su hora
+    de salida programada, de la más antigua a la más reciente. Es una lectura
+    sobre el índice parcial de estancias activas.
+    - `GET`: Admins, Empleados e Invitados (recepción).
+    """
+    serializer_class = EstanciaDetalleSerializer
+    permission_classes = [IsAuthenticated, (IsEmpleado | IsOnlyInvitado)]
+
+    def get_queryset(self):
+        # Incluye las relaciones que anidan los serializadores (tipo y usuario).
+        return estancias_vencidas().select_related(
+            'habitacion__tipo', 'tarifa__tipo_habitacion',
+            'turno_inicio__usuario', 'turno_cierre__usuario',
+        )
+
+
 class ActiveTurnoRequiredMixin:
     """
     Mixin que verifica la existencia de un turno activo antes de procesar la petición.
@@ -48,17 +83,19 @@ class ActiveTurnoRequiredMixin:
         # Llama al método `initial` del padre para ejecutar sus validaciones (auth, perms, etc.)
         super().initial(request, *args, **kwargs)
         # Ahora, ejecuta nuestra validación personalizada.
-        try:
-            self.turno_activo = Turno.objects.get(activo=True)
-        except Turno.DoesNotExist:
+        # El turno se resuelve desde la caché del proceso; los servicios vuelven a
+        # verificar en la base de datos que siga activo al escribir.
+        self.turno_activo = obtener_turno_activo(request.user)
+        if self.turno_activo is None:
             raise DRFValidationError({"error": "No hay un turno activo"}) # Lanzar excepción de DRF
 
-class AbrirEstanciaAPIView(ActiveTurnoRequiredMixin, APIView):
+class AbrirEstanciaAPIView(MedicionRenderMixin, ActiveTurnoRequiredMixin, APIView):
     """Endpoint para abrir una nueva estancia."""
     # Se permite abrir estancias a Admins, Empleados e Invitados.
     # IsEmpleado cubre a Admins y Empleados. IsOnlyInvitado cubre a los invitados.
     permission_classes = [IsAuthenticated, (IsEmpleado | IsOnlyInvitado)]
 
+    @idempotente
     def post(self, request):
         """
         Maneja la petición POST para crear una estancia.
@@ -87,7 +124,7 @@ class AbrirEstanciaAPIView(ActiveTurnoRequiredMixin, APIView):
         # Devuelve el estado completo de la estancia creada.
         return Response(EstanciaDetalleSerializer(estancia).data, status=status.HTTP_201_CREATED)
 
-class CerrarEstanciaAPIView(ActiveTurnoRequiredMixin, APIView):
+class CerrarEstanciaAPIView(MedicionRenderMixin, ActiveTurnoRequiredMixin, APIView):
     """Endpoint para cerrar una estancia activa."""
     # Se permite cerrar estancias a Admins, Empleados e Invitados.
     permission_classes = [IsAuthenticated, (IsEmpleado | IsOnlyInvitado)]
@@ -116,11 +153,12 @@ class CerrarEstanciaAPIView(ActiveTurnoRequiredMixin, APIView):
         # Devuelve el estado completo de la estancia cerrada.
         return Response(EstanciaDetalleSerializer(estancia).data, status=status.HTTP_200_OK)
 
-class AgregarHorasExtraAPIView(ActiveTurnoRequiredMixin, APIView):
+class AgregarHorasExtraAPIView(MedicionRenderMixin, ActiveTurnoRequiredMixin, APIView):
     """Endpoint para agregar horas extra a una estancia."""
     # Se permite agregar horas a Admins, Empleados e Invitados.
     permission_classes = [IsAuthenticated, (IsEmpleado | IsOnlyInvitado)]
 
+    @idempotente
     def post(self, request):
         """
         Maneja la petición POST para agregar horas y registrar el cobro.
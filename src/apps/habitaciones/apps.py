@@ -5,3 +5,7 @@ class HabitacionesConfig(AppConfig):
     """Configuración de la aplicación 'habitaciones' de Django."""
     name = 'apps.habitaciones'
     label = 'habitaciones'
+
+    def ready(self):
+        # Conecta los receptores que invalidan el tablero de habitaciones.
+        from . import signals  # noqa: F401
@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from apps.core.medicion import MedicionSerializerMixin
 from rest_framework.validators import UniqueValidator
 from .models import TipoHabitacion, Habitacion
 
 
-class TipoHabitacionSerializer(serializers.ModelSerializer):
+class TipoHabitacionSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo TipoHabitacion. Se usa para crear, listar y actualizar.
     """
@@ -26,7 +27,7 @@ class TipoHabitacionSerializer(serializers.ModelSerializer):
             }
         }
 
-class HabitacionSerializer(serializers.ModelSerializer):
+class HabitacionSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Habitacion.
     """
@@ -66,4 +67,14 @@ class HabitacionSerializer(serializers.ModelSerializer):
         """
         if not value.activo:
             raise serializers.ValidationError("No se puede asignar una habitación a un tipo inactivo.")
-        return value
\ No newline at end of file
+        return value
+
+
+class MarcarDisponibleSerializer(MedicionSerializerMixin, serializers.Serializer):
+    """
+    Serializador de escritura para marcar una habitación como disponible cuando
+    la habitación no viene en la URL (ej. dentro de un lote de operaciones).
+    """
+    habitacion_id = serializers.PrimaryKeyRelatedField(
+        queryset=Habitacion.objects.all(), source='habitacion'
+    )
@@ -0,0 +1,20 @@
+from django.core.exceptions import ValidationError
+
+from .models import Habitacion
+
+
+def marcar_habitacion_disponible(*, habitacion):
+    """
+    Servicio de negocio para marcar una habitación como 'Disponible'.
+    Típicamente se usa al terminar la limpieza o el mantenimiento.
+    """
+    # Regla de negocio: Solo permitir el cambio si la habitación está en limpieza o mantenimiento.
+    if habitacion.estado not in [Habitacion.Estado.LIMPIEZA, Habitacion.Estado.MANTENIMIENTO]:
+        raise ValidationError(
+            f"No se puede marcar como disponible una habitación que está '{habitacion.get_estado_display()}'."
+        )
+
+    habitacion.estado = Habitacion.Estado.DISPONIBLE
+    habitacion.save(update_fields=['estado'])
+
+    return habitacion
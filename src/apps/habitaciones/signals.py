@@ -0,0 +1,20 @@
+"""
+Receptores que invalidan el tablero de habitaciones. Se conectan en
+`HabitacionesConfig.ready`. Las estancias y tarifas se referencian por nombre
+para no importar apps que dependen de esta.
+"""
+from django.db.models.signals import post_delete, post_save
+
+from .tablero import registrar_cambio_en_tablero
+
+
+MODELOS_DEL_TABLERO = [
+    "habitaciones.Habitacion",
+    "habitaciones.TipoHabitacion",
+    "estancias.Estancia",
+    "tarifas.Tarifa",
+]
+
+for modelo in MODELOS_DEL_TABLERO:
+    post_save.connect(registrar_cambio_en_tablero, sender=modelo, dispatch_uid=f"tablero_post_save_{modelo}")
+    post_delete.connect(registrar_cambio_en_tablero, sender=modelo, dispatch_uid=f"tablero_post_delete_{modelo}")
@@ -0,0 +1,84 @@
+"""
+Tablero de habitaciones para recepción.
+
+Reúne en una sola consulta cada habitación con su tipo y, si está ocupada, su
+estancia activa y tarifa. Los cambios que afectan al tablero (habitaciones,
+tipos, estancias y tarifas) incrementan el sello de versión
+`tablero_habitaciones`, con el que la vista arma su ETag.
+"""
+from django.db.models import FilteredRelation, Q
+from django.utils import timezone
+
+from apps.core.versiones import incrementar_version, obtener_version
+from .models import Habitacion
+
+
+CLAVE_VERSION = "tablero_habitaciones"
+
+
+def version_tablero():
+    return obtener_version(CLAVE_VERSION)
+
+
+def registrar_cambio_en_tablero(**kwargs):
+    """Receptor de señales: el tablero cambió, en la misma transacción que el cambio."""
+    incrementar_version(CLAVE_VERSION)
+
+
+def momento_del_tablero():
+    """
+    El tablero se calcula con precisión de minuto: los minutos restantes y las
+    estancias vencidas solo cambian al cambiar el minuto, no en cada petición.
+    """
+    return timezone.now().replace(second=0, microsecond=0)
+
+
+def tablero_habitaciones(momento=None):
+    """
+    Lista de habitaciones (por número) con su estado, tipo y estancia activa.
+    La estancia activa se une con un LEFT JOIN condicionado a `activa=True`; la
+    restricción de una estancia activa por habitación garantiza una fila por
+    habitación.
+    """
+    momento = momento or momento_del_tablero()
+    filas = (
+        Habitacion.objects
+        .annotate(estancia_activa=FilteredRelation("estancias", condition=Q(estancias__activa=True)))
+        .values(
+            "id", "numero", "estado", "activa", "tipo_id", "tipo__nombre",
+            "estancia_activa__id",
+            "estancia_activa__hora_entrada",
+            "estancia_activa__hora_salida_programada",
+            "estancia_activa__tarifa_id",
+            "estancia_activa__tarifa__nombre",
+        )
+        .order_by("numero")
+    )
+
+    tablero = []
+    for fila in filas:
+        estancia = None
+        if fila["estancia_activa__id"] is not None:
+            salida = fila["estancia_activa__hora_salida_programada"]
+            segundos_restantes = (salida - momento).total_seconds()
+            estancia = {
+                "id": fila["estancia_activa__id"],
+                "hora_entrada": fila["estancia_activa__hora_entrada"],
+                "hora_salida_programada": salida,
+                "minutos_restantes": max(int(segundos_restantes // 60), 0),
+                "vencida": segundos_restantes <= 0,
+                "tarifa_id": fila["estancia_activa__tarifa_id"],
+                "tarifa": fila["estancia_activa__tarifa__nombre"],
+            }
+
+        tablero.append({
+            "id": fila["id"],
+            "numero": fila["numero"],
+            "estado": fila["estado"],
+            "activa": fila["activa"],
+            "tipo_id": fila["tipo_id"],
+            "tipo": fila["tipo__nombre"],
+            "estancia": estancia,
+            "vencida": bool(estancia and estancia["vencida"]),
+        })
+    return tablero
@@ -1,8 +1,16 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from apps.users.models import Usuario
+from apps.turnos.models import Turno
+from apps.tarifas.models import Tarifa
+from apps.estancias.models import Estancia
 from .models import TipoHabitacion, Habitacion
 
 
@@ -120,3 +128,77 @@ class HabitacionAPITests(APITestCase):
         response = self.client.post(self.list_create_url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response.data['tipo'][0], 'No se puede asignar una habitación a un tipo inactivo.')
+
+
+class TableroHabitacionesAPITests(APITestCase):
+    def setUp(self):
+        self.employee_user = Usuario.objects.create_user(username='employee', password='password123', rol=Usuario.Rol.EMPLEADO)
+        self.tipo = TipoHabitacion.objects.create(nombre="Sencilla")
+        self.tarifa = Tarifa.objects.create(nombre="3 Horas", horas=3, precio=500, tipo_habitacion=self.tipo, activa=True)
+        self.turno = Turno.objects.create(usuario=self.employee_user, tipo_turno="DIA", activo=True)
+        self.habitaciones = [Habitacion.objects.create(numero=100 + i, tipo=self.tipo) for i in range(5)]
+
+        self.url = reverse('habitaciones-tablero')
+        self.client.force_authenticate(user=self.employee_user)
+
+    def _ocupar(self, habitacion, salida):
+        return Estancia.objects.create(
+            habitacion=habitacion, tarifa=self.tarifa, turno_inicio=self.turno, hora_salida_programada=salida
+        )
+
+    def test_tablero_con_estancias_activas_y_vencidas(self):
+        self._ocupar(self.habitaciones[0], timezone.now() + timedelta(minutes=90, seconds=30))
+        self._ocupar(self.habitaciones[1], timezone.now() - timedelta(minutes=5))
+        cerrada = self._ocupar(self.habitaciones[2], timezone.now() + timedelta(hours=1))
+        Estancia.objects.filter(pk=cerrada.pk).update(activa=False)
+
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Sello de versión + tablero.
+        self.assertEqual(len(consultas), 2)
+
+        habitaciones = response.data['habitaciones']
+        self.assertEqual([h['numero'] for h in habitaciones], [100, 101, 102, 103, 104])
+        self.assertEqual(habitaciones[0]['estancia']['tarifa'], "3 Horas")
+        self.assertIn(habitaciones[0]['estancia']['minutos_restantes'], [90, 91])
+        self.assertFalse(habitaciones[0]['vencida'])
+        self.assertTrue(habitaciones[1]['vencida'])
+        self.assertEqual(habitaciones[1]['estancia']['minutos_restantes'], 0)
+        self.assertIsNone(habitaciones[2]['estancia'])
+
+    def test_etag_sin_cambios_responde_304(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        # Solo se lee el sello de versión.
+        self.assertEqual(len(consultas), 1)
+
+    def test_variante_asincrona(self):
+        self._ocupar(self.habitaciones[0], timezone.now() + timedelta(hours=1))
+        url = reverse('habitaciones-tablero-async')
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['habitaciones'], self.client.get(self.url).json()['habitaciones'])
+        self.assertEqual(response['ETag'], self.client.get(self.url)['ETag'])
+
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(consultas), 1)
+
+    def test_cambio_de_estado_invalida_el_etag(self):
+        etag = self.client.get(self.url)['ETag']
+
+        habitacion = self.habitaciones[3]
+        habitacion.estado = Habitacion.Estado.LIMPIEZA
+        habitacion.save(update_fields=['estado'])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['habitaciones'][3]['estado'], Habitacion.Estado.LIMPIEZA)
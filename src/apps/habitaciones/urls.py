@@ -7,6 +7,8 @@ from .views import (
     HabitacionListAPIView,
     HabitacionDetailAPIView,
     MarcarHabitacionDisponibleAPIView,
+    TableroHabitacionesAPIView,
+    TableroHabitacionesAsincronoAPIView,
 )
 
 urlpatterns = [
@@ -21,6 +23,14 @@ urlpatterns = [
     # Ejemplo: GET, POST /api/habitaciones/
     path('', HabitacionListAPIView.as_view(), name='habitaciones_list'),
 
+    # Tablero de recepción con el estado de todas las habitaciones
+    # Ejemplo: GET /api/habitaciones/tablero/
+    path('tablero/', TableroHabitacionesAPIView.as_view(), name='habitaciones-tablero'),
+
+    # Variante asíncrona del tablero (servidor ASGI)
+    # Ejemplo: GET /api/habitaciones/tablero/async/
+    path('tablero/async/', TableroHabitacionesAsincronoAPIView.as_view(), name='habitaciones-tablero-async'),
+
     # Ejemplo: GET, PUT /api/habitaciones/1/
     path('<int:pk>/', HabitacionDetailAPIView.as_view(), name='habitaciones_detail'),
 
@@ -2,15 +2,23 @@ from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import etag
 
 # Imports de tus modelos y servicios
 from .models import Habitacion, TipoHabitacion
 from .serializers import HabitacionSerializer, TipoHabitacionSerializer
+from .services import marcar_habitacion_disponible
+from .tablero import momento_del_tablero, tablero_habitaciones, version_tablero
+from apps.core.asincrono import VistaAsincronaMixin, en_hilo
 from apps.core.permissions import IsAdminUser, IsEmpleado, IsOnlyInvitado
+from apps.core.medicion import MedicionRenderMixin
 
 #  VISTAS PARA TIPOS DE HABITACIÓN
 
-class TipoHabitacionListAPIView(generics.ListCreateAPIView):
+class TipoHabitacionListAPIView(MedicionRenderMixin, generics.ListCreateAPIView):
     """
     Maneja las peticiones para la lista de Tipos de Habitación.
     - GET: Devuelve una lista de todos los tipos de habitación.
@@ -27,7 +35,7 @@ class TipoHabitacionListAPIView(generics.ListCreateAPIView):
         return [IsAuthenticated()]
 
 
-class TipoHabitacionDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class TipoHabitacionDetailAPIView(MedicionRenderMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Maneja peticiones para un Tipo de Habitación específico.
     - GET: Devuelve los detalles de un tipo de habitación.
@@ -44,7 +52,7 @@ class TipoHabitacionDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
         return [IsAuthenticated()]
 
 
-class MarcarHabitacionDisponibleAPIView(APIView):
+class MarcarHabitacionDisponibleAPIView(MedicionRenderMixin, APIView):
     """
     Endpoint para que un empleado o invitado marque una habitación como 'Disponible'.
     Típicamente se usa para cambiar el estado de 'En Limpieza' a 'Disponible'.
@@ -64,15 +72,10 @@ class MarcarHabitacionDisponibleAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Regla de negocio: Solo permitir el cambio si la habitación está en limpieza o mantenimiento.
-        if habitacion.estado not in [Habitacion.Estado.LIMPIEZA, Habitacion.Estado.MANTENIMIENTO]:
-            return Response(
-                {"error": f"No se puede marcar como disponible una habitación que está '{habitacion.get_estado_display()}'."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        habitacion.estado = Habitacion.Estado.DISPONIBLE
-        habitacion.save(update_fields=['estado'])
+        try:
+            marcar_habitacion_disponible(habitacion=habitacion)
+        except ValidationError as e:
+            return Response({"error": e.message}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = self.serializer_class(habitacion)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -80,7 +83,7 @@ class MarcarHabitacionDisponibleAPIView(APIView):
 
 #  VISTAS PARA HABITACIONES
 
-class HabitacionListAPIView(generics.ListCreateAPIView):
+class HabitacionListAPIView(MedicionRenderMixin, generics.ListCreateAPIView):
     """
     Maneja las peticiones para la lista de Habitaciones.
     - GET: Devuelve una lista de todas las habitaciones.
@@ -97,7 +100,7 @@ class HabitacionListAPIView(generics.ListCreateAPIView):
         return [IsAuthenticated()]
 
 
-class HabitacionDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class HabitacionDetailAPIView(MedicionRenderMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Maneja peticiones para una Habitación específica.
     - GET: Devuelve los detalles de una habitación.
@@ -111,4 +114,57 @@ class HabitacionDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
         """Define permisos específicos por acción."""
         if self.request.method in ['PUT', 'PATCH', 'DELETE']:
             return [IsAuthenticated(), IsAdminUser()]
-        return [IsAuthenticated()]
\ No newline at end of file
+        return [IsAuthenticated()]
+
+#  TABLERO DE RECEPCIÓN
+
+def _etag_tablero(request, *args, **kwargs):
+    """
+    El tablero cambia cuando cambia el sello de versión o el minuto (minutos
+    restantes y estancias vencidas). Si coincide con `If-None-Match`, se
+    responde 304 sin consultar las habitaciones.
+    """
+    return _etiqueta_tablero(version_tablero())
+
+
+def _etiqueta_tablero(version):
+    minuto = int(momento_del_tablero().timestamp()) // 60
+    return f"{version}-{minuto}"
+
+
+class TableroHabitacionesAPIView(MedicionRenderMixin, APIView):
+    """
+    Tablero de recepción: todas las habitaciones con su estado, tipo, estancia
+    activa (entrada, salida programada, minutos restantes y tarifa) y si está
+    vencida, en una sola consulta. Admite `If-None-Match` con el ETag de la
+    respuesta anterior.
+    - GET: Cualquier usuario autenticado.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @method_decorator(etag(_etag_tablero))
+    def get(self, request):
+        return Response({
+            "generado": momento_del_tablero(),
+            "habitaciones": tablero_habitaciones(),
+        })
+
+
+class TableroHabitacionesAsincronoAPIView(VistaAsincronaMixin, TableroHabitacionesAPIView):
+    """
+    Variante asíncrona de `TableroHabitacionesAPIView` para el servidor ASGI
+    (ver apps/core/asincrono.py), con el mismo ETag.
+    """
+
+    async def get(self, request):
+        etiqueta = quote_etag(_etiqueta_tablero(await en_hilo(version_tablero)()))
+        no_modificado = get_conditional_response(request, etag=etiqueta)
+        if no_modificado is not None:
+            return no_modificado
+
+        response = Response({
+            "generado": momento_del_tablero(),
+            "habitaciones": await en_hilo(tablero_habitaciones)(),
+        })
+        response["ETag"] = etiqueta
+        return response
@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from apps.core.medicion import MedicionSerializerMixin
 from rest_framework.validators import UniqueValidator
 from .models import Producto
 
 
-class ProductoSerializer(serializers.ModelSerializer):
+class ProductoSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Producto.
     Maneja la validación (precio > 0, nombre único) y la conversión
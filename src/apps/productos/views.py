@@ -3,10 +3,11 @@ from rest_framework.permissions import IsAuthenticated
 
 from .models import Producto
 from apps.core.permissions import IsAdminUser
+from apps.core.medicion import MedicionRenderMixin
 from .serializers import ProductoSerializer
 
 
-class ProductoListAPIView(generics.ListCreateAPIView):
+class ProductoListAPIView(MedicionRenderMixin, generics.ListCreateAPIView):
     """
     Maneja GET para listar todos los productos y POST para crear uno nuevo.
     - `GET`: Cualquier usuario autenticado puede listar los productos.
@@ -23,7 +24,7 @@ class ProductoListAPIView(generics.ListCreateAPIView):
         return [IsAuthenticated()]
 
 
-class ProductoDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class ProductoDetailAPIView(MedicionRenderMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Maneja GET (detalle), PUT/PATCH (actualizar) y DELETE para un producto.
     - `GET`: Cualquier usuario autenticado puede ver el detalle.
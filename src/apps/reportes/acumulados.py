@@ -0,0 +1,140 @@
+"""
+Acumulados diarios de ingresos y turnos que alimentan los reportes.
+
+Se actualizan de forma incremental a partir de los eventos del dominio
+(registro de movimientos, inicio y cierre de turnos) y pueden reconstruirse
+por completo desde el libro de caja con `reconstruir_acumulados_diarios`.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Sum, Value, DecimalField
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .fechas import filtro_por_fechas
+from .models import AcumuladoDiarioMovimiento, AcumuladoDiarioTurno
+
+
+def fecha_de_turno(turno):
+    """Día (hora local) al que se asignan el turno y sus movimientos."""
+    return timezone.localdate(turno.fecha_inicio)
+
+
+def _sumar(modelo, claves, incrementos):
+    """
+    Suma los incrementos a la fila identificada por `claves`, creándola si no existe.
+    En el caso común (la fila ya existe) es una sola sentencia UPDATE.
+    """
+    expresiones = {campo: F(campo) + valor for campo, valor in incrementos.items()}
+    if modelo.objects.filter(**claves).update(**expresiones):
+        return
+
+    try:
+        with transaction.atomic():
+            modelo.objects.create(**claves, **incrementos)
+    except IntegrityError:
+        # Otra transacción creó la fila entre la actualización y la inserción.
+        modelo.objects.filter(**claves).update(**expresiones)
+
+
+def acumular_inicio_turno(turno):
+    """Cuenta un turno recién iniciado; mientras no tenga movimientos, cuenta como 'sin ingresos'."""
+    _sumar(
+        AcumuladoDiarioTurno,
+        {"fecha": fecha_de_turno(turno), "usuario_id": turno.usuario_id},
+        {"turnos": 1, "turnos_sin_ingresos": 1},
+    )
+
+
+def acumular_movimientos(*, turno, tipo, metodo_pago, monto, cantidad, primer_movimiento):
+    """Suma movimientos de caja al acumulado del día del turno."""
+    fecha = fecha_de_turno(turno)
+    _sumar(
+        AcumuladoDiarioMovimiento,
+        {"fecha": fecha, "usuario_id": turno.usuario_id, "tipo": tipo, "metodo_pago": metodo_pago},
+        {"total": monto, "cantidad": cantidad},
+    )
+    if primer_movimiento:
+        _sumar(
+            AcumuladoDiarioTurno,
+            {"fecha": fecha, "usuario_id": turno.usuario_id},
+            {"turnos_sin_ingresos": -1},
+        )
+
+
+def acumular_cierre_turno(turno):
+    """Suma el sueldo y la diferencia de caja reportados al cerrar el turno."""
+    _sumar(
+        AcumuladoDiarioTurno,
+        {"fecha": fecha_de_turno(turno), "usuario_id": turno.usuario_id},
+        {"total_sueldos": turno.sueldo, "total_diferencias": turno.diferencia or 0},
+    )
+
+
+@transaction.atomic
+def reconstruir_acumulados_diarios(*, fecha_desde=None, fecha_hasta=None):
+    """
+    Borra y recalcula los acumulados diarios del rango indicado (o de todo el
+    historial) a partir de los turnos y del libro de caja.
+    Devuelve la cantidad de filas generadas para cada acumulado.
+    """
+    from apps.turnos.models import Turno
+    from apps.caja.models import MovimientoCaja
+
+    rango = Q()
+    if fecha_desde:
+        rango &= Q(fecha__gte=fecha_desde)
+    if fecha_hasta:
+        rango &= Q(fecha__lte=fecha_hasta)
+
+    AcumuladoDiarioMovimiento.objects.filter(rango).delete()
+    AcumuladoDiarioTurno.objects.filter(rango).delete()
+
+    movimientos = (
+        MovimientoCaja.objects
+        .filter(filtro_por_fechas("turno__fecha_inicio", fecha_desde, fecha_hasta))
+        .annotate(dia=TruncDate("turno__fecha_inicio"))
+        .values("dia", "turno__usuario_id", "tipo", "metodo_pago")
+        .annotate(total=Sum("monto"), cantidad=Count("id"))
+        .order_by()
+    )
+    filas_movimientos = AcumuladoDiarioMovimiento.objects.bulk_create(
+        AcumuladoDiarioMovimiento(
+            fecha=fila["dia"],
+            usuario_id=fila["turno__usuario_id"],
+            tipo=fila["tipo"],
+            metodo_pago=fila["metodo_pago"],
+            total=fila["total"],
+            cantidad=fila["cantidad"],
+        )
+        for fila in movimientos
+    )
+
+    turnos = (
+        Turno.objects
+        .filter(filtro_por_fechas("fecha_inicio", fecha_desde, fecha_hasta))
+        .annotate(
+            dia=TruncDate("fecha_inicio"),
+            con_movimientos=Exists(MovimientoCaja.objects.filter(turno=OuterRef("pk"))),
+        )
+        .values("dia", "usuario_id")
+        .annotate(
+            total_turnos=Count("id"),
+            sin_ingresos=Count("id", filter=Q(con_movimientos=False)),
+            sueldos=Coalesce(Sum("sueldo", filter=Q(activo=False)), Value(0), output_field=DecimalField()),
+            diferencias=Coalesce(Sum("diferencia"), Value(0), output_field=DecimalField()),
+        )
+        .order_by()
+    )
+    filas_turnos = AcumuladoDiarioTurno.objects.bulk_create(
+        AcumuladoDiarioTurno(
+            fecha=fila["dia"],
+            usuario_id=fila["usuario_id"],
+            turnos=fila["total_turnos"],
+            turnos_sin_ingresos=fila["sin_ingresos"],
+            total_sueldos=fila["sueldos"],
+            total_diferencias=fila["diferencias"],
+        )
+        for fila in turnos
+    )
+
+    return len(filas_movimientos), len(filas_turnos)
@@ -1,3 +1,23 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ExportacionReporte
+
+
+@admin.register(ExportacionReporte)
+class ExportacionReporteAdmin(admin.ModelAdmin):
+    """
+    Permite revisar la cola de exportaciones y sus errores. Las solicitudes se
+    crean desde la API y las procesa el comando `procesar_exportaciones`.
+    """
+    list_display = ('id', 'usuario', 'formato', 'estado', 'intentos', 'fecha_creacion', 'fecha_fin')
+    list_filter = ('estado', 'formato')
+    search_fields = ('usuario__username', 'id')
+    ordering = ('-fecha_creacion',)
+    list_select_related = ('usuario',)
+    readonly_fields = (
+        'usuario', 'formato', 'fecha_desde', 'fecha_hasta', 'estado', 'archivo',
+        'error', 'intentos', 'fecha_creacion', 'fecha_inicio', 'fecha_fin'
+    )
+
+    def has_add_permission(self, request):
+        return False
@@ -5,5 +5,6 @@ class ReportesConfig(AppConfig):
     name = 'apps.reportes'
     label = 'reportes'
 
-
-
+    def ready(self):
+        # Conecta los receptores que mantienen los acumulados diarios.
+        from . import signals  # noqa: F401
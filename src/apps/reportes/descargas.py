@@ -0,0 +1,35 @@
+import os
+import tempfile
+from wsgiref.util import FileWrapper
+
+from django.http import StreamingHttpResponse
+
+
+# Tamaño de los bloques en los que se envía el archivo al cliente.
+TAMANO_BLOQUE_RESPUESTA = 64 * 1024
+
+
+def respuesta_en_streaming(escribir, *, nombre_archivo, content_type, **parametros):
+    """
+    Genera un archivo con `escribir(destino, **parametros)` en un temporal en
+    disco y lo envía como respuesta en streaming, por bloques. El uso de memoria
+    del worker no depende del tamaño del archivo.
+    """
+    archivo = tempfile.TemporaryFile()
+    try:
+        escribir(archivo, **parametros)
+    except Exception:
+        archivo.close()
+        raise
+
+    tamano = os.fstat(archivo.fileno()).st_size
+    archivo.seek(0)
+
+    # `FileWrapper` cierra (y por lo tanto elimina) el temporal al terminar la respuesta.
+    response = StreamingHttpResponse(
+        FileWrapper(archivo, TAMANO_BLOQUE_RESPUESTA),
+        content_type=content_type
+    )
+    response["Content-Disposition"] = f"attachment; filename={nombre_archivo}"
+    response["Content-Length"] = tamano
+    return response
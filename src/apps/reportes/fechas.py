@@ -0,0 +1,43 @@
+"""
+Conversión de fechas locales a rangos de fecha y hora para filtrar reportes.
+
+Filtrar con `campo__date=...` obliga a la base de datos a convertir cada fila
+a la zona horaria local antes de comparar, lo que impide usar índices. En su
+lugar, los días locales (America/Mexico_City) se convierten a un rango
+semiabierto `[inicio, fin)` de instantes con zona horaria, que se compara
+directamente contra la columna indexada.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+
+def inicio_del_dia(fecha):
+    """Instante (con zona horaria) en que comienza `fecha` en la hora local."""
+    return timezone.make_aware(datetime.combine(fecha, time.min))
+
+
+def rango_de_fechas(fecha_desde=None, fecha_hasta=None):
+    """
+    Convierte un rango de días locales, ambos inclusive, en `(inicio, fin)`:
+    `inicio` es el comienzo de `fecha_desde` y `fin` el comienzo del día
+    siguiente a `fecha_hasta`. Un extremo es None si no se indicó su fecha.
+    """
+    inicio = inicio_del_dia(fecha_desde) if fecha_desde else None
+    fin = inicio_del_dia(fecha_hasta + timedelta(days=1)) if fecha_hasta else None
+    return inicio, fin
+
+
+def filtro_por_fechas(campo, fecha_desde=None, fecha_hasta=None):
+    """
+    Devuelve un `Q` que filtra `campo` (fecha y hora) por los días locales
+    indicados, ambos inclusive: `campo >= inicio AND campo < fin`.
+    """
+    inicio, fin = rango_de_fechas(fecha_desde, fecha_hasta)
+    filtro = Q()
+    if inicio is not None:
+        filtro &= Q(**{f"{campo}__gte": inicio})
+    if fin is not None:
+        filtro &= Q(**{f"{campo}__lt": fin})
+    return filtro
@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.reportes.services_exportaciones import (
+    liberar_exportaciones_abandonadas,
+    procesar_pendientes,
+)
+
+
+class Command(BaseCommand):
+    """
+    Worker local de la cola de exportaciones. Consulta periódicamente las
+    exportaciones pendientes en la base de datos y genera sus archivos en
+    `MEDIA_ROOT`. Pueden ejecutarse varios workers en paralelo.
+
+    En producción se ejecuta con `DB_ROL=reportes`, para que sus consultas
+    tengan el límite de tiempo de los reportes y no el de la API (ver
+    config/base_de_datos.py).
+
+    Uso:
+        python manage.py procesar_exportaciones
+        python manage.py procesar_exportaciones --una-vez
+        DB_ROL=reportes python manage.py procesar_exportaciones
+    """
+    help = "Genera en segundo plano los archivos de las exportaciones de reportes pendientes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--una-vez",
+            action="store_true",
+            help="Procesa las exportaciones pendientes y termina, en lugar de quedarse esperando.",
+        )
+        parser.add_argument(
+            "--intervalo",
+            type=float,
+            default=2.0,
+            help="Segundos de espera entre consultas cuando la cola está vacía (por defecto 2).",
+        )
+        parser.add_argument(
+            "--abandonada-despues",
+            type=int,
+            default=30,
+            help="Minutos tras los cuales una exportación en proceso se considera abandonada (por defecto 30).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            # El worker es de larga duración: se descartan las conexiones caídas o vencidas.
+            close_old_connections()
+
+            reencoladas = liberar_exportaciones_abandonadas(minutos=options["abandonada_despues"])
+            if reencoladas:
+                self.stdout.write(f"{reencoladas} exportaciones abandonadas devueltas a la cola.")
+
+            procesadas = procesar_pendientes()
+            if procesadas:
+                self.stdout.write(self.style.SUCCESS(f"{procesadas} exportaciones procesadas."))
+
+            if options["una_vez"]:
+                break
+            if not procesadas:
+                time.sleep(options["intervalo"])
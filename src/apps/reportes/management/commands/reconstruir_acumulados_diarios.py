@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from apps.reportes.acumulados import reconstruir_acumulados_diarios
+
+
+class Command(BaseCommand):
+    """
+    Reconstruye los acumulados diarios de los reportes desde los turnos y el
+    libro de caja. Útil después de una migración de datos o para corregir
+    inconsistencias.
+
+    Uso:
+        python manage.py reconstruir_acumulados_diarios
+        python manage.py reconstruir_acumulados_diarios --desde 2026-01-01 --hasta 2026-01-31
+    """
+    help = "Reconstruye los acumulados diarios de ingresos y turnos desde el libro de caja."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--desde", help="Primer día a reconstruir (AAAA-MM-DD).")
+        parser.add_argument("--hasta", help="Último día a reconstruir (AAAA-MM-DD).")
+
+    def handle(self, *args, **options):
+        fechas = {}
+        for opcion in ("desde", "hasta"):
+            valor = options[opcion]
+            if valor and parse_date(valor) is None:
+                raise CommandError(f"Fecha inválida para --{opcion}: {valor}")
+            fechas[opcion] = parse_date(valor) if valor else None
+
+        movimientos, turnos = reconstruir_acumulados_diarios(
+            fecha_desde=fechas["desde"],
+            fecha_hasta=fechas["hasta"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Acumulados reconstruidos: {movimientos} de movimientos, {turnos} de turnos."
+        ))
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, Exists, OuterRef, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def calcular_acumulados_diarios(apps, schema_editor):
+    """Genera los acumulados diarios a partir de los turnos y movimientos existentes."""
+    Turno = apps.get_model("turnos", "Turno")
+    MovimientoCaja = apps.get_model("caja", "MovimientoCaja")
+    AcumuladoDiarioMovimiento = apps.get_model("reportes", "AcumuladoDiarioMovimiento")
+    AcumuladoDiarioTurno = apps.get_model("reportes", "AcumuladoDiarioTurno")
+
+    movimientos = (
+        MovimientoCaja.objects
+        .annotate(dia=TruncDate("turno__fecha_inicio"))
+        .values("dia", "turno__usuario_id", "tipo", "metodo_pago")
+        .annotate(total=Sum("monto"), cantidad=Count("id"))
+        .order_by()
+    )
+    AcumuladoDiarioMovimiento.objects.bulk_create(
+        AcumuladoDiarioMovimiento(
+            fecha=fila["dia"],
+            usuario_id=fila["turno__usuario_id"],
+            tipo=fila["tipo"],
+            metodo_pago=fila["metodo_pago"],
+            total=fila["total"],
+            cantidad=fila["cantidad"],
+        )
+        for fila in movimientos
+    )
+
+    turnos = (
+        Turno.objects
+        .annotate(
+            dia=TruncDate("fecha_inicio"),
+            con_movimientos=Exists(MovimientoCaja.objects.filter(turno=OuterRef("pk"))),
+        )
+        .values("dia", "usuario_id")
+        .annotate(
+            total_turnos=Count("id"),
+            sin_ingresos=Count("id", filter=Q(con_movimientos=False)),
+            sueldos=Coalesce(Sum("sueldo", filter=Q(activo=False)), Value(0), output_field=DecimalField()),
+            diferencias=Coalesce(Sum("diferencia"), Value(0), output_field=DecimalField()),
+        )
+        .order_by()
+    )
+    AcumuladoDiarioTurno.objects.bulk_create(
+        AcumuladoDiarioTurno(
+            fecha=fila["dia"],
+            usuario_id=fila["usuario_id"],
+            turnos=fila["total_turnos"],
+            turnos_sin_ingresos=fila["sin_ingresos"],
+            total_sueldos=fila["sueldos"],
+            total_diferencias=fila["diferencias"],
+        )
+        for fila in turnos
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('turnos', '0003_turno_acumulados'),
+        ('caja', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AcumuladoDiarioMovimiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(help_text='Día (hora local) en que inició el turno de los movimientos.')),
+                ('tipo', models.CharField(help_text='Tipo de movimiento (ESTANCIA, EXTRA, PRODUCTO).', max_length=20)),
+                ('metodo_pago', models.CharField(help_text='Método de pago de los movimientos.', max_length=20)),
+                ('total', models.DecimalField(decimal_places=2, default=0, help_text='Suma de los montos de los movimientos.', max_digits=14)),
+                ('cantidad', models.PositiveIntegerField(default=0, help_text='Número de movimientos acumulados.')),
+                ('usuario', models.ForeignKey(help_text='Empleado responsable de los turnos.', on_delete=django.db.models.deletion.PROTECT, related_name='acumulados_movimientos', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'usuario', 'tipo', 'metodo_pago'), name='unique_acumulado_movimiento_por_dia')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AcumuladoDiarioTurno',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(help_text='Día (hora local) en que iniciaron los turnos.')),
+                ('turnos', models.PositiveIntegerField(default=0, help_text='Turnos iniciados en el día.')),
+                ('turnos_sin_ingresos', models.IntegerField(default=0, help_text='Turnos iniciados en el día que aún no registran movimientos.')),
+                ('total_sueldos', models.DecimalField(decimal_places=2, default=0, help_text='Suma de los sueldos reportados al cerrar los turnos.', max_digits=14)),
+                ('total_diferencias', models.DecimalField(decimal_places=2, default=0, help_text='Suma de las diferencias de caja de los turnos cerrados.', max_digits=14)),
+                ('usuario', models.ForeignKey(help_text='Empleado responsable de los turnos.', on_delete=django.db.models.deletion.PROTECT, related_name='acumulados_turnos', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'usuario'), name='unique_acumulado_turno_por_dia')],
+            },
+        ),
+        migrations.RunPython(calcular_acumulados_diarios, migrations.RunPython.noop),
+    ]
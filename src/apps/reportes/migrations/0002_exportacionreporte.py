@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportacionReporte',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('formato', models.CharField(choices=[('EXCEL', 'Excel'), ('PDF', 'PDF')], help_text='Formato del archivo a generar.', max_length=10)),
+                ('fecha_desde', models.DateField(blank=True, help_text='Fecha inicial (inclusive) de los turnos a exportar.', null=True)),
+                ('fecha_hasta', models.DateField(blank=True, help_text='Fecha final (inclusive) de los turnos a exportar.', null=True)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('PROCESANDO', 'Procesando'), ('COMPLETADA', 'Completada'), ('FALLIDA', 'Fallida')], default='PENDIENTE', help_text='Estado de la exportación dentro de la cola.', max_length=20)),
+                ('archivo', models.FileField(blank=True, help_text='Archivo generado. Vacío hasta que la exportación se completa.', upload_to='exportaciones/%Y/%m/')),
+                ('error', models.TextField(blank=True, help_text='Detalle del error si la exportación falló.')),
+                ('intentos', models.PositiveIntegerField(default=0, help_text='Veces que un worker tomó la exportación.')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, help_text='Fecha y hora en que se solicitó la exportación.')),
+                ('fecha_inicio', models.DateTimeField(blank=True, help_text='Fecha y hora en que un worker comenzó a generarla.', null=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, help_text='Fecha y hora en que terminó (con éxito o con error).', null=True)),
+                ('usuario', models.ForeignKey(help_text='Usuario que solicitó la exportación. Define el alcance del reporte.', on_delete=django.db.models.deletion.CASCADE, related_name='exportaciones', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['estado', 'fecha_creacion'], name='exportacion_estado_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,209 @@
 from django.db import models
+from django.conf import settings
 
-# Create your models here.
+Usuario = settings.AUTH_USER_MODEL
+
+
+class AcumuladoDiarioMovimiento(models.Model):
+    """
+    Total diario de los movimientos de caja, agrupado por empleado, tipo de
+    movimiento y método de pago. La fecha corresponde al día (hora local) en
+    que inició el turno al que pertenecen los movimientos, igual que en el
+    resumen diario. Se actualiza de forma incremental con cada movimiento.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["fecha", "usuario", "tipo", "metodo_pago"],
+                name="unique_acumulado_movimiento_por_dia"
+            )
+        ]
+
+    fecha = models.DateField(
+        help_text="Día (hora local) en que inició el turno de los movimientos."
+    )
+
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.PROTECT,
+        related_name="acumulados_movimientos",
+        help_text="Empleado responsable de los turnos."
+    )
+
+    tipo = models.CharField(
+        max_length=20,
+        help_text="Tipo de movimiento (ESTANCIA, EXTRA, PRODUCTO)."
+    )
+
+    metodo_pago = models.CharField(
+        max_length=20,
+        help_text="Método de pago de los movimientos."
+    )
+
+    total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Suma de los montos de los movimientos."
+    )
+
+    cantidad = models.PositiveIntegerField(
+        default=0,
+        help_text="Número de movimientos acumulados."
+    )
+
+    def __str__(self):
+        return f"{self.fecha} - {self.usuario_id} - {self.tipo}/{self.metodo_pago}: ${self.total}"
+
+
+class AcumuladoDiarioTurno(models.Model):
+    """
+    Totales diarios de los turnos de cada empleado: cuántos se iniciaron,
+    cuántos no tuvieron ingresos y la suma de sueldos y diferencias de caja
+    registradas al cerrarlos.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["fecha", "usuario"],
+                name="unique_acumulado_turno_por_dia"
+            )
+        ]
+
+    fecha = models.DateField(
+        help_text="Día (hora local) en que iniciaron los turnos."
+    )
+
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.PROTECT,
+        related_name="acumulados_turnos",
+        help_text="Empleado responsable de los turnos."
+    )
+
+    turnos = models.PositiveIntegerField(
+        default=0,
+        help_text="Turnos iniciados en el día."
+    )
+
+    turnos_sin_ingresos = models.IntegerField(
+        default=0,
+        help_text="Turnos iniciados en el día que aún no registran movimientos."
+    )
+
+    total_sueldos = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Suma de los sueldos reportados al cerrar los turnos."
+    )
+
+    total_diferencias = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Suma de las diferencias de caja de los turnos cerrados."
+    )
+
+    def __str__(self):
+        return f"{self.fecha} - {self.usuario_id}: {self.turnos} turnos"
+
+
+class ExportacionReporte(models.Model):
+    """
+    Solicitud de exportación del reporte de turnos que se genera en segundo
+    plano. Funciona como una cola en la base de datos: el comando
+    `procesar_exportaciones` toma las solicitudes pendientes, genera el archivo
+    en `MEDIA_ROOT` y registra el resultado.
+    """
+
+    class Meta:
+        ordering = ["-fecha_creacion"]
+        indexes = [
+            models.Index(fields=["estado", "fecha_creacion"], name="exportacion_estado_idx"),
+        ]
+
+    class Formato(models.TextChoices):
+        EXCEL = "EXCEL", "Excel"
+        PDF = "PDF", "PDF"
+
+    class Estado(models.TextChoices):
+        PENDIENTE = "PENDIENTE", "Pendiente"
+        PROCESANDO = "PROCESANDO", "Procesando"
+        COMPLETADA = "COMPLETADA", "Completada"
+        FALLIDA = "FALLIDA", "Fallida"
+
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.CASCADE,
+        related_name="exportaciones",
+        help_text="Usuario que solicitó la exportación. Define el alcance del reporte."
+    )
+
+    formato = models.CharField(
+        max_length=10,
+        choices=Formato.choices,
+        help_text="Formato del archivo a generar."
+    )
+
+    fecha_desde = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Fecha inicial (inclusive) de los turnos a exportar."
+    )
+
+    fecha_hasta = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Fecha final (inclusive) de los turnos a exportar."
+    )
+
+    estado = models.CharField(
+        max_length=20,
+        choices=Estado.choices,
+        default=Estado.PENDIENTE,
+        help_text="Estado de la exportación dentro de la cola."
+    )
+
+    archivo = models.FileField(
+        upload_to="exportaciones/%Y/%m/",
+        blank=True,
+        help_text="Archivo generado. Vacío hasta que la exportación se completa."
+    )
+
+    error = models.TextField(
+        blank=True,
+        help_text="Detalle del error si la exportación falló."
+    )
+
+    intentos = models.PositiveIntegerField(
+        default=0,
+        help_text="Veces que un worker tomó la exportación."
+    )
+
+    fecha_creacion = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Fecha y hora en que se solicitó la exportación."
+    )
+
+    fecha_inicio = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Fecha y hora en que un worker comenzó a generarla."
+    )
+
+    fecha_fin = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Fecha y hora en que terminó (con éxito o con error)."
+    )
+
+    @property
+    def nombre_descarga(self):
+        extension = "xlsx" if self.formato == self.Formato.EXCEL else "pdf"
+        return f"reporte_turnos_{self.pk}.{extension}"
+
+    def __str__(self):
+        return f"Exportación {self.pk} ({self.formato}) - {self.estado}"
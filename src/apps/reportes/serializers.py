@@ -1,7 +1,11 @@
+from django.urls import reverse
 from rest_framework import serializers
+from apps.core.medicion import MedicionSerializerMixin
 
+from .models import ExportacionReporte
 
-class ReporteTurnoSerializer(serializers.Serializer):
+
+class ReporteTurnoSerializer(MedicionSerializerMixin, serializers.Serializer):
     """
     Serializador de solo lectura para el reporte detallado por turno.
     Define la estructura de salida de los datos agregados por el servicio.
@@ -29,7 +33,7 @@ class ReporteTurnoSerializer(serializers.Serializer):
     sin_ingresos = serializers.BooleanField()
 
 
-class ReporteEmpleadoSerializer(serializers.Serializer):
+class ReporteEmpleadoSerializer(MedicionSerializerMixin, serializers.Serializer):
     """
     Serializador de solo lectura para el reporte agregado por empleado.
     Muestra los totales acumulados para cada empleado.
@@ -48,7 +52,7 @@ class ReporteEmpleadoSerializer(serializers.Serializer):
     total_diferencias = serializers.DecimalField(max_digits=12, decimal_places=2)
 
 
-class ReporteDetalleTurnoEmpleadoSerializer(serializers.Serializer):
+class ReporteDetalleTurnoEmpleadoSerializer(MedicionSerializerMixin, serializers.Serializer):
     """
     Serializador para el detalle de un turno específico, usado en el reporte por empleado.
     Muestra los datos del turno y sus totales financieros calculados de forma eficiente.
@@ -74,3 +78,37 @@ class ReporteDetalleTurnoEmpleadoSerializer(serializers.Serializer):
     )
     sin_ingresos = serializers.BooleanField()
     activo = serializers.BooleanField()
+
+
+class SolicitudExportacionSerializer(MedicionSerializerMixin, serializers.Serializer):
+    """
+    Serializador de escritura para solicitar una exportación en segundo plano.
+    El alcance del reporte lo define el usuario autenticado, igual que en la
+    exportación directa.
+    """
+    formato = serializers.ChoiceField(choices=ExportacionReporte.Formato.choices)
+    fecha_desde = serializers.DateField(required=False, allow_null=True)
+    fecha_hasta = serializers.DateField(required=False, allow_null=True)
+
+
+class ExportacionReporteSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
+    """
+    Serializador de solo lectura con el estado de una exportación.
+    `url_descarga` solo se incluye cuando el archivo ya está disponible.
+    """
+    url_descarga = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportacionReporte
+        fields = [
+            "id", "formato", "fecha_desde", "fecha_hasta", "estado", "error",
+            "fecha_creacion", "fecha_inicio", "fecha_fin", "url_descarga",
+        ]
+        read_only_fields = fields
+
+    def get_url_descarga(self, obj):
+        if obj.estado != ExportacionReporte.Estado.COMPLETADA:
+            return None
+        url = reverse("exportacion-reporte-descarga", args=[obj.pk])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
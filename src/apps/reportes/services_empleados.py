@@ -1,7 +1,6 @@
-from django.db.models import Sum, Q, Count, Value, DecimalField, Case, When, BooleanField
+from django.db.models import Sum, Q, F, Count, Value, DecimalField, Case, When, BooleanField
 from django.db.models.functions import Coalesce
 from apps.turnos.models import Turno
-from apps.caja.models import MovimientoCaja
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -10,17 +9,27 @@ User = get_user_model()
 def _get_empleado_report_queryset():
     """
     Queryset base y reutilizable para los reportes de empleados.
-    Calcula todos los totales por empleado usando la potencia de la base de datos.
+
+    La agregación se hace por niveles: los totales de cada turno ya están
+    materializados en sus acumulados (movimiento -> turno), así que aquí solo se
+    suman los turnos de cada empleado (turno -> empleado). Al no unir los
+    movimientos de caja, cada turno aparece una sola vez y su sueldo y diferencia
+    no se multiplican por la cantidad de movimientos.
     """
+    def suma(campo, **filtro):
+        return Coalesce(Sum(campo, **filtro), Value(0), output_field=DecimalField())
+
     return User.objects.filter(rol=User.Rol.EMPLEADO).annotate(
-        turnos_count=Count('turnos', distinct=True),
-        total_efectivo=Coalesce(Sum('turnos__movimientos__monto', filter=Q(turnos__movimientos__metodo_pago='EFECTIVO')), Value(0), output_field=DecimalField()),
-        total_transferencia=Coalesce(Sum('turnos__movimientos__monto', filter=Q(turnos__movimientos__metodo_pago='TRANSFERENCIA')), Value(0), output_field=DecimalField()),
-        total_tarjeta=Coalesce(Sum('turnos__movimientos__monto', filter=Q(turnos__movimientos__metodo_pago='TARJETA')), Value(0), output_field=DecimalField()),
-        total_ingresos=Coalesce(Sum('turnos__movimientos__monto'), Value(0), output_field=DecimalField()),
-        total_sueldos=Coalesce(Sum('turnos__sueldo'), Value(0), output_field=DecimalField()),
-        total_diferencias=Coalesce(Sum('turnos__diferencia'), Value(0), output_field=DecimalField()),
-        turnos_sin_ingresos=Count('turnos', filter=Q(turnos__movimientos__isnull=True))
+        turnos_count=Count('turnos'),
+        total_efectivo=suma('turnos__total_efectivo'),
+        total_transferencia=suma('turnos__total_transferencia'),
+        total_tarjeta=suma('turnos__total_tarjeta'),
+        total_ingresos=suma(
+            F('turnos__total_efectivo') + F('turnos__total_transferencia') + F('turnos__total_tarjeta')
+        ),
+        total_sueldos=suma('turnos__sueldo'),
+        total_diferencias=suma('turnos__diferencia'),
+        turnos_sin_ingresos=Count('turnos', filter=Q(turnos__cantidad_movimientos=0)),
     )
 
 
@@ -40,12 +49,9 @@ def reporte_detalle_empleado(*, empleado_id):
         Turno.objects
         .filter(usuario_id=empleado_id)
         .annotate(
-            total_efectivo=Coalesce(Sum('movimientos__monto', filter=Q(movimientos__metodo_pago='EFECTIVO')), Value(0), output_field=DecimalField()),
-            total_transferencia=Coalesce(Sum('movimientos__monto', filter=Q(movimientos__metodo_pago='TRANSFERENCIA')), Value(0), output_field=DecimalField()),
-            total_tarjeta=Coalesce(Sum('movimientos__monto', filter=Q(movimientos__metodo_pago='TARJETA')), Value(0), output_field=DecimalField()),
-            total_ingresos=Coalesce(Sum('movimientos__monto'), Value(0), output_field=DecimalField()),
+            # Los totales por método de pago son campos acumulados del propio turno.
             sin_ingresos=Case(
-                When(movimientos__isnull=True, then=Value(True)),
+                When(cantidad_movimientos=0, then=Value(True)),
                 default=Value(False),
                 output_field=BooleanField()
             )
@@ -1,52 +1,41 @@
 from openpyxl import Workbook
-from django.http import HttpResponse
 
+from .descargas import respuesta_en_streaming
 from .services import reporte_turnos
 from .serializers import ReporteTurnoSerializer
 
 
-def exportar_turnos_excel(*, usuario, fecha_desde=None, fecha_hasta=None):
-    """
-    Genera un archivo Excel con el reporte de turnos.
-    Reutiliza el servicio y el serializador para mantener la consistencia de los datos.
-    """
-    # 1. Obtener el queryset del servicio.
-    turnos_qs = reporte_turnos(
-        usuario=usuario,
-        fecha_desde=fecha_desde,
-        fecha_hasta=fecha_hasta,
-    )
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Reporte de Turnos"
+# Turnos leídos de la base de datos por cada consulta del iterador.
+TAMANO_LOTE_TURNOS = 2000
 
-    # 2. Serializar los datos para asegurar una estructura consistente.
-    data = ReporteTurnoSerializer(turnos_qs, many=True).data
+ENCABEZADOS = [
+    "ID Turno",
+    "Empleado",
+    "Tipo",
+    "Fecha Inicio",
+    "Fecha Fin",
+    "Caja Inicial",
+    "Total Efectivo",
+    "Total Transferencia",
+    "Total Tarjeta",
+    "Total Ingresos",
+    "Sueldo",
+    "Efectivo Esperado",
+    "Efectivo Reportado",
+    "Diferencia",
+    "Sin Ingresos",
+]
 
-    headers = [
-        "ID Turno",
-        "Empleado",
-        "Tipo",
-        "Fecha Inicio",
-        "Fecha Fin",
-        "Caja Inicial",
-        "Total Efectivo",
-        "Total Transferencia",
-        "Total Tarjeta",
-        "Total Ingresos",
-        "Sueldo",
-        "Efectivo Esperado",
-        "Efectivo Reportado",
-        "Diferencia",
-        "Sin Ingresos",
-    ]
 
-    ws.append(headers)
-
-    # 3. Escribir los datos serializados en el archivo Excel.
-    for item in data:
-        ws.append([
+def _filas_turnos(turnos_qs, tamano_lote):
+    """
+    Recorre el queryset por lotes y serializa un turno a la vez, de modo que
+    nunca se materializa el reporte completo en memoria.
+    """
+    serializer = ReporteTurnoSerializer()
+    for turno in turnos_qs.iterator(chunk_size=tamano_lote):
+        item = serializer.to_representation(turno)
+        yield [
             item["turno_id"],
             item["empleado"],
             item["tipo_turno"],
@@ -62,12 +51,44 @@ def exportar_turnos_excel(*, usuario, fecha_desde=None, fecha_hasta=None):
             item["efectivo_reportado"],
             item["diferencia"],
             item["sin_ingresos"],
-        ])
+        ]
+
 
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+def escribir_turnos_excel(destino, *, usuario, fecha_desde=None, fecha_hasta=None, tamano_lote=TAMANO_LOTE_TURNOS):
+    """
+    Escribe el reporte de turnos en formato Excel sobre `destino` (ruta o archivo).
+    Usa el modo de solo escritura de openpyxl, que vuelca cada fila a disco en
+    lugar de conservar las celdas en memoria.
+    """
+    # 1. Obtener el queryset del servicio.
+    turnos_qs = reporte_turnos(
+        usuario=usuario,
+        fecha_desde=fecha_desde,
+        fecha_hasta=fecha_hasta,
     )
-    response["Content-Disposition"] = "attachment; filename=reporte_turnos.xlsx"
 
-    wb.save(response)
-    return response
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Reporte de Turnos")
+    ws.append(ENCABEZADOS)
+
+    # 2. Escribir las filas a medida que se leen de la base de datos.
+    for fila in _filas_turnos(turnos_qs, tamano_lote):
+        ws.append(fila)
+
+    wb.save(destino)
+
+
+def exportar_turnos_excel(*, usuario, fecha_desde=None, fecha_hasta=None):
+    """
+    Genera un archivo Excel con el reporte de turnos y lo envía como respuesta
+    en streaming. El archivo se construye en un temporal en disco, así que el
+    uso de memoria del worker no depende del número de turnos.
+    """
+    return respuesta_en_streaming(
+        escribir_turnos_excel,
+        nombre_archivo="reporte_turnos.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        usuario=usuario,
+        fecha_desde=fecha_desde,
+        fecha_hasta=fecha_hasta,
+    )
@@ -0,0 +1,155 @@
+"""
+Cola de exportaciones del reporte de turnos.
+
+Las vistas solo registran la solicitud; el archivo lo genera un proceso aparte
+(`python manage.py procesar_exportaciones`) que toma las solicitudes pendientes
+de la base de datos, sin necesidad de un broker externo. Así, los reportes
+grandes no ocupan a los workers de la API ni chocan con los timeouts del proxy.
+"""
+import logging
+import tempfile
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.replicas import leer_de_replica
+
+from .models import ExportacionReporte
+from .services_excel import escribir_turnos_excel
+from .services_pdf import escribir_turnos_pdf
+
+logger = logging.getLogger(__name__)
+
+# Veces que se reintenta una exportación abandonada por un worker antes de darla por fallida.
+MAXIMO_INTENTOS = 3
+
+GENERADORES = {
+    ExportacionReporte.Formato.EXCEL: escribir_turnos_excel,
+    ExportacionReporte.Formato.PDF: escribir_turnos_pdf,
+}
+
+
+def solicitar_exportacion(*, usuario, formato, fecha_desde=None, fecha_hasta=None):
+    """Registra una exportación pendiente. El alcance del reporte es el del usuario que la solicita."""
+    if formato not in ExportacionReporte.Formato.values:
+        raise ValidationError("Formato de exportación no válido.")
+
+    if fecha_desde and fecha_hasta and fecha_desde > fecha_hasta:
+        raise ValidationError("La fecha inicial no puede ser posterior a la fecha final.")
+
+    return ExportacionReporte.objects.create(
+        usuario=usuario,
+        formato=formato,
+        fecha_desde=fecha_desde,
+        fecha_hasta=fecha_hasta,
+    )
+
+
+def tomar_siguiente_exportacion():
+    """
+    Toma la exportación pendiente más antigua y la marca como 'procesando'.
+
+    El cambio de estado es una actualización condicional, de modo que varios
+    workers pueden consultar la cola a la vez sin tomar la misma solicitud.
+    Devuelve None si no hay exportaciones pendientes.
+    """
+    pendientes = ExportacionReporte.objects.filter(estado=ExportacionReporte.Estado.PENDIENTE)
+
+    while True:
+        exportacion_id = (
+            pendientes.order_by("fecha_creacion", "id").values_list("id", flat=True).first()
+        )
+        if exportacion_id is None:
+            return None
+
+        tomada = pendientes.filter(pk=exportacion_id).update(
+            estado=ExportacionReporte.Estado.PROCESANDO,
+            fecha_inicio=timezone.now(),
+            intentos=F("intentos") + 1,
+        )
+        if tomada:
+            return ExportacionReporte.objects.select_related("usuario").get(pk=exportacion_id)
+        # Otro worker la tomó primero; se intenta con la siguiente.
+
+
+def procesar_exportacion(exportacion):
+    """
+    Genera el archivo de una exportación ya tomada y registra el resultado.
+    Los datos del reporte se leen de la réplica, si hay una configurada.
+
+    El resultado se guarda solo si la exportación sigue en la toma de este
+    worker (mismo estado e intento); si mientras tanto se reencoló o la tomó
+    otro worker, se descarta el archivo generado y no se modifica la fila.
+    """
+    generar = GENERADORES[exportacion.formato]
+
+    try:
+        with tempfile.TemporaryFile() as temporal, leer_de_replica():
+            generar(
+                temporal,
+                usuario=exportacion.usuario,
+                fecha_desde=exportacion.fecha_desde,
+                fecha_hasta=exportacion.fecha_hasta,
+            )
+            temporal.seek(0)
+            exportacion.archivo.save(exportacion.nombre_descarga, File(temporal), save=False)
+    except Exception as exc:
+        logger.exception("Falló la exportación %s", exportacion.pk)
+        exportacion.estado = ExportacionReporte.Estado.FALLIDA
+        exportacion.error = str(exc) or exc.__class__.__name__
+    else:
+        exportacion.estado = ExportacionReporte.Estado.COMPLETADA
+        exportacion.error = ""
+
+    exportacion.fecha_fin = timezone.now()
+    registrada = ExportacionReporte.objects.filter(
+        pk=exportacion.pk,
+        estado=ExportacionReporte.Estado.PROCESANDO,
+        intentos=exportacion.intentos,
+    ).update(
+        archivo=exportacion.archivo.name or "",
+        estado=exportacion.estado,
+        error=exportacion.error,
+        fecha_fin=exportacion.fecha_fin,
+    )
+    if not registrada:
+        logger.warning("La exportación %s cambió de estado durante el proceso; se descarta el resultado", exportacion.pk)
+        if exportacion.archivo:
+            exportacion.archivo.delete(save=False)
+    return exportacion
+
+
+def liberar_exportaciones_abandonadas(*, minutos):
+    """
+    Devuelve a la cola las exportaciones que llevan más de `minutos` en proceso
+    (por ejemplo, porque el worker se detuvo). Las que agotaron sus intentos se
+    marcan como fallidas. Devuelve cuántas se reencolaron.
+    """
+    abandonadas = ExportacionReporte.objects.filter(
+        estado=ExportacionReporte.Estado.PROCESANDO,
+        fecha_inicio__lt=timezone.now() - timedelta(minutes=minutos),
+    )
+    abandonadas.filter(intentos__gte=MAXIMO_INTENTOS).update(
+        estado=ExportacionReporte.Estado.FALLIDA,
+        error="La exportación excedió el número máximo de intentos.",
+        fecha_fin=timezone.now(),
+    )
+    return abandonadas.filter(intentos__lt=MAXIMO_INTENTOS).update(
+        estado=ExportacionReporte.Estado.PENDIENTE,
+        fecha_inicio=None,
+    )
+
+
+def procesar_pendientes(*, maximo=None):
+    """Procesa exportaciones pendientes hasta vaciar la cola o llegar a `maximo`. Devuelve cuántas procesó."""
+    procesadas = 0
+    while maximo is None or procesadas < maximo:
+        exportacion = tomar_siguiente_exportacion()
+        if exportacion is None:
+            break
+        procesar_exportacion(exportacion)
+        procesadas += 1
+    return procesadas
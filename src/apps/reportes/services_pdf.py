@@ -1,23 +1,162 @@
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-from reportlab.lib.pagesizes import letter, landscape
+from decimal import Decimal
+
+from django.utils import timezone
 from reportlab.lib import colors
-from io import BytesIO
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle
+
+from .descargas import respuesta_en_streaming
 from .services import reporte_turnos
 from .serializers import ReporteTurnoSerializer
 
 
-def generar_pdf_turnos(*, usuario, fecha_desde=None, fecha_hasta=None):
-    buffer = BytesIO()
+# Turnos leídos de la base de datos por cada consulta del iterador.
+TAMANO_LOTE_TURNOS = 2000
+
+TAMANO_PAGINA = landscape(letter)
+MARGEN = 20
+# Todas las filas miden lo mismo, así que las filas por página se conocen de
+# antemano y cada página se dibuja como una tabla independiente.
+ALTO_FILA = 12
+
+ENCABEZADOS = [
+    "ID",
+    "Empleado",
+    "Turno",
+    "Inicio",
+    "Fin",
+    "Caja Inicial",
+    "Efectivo",
+    "Transferencia",
+    "Tarjeta",
+    "Ingresos",
+    "Sueldo",
+    "Esperado",
+    "Reportado",
+    "Diferencia",
+]
+ANCHOS_COLUMNAS = [35, 85, 40, 70, 70] + [50.2] * 9
+
+# Columnas que se suman en los subtotales por día y en el total del reporte.
+CAMPOS_SUMADOS = [
+    "total_efectivo",
+    "total_transferencia",
+    "total_tarjeta",
+    "total_ingresos",
+    "sueldo",
+    "diferencia",
+]
+
+ESTILO_BASE = [
+    ("BACKGROUND", (0, 0), (-1, 0), colors.darkblue),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ("FONT", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 8),
+    ("TOPPADDING", (0, 0), (-1, -1), 1),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
+]
+
+
+def _moneda(valor):
+    return f"${valor}"
+
+
+def _fila_totales(etiqueta, totales):
+    """Fila de subtotal/total: la etiqueta ocupa las columnas de datos del turno."""
+    return [
+        etiqueta, "", "", "", "", "",
+        _moneda(totales["total_efectivo"]),
+        _moneda(totales["total_transferencia"]),
+        _moneda(totales["total_tarjeta"]),
+        _moneda(totales["total_ingresos"]),
+        _moneda(totales["sueldo"]),
+        "",
+        "",
+        _moneda(totales["diferencia"]),
+    ]
+
+
+def _filas_turnos(turnos_qs, tamano_lote):
+    """
+    Recorre el queryset por lotes y genera las filas del reporte, una a la vez.
+    Cada fila es una tupla `(celdas, es_total)`. Al cambiar de día (hora local)
+    se inserta el subtotal del día anterior y al final el total del reporte.
+    """
+    serializer = ReporteTurnoSerializer()
+    total = dict.fromkeys(CAMPOS_SUMADOS, Decimal(0))
+    dia_actual, subtotal = None, None
+
+    for turno in turnos_qs.iterator(chunk_size=tamano_lote):
+        dia = timezone.localdate(turno.fecha_inicio)
+        if dia != dia_actual:
+            if subtotal is not None:
+                yield _fila_totales(f"Subtotal {dia_actual}", subtotal), True
+            dia_actual, subtotal = dia, dict.fromkeys(CAMPOS_SUMADOS, Decimal(0))
+
+        item = serializer.to_representation(turno)
+        for campo in CAMPOS_SUMADOS:
+            valor = Decimal(item[campo] or 0)
+            subtotal[campo] += valor
+            total[campo] += valor
+
+        yield [
+            item["turno_id"],
+            item["empleado"],
+            item["tipo_turno"],
+            item["fecha_inicio"],  # El serializador ya formatea la fecha.
+            item["fecha_fin"],
+            _moneda(item["caja_inicial"]),
+            _moneda(item["total_efectivo"]),
+            _moneda(item["total_transferencia"]),
+            _moneda(item["total_tarjeta"]),
+            _moneda(item["total_ingresos"]),
+            _moneda(item["sueldo"]),
+            _moneda(item["efectivo_esperado"]),
+            _moneda(item["efectivo_reportado"]),
+            _moneda(item["diferencia"]),
+        ], False
+
+    if subtotal is not None:
+        yield _fila_totales(f"Subtotal {dia_actual}", subtotal), True
+    yield _fila_totales("Total", total), True
+
+
+def _dibujar_pagina(lienzo, filas):
+    """Dibuja una página con el encabezado y las filas indicadas, y la cierra."""
+    estilo = list(ESTILO_BASE)
+    for indice, (_, es_total) in enumerate(filas, start=1):
+        if es_total:
+            estilo += [
+                ("SPAN", (0, indice), (5, indice)),
+                ("BACKGROUND", (0, indice), (-1, indice), colors.lightgrey),
+                ("FONT", (0, indice), (-1, indice), "Helvetica-Bold"),
+            ]
 
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=landscape(letter),
-        rightMargin=20,
-        leftMargin=20,
-        topMargin=20,
-        bottomMargin=20,
+    tabla = Table(
+        [ENCABEZADOS] + [celdas for celdas, _ in filas],
+        colWidths=ANCHOS_COLUMNAS,
+        rowHeights=ALTO_FILA,
     )
+    tabla.setStyle(TableStyle(estilo))
 
+    ancho, alto = TAMANO_PAGINA
+    _, alto_tabla = tabla.wrapOn(lienzo, ancho - 2 * MARGEN, alto - 2 * MARGEN)
+    tabla.drawOn(lienzo, MARGEN, alto - MARGEN - alto_tabla)
+    lienzo.showPage()
+
+
+def escribir_turnos_pdf(destino, *, usuario, fecha_desde=None, fecha_hasta=None, tamano_lote=TAMANO_LOTE_TURNOS):
+    """
+    Escribe el reporte de turnos en formato PDF sobre `destino` (ruta o archivo).
+
+    En lugar de una sola tabla con todos los turnos (cuyo acomodo entre páginas
+    crece de forma cuadrática), cada página es una tabla del tamaño de la página
+    que se dibuja y se descarta en cuanto se llena.
+    """
     # 1. Obtener el queryset del servicio.
     turnos_qs = reporte_turnos(
         usuario=usuario,
@@ -25,58 +164,33 @@ def generar_pdf_turnos(*, usuario, fecha_desde=None, fecha_hasta=None):
         fecha_hasta=fecha_hasta
     )
 
-    # 2. Serializar el queryset para convertirlo en una lista de diccionarios.
-    data = ReporteTurnoSerializer(turnos_qs, many=True).data
-
-    tabla = [
-        [
-            "ID",
-            "Empleado",
-            "Turno",
-            "Inicio",
-            "Fin",
-            "Caja Inicial",
-            "Efectivo",
-            "Transferencia",
-            "Tarjeta",
-            "Ingresos",
-            "Sueldo",
-            "Esperado",
-            "Reportado",
-            "Diferencia",
-        ]
-    ]
+    lienzo = canvas.Canvas(destino, pagesize=TAMANO_PAGINA, pageCompression=1)
+    # Una fila de cada página la ocupa el encabezado.
+    filas_por_pagina = int((TAMANO_PAGINA[1] - 2 * MARGEN) // ALTO_FILA) - 1
 
-    for item in data:
-        tabla.append([
-            item["turno_id"],
-            item["empleado"],
-            item["tipo_turno"],
-            item["fecha_inicio"], # El serializador ya debería formatear la fecha.
-            item["fecha_fin"],
-            f"${item['caja_inicial']}",
-            f"${item['total_efectivo']}",
-            f"${item['total_transferencia']}",
-            f"${item['total_tarjeta']}",
-            f"${item['total_ingresos']}",
-            f"${item['sueldo']}",
-            f"${item['efectivo_esperado']}",
-            f"${item['efectivo_reportado']}",
-            f"${item['diferencia']}",
-        ])
-
-    table = Table(tabla, repeatRows=1)
-
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.darkblue),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("FONT", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 8),
-    ]))
-
-    doc.build([table])
-
-    buffer.seek(0)
-    return buffer
+    # 2. Dibujar las filas página por página a medida que se leen.
+    pagina = []
+    for fila in _filas_turnos(turnos_qs, tamano_lote):
+        pagina.append(fila)
+        if len(pagina) == filas_por_pagina:
+            _dibujar_pagina(lienzo, pagina)
+            pagina = []
+
+    if pagina:
+        _dibujar_pagina(lienzo, pagina)
+
+    lienzo.save()
+
+
+def exportar_turnos_pdf(*, usuario, fecha_desde=None, fecha_hasta=None):
+    """
+    Genera el PDF del reporte de turnos y lo envía como respuesta en streaming.
+    """
+    return respuesta_en_streaming(
+        escribir_turnos_pdf,
+        nombre_archivo="reporte_turnos.pdf",
+        content_type="application/pdf",
+        usuario=usuario,
+        fecha_desde=fecha_desde,
+        fecha_hasta=fecha_hasta,
+    )
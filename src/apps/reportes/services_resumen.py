@@ -1,62 +1,81 @@
 from django.db.models import Sum
 from django.utils import timezone
-from apps.turnos.models import Turno
-from apps.caja.models import MovimientoCaja
+from .models import AcumuladoDiarioMovimiento, AcumuladoDiarioTurno
 
 
-def resumen_diario(fecha=None):
-    if fecha is None:
-        fecha = timezone.now().date()
+def _resumen_vacio(fecha):
+    return {
+        "fecha": fecha,
+        "turnos": 0,
+        "turnos_sin_ingresos": 0,
+        "total_efectivo": 0,
+        "total_transferencia": 0,
+        "total_tarjeta": 0,
+        "total_ingresos": 0,
+        "total_sueldos": 0,
+        "total_diferencias": 0,
+    }
 
-    turnos = Turno.objects.filter(
-        fecha_inicio__date=fecha
-    )
 
-    total_efectivo = (
-        MovimientoCaja.objects
-        .filter(
-            turno__in=turnos,
-            metodo_pago="EFECTIVO"
-        )
-        .aggregate(total=Sum("monto"))["total"] or 0
-    )
+def _resumenes_por_fecha(fecha_desde, fecha_hasta):
+    """
+    Construye los resúmenes de cada día del rango a partir de los acumulados
+    diarios. Son dos consultas agrupadas sobre tablas pequeñas, sin importar
+    el tamaño del libro de caja.
+    """
+    resumenes = {}
 
-    total_transferencia = (
-        MovimientoCaja.objects
-        .filter(
-            turno__in=turnos,
-            metodo_pago="TRANSFERENCIA"
-        )
-        .aggregate(total=Sum("monto"))["total"] or 0
+    movimientos = (
+        AcumuladoDiarioMovimiento.objects
+        .filter(fecha__gte=fecha_desde, fecha__lte=fecha_hasta)
+        .values("fecha", "metodo_pago")
+        .annotate(total=Sum("total"))
+        .order_by()
     )
+    for fila in movimientos:
+        resumen = resumenes.setdefault(fila["fecha"], _resumen_vacio(fila["fecha"]))
+        campo = f"total_{fila['metodo_pago'].lower()}"
+        if campo in resumen:
+            resumen[campo] += fila["total"]
+        resumen["total_ingresos"] += fila["total"]
 
-    total_tarjeta = (
-        MovimientoCaja.objects
-        .filter(
-            turno__in=turnos,
-            metodo_pago="TARJETA"
+    turnos = (
+        AcumuladoDiarioTurno.objects
+        .filter(fecha__gte=fecha_desde, fecha__lte=fecha_hasta)
+        .values("fecha")
+        .annotate(
+            turnos_dia=Sum("turnos"),
+            sin_ingresos=Sum("turnos_sin_ingresos"),
+            sueldos=Sum("total_sueldos"),
+            diferencias=Sum("total_diferencias"),
         )
-        .aggregate(total=Sum("monto"))["total"] or 0
+        .order_by()
     )
+    for fila in turnos:
+        resumen = resumenes.setdefault(fila["fecha"], _resumen_vacio(fila["fecha"]))
+        resumen["turnos"] = fila["turnos_dia"]
+        resumen["turnos_sin_ingresos"] = fila["sin_ingresos"]
+        resumen["total_sueldos"] = fila["sueldos"]
+        resumen["total_diferencias"] = fila["diferencias"]
 
-    total_sueldos = (
-        turnos.aggregate(total=Sum("sueldo"))["total"] or 0
-    )
+    return resumenes
 
-    total_diferencias = (
-        turnos.aggregate(total=Sum("diferencia"))["total"] or 0
-    )
 
-    return {
-        "fecha": fecha,
-        "turnos": turnos.count(),
-        "turnos_sin_ingresos": turnos.filter(
-            movimientos__isnull=True
-        ).distinct().count(),
-        "total_efectivo": total_efectivo,
-        "total_transferencia": total_transferencia,
-        "total_tarjeta": total_tarjeta,
-        "total_ingresos": total_efectivo + total_transferencia + total_tarjeta,
-        "total_sueldos": total_sueldos,
-        "total_diferencias": total_diferencias,
-    }
+def resumen_diario(fecha=None):
+    """
+    Resumen financiero de un día: turnos iniciados ese día y los ingresos
+    registrados en ellos. Se lee de los acumulados diarios.
+    """
+    if fecha is None:
+        fecha = timezone.localdate()
+
+    return _resumenes_por_fecha(fecha, fecha).get(fecha) or _resumen_vacio(fecha)
+
+
+def resumen_por_dias(fecha_desde, fecha_hasta):
+    """
+    Resúmenes diarios de un rango de fechas (por ejemplo, un mes completo),
+    ordenados por fecha. Solo se incluyen los días con actividad.
+    """
+    resumenes = _resumenes_por_fecha(fecha_desde, fecha_hasta)
+    return [resumenes[fecha] for fecha in sorted(resumenes)]
@@ -0,0 +1,34 @@
+"""
+Receptores que mantienen los acumulados diarios sincronizados con los eventos
+de turnos y de caja. Se conectan en `ReportesConfig.ready`.
+"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.turnos.models import Turno
+from apps.turnos.signals import turno_cerrado
+from apps.caja.signals import movimientos_registrados
+from . import acumulados
+
+
+@receiver(post_save, sender=Turno, dispatch_uid="reportes_acumular_inicio_turno")
+def acumular_inicio_turno(sender, instance, created, **kwargs):
+    if created:
+        acumulados.acumular_inicio_turno(instance)
+
+
+@receiver(turno_cerrado, dispatch_uid="reportes_acumular_cierre_turno")
+def acumular_cierre_turno(sender, turno, **kwargs):
+    acumulados.acumular_cierre_turno(turno)
+
+
+@receiver(movimientos_registrados, dispatch_uid="reportes_acumular_movimientos")
+def acumular_movimientos(sender, turno, tipo, metodo_pago, monto, cantidad, primer_movimiento, **kwargs):
+    acumulados.acumular_movimientos(
+        turno=turno,
+        tipo=tipo,
+        metodo_pago=metodo_pago,
+        monto=monto,
+        cantidad=cantidad,
+        primer_movimiento=primer_movimiento,
+    )
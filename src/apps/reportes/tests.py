@@ -1,7 +1,16 @@
+import shutil
+import tempfile
+
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from decimal import Decimal
+from datetime import timedelta
+from io import BytesIO, StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from openpyxl import load_workbook
 
 from apps.users.models import Usuario
 from apps.turnos.models import Turno
@@ -10,6 +19,13 @@ from apps.habitaciones.models import TipoHabitacion, Habitacion
 from apps.tarifas.models import Tarifa
 from apps.estancias.models import Estancia
 from apps.productos.models import Producto
+from apps.turnos.services import cerrar_turno_service
+from .services import reporte_turnos
+from .fechas import inicio_del_dia
+from .models import AcumuladoDiarioMovimiento, AcumuladoDiarioTurno, ExportacionReporte
+from .services_pdf import _filas_turnos as filas_pdf_turnos
+from .services_exportaciones import procesar_exportacion, procesar_pendientes, tomar_siguiente_exportacion
+from .services_resumen import resumen_diario
 
 
 class ReportesAPITests(APITestCase):
@@ -85,4 +101,210 @@ class ReportesAPITests(APITestCase):
         emp1_data = next(e for e in results if e['empleado_id'] == self.employee1.id)
         self.assertEqual(emp1_data['turnos'], 2)
         self.assertEqual(emp1_data['turnos_sin_ingresos'], 1)
-        self.assertEqual(Decimal(emp1_data['total_ingresos']), Decimal('1150.00'))
\ No newline at end of file
+        self.assertEqual(Decimal(emp1_data['total_ingresos']), Decimal('1150.00'))
+
+    def test_reporte_empleados_no_multiplica_sueldos_por_movimientos(self):
+        """El sueldo y la diferencia de un turno con varios movimientos se suman una sola vez."""
+        Turno.objects.filter(pk=self.turno1_emp1.pk).update(sueldo=Decimal('300.00'), diferencia=Decimal('-5.00'))
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.reporte_empleados_url)
+        results = response.data['results'] if 'results' in response.data else response.data
+
+        emp1_data = next(e for e in results if e['empleado_id'] == self.employee1.id)
+        self.assertEqual(Decimal(emp1_data['total_sueldos']), Decimal('300.00'))
+        self.assertEqual(Decimal(emp1_data['total_diferencias']), Decimal('-5.00'))
+        self.assertEqual(Decimal(emp1_data['total_transferencia']), Decimal('150.00'))
+
+    def test_filtro_por_fechas_usa_dias_locales_semiabiertos(self):
+        """El rango incluye todo el último día local y excluye la medianoche del siguiente."""
+        hoy = timezone.localdate()
+        ultimo_instante = inicio_del_dia(hoy) - timedelta(microseconds=1)
+        Turno.objects.filter(pk=self.turno2_emp1.pk).update(fecha_inicio=ultimo_instante)
+
+        ayer = hoy - timedelta(days=1)
+        ids = set(reporte_turnos(usuario=self.admin_user, fecha_desde=ayer, fecha_hasta=ayer).values_list('id', flat=True))
+        self.assertEqual(ids, {self.turno2_emp1.id})
+
+        # La condición se aplica sobre la columna, sin convertirla a fecha local.
+        sql = str(reporte_turnos(usuario=self.admin_user, fecha_desde=ayer).query)
+        self.assertNotIn("cast_date", sql.lower())
+
+    def test_reporte_turnos_fecha_invalida(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.reporte_turnos_url, {'fecha_desde': '01/02/2026'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_resumen_diario_desde_acumulados(self):
+        """El resumen diario refleja los movimientos y turnos del día, leídos de los acumulados."""
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(reverse('resumen-diario'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(response.data['turnos'], 3)
+        self.assertEqual(response.data['turnos_sin_ingresos'], 1)
+        self.assertEqual(Decimal(response.data['total_efectivo']), Decimal('3000.00'))
+        self.assertEqual(Decimal(response.data['total_transferencia']), Decimal('150.00'))
+        self.assertEqual(Decimal(response.data['total_ingresos']), Decimal('3150.00'))
+
+    def test_resumen_por_rango_de_fechas(self):
+        """Con `fecha_desde` y `fecha_hasta` se devuelve un resumen por cada día con actividad."""
+        hoy = timezone.localdate()
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(reverse('resumen-diario'), {
+            'fecha_desde': (hoy - timedelta(days=30)).isoformat(),
+            'fecha_hasta': hoy.isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['dias']), 1)
+        self.assertEqual(response.data['dias'][0]['fecha'], hoy)
+
+    def test_resumen_con_rango_incompleto_o_invertido(self):
+        """Un rango con un solo extremo o con el inicio después del fin se rechaza."""
+        hoy = timezone.localdate()
+        self.client.force_authenticate(user=self.admin_user)
+        for params in (
+            {'fecha_desde': hoy.isoformat()},
+            {'fecha_hasta': hoy.isoformat()},
+            {'fecha_desde': hoy.isoformat(), 'fecha_hasta': (hoy - timedelta(days=1)).isoformat()},
+        ):
+            response = self.client.get(reverse('resumen-diario'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_cierre_de_turno_acumula_sueldo_y_diferencia(self):
+        """Cerrar un turno con el servicio suma su sueldo y diferencia al acumulado del día."""
+        cerrar_turno_service(usuario=self.employee2, efectivo_reportado=Decimal('1990.00'), sueldo=Decimal('0.00'))
+
+        resumen = resumen_diario()
+        self.assertEqual(resumen['total_diferencias'], Decimal('-10.00'))
+
+    def test_reconstruccion_coincide_con_acumulado_incremental(self):
+        """Reconstruir los acumulados desde el libro de caja produce el mismo resumen."""
+        incremental = resumen_diario()
+        AcumuladoDiarioMovimiento.objects.all().delete()
+        AcumuladoDiarioTurno.objects.all().delete()
+
+        call_command('reconstruir_acumulados_diarios', stdout=StringIO())
+        self.assertEqual(resumen_diario(), incremental)
+
+    def test_exportacion_excel_en_streaming(self):
+        """El Excel se envía en streaming y contiene una fila por turno."""
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(reverse('reporte-turnos-excel'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+
+        contenido = b"".join(response.streaming_content)
+        self.assertEqual(int(response['Content-Length']), len(contenido))
+
+        hoja = load_workbook(BytesIO(contenido), read_only=True)["Reporte de Turnos"]
+        filas = list(hoja.values)
+        self.assertEqual(filas[0][0], "ID Turno")
+        self.assertEqual(len(filas), 4)
+
+    def test_pdf_en_streaming_con_subtotales_por_dia(self):
+        """El PDF se envía en streaming e incluye un subtotal por día y el total del reporte."""
+        # El turno sin movimientos se mueve al día anterior.
+        Turno.objects.filter(pk=self.turno2_emp1.pk).update(fecha_inicio=timezone.now() - timedelta(days=1))
+
+        filas = list(filas_pdf_turnos(reporte_turnos(usuario=self.admin_user), 100))
+        totales = [celdas for celdas, es_total in filas if es_total]
+        self.assertEqual(len(filas), 3 + 3)
+        self.assertEqual([t[0][:8] for t in totales], ["Subtotal", "Subtotal", "Total"])
+        # Columna de ingresos: día de hoy (1150 + 2000), día anterior (0) y total.
+        self.assertEqual([t[9] for t in totales], ["$3150.00", "$0.00", "$3150.00"])
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(reverse('reporte-turnos-pdf'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF"))
+
+
+class ExportacionesReporteTests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=self.media_root)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.admin_user = Usuario.objects.create_user(username='admin', password='password123', rol=Usuario.Rol.ADMINISTRADOR)
+        self.employee = Usuario.objects.create_user(username='empleado1', password='password123', rol=Usuario.Rol.EMPLEADO)
+        Turno.objects.create(usuario=self.employee, tipo_turno="DIA", activo=False)
+        Turno.objects.create(usuario=self.admin_user, tipo_turno="NOCHE", activo=False)
+
+        self.url = reverse('exportaciones-reporte')
+
+    def _solicitar(self, usuario, formato):
+        self.client.force_authenticate(user=usuario)
+        response = self.client.post(self.url, {'formato': formato}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['estado'], ExportacionReporte.Estado.PENDIENTE)
+        return response.data['id']
+
+    def test_exportacion_en_segundo_plano_y_descarga(self):
+        """La solicitud queda pendiente, el worker genera el archivo y el usuario lo descarga."""
+        exportacion_id = self._solicitar(self.employee, 'EXCEL')
+        detalle_url = reverse('exportacion-reporte-detalle', args=[exportacion_id])
+
+        self.assertIsNone(self.client.get(detalle_url).data['url_descarga'])
+        self.assertEqual(procesar_pendientes(), 1)
+
+        response = self.client.get(detalle_url)
+        self.assertEqual(response.data['estado'], ExportacionReporte.Estado.COMPLETADA)
+        self.assertIsNotNone(response.data['url_descarga'])
+
+        descarga = self.client.get(reverse('exportacion-reporte-descarga', args=[exportacion_id]))
+        self.assertEqual(descarga.status_code, status.HTTP_200_OK)
+        hoja = load_workbook(BytesIO(b"".join(descarga.streaming_content)), read_only=True)["Reporte de Turnos"]
+        # Encabezados + el único turno del empleado.
+        self.assertEqual(len(list(hoja.values)), 2)
+
+    def test_exportacion_pdf(self):
+        exportacion_id = self._solicitar(self.admin_user, 'PDF')
+        procesar_pendientes()
+
+        exportacion = ExportacionReporte.objects.get(pk=exportacion_id)
+        self.assertEqual(exportacion.estado, ExportacionReporte.Estado.COMPLETADA)
+        with exportacion.archivo.open("rb") as archivo:
+            self.assertEqual(archivo.read(4), b"%PDF")
+
+    def test_descarga_pendiente_devuelve_conflicto(self):
+        exportacion_id = self._solicitar(self.employee, 'PDF')
+        response = self.client.get(reverse('exportacion-reporte-descarga', args=[exportacion_id]))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_usuario_no_ve_exportaciones_ajenas(self):
+        exportacion_id = self._solicitar(self.admin_user, 'EXCEL')
+        self.client.force_authenticate(user=self.employee)
+        response = self.client.get(reverse('exportacion-reporte-detalle', args=[exportacion_id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_una_exportacion_solo_la_toma_un_worker(self):
+        self._solicitar(self.employee, 'EXCEL')
+        self.assertIsNotNone(tomar_siguiente_exportacion())
+        self.assertIsNone(tomar_siguiente_exportacion())
+
+    def test_resultado_de_una_toma_reencolada_no_pisa_la_nueva(self):
+        """Si la exportación se reencoló y otro worker la tomó, el primero no sobrescribe su estado."""
+        exportacion_id = self._solicitar(self.employee, 'EXCEL')
+        primera = tomar_siguiente_exportacion()
+        ExportacionReporte.objects.filter(pk=exportacion_id).update(estado=ExportacionReporte.Estado.PENDIENTE)
+        segunda = tomar_siguiente_exportacion()
+
+        procesar_exportacion(primera)
+        exportacion = ExportacionReporte.objects.get(pk=exportacion_id)
+        self.assertEqual(exportacion.estado, ExportacionReporte.Estado.PROCESANDO)
+        self.assertFalse(exportacion.archivo)
+
+        procesar_exportacion(segunda)
+        exportacion.refresh_from_db()
+        self.assertEqual(exportacion.estado, ExportacionReporte.Estado.COMPLETADA)
+        self.assertTrue(exportacion.archivo)
+
+    def test_rango_de_fechas_invalido(self):
+        self.client.force_authenticate(user=self.employee)
+        response = self.client.post(self.url, {
+            'formato': 'EXCEL', 'fecha_desde': '2026-02-01', 'fecha_hasta': '2026-01-01'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
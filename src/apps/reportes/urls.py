@@ -1,10 +1,14 @@
 from django.urls import path
 from .views import GraficaIngresosEmpleadosAPIView,ReporteTurnosAPIView, ReporteTurnosExcelAPIView,ReporteTurnosPDFAPIView, ResumenDiarioAPIView, ReportePorEmpleadoAPIView, ReporteDetalleEmpleadoAPIView, RankingEmpleadosAPIView
+from .views import ExportacionesReporteAPIView, ExportacionReporteDetalleAPIView, ExportacionReporteDescargaAPIView
 
 urlpatterns = [
     path("turnos/", ReporteTurnosAPIView.as_view(), name="reporte-turnos"),
     path("turnos/excel/", ReporteTurnosExcelAPIView.as_view(), name="reporte-turnos-excel"),
     path("turnos/pdf/", ReporteTurnosPDFAPIView.as_view(), name="reporte-turnos-pdf"),
+    path("exportaciones/", ExportacionesReporteAPIView.as_view(), name="exportaciones-reporte"),
+    path("exportaciones/<int:pk>/", ExportacionReporteDetalleAPIView.as_view(), name="exportacion-reporte-detalle"),
+    path("exportaciones/<int:pk>/descargar/", ExportacionReporteDescargaAPIView.as_view(), name="exportacion-reporte-descarga"),
     path("resumen/diario/", ResumenDiarioAPIView.as_view(), name="resumen-diario"),
     path("empleados/", ReportePorEmpleadoAPIView.as_view(), name="reporte-empleados"),
     path("empleados/<int:empleado_id>/", ReporteDetalleEmpleadoAPIView.as_view(), name="reporte-detalle-empleado"),
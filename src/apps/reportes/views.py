@@ -2,15 +2,25 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.core.exceptions import ValidationError
 from django.http import FileResponse
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
+from django.utils.dateparse import parse_date
 
 from .services import reporte_turnos
-from .serializers import ReporteTurnoSerializer, ReporteEmpleadoSerializer, ReporteDetalleTurnoEmpleadoSerializer
+from .models import ExportacionReporte
+from .serializers import (
+    ReporteTurnoSerializer,
+    ReporteEmpleadoSerializer,
+    ReporteDetalleTurnoEmpleadoSerializer,
+    SolicitudExportacionSerializer,
+    ExportacionReporteSerializer,
+)
 from .services_excel import exportar_turnos_excel
-from .services_pdf import generar_pdf_turnos
-from .services_resumen import resumen_diario
+from .services_pdf import exportar_turnos_pdf
+from .services_exportaciones import solicitar_exportacion
+from .services_resumen import resumen_diario, resumen_por_dias
 from .services_empleados import (
     reporte_por_empleado,
     reporte_detalle_empleado,
@@ -18,9 +28,35 @@ from .services_empleados import (
     grafica_ingresos_por_empleado
 )
 from apps.core.permissions import IsAdminUser, IsEmpleado, IsOnlyInvitado
+from apps.core.medicion import MedicionRenderMixin
+
+
+def _parsear_fecha(valor):
+    """Convierte un parámetro 'AAAA-MM-DD' en fecha. Lanza ValueError si es inválido."""
+    if not valor:
+        return None
+    fecha = parse_date(valor)
+    if fecha is None:
+        raise ValueError(valor)
+    return fecha
+
+
+def _fechas_de_consulta(request):
+    """Lee `fecha_desde` y `fecha_hasta` de la consulta. Lanza ValueError si alguna es inválida."""
+    return (
+        _parsear_fecha(request.query_params.get("fecha_desde")),
+        _parsear_fecha(request.query_params.get("fecha_hasta")),
+    )
+
+
+def _respuesta_fecha_invalida():
+    return Response(
+        {"error": "Las fechas deben tener el formato AAAA-MM-DD."},
+        status=status.HTTP_400_BAD_REQUEST
+    )
 
 
-class ReporteTurnosAPIView(APIView):
+class ReporteTurnosAPIView(MedicionRenderMixin, APIView):
     """
     Vista para obtener un reporte detallado de los turnos.
     - Admins: Ven todos los turnos.
@@ -30,8 +66,10 @@ class ReporteTurnosAPIView(APIView):
     permission_classes = [IsAuthenticated, (IsEmpleado | IsOnlyInvitado)]
 
     def get(self, request):
-        fecha_desde = request.query_params.get("fecha_desde")
-        fecha_hasta = request.query_params.get("fecha_hasta")
+        try:
+            fecha_desde, fecha_hasta = _fechas_de_consulta(request)
+        except ValueError:
+            return _respuesta_fecha_invalida()
 
         data = reporte_turnos(
             usuario=request.user,
@@ -42,7 +80,7 @@ class ReporteTurnosAPIView(APIView):
         serializer = ReporteTurnoSerializer(data, many=True)
         return Response(serializer.data)
 
-class ReporteTurnosExcelAPIView(APIView):
+class ReporteTurnosExcelAPIView(MedicionRenderMixin, APIView):
     """
     Vista para exportar el reporte de turnos a un archivo Excel.
     - Admins: Exportan todos los turnos.
@@ -52,8 +90,10 @@ class ReporteTurnosExcelAPIView(APIView):
     permission_classes = [IsAuthenticated, (IsEmpleado | IsOnlyInvitado)]
 
     def get(self, request):
-        fecha_desde = request.query_params.get("fecha_desde")
-        fecha_hasta = request.query_params.get("fecha_hasta")
+        try:
+            fecha_desde, fecha_hasta = _fechas_de_consulta(request)
+        except ValueError:
+            return _respuesta_fecha_invalida()
 
         return exportar_turnos_excel(
             usuario=request.user,
@@ -62,7 +102,7 @@ class ReporteTurnosExcelAPIView(APIView):
         )
     
 
-class ReporteTurnosPDFAPIView(APIView):
+class ReporteTurnosPDFAPIView(MedicionRenderMixin, APIView):
     """
     Vista para exportar el reporte de turnos a un archivo PDF.
     - Admins: Exportan todos los turnos.
@@ -72,36 +112,58 @@ class ReporteTurnosPDFAPIView(APIView):
     permission_classes = [IsAuthenticated, (IsEmpleado | IsOnlyInvitado)]
 
     def get(self, request):
-        fecha_desde = request.query_params.get("fecha_desde")
-        fecha_hasta = request.query_params.get("fecha_hasta")
+        try:
+            fecha_desde, fecha_hasta = _fechas_de_consulta(request)
+        except ValueError:
+            return _respuesta_fecha_invalida()
 
-        buffer = generar_pdf_turnos(
+        return exportar_turnos_pdf(
             usuario=request.user,
             fecha_desde=fecha_desde,
             fecha_hasta=fecha_hasta
         )
-
-        return FileResponse(
-            buffer,
-            as_attachment=True,
-            filename="reporte_turnos.pdf",
-            content_type="application/pdf"
-        )
     
-class ResumenDiarioAPIView(APIView):
+class ResumenDiarioAPIView(MedicionRenderMixin, APIView):
     """
-    Vista para obtener un resumen financiero de un día específico.
+    Vista para obtener un resumen financiero de un día específico (`fecha`)
+    o de cada día de un rango (`fecha_desde` y `fecha_hasta`).
     Accesible solo por administradores.
     """
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def get(self, request):
-        fecha = request.query_params.get("fecha")
+        try:
+            fecha = _parsear_fecha(request.query_params.get("fecha"))
+            fecha_desde = _parsear_fecha(request.query_params.get("fecha_desde"))
+            fecha_hasta = _parsear_fecha(request.query_params.get("fecha_hasta"))
+        except ValueError:
+            return _respuesta_fecha_invalida()
+
+        # Un rango incompleto o invertido no debe caer en el resumen de un solo día.
+        if bool(fecha_desde) != bool(fecha_hasta):
+            return Response(
+                {"error": "Para un rango se requieren 'fecha_desde' y 'fecha_hasta'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if fecha_desde and fecha_desde > fecha_hasta:
+            return Response(
+                {"error": "La fecha inicial no puede ser posterior a la fecha final."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Con un rango de fechas se devuelve el resumen de cada día (ej. un mes).
+        if fecha_desde:
+            return Response({
+                "fecha_desde": fecha_desde,
+                "fecha_hasta": fecha_hasta,
+                "dias": resumen_por_dias(fecha_desde, fecha_hasta),
+            })
+
         resumen = resumen_diario(fecha)
         return Response(resumen)
     
 
-class ReportePorEmpleadoAPIView(APIView):
+class ReportePorEmpleadoAPIView(MedicionRenderMixin, APIView):
     """
     Vista para obtener un reporte agregado con los totales por empleado.
     Accesible solo por administradores.
@@ -115,7 +177,7 @@ class ReportePorEmpleadoAPIView(APIView):
     
 
 
-class ReporteDetalleEmpleadoAPIView(APIView):
+class ReporteDetalleEmpleadoAPIView(MedicionRenderMixin, APIView):
     """
     Vista para obtener el detalle de todos los turnos de un empleado específico.
     - Admins: Ven el detalle de cualquier empleado.
@@ -148,7 +210,7 @@ class ReporteDetalleEmpleadoAPIView(APIView):
         })
     
 
-class RankingEmpleadosAPIView(APIView):
+class RankingEmpleadosAPIView(MedicionRenderMixin, APIView):
     """
     Vista que devuelve un ranking de empleados ordenado por ingresos totales.
     Accesible solo por administradores.
@@ -161,7 +223,7 @@ class RankingEmpleadosAPIView(APIView):
         return Response(serializer.data)
 
 
-class GraficaIngresosEmpleadosAPIView(APIView):
+class GraficaIngresosEmpleadosAPIView(MedicionRenderMixin, APIView):
     """
     Vista que devuelve datos formateados para una gráfica de ingresos por empleado.
     Accesible solo por administradores.
@@ -169,4 +231,73 @@ class GraficaIngresosEmpleadosAPIView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def get(self, request):
-        return Response(grafica_ingresos_por_empleado())
\ No newline at end of file
+        return Response(grafica_ingresos_por_empleado())
+
+
+class ExportacionesReporteAPIView(MedicionRenderMixin, APIView):
+    """
+    Cola de exportaciones del reporte de turnos.
+    - POST: Solicita una exportación (Excel o PDF) que se genera en segundo plano.
+      Responde 202 con la solicitud; el cliente consulta su estado hasta que se completa.
+    - GET: Lista las exportaciones recientes del usuario.
+    El alcance del reporte es el mismo que en la exportación directa.
+    """
+    permission_classes = [IsAuthenticated, (IsEmpleado | IsOnlyInvitado)]
+    # El estado de la cola debe verse en cuanto el worker lo actualiza.
+    lectura_en_replica = False
+
+    def get(self, request):
+        exportaciones = ExportacionReporte.objects.filter(usuario=request.user)[:20]
+        serializer = ExportacionReporteSerializer(exportaciones, many=True, context={"request": request})
+        return Response(serializer.data)
+
+    def post(self, request):
+        serializer = SolicitudExportacionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            exportacion = solicitar_exportacion(usuario=request.user, **serializer.validated_data)
+        except ValidationError as e:
+            return Response({"error": e.message}, status=status.HTTP_400_BAD_REQUEST)
+
+        response_serializer = ExportacionReporteSerializer(exportacion, context={"request": request})
+        return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class ExportacionReporteDetalleAPIView(MedicionRenderMixin, APIView):
+    """
+    Estado de una exportación. Cada usuario solo puede consultar las suyas.
+    """
+    permission_classes = [IsAuthenticated, (IsEmpleado | IsOnlyInvitado)]
+    # El estado de la cola debe verse en cuanto el worker lo actualiza.
+    lectura_en_replica = False
+
+    def get(self, request, pk):
+        exportacion = get_object_or_404(ExportacionReporte, pk=pk, usuario=request.user)
+        serializer = ExportacionReporteSerializer(exportacion, context={"request": request})
+        return Response(serializer.data)
+
+
+class ExportacionReporteDescargaAPIView(MedicionRenderMixin, APIView):
+    """
+    Descarga el archivo de una exportación completada.
+    Responde 409 si la exportación aún no termina o falló.
+    """
+    permission_classes = [IsAuthenticated, (IsEmpleado | IsOnlyInvitado)]
+    # El estado de la cola debe verse en cuanto el worker lo actualiza.
+    lectura_en_replica = False
+
+    def get(self, request, pk):
+        exportacion = get_object_or_404(ExportacionReporte, pk=pk, usuario=request.user)
+
+        if exportacion.estado != ExportacionReporte.Estado.COMPLETADA:
+            return Response(
+                {"error": "La exportación aún no está disponible.", "estado": exportacion.estado},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        return FileResponse(
+            exportacion.archivo.open("rb"),
+            as_attachment=True,
+            filename=exportacion.nombre_descarga,
+        )
@@ -1,7 +1,20 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class TarifasConfig(AppConfig):
     """Configuración de la aplicación 'tarifas' de Django."""
     name = 'apps.tarifas'
-    label = 'tarifas'
\ No newline at end of file
+    label = 'tarifas'
+
+    def ready(self):
+        # Los cambios en tarifas, o en el tipo de una habitación, invalidan las
+        # tablas de tarifas aplicables.
+        from apps.habitaciones.models import Habitacion
+        from .models import Tarifa
+        from .resolucion import registrar_cambio_de_habitacion, registrar_cambio_de_tarifas
+
+        post_save.connect(registrar_cambio_de_tarifas, sender=Tarifa, dispatch_uid="tarifas_aplicables_post_save")
+        post_delete.connect(registrar_cambio_de_tarifas, sender=Tarifa, dispatch_uid="tarifas_aplicables_post_delete")
+        post_save.connect(registrar_cambio_de_habitacion, sender=Habitacion, dispatch_uid="tarifas_habitacion_post_save")
+        post_delete.connect(registrar_cambio_de_habitacion, sender=Habitacion, dispatch_uid="tarifas_habitacion_post_delete")
@@ -0,0 +1,155 @@
+"""
+Resolución de las tarifas aplicables a una habitación en un momento dado.
+
+Por cada tipo de habitación se precalcula una tabla de intervalos sobre el día
+(en segundos desde la medianoche, hora local): los límites son las horas de
+inicio y fin de las tarifas nocturnas y cada intervalo guarda, ya ordenadas por
+precio, las tarifas que aplican en él (las diurnas aplican todo el día). Una
+ventana nocturna que cruza la medianoche (ej. 21:00 a 10:00) se divide en dos
+intervalos. Resolver una consulta es una búsqueda binaria sobre los límites.
+
+Las tablas y la relación habitación -> tipo se guardan en una copia local al
+proceso (`CacheVersionada`), que se invalida al guardar o eliminar una tarifa
+o al cambiar el tipo de una habitación.
+"""
+from bisect import bisect_right
+from itertools import groupby
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.core.versiones import CacheVersionada, incrementar_version
+from apps.habitaciones.models import Habitacion
+from .models import Tarifa
+
+
+CLAVE_VERSION = "tarifas_aplicables"
+SEGUNDOS_DIA = 24 * 60 * 60
+
+CAMPOS_TARIFA = [
+    "id", "nombre", "horas", "precio", "es_nocturna",
+    "hora_inicio_nocturna", "hora_fin_nocturna", "tipo_habitacion_id",
+]
+
+
+def _segundos(hora):
+    return hora.hour * 3600 + hora.minute * 60 + hora.second
+
+
+def _ventanas(tarifa):
+    """Intervalos [inicio, fin) del día en que aplica una tarifa nocturna."""
+    inicio = _segundos(tarifa["hora_inicio_nocturna"])
+    fin = _segundos(tarifa["hora_fin_nocturna"])
+    if inicio < fin:
+        return [(inicio, fin)]
+    if inicio > fin:
+        # La ventana cruza la medianoche.
+        return [(inicio, SEGUNDOS_DIA), (0, fin)]
+    # Inicio y fin iguales: aplica todo el día.
+    return [(0, SEGUNDOS_DIA)]
+
+
+class TablaTarifas:
+    """Tarifas aplicables de un tipo de habitación por intervalo del día."""
+    __slots__ = ("limites", "intervalos")
+
+    def __init__(self, tarifas):
+        diurnas = [t for t in tarifas if not t["es_nocturna"]]
+        ventanas = [(t, _ventanas(t)) for t in tarifas if t["es_nocturna"]]
+
+        self.limites = sorted({0} | {
+            limite
+            for _, intervalos in ventanas
+            for intervalo in intervalos
+            for limite in intervalo
+            if limite < SEGUNDOS_DIA
+        })
+        # Cada intervalo va de su límite al siguiente; basta evaluar su inicio.
+        self.intervalos = [
+            tuple(sorted(
+                diurnas + [
+                    tarifa for tarifa, intervalos in ventanas
+                    if any(inicio <= limite < fin for inicio, fin in intervalos)
+                ],
+                key=lambda t: (t["precio"], t["nombre"]),
+            ))
+            for limite in self.limites
+        ]
+
+    def aplicables(self, segundo_del_dia):
+        return self.intervalos[bisect_right(self.limites, segundo_del_dia) - 1]
+
+
+def _cargar_tablas():
+    tarifas = (
+        Tarifa.objects.filter(activa=True)
+        .values(*CAMPOS_TARIFA)
+        .order_by("tipo_habitacion_id")
+    )
+    return {
+        "tablas": {
+            tipo_id: TablaTarifas(list(grupo))
+            for tipo_id, grupo in groupby(tarifas, key=lambda t: t["tipo_habitacion_id"])
+        },
+        "habitaciones": dict(Habitacion.objects.filter(activa=True).values_list("id", "tipo_id")),
+    }
+
+
+def _segundos_entre_verificaciones():
+    return getattr(settings, "TARIFAS_VERIFICACION_SEGUNDOS", 2)
+
+
+_cache = CacheVersionada(CLAVE_VERSION, _cargar_tablas, _segundos_entre_verificaciones)
+
+
+def invalidar_cache_local():
+    """Descarta las tablas de tarifas de este proceso."""
+    _cache.invalidar()
+
+
+def tarifas_aplicables(habitacion_id, momento=None):
+    """
+    Tarifas activas que se pueden usar en la habitación `habitacion_id` en
+    `momento` (ahora, por defecto), de la más barata a la más cara.
+    Devuelve diccionarios compartidos con la caché: no deben modificarse.
+    """
+    # Dentro de una transacción puede haber cambios aún no confirmados que la
+    # caché no refleja, así que las tablas se construyen directamente.
+    datos = _cargar_tablas() if connection.in_atomic_block else _cache.obtener()
+    return _resolver(datos, habitacion_id, momento)
+
+
+async def atarifas_aplicables(habitacion_id, momento=None):
+    """Como `tarifas_aplicables`, para vistas asíncronas (siempre con la copia local)."""
+    return _resolver(await _cache.aobtener(), habitacion_id, momento)
+
+
+def _resolver(datos, habitacion_id, momento):
+    tipo_id = datos["habitaciones"].get(habitacion_id)
+    if tipo_id is None:
+        raise ValidationError("La habitación no existe o no está activa.")
+
+    tabla = datos["tablas"].get(tipo_id)
+    if tabla is None:
+        return ()
+
+    hora = timezone.localtime(momento or timezone.now())
+    return tabla.aplicables(_segundos(hora))
+
+
+def registrar_cambio_de_tarifas(**kwargs):
+    """
+    Receptor de señales: incrementa el sello de versión (en la misma transacción
+    que el cambio) e invalida la copia local, ahora y al confirmar la transacción.
+    """
+    incrementar_version(CLAVE_VERSION)
+    invalidar_cache_local()
+    transaction.on_commit(invalidar_cache_local)
+
+
+def registrar_cambio_de_habitacion(update_fields=None, **kwargs):
+    # Abrir o cerrar estancias solo guarda el estado, que no afecta a las tarifas.
+    if update_fields is None or {"tipo", "activa"} & set(update_fields):
+        registrar_cambio_de_tarifas()
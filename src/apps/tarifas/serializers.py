@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from apps.core.medicion import MedicionSerializerMixin
 from .models import Tarifa
 from rest_framework.validators import UniqueTogetherValidator
 
 
-class TarifaSerializer(serializers.ModelSerializer):
+class TarifaSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Tarifa.
     Maneja la validación (precio > 0, horas > 0, lógica de tarifa nocturna, unicidad)
@@ -1,10 +1,14 @@
+from datetime import time
+
+from django.test import TransactionTestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from apps.users.models import Usuario
-from apps.habitaciones.models import TipoHabitacion
+from apps.habitaciones.models import Habitacion, TipoHabitacion
 from .models import Tarifa
+from .resolucion import invalidar_cache_local, tarifas_aplicables
 
 
 class TarifaAPITests(APITestCase):
@@ -111,3 +115,87 @@ class TarifaAPITests(APITestCase):
         response = self.client.post(self.list_create_url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("Ya existe una tarifa con este nombre para el tipo de habitación seleccionado.", str(response.data))
+
+
+class TarifasAplicablesAPITests(APITestCase):
+    def setUp(self):
+        self.employee_user = Usuario.objects.create_user(username='employee', password='password123', rol=Usuario.Rol.EMPLEADO)
+        self.tipo = TipoHabitacion.objects.create(nombre="Sencilla")
+        otro_tipo = TipoHabitacion.objects.create(nombre="Suite")
+        self.habitacion = Habitacion.objects.create(numero=101, tipo=self.tipo)
+
+        Tarifa.objects.create(nombre="3 Horas", horas=3, precio=300, tipo_habitacion=self.tipo)
+        Tarifa.objects.create(
+            nombre="Noche", horas=12, precio=800, tipo_habitacion=self.tipo,
+            es_nocturna=True, hora_inicio_nocturna=time(21), hora_fin_nocturna=time(10),
+        )
+        Tarifa.objects.create(
+            nombre="Mediodía", horas=2, precio=200, tipo_habitacion=self.tipo,
+            es_nocturna=True, hora_inicio_nocturna=time(13), hora_fin_nocturna=time(15),
+        )
+        Tarifa.objects.create(nombre="Inactiva", horas=1, precio=100, tipo_habitacion=self.tipo, activa=False)
+        Tarifa.objects.create(nombre="Suite 3 Horas", horas=3, precio=900, tipo_habitacion=otro_tipo)
+
+        self.url = reverse('tarifas-aplicables')
+        self.client.force_authenticate(user=self.employee_user)
+
+    def _nombres(self, hora):
+        response = self.client.get(self.url, {'habitacion': self.habitacion.id, 'momento': f"2025-03-10T{hora}"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [t['nombre'] for t in response.data['tarifas']]
+
+    def test_tarifas_por_hora_del_dia(self):
+        self.assertEqual(self._nombres("12:00"), ["3 Horas"])
+        self.assertEqual(self._nombres("14:30"), ["Mediodía", "3 Horas"])
+        self.assertEqual(self._nombres("15:00"), ["3 Horas"])
+
+    def test_ventana_que_cruza_la_medianoche(self):
+        self.assertEqual(self._nombres("21:00"), ["3 Horas", "Noche"])
+        self.assertEqual(self._nombres("23:59"), ["3 Horas", "Noche"])
+        self.assertEqual(self._nombres("03:00"), ["3 Horas", "Noche"])
+        self.assertEqual(self._nombres("09:59:59"), ["3 Horas", "Noche"])
+        self.assertEqual(self._nombres("10:00"), ["3 Horas"])
+
+    def test_parametros_invalidos(self):
+        response = self.client.get(self.url, {'habitacion': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'habitacion': 999})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'habitacion': self.habitacion.id, 'momento': 'ayer'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_variante_asincrona(self):
+        # La variante asíncrona usa la copia local aunque la prueba corra en una transacción.
+        invalidar_cache_local()
+        self.addCleanup(invalidar_cache_local)
+        url = reverse('tarifas-aplicables-async')
+
+        for params in ({"habitacion": self.habitacion.id, "momento": "2025-01-01T22:00:00"}, {"habitacion": "x"}):
+            response = self.client.get(url, params)
+            self.assertEqual(response.json(), self.client.get(self.url, params).json())
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TarifasAplicablesCacheTests(TransactionTestCase):
+    """La caché de tablas solo se usa fuera de transacciones, por eso no se usa TestCase."""
+
+    def setUp(self):
+        invalidar_cache_local()
+        self.addCleanup(invalidar_cache_local)
+        self.tipo = TipoHabitacion.objects.create(nombre="Sencilla")
+        self.habitacion = Habitacion.objects.create(numero=101, tipo=self.tipo)
+        Tarifa.objects.create(nombre="3 Horas", horas=3, precio=300, tipo_habitacion=self.tipo)
+
+    def test_consultas_repetidas_no_tocan_la_base(self):
+        tarifas_aplicables(self.habitacion.id)
+        with self.assertNumQueries(0):
+            tarifas = tarifas_aplicables(self.habitacion.id)
+        self.assertEqual([t['nombre'] for t in tarifas], ["3 Horas"])
+
+    def test_guardar_una_tarifa_invalida_la_cache(self):
+        tarifas_aplicables(self.habitacion.id)
+        Tarifa.objects.create(nombre="6 Horas", horas=6, precio=500, tipo_habitacion=self.tipo)
+        self.assertEqual(
+            [t['nombre'] for t in tarifas_aplicables(self.habitacion.id)],
+            ["3 Horas", "6 Horas"],
+        )
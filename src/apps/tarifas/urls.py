@@ -1,11 +1,19 @@
 # Define las rutas de la API para la aplicación 'tarifas'.
 
 from django.urls import path
-from .views import TarifaListCreateAPIView, TarifaDetailAPIView
+from .views import (
+    TarifaListCreateAPIView, TarifaDetailAPIView, TarifasAplicablesAPIView, TarifasAplicablesAsincronoAPIView,
+)
 
 urlpatterns = [
     # Ejemplo: GET, POST /api/tarifas/
     path('', TarifaListCreateAPIView.as_view(), name='tarifas_list_create'),
+    # Tarifas que aplican a una habitación en un momento dado
+    # Ejemplo: GET /api/tarifas/aplicables/?habitacion=1&momento=2025-01-01T22:00
+    path('aplicables/', TarifasAplicablesAPIView.as_view(), name='tarifas-aplicables'),
+    # Variante asíncrona (servidor ASGI)
+    # Ejemplo: GET /api/tarifas/aplicables/async/?habitacion=1
+    path('aplicables/async/', TarifasAplicablesAsincronoAPIView.as_view(), name='tarifas-aplicables-async'),
     # Ejemplo: GET, PUT, PATCH, DELETE /api/tarifas/1/
     path(
         '<int:pk>/',
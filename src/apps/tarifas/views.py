@@ -1,12 +1,20 @@
-from rest_framework import generics
+from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from .models import Tarifa
+from .resolucion import atarifas_aplicables, tarifas_aplicables
 from .serializers import TarifaSerializer
+from apps.core.asincrono import VistaAsincronaMixin
 from apps.core.permissions import IsAdminUser
+from apps.core.medicion import MedicionRenderMixin
 
 
-class TarifaListCreateAPIView(generics.ListCreateAPIView):
+class TarifaListCreateAPIView(MedicionRenderMixin, generics.ListCreateAPIView):
     """
     Maneja GET para listar todas las tarifas y POST para crear una nueva.
     - `GET`: Cualquier usuario autenticado puede listar las tarifas.
@@ -29,7 +37,7 @@ class TarifaListCreateAPIView(generics.ListCreateAPIView):
         return [IsAuthenticated()]
 
 
-class TarifaDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class TarifaDetailAPIView(MedicionRenderMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Maneja GET (detalle), PUT, PATCH (actualizar) y DELETE para una tarifa.
     - `GET`: Cualquier usuario autenticado puede ver el detalle.
@@ -43,3 +51,67 @@ class TarifaDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
         if self.request.method in ['PUT', 'PATCH', 'DELETE']:
             return [IsAuthenticated(), IsAdminUser()]
         return [IsAuthenticated()]
+
+
+class TarifasAplicablesAPIView(MedicionRenderMixin, APIView):
+    """
+    Devuelve las tarifas que se pueden usar en una habitación en un momento
+    dado, de la más barata a la más cara, sin consultar la lista completa.
+    - `GET ?habitacion=<id>&momento=<fecha ISO 8601>`: `momento` es opcional
+      (por defecto, ahora). Cualquier usuario autenticado.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            habitacion_id, momento = _parametros_aplicables(request.query_params)
+            tarifas = tarifas_aplicables(habitacion_id, momento)
+        except ValidationError as e:
+            return Response({"error": e.message}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(_respuesta_aplicables(habitacion_id, momento, tarifas))
+
+
+class TarifasAplicablesAsincronoAPIView(VistaAsincronaMixin, TarifasAplicablesAPIView):
+    """
+    Variante asíncrona de `TarifasAplicablesAPIView` para el servidor ASGI
+    (ver apps/core/asincrono.py). Mientras las tablas locales estén vigentes,
+    no consulta la base.
+    """
+
+    async def get(self, request):
+        try:
+            habitacion_id, momento = _parametros_aplicables(request.query_params)
+            tarifas = await atarifas_aplicables(habitacion_id, momento)
+        except ValidationError as e:
+            return Response({"error": e.message}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(_respuesta_aplicables(habitacion_id, momento, tarifas))
+
+
+def _parametros_aplicables(parametros):
+    """Habitación y momento (por defecto, ahora) de la consulta de tarifas aplicables."""
+    try:
+        habitacion_id = int(parametros.get("habitacion", ""))
+    except ValueError:
+        raise ValidationError("El parámetro 'habitacion' es obligatorio y debe ser un id.")
+
+    momento = timezone.now()
+    if parametros.get("momento"):
+        momento = parse_datetime(parametros["momento"])
+        if momento is None:
+            raise ValidationError("El parámetro 'momento' debe ser una fecha y hora ISO 8601.")
+        if timezone.is_naive(momento):
+            momento = timezone.make_aware(momento)
+    return habitacion_id, momento
+
+
+def _respuesta_aplicables(habitacion_id, momento, tarifas):
+    return {
+        "habitacion": habitacion_id,
+        "momento": momento,
+        "tarifas": [
+            {campo: tarifa[campo] for campo in ("id", "nombre", "horas", "precio", "es_nocturna")}
+            for tarifa in tarifas
+        ],
+    }
@@ -24,7 +24,8 @@ class TurnoAdmin(admin.ModelAdmin):
     readonly_fields = (
         'id', 'usuario', 'tipo_turno', 'fecha_inicio', 'fecha_fin', 'activo',
         'sueldo', 'caja_inicial', 'efectivo_esperado', 'efectivo_reportado',
-        'diferencia', 'caja_final'
+        'diferencia', 'caja_final', 'total_efectivo', 'total_transferencia',
+        'total_tarjeta', 'cantidad_movimientos'
     )
 
     fieldsets = (
@@ -40,6 +41,12 @@ class TurnoAdmin(admin.ModelAdmin):
                 'efectivo_reportado', 'diferencia', 'caja_final'
             )
         }),
+        ('Acumulados de Caja', {
+            'fields': (
+                'total_efectivo', 'total_transferencia', 'total_tarjeta',
+                'cantidad_movimientos'
+            )
+        }),
     )
 
     def has_add_permission(self, request):
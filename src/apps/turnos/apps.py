@@ -1,8 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class TurnosConfig(AppConfig):
     """Configuración de la aplicación 'turnos' de Django."""
     DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
     name = 'apps.turnos'
-    label = 'turnos'
\ No newline at end of file
+    label = 'turnos'
+
+    def ready(self):
+        # Cualquier alta, cierre o baja de un turno invalida la caché del turno activo.
+        from .models import Turno
+        from .turno_activo import registrar_cambio_de_turnos
+
+        post_save.connect(registrar_cambio_de_turnos, sender=Turno, dispatch_uid="turno_activo_post_save")
+        post_delete.connect(registrar_cambio_de_turnos, sender=Turno, dispatch_uid="turno_activo_post_delete")
@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.caja.acumulados import totales_desde_movimientos
+from apps.turnos.models import Turno
+
+
+class Command(BaseCommand):
+    """
+    Verifica (y opcionalmente reconstruye) los acumulados de caja de los turnos
+    comparándolos contra el libro de movimientos, que es la fuente de verdad.
+
+    Uso:
+        python manage.py recalcular_acumulados_turnos            # Solo verifica.
+        python manage.py recalcular_acumulados_turnos --corregir # Corrige las diferencias.
+    """
+    help = "Verifica los acumulados de caja de los turnos contra sus movimientos y, opcionalmente, los corrige."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--corregir",
+            action="store_true",
+            help="Sobrescribe los acumulados que no coincidan con el libro de caja.",
+        )
+        parser.add_argument(
+            "--turno",
+            type=int,
+            action="append",
+            dest="turnos",
+            help="ID de un turno a revisar. Puede repetirse. Por defecto se revisan todos.",
+        )
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=1000,
+            help="Cantidad de turnos procesados por consulta.",
+        )
+
+    def handle(self, *args, **options):
+        turnos = Turno.objects.order_by("id")
+        if options["turnos"]:
+            turnos = turnos.filter(id__in=options["turnos"])
+
+        ids = list(turnos.values_list("id", flat=True))
+        revisados = 0
+        inconsistentes = 0
+
+        for inicio in range(0, len(ids), options["lote"]):
+            lote_ids = ids[inicio:inicio + options["lote"]]
+            with transaction.atomic():
+                # Se bloquean los turnos del lote para comparar contra un estado estable.
+                lote = Turno.objects.select_for_update().filter(id__in=lote_ids)
+                esperados = totales_desde_movimientos(lote)
+
+                for turno in lote.only("id", *Turno.CAMPOS_ACUMULADOS):
+                    revisados += 1
+                    esperado = esperados[turno.id]
+                    diferencias = {
+                        campo: (getattr(turno, campo), valor)
+                        for campo, valor in esperado.items()
+                        if getattr(turno, campo) != valor
+                    }
+                    if not diferencias:
+                        continue
+
+                    inconsistentes += 1
+                    detalle = ", ".join(
+                        f"{campo}: {actual} -> {valor}"
+                        for campo, (actual, valor) in diferencias.items()
+                    )
+                    self.stdout.write(self.style.WARNING(f"Turno #{turno.id}: {detalle}"))
+
+                    if options["corregir"]:
+                        Turno.objects.filter(pk=turno.id).update(**esperado)
+
+        if not inconsistentes:
+            self.stdout.write(self.style.SUCCESS(f"{revisados} turnos revisados, acumulados consistentes."))
+        elif options["corregir"]:
+            self.stdout.write(self.style.SUCCESS(f"{revisados} turnos revisados, {inconsistentes} corregidos."))
+        else:
+            self.stdout.write(self.style.ERROR(
+                f"{revisados} turnos revisados, {inconsistentes} inconsistentes. "
+                "Ejecute con --corregir para reconstruirlos."
+            ))
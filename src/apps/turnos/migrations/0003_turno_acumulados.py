@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:40
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+CAMPO_TOTAL_POR_METODO = {
+    "EFECTIVO": "total_efectivo",
+    "TRANSFERENCIA": "total_transferencia",
+    "TARJETA": "total_tarjeta",
+}
+
+
+def calcular_acumulados(apps, schema_editor):
+    """Inicializa los acumulados de los turnos existentes a partir de sus movimientos."""
+    Turno = apps.get_model("turnos", "Turno")
+    MovimientoCaja = apps.get_model("caja", "MovimientoCaja")
+
+    totales = {}
+    agrupados = (
+        MovimientoCaja.objects
+        .values("turno_id", "metodo_pago")
+        .annotate(total=Sum("monto"), cantidad=Count("id"))
+        .order_by()
+    )
+    for fila in agrupados:
+        acumulado = totales.setdefault(fila["turno_id"], {"cantidad_movimientos": 0})
+        campo = CAMPO_TOTAL_POR_METODO[fila["metodo_pago"]]
+        acumulado[campo] = acumulado.get(campo, 0) + fila["total"]
+        acumulado["cantidad_movimientos"] += fila["cantidad"]
+
+    for turno_id, campos in totales.items():
+        Turno.objects.filter(pk=turno_id).update(**campos)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turnos', '0002_initial'),
+        ('caja', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='turno',
+            name='cantidad_movimientos',
+            field=models.PositiveIntegerField(default=0, help_text='Número de movimientos de caja registrados en el turno.'),
+        ),
+        migrations.AddField(
+            model_name='turno',
+            name='total_efectivo',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Suma de los movimientos en efectivo registrados en el turno.', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='turno',
+            name='total_tarjeta',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Suma de los movimientos con tarjeta registrados en el turno.', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='turno',
+            name='total_transferencia',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Suma de los movimientos por transferencia registrados en el turno.', max_digits=12),
+        ),
+        migrations.RunPython(calcular_acumulados, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turnos', '0003_turno_acumulados'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='turno',
+            index=models.Index(fields=['fecha_inicio'], name='turno_fecha_inicio_idx'),
+        ),
+    ]
@@ -3,6 +3,8 @@ from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
+from .signals import turno_cerrado
+
 Usuario = settings.AUTH_USER_MODEL
 
 
@@ -18,6 +20,10 @@ class Turno(models.Model):
             ("cerrar_turno", "Puede cerrar turno"),
             ("ver_turnos", "Puede ver turnos"),
         ]
+        indexes = [
+            # Los reportes filtran y ordenan los turnos por rangos de fecha de inicio.
+            models.Index(fields=["fecha_inicio"], name="turno_fecha_inicio_idx"),
+        ]
 
     class TipoTurno(models.TextChoices):
         """Define si el turno es de día o de noche."""
@@ -102,6 +108,45 @@ class Turno(models.Model):
         help_text="Efectivo final en caja después de tomar el sueldo (es igual al efectivo reportado).",
     )
 
+    # Totales acumulados (materializados) de los movimientos de caja del turno.
+    # Se actualizan de forma atómica cada vez que se registra un movimiento,
+    # por lo que el cierre y el resumen del turno no necesitan recorrer el libro de caja.
+    total_efectivo = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text="Suma de los movimientos en efectivo registrados en el turno.",
+    )
+
+    total_transferencia = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text="Suma de los movimientos por transferencia registrados en el turno.",
+    )
+
+    total_tarjeta = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text="Suma de los movimientos con tarjeta registrados en el turno.",
+    )
+
+    cantidad_movimientos = models.PositiveIntegerField(
+        default=0,
+        help_text="Número de movimientos de caja registrados en el turno.",
+    )
+
+    # Los acumulados solo se modifican con actualizaciones atómicas (`F()`) desde
+    # `apps.caja.acumulados`. Se excluyen de los guardados completos para que una
+    # instancia en memoria desactualizada nunca sobrescriba los valores reales.
+    CAMPOS_ACUMULADOS = (
+        "total_efectivo",
+        "total_transferencia",
+        "total_tarjeta",
+        "cantidad_movimientos",
+    )
+
     # Métodos de dominio
     def clean(self):
         """Aplica validaciones de negocio a nivel de modelo."""
@@ -109,10 +154,26 @@ class Turno(models.Model):
             raise ValidationError("La caja inicial no puede ser negativa.")
 
     def save(self, *args, **kwargs):
-        """Asegura que las validaciones se ejecuten antes de guardar."""
+        """
+        Asegura que las validaciones se ejecuten antes de guardar y protege
+        los acumulados de caja en las actualizaciones completas.
+        """
         self.full_clean()
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.CAMPOS_ACUMULADOS
+            ]
         super().save(*args, **kwargs)
 
+    @property
+    def total_ingresos(self):
+        """
+        Suma de todos los ingresos del turno, sin importar el método de pago
+        (incluida la tarjeta), como en los reportes y el resumen del turno.
+        """
+        return self.total_efectivo + self.total_transferencia + self.total_tarjeta
+
     def cerrar_turno(
         self,
         *,
@@ -149,6 +210,7 @@ class Turno(models.Model):
             'efectivo_esperado', 'efectivo_reportado', 'sueldo',
             'diferencia', 'caja_final', 'fecha_fin', 'activo'
         ])
+        turno_cerrado.send(sender=Turno, turno=self)
 
     def __str__(self):
         """Representación en cadena para legibilidad."""
@@ -1,14 +1,13 @@
 from rest_framework import serializers
+from apps.core.medicion import MedicionSerializerMixin
 from .models import Turno
-from django.db.models import Sum
-from apps.caja.models import MovimientoCaja
 from apps.estancias.models import Estancia
 from apps.users.serializers import UserSerializer
 
 
 
 
-class TurnoListSerializer(serializers.ModelSerializer):
+class TurnoListSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     """
     Serializador de solo lectura para listar los turnos de forma resumida.
     Usado para el endpoint de listado y para devolver el objeto completo al crear.
@@ -24,7 +23,7 @@ class TurnoListSerializer(serializers.ModelSerializer):
         ]
 
 
-class InicioTurnoSerializer(serializers.ModelSerializer):
+class InicioTurnoSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     """
     Serializador de escritura para validar los datos de entrada al iniciar un turno.
     """
@@ -42,7 +41,7 @@ class InicioTurnoSerializer(serializers.ModelSerializer):
         return value
 
 
-class CerrarTurnoSerializer(serializers.Serializer):
+class CerrarTurnoSerializer(MedicionSerializerMixin, serializers.Serializer):
     """
     Serializador de escritura para validar los datos de entrada al cerrar un turno.
     No está ligado a un modelo, solo define la estructura de la petición.
@@ -61,7 +60,7 @@ class CerrarTurnoSerializer(serializers.Serializer):
     )
 
 
-class TurnoResumenSerializer(serializers.ModelSerializer):
+class TurnoResumenSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     """
     Serializador de solo lectura para presentar un resumen completo de un turno cerrado.
     Calcula todos los totales y contadores relacionados con el turno.
@@ -89,13 +88,14 @@ class TurnoResumenSerializer(serializers.ModelSerializer):
 
     def get_totales_movimientos(self, obj):
         """
-        Método auxiliar para evitar recalcular los totales.
-        Se ejecuta una vez y almacena los resultados en el contexto del serializador.
+        Método auxiliar que agrupa los totales por método de pago.
+        Los valores provienen de los acumulados del turno, sin consultar los movimientos.
         """
-        if not hasattr(self, '_totales_movimientos'):
-            movimientos = MovimientoCaja.objects.filter(turno=obj).values('metodo_pago').annotate(total=Sum('monto'))
-            self._totales_movimientos = {m['metodo_pago']: m['total'] for m in movimientos}
-        return self._totales_movimientos
+        return {
+            'EFECTIVO': obj.total_efectivo,
+            'TRANSFERENCIA': obj.total_transferencia,
+            'TARJETA': obj.total_tarjeta,
+        }
 
     def get_total_efectivo(self, obj):
         return self.get_totales_movimientos(obj).get('EFECTIVO', 0)
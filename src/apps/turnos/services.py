@@ -1,10 +1,7 @@
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import Sum
-from apps.estancias.models import Estancia
 from .models import Turno
-from apps.caja.models import MovimientoCaja
 
 
 @transaction.atomic
@@ -45,8 +42,9 @@ def cerrar_turno_service(*, usuario, efectivo_reportado, sueldo):
     Orquesta las validaciones, el cálculo de totales y el cierre del turno.
     """
     try:
-        # Busca el turno activo específico del usuario.
-        turno = Turno.objects.get(activo=True, usuario=usuario)
+        # Busca el turno activo específico del usuario. La fila se bloquea para que
+        # ningún movimiento concurrente modifique los acumulados durante el cierre.
+        turno = Turno.objects.select_for_update().get(activo=True, usuario=usuario)
     except Turno.DoesNotExist:
         # Si no tiene turno propio, verificamos si hay algún turno activo para dar un mensaje claro.
         if Turno.objects.filter(activo=True).exists():
@@ -57,22 +55,13 @@ def cerrar_turno_service(*, usuario, efectivo_reportado, sueldo):
     if not turno.activo:
         raise ValidationError("El turno ya está cerrado")
 
-    # Calcula los totales de ingresos del turno desde los movimientos de caja.
-    movimientos = MovimientoCaja.objects.filter(turno=turno)
-
-    total_efectivo = (
-        movimientos
-        .filter(metodo_pago="EFECTIVO")
-        .aggregate(total=Sum("monto"))["total"] or 0
-    )
-
-    total_transferencia = (
-        movimientos
-        .filter(metodo_pago="TRANSFERENCIA")
-        .aggregate(total=Sum("monto"))["total"] or 0
-    )
-
-    total_ingresos = total_efectivo + total_transferencia
+    # Los totales de ingresos se leen de los acumulados del turno, que se
+    # mantienen al registrar cada movimiento de caja. Como antes de los
+    # acumulados, el cierre solo considera efectivo y transferencia: los pagos
+    # con tarjeta no cuentan para `sin_ingresos` (los reportes sí los suman,
+    # ver `Turno.total_ingresos`).
+    total_efectivo = turno.total_efectivo
+    total_ingresos = turno.total_efectivo + turno.total_transferencia
 
     # Bandera informativa para saber si el turno tuvo actividad económica.
     sin_ingresos = total_ingresos == 0
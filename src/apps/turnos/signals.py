@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Se envía cuando un turno se cierra, después de guardar su estado final.
+# Argumentos: `turno` (la instancia del turno ya cerrado).
+turno_cerrado = Signal()
@@ -1,13 +1,27 @@
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 from decimal import Decimal
+from io import StringIO
 from django.utils import timezone
+from django.core.management import call_command
 
 from apps.users.models import Usuario
 from .models import Turno
+from .services import cerrar_turno_service
+from .turno_activo import (
+    CLAVE_VERSION,
+    confirmar_turno_activo,
+    invalidar_cache_local,
+    obtener_turno_activo,
+)
+from apps.core.versiones import incrementar_version
 from apps.caja.models import MovimientoCaja
 from apps.habitaciones.models import TipoHabitacion, Habitacion
 from apps.tarifas.models import Tarifa
@@ -152,6 +166,19 @@ class TurnoAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['sin_ingresos'])
 
+    def test_cierre_sin_ingresos_no_cuenta_pagos_con_tarjeta(self):
+        """Al cerrar, solo efectivo y transferencia cuentan como ingresos; los reportes suman la tarjeta."""
+        turno = Turno.objects.create(usuario=self.employee_auth, tipo_turno="DIA", caja_inicial=1000, activo=True)
+        # La caja no registra pagos con tarjeta, pero el acumulado existe (datos históricos).
+        Turno.objects.filter(pk=turno.pk).update(total_tarjeta=80, cantidad_movimientos=1)
+
+        turno, sin_ingresos = cerrar_turno_service(
+            usuario=self.employee_auth, efectivo_reportado=Decimal("1000.00"), sueldo=Decimal("0"),
+        )
+
+        self.assertTrue(sin_ingresos)
+        self.assertEqual(turno.total_ingresos, Decimal("80.00"))
+
     def test_admin_puede_listar_turnos(self):
         """Prueba que un admin puede listar todos los turnos."""
         Turno.objects.create(usuario=self.employee_auth, tipo_turno="DIA", activo=False)
@@ -203,3 +230,157 @@ class TurnoAPITests(APITestCase):
                 caja_inicial=-100,
                 activo=True
             )
+
+
+class TurnoAcumuladosTests(APITestCase):
+    def setUp(self):
+        self.employee = Usuario.objects.create_user(username='emp', password='password123', rol=Usuario.Rol.EMPLEADO)
+        self.producto = Producto.objects.create(nombre="Refresco", precio=50)
+        self.turno = Turno.objects.create(usuario=self.employee, tipo_turno="DIA", caja_inicial=1000, activo=True)
+
+    def test_movimientos_actualizan_acumulados(self):
+        """Cada movimiento registrado suma a los acumulados de su método de pago."""
+        MovimientoCaja.objects.create(turno=self.turno, monto=100, metodo_pago="EFECTIVO", tipo="PRODUCTO", producto=self.producto)
+        MovimientoCaja.objects.create(turno=self.turno, monto=50, metodo_pago="EFECTIVO", tipo="PRODUCTO", producto=self.producto)
+        MovimientoCaja.objects.create(turno=self.turno, monto=70, metodo_pago="TRANSFERENCIA", tipo="PRODUCTO", producto=self.producto)
+
+        self.turno.refresh_from_db()
+        self.assertEqual(self.turno.total_efectivo, Decimal("150.00"))
+        self.assertEqual(self.turno.total_transferencia, Decimal("70.00"))
+        self.assertEqual(self.turno.cantidad_movimientos, 3)
+        self.assertEqual(self.turno.total_ingresos, Decimal("220.00"))
+
+    def test_un_solo_update_del_turno_por_movimiento(self):
+        """Después del primero, cada movimiento actualiza la fila del turno con una sola sentencia."""
+        MovimientoCaja.objects.create(turno=self.turno, monto=100, metodo_pago="EFECTIVO", tipo="PRODUCTO", producto=self.producto)
+
+        with CaptureQueriesContext(connection) as consultas:
+            MovimientoCaja.objects.create(turno=self.turno, monto=50, metodo_pago="EFECTIVO", tipo="PRODUCTO", producto=self.producto)
+
+        actualizaciones = [q["sql"] for q in consultas.captured_queries if q["sql"].startswith('UPDATE "turnos_turno"')]
+        self.assertEqual(len(actualizaciones), 1)
+        self.turno.refresh_from_db()
+        self.assertEqual(self.turno.cantidad_movimientos, 2)
+
+    def test_guardado_completo_no_sobrescribe_acumulados(self):
+        """Una instancia desactualizada en memoria no pisa los acumulados al guardarse."""
+        MovimientoCaja.objects.create(turno=self.turno, monto=100, metodo_pago="EFECTIVO", tipo="PRODUCTO", producto=self.producto)
+        self.turno.tipo_turno = "NOCHE"
+        self.turno.save()
+
+        self.turno.refresh_from_db()
+        self.assertEqual(self.turno.tipo_turno, "NOCHE")
+        self.assertEqual(self.turno.total_efectivo, Decimal("100.00"))
+
+    def test_no_se_acumula_en_turno_cerrado_concurrentemente(self):
+        """Si el turno se cerró en la base de datos, el movimiento se rechaza y no se guarda."""
+        Turno.objects.filter(pk=self.turno.pk).update(activo=False)
+
+        with self.assertRaises(ValidationError):
+            MovimientoCaja.objects.create(turno=self.turno, monto=100, metodo_pago="EFECTIVO", tipo="PRODUCTO", producto=self.producto)
+        self.assertFalse(MovimientoCaja.objects.exists())
+
+    def test_comando_recalcula_acumulados(self):
+        """El comando detecta acumulados inconsistentes y los corrige con --corregir."""
+        MovimientoCaja.objects.create(turno=self.turno, monto=100, metodo_pago="EFECTIVO", tipo="PRODUCTO", producto=self.producto)
+        Turno.objects.filter(pk=self.turno.pk).update(total_efectivo=0, cantidad_movimientos=0)
+
+        salida = StringIO()
+        call_command('recalcular_acumulados_turnos', stdout=salida)
+        self.assertIn("1 inconsistentes", salida.getvalue())
+        self.turno.refresh_from_db()
+        self.assertEqual(self.turno.total_efectivo, Decimal("0.00"))
+
+        call_command('recalcular_acumulados_turnos', '--corregir', stdout=StringIO())
+        self.turno.refresh_from_db()
+        self.assertEqual(self.turno.total_efectivo, Decimal("100.00"))
+        self.assertEqual(self.turno.cantidad_movimientos, 1)
+
+
+class TurnoActivoCacheTests(TransactionTestCase):
+    """
+    La caché del turno activo solo se usa fuera de transacciones, por eso
+    estas pruebas no envuelven cada caso en una transacción.
+    """
+
+    def setUp(self):
+        invalidar_cache_local()
+        self.addCleanup(invalidar_cache_local)
+        self.admin = Usuario.objects.create_user(username='admin', password='password123', rol=Usuario.Rol.ADMINISTRADOR)
+        self.empleado = Usuario.objects.create_user(username='empleado', password='password123', rol=Usuario.Rol.EMPLEADO)
+
+    def test_segunda_resolucion_no_consulta_la_base(self):
+        turno = Turno.objects.create(usuario=self.empleado, tipo_turno="DIA", activo=True)
+        self.assertEqual(obtener_turno_activo(self.empleado).pk, turno.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(obtener_turno_activo(self.empleado).pk, turno.pk)
+
+    def test_cierre_invalida_la_cache_del_proceso(self):
+        turno = Turno.objects.create(usuario=self.empleado, tipo_turno="DIA", activo=True)
+        self.assertIsNotNone(obtener_turno_activo(self.empleado))
+
+        turno.activo = False
+        turno.save()
+        self.assertIsNone(obtener_turno_activo(self.empleado))
+
+    def test_cambio_en_otro_proceso_se_detecta_por_version(self):
+        turno = Turno.objects.create(usuario=self.empleado, tipo_turno="DIA", activo=True)
+        self.assertIsNotNone(obtener_turno_activo(self.empleado))
+
+        # Otro proceso cierra el turno: sus señales no invalidan la caché de este proceso.
+        Turno.objects.filter(pk=turno.pk).update(activo=False)
+        incrementar_version(CLAVE_VERSION)
+
+        with override_settings(TURNO_ACTIVO_VERIFICACION_SEGUNDOS=0):
+            self.assertIsNone(obtener_turno_activo(self.empleado))
+
+    def test_prioriza_el_turno_propio(self):
+        turno_admin = Turno.objects.create(usuario=self.admin, tipo_turno="DIA", activo=True)
+        turno_empleado = Turno.objects.create(usuario=self.empleado, tipo_turno="DIA", activo=True)
+
+        self.assertEqual(obtener_turno_activo(self.empleado).pk, turno_empleado.pk)
+        self.assertEqual(obtener_turno_activo(self.admin).pk, turno_admin.pk)
+
+    def test_confirmar_rechaza_un_turno_cerrado_en_la_base(self):
+        turno = Turno.objects.create(usuario=self.empleado, tipo_turno="DIA", activo=True)
+        copia = obtener_turno_activo(self.empleado)
+        Turno.objects.filter(pk=turno.pk).update(activo=False)
+
+        with transaction.atomic(), self.assertRaises(ValidationError):
+            confirmar_turno_activo(copia)
+
+
+class TurnoActivoAsincronoTests(APITestCase):
+    def setUp(self):
+        # La variante asíncrona usa la copia local aunque la prueba corra en una transacción.
+        invalidar_cache_local()
+        self.addCleanup(invalidar_cache_local)
+        self.empleado = Usuario.objects.create_user(username='empleado', password='password123', rol=Usuario.Rol.EMPLEADO)
+        self.client.force_authenticate(user=self.empleado)
+        self.url = reverse('turno-activo-async')
+
+    def test_misma_respuesta_que_la_vista_sincrona_y_sin_consultar_el_turno(self):
+        Turno.objects.create(usuario=self.empleado, tipo_turno="DIA", caja_inicial=500, activo=True)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), self.client.get(reverse('turno-activo')).json())
+
+        # El turno sale de la copia local.
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_autenticacion_y_errores_de_drf(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), {"detail": "No hay un turno activo."})
+        self.assertEqual(self.client.post(self.url).status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json(), self.client.get(reverse('turno-activo')).json())
+
+        # Las mismas clases de autenticación que las demás vistas.
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.empleado)}")
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
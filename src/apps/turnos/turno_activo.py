@@ -0,0 +1,107 @@
+"""
+Resolución del turno activo con caché local al proceso.
+
+Los endpoints de recepción (estancias, caja) necesitan el turno activo en cada
+petición. En lugar de consultarlo siempre, cada proceso guarda en memoria los
+turnos activos y los invalida:
+
+- De inmediato, en el mismo proceso, cuando se guarda o elimina un turno
+  (señales `post_save` / `post_delete`), lo que cubre `iniciar_turno` y
+  `cerrar_turno_service`.
+- En los demás procesos, mediante el sello de versión `turnos_activos` en la
+  base de datos, que se compara como máximo una vez cada
+  `TURNO_ACTIVO_VERIFICACION_SEGUNDOS`.
+
+Entre verificaciones otro proceso podría ver todavía un turno recién cerrado;
+por eso las escrituras no confían en la caché: los movimientos de caja solo se
+suman a un turno si sigue activo en la base de datos (`acumular_en_turno`) y
+las operaciones sin movimiento usan `confirmar_turno_activo`.
+"""
+import copy
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+
+from apps.core.versiones import CacheVersionada, incrementar_version
+from .models import Turno
+
+
+CLAVE_VERSION = "turnos_activos"
+
+
+def _segundos_entre_verificaciones():
+    return getattr(settings, "TURNO_ACTIVO_VERIFICACION_SEGUNDOS", 2)
+
+
+def _cargar_turnos_activos():
+    return tuple(
+        Turno.objects.filter(activo=True).select_related("usuario").order_by("id")
+    )
+
+
+_cache = CacheVersionada(CLAVE_VERSION, _cargar_turnos_activos, _segundos_entre_verificaciones)
+
+
+def invalidar_cache_local():
+    """Descarta la copia local de los turnos activos de este proceso."""
+    _cache.invalidar()
+
+
+def turnos_activos():
+    """
+    Devuelve los turnos activos (con su usuario), usando la copia local mientras
+    el sello de versión de la base de datos no cambie.
+    """
+    # Dentro de una transacción puede haber cambios aún no confirmados que la
+    # caché no refleja, así que se consulta directamente.
+    if connection.in_atomic_block:
+        return _cargar_turnos_activos()
+    return _cache.obtener()
+
+
+def obtener_turno_activo(usuario=None):
+    """
+    Turno activo con el que debe operar `usuario`: el suyo si tiene uno; si no,
+    el primero que se abrió. Devuelve None si no hay turnos activos.
+    Se entrega una copia, de modo que modificarla no altera la caché.
+    """
+    return _turno_de_usuario(turnos_activos(), usuario)
+
+
+async def aobtener_turno_activo(usuario=None):
+    """
+    Como `obtener_turno_activo`, para vistas asíncronas (que no se ejecutan
+    dentro de una transacción, así que siempre pueden usar la copia local).
+    """
+    return _turno_de_usuario(await _cache.aobtener(), usuario)
+
+
+def _turno_de_usuario(turnos, usuario):
+    if not turnos:
+        return None
+
+    usuario_id = getattr(usuario, "pk", None)
+    turno = next((t for t in turnos if t.usuario_id == usuario_id), turnos[0])
+    return copy.copy(turno)
+
+
+def confirmar_turno_activo(turno):
+    """
+    Bloquea la fila del turno y verifica en la base de datos que siga activo.
+    Para escrituras que no registran movimientos de caja; debe llamarse dentro
+    de una transacción.
+    """
+    if not Turno.objects.select_for_update().filter(pk=turno.pk, activo=True).exists():
+        raise ValidationError("No hay un turno activo")
+
+
+def registrar_cambio_de_turnos(**kwargs):
+    """
+    Receptor de las señales de `Turno`: incrementa el sello de versión (en la
+    misma transacción que el cambio) e invalida la copia local, ahora y al
+    confirmar la transacción.
+    """
+    incrementar_version(CLAVE_VERSION)
+    invalidar_cache_local()
+    transaction.on_commit(invalidar_cache_local)
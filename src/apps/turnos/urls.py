@@ -1,7 +1,9 @@
 # Define las rutas de la API para la aplicación 'turnos'.
 
 from django.urls import path
-from .views import IniciarTurnoView, CerrarTurnoAPIView, TurnoListAPIView, TurnoActivoAPIView
+from .views import (
+    IniciarTurnoView, CerrarTurnoAPIView, TurnoListAPIView, TurnoActivoAPIView, TurnoActivoAsincronoAPIView,
+)
 
 
 urlpatterns = [
@@ -9,6 +11,8 @@ urlpatterns = [
     path("", TurnoListAPIView.as_view(), name="turnos-list"),
     # Endpoint para obtener el turno activo.
     path("activo/", TurnoActivoAPIView.as_view(), name="turno-activo"),
+    # Variante asíncrona del turno activo (servidor ASGI).
+    path("activo/async/", TurnoActivoAsincronoAPIView.as_view(), name="turno-activo-async"),
     # Endpoint para que un empleado inicie su turno.
     path("iniciar/", IniciarTurnoView.as_view(), name="iniciar-turno"),
     # Endpoint para que un empleado cierre su turno.
@@ -11,11 +11,14 @@ from rest_framework.exceptions import NotFound
 from .serializers import InicioTurnoSerializer, CerrarTurnoSerializer, TurnoListSerializer, TurnoResumenSerializer
 from .services import iniciar_turno, cerrar_turno_service
 from .models import Turno
+from .turno_activo import aobtener_turno_activo, obtener_turno_activo
 from django.core.exceptions import ValidationError # Importar ValidationError de Django
+from apps.core.asincrono import VistaAsincronaMixin
 from apps.core.permissions import IsAdminUser, IsEmpleado, IsOnlyInvitado
+from apps.core.medicion import MedicionRenderMixin
 
 
-class TurnoListAPIView(generics.ListAPIView):
+class TurnoListAPIView(MedicionRenderMixin, generics.ListAPIView):
     """
     Endpoint de solo lectura para listar todos los turnos (históricos y activos).
     - `GET`: Solo los administradores pueden ver la lista de turnos.
@@ -33,7 +36,7 @@ class TurnoListAPIView(generics.ListAPIView):
 
 
 @method_decorator(csrf_exempt, name="dispatch")
-class IniciarTurnoView(APIView):
+class IniciarTurnoView(MedicionRenderMixin, APIView):
     """Endpoint para iniciar un nuevo turno."""
     # Permite a Admins, Empleados e Invitados iniciar un turno.
     permission_classes = [IsAuthenticated, (IsEmpleado | IsOnlyInvitado)]
@@ -66,7 +69,7 @@ class IniciarTurnoView(APIView):
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
 
-class CerrarTurnoAPIView(APIView):
+class CerrarTurnoAPIView(MedicionRenderMixin, APIView):
     """Endpoint para cerrar el turno activo."""
     # Permite a Admins, Empleados e Invitados cerrar un turno.
     permission_classes = [IsAuthenticated, (IsEmpleado | IsOnlyInvitado)]
@@ -107,7 +110,7 @@ class CerrarTurnoAPIView(APIView):
         )
 
 
-class TurnoActivoAPIView(APIView):
+class TurnoActivoAPIView(MedicionRenderMixin, APIView):
     """
     Endpoint para obtener el turno activo.
     - `GET`: Devuelve el turno activo si existe, de lo contrario 404.
@@ -117,21 +120,27 @@ class TurnoActivoAPIView(APIView):
     def get(self, request, *args, **kwargs):
         """
         Busca y devuelve el turno activo.
+        Prioridad: el turno del usuario actual; si no tiene, el primero que se abrió.
         """
-        # Buscamos todos los turnos activos
-        turnos_activos = Turno.objects.filter(activo=True).select_related('usuario')
-
-        if not turnos_activos.exists():
+        turno = obtener_turno_activo(request.user)
+        if turno is None:
             raise NotFound(detail="No hay un turno activo.")
 
-        # Prioridad: Devolver el turno del usuario actual si tiene uno
-        turno_usuario = next((t for t in turnos_activos if t.usuario == request.user), None)
+        serializer = TurnoListSerializer(turno)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
-        if turno_usuario:
-            serializer = TurnoListSerializer(turno_usuario)
-            return Response(serializer.data, status=status.HTTP_200_OK)
 
-        # Si el usuario no tiene turno, pero hay otros activos, devolvemos el primero.
-        serializer = TurnoListSerializer(turnos_activos.first())
-        return Response(serializer.data, status=status.HTTP_200_OK)
+class TurnoActivoAsincronoAPIView(VistaAsincronaMixin, TurnoActivoAPIView):
+    """
+    Variante asíncrona de `TurnoActivoAPIView` para el servidor ASGI (ver
+    apps/core/asincrono.py). Mientras la copia local de los turnos activos
+    esté vigente, no consulta la base.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        turno = await aobtener_turno_activo(request.user)
+        if turno is None:
+            raise NotFound(detail="No hay un turno activo.")
 
+        serializer = TurnoListSerializer(turno)
+        return Response(serializer.data, status=status.HTTP_200_OK)
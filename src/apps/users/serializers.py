@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from apps.core.medicion import MedicionSerializerMixin
 from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from rest_framework.exceptions import AuthenticationFailed
@@ -6,7 +7,7 @@ from .models import Usuario
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     """
     Serializador de solo lectura para mostrar la información de un usuario.
     Diseñado para ser seguro, no expone campos sensibles como la contraseña.
@@ -35,7 +36,7 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         return data
 
 
-class UserRegistrationSerializer(serializers.ModelSerializer):
+class UserRegistrationSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     """
     Serializador de escritura para registrar nuevos usuarios (empleados o administradores).
     Maneja la validación de datos y el hasheo de la contraseña.
@@ -71,7 +72,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class LoginInvitadoSerializer(serializers.Serializer):
+class LoginInvitadoSerializer(MedicionSerializerMixin, serializers.Serializer):
     """
     Serializador de escritura para validar los datos de entrada del login de invitado.
     """
@@ -85,7 +86,7 @@ class LoginInvitadoSerializer(serializers.Serializer):
 
         return datos
 
-class UserUpdateSerializer(serializers.ModelSerializer):
+class UserUpdateSerializer(MedicionSerializerMixin, serializers.ModelSerializer):
     """
     Serializador para actualizar usuarios existentes.
     Permite modificar roles y estado activo.
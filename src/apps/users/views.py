@@ -7,18 +7,19 @@ from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers import LoginInvitadoSerializer, UserRegistrationSerializer, MyTokenObtainPairSerializer, UserSerializer, UserUpdateSerializer
 from apps.core.permissions import IsAdminUser
+from apps.core.medicion import MedicionRenderMixin
 from .services import login_invitado_service
 from .models import Usuario
 
 
-class MyTokenObtainPairView(TokenObtainPairView):
+class MyTokenObtainPairView(MedicionRenderMixin, TokenObtainPairView):
     """
     Vista de login personalizada para devolver datos del usuario junto con los tokens.
     Hereda de la vista de JWT y especifica nuestro serializador personalizado.
     """
     serializer_class = MyTokenObtainPairSerializer
 
-class UserRegistrationAPIView(generics.CreateAPIView):
+class UserRegistrationAPIView(MedicionRenderMixin, generics.CreateAPIView):
     """
     Vista para que un administrador registre nuevos usuarios (empleados/admins).
     Solo accesible por administradores autenticados.
@@ -34,7 +35,7 @@ class UserRegistrationAPIView(generics.CreateAPIView):
         self.perform_create(serializer)
         return Response(UserSerializer(serializer.instance).data, status=status.HTTP_201_CREATED)
 
-class VistaLoginInvitado(generics.GenericAPIView):
+class VistaLoginInvitado(MedicionRenderMixin, generics.GenericAPIView):
     """
     Vista para el login de invitados. No requiere autenticación previa.
     Crea un usuario temporal de tipo 'INVITADO' y le genera tokens JWT.
@@ -62,7 +63,7 @@ class VistaLoginInvitado(generics.GenericAPIView):
         })
 
 
-class LogoutAPIView(APIView):
+class LogoutAPIView(MedicionRenderMixin, APIView):
     """
     Vista para invalidar el refresh token del usuario (logout).
     Requiere que el usuario esté autenticado.
@@ -87,7 +88,7 @@ class LogoutAPIView(APIView):
             return Response({"error": "Token de refresco inválido o no proporcionado."}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class CurrentUserAPIView(APIView):
+class CurrentUserAPIView(MedicionRenderMixin, APIView):
     """
     Vista para obtener los datos del usuario actualmente autenticado.
     """
@@ -100,7 +101,7 @@ class CurrentUserAPIView(APIView):
         serializer = UserSerializer(request.user)
         return Response(serializer.data)
 
-class UserListAPIView(generics.ListAPIView):
+class UserListAPIView(MedicionRenderMixin, generics.ListAPIView):
     """
     Vista para listar todos los usuarios registrados en el sistema.
     Solo accesible por administradores.
@@ -109,7 +110,7 @@ class UserListAPIView(generics.ListAPIView):
     queryset = Usuario.objects.all().order_by('-date_joined')
     serializer_class = UserSerializer
 
-class UserDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class UserDetailAPIView(MedicionRenderMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Vista para obtener, actualizar o eliminar un usuario específico.
     Solo accesible por administradores.
@@ -0,0 +1,539 @@
+"""
+Benchmark de todos los endpoints de la API sobre datos sintéticos.
+
+Si la base no tiene turnos, la llena con el comando `generar_datos_sinteticos`
+(60 días y 300 habitaciones por defecto). Después recorre las rutas de
+`config/urls.py` (excepto el admin de Django) y mide cada escenario con el
+cliente de pruebas de DRF, pasando por todos los middlewares:
+- p50 y p95 del tiempo de respuesta sobre `--repeticiones` peticiones,
+- el número de consultas a la base de datos de una petición,
+- el pico de memoria de Python (tracemalloc) de una petición.
+
+Las peticiones que escriben se ejecutan en una transacción que se revierte,
+así que todas las repeticiones ven los mismos datos. Al final se listan las
+rutas sin escenario, para que una ruta nueva no quede sin medir.
+
+Con `--guardar` los resultados se escriben como línea base en JSON; con
+`--comparar` se comparan contra una línea base y el proceso termina con
+código 1 si algún escenario hace más consultas o su mediana empeoró más que
+la tolerancia respecto a los demás escenarios (ver `factor_de_carga`). Con
+pocas muestras el p95 varía demasiado entre ejecuciones para usarlo como
+criterio; se informa como referencia. Los tiempos solo son comparables en la misma máquina y con el
+mismo volumen de datos; el número de consultas, en cualquiera.
+
+Uso (desde `src/`):
+    python -m benchmarks.api --db /tmp/api.sqlite3 --guardar benchmarks/linea_base/api.json
+    python -m benchmarks.api --db /tmp/api.sqlite3 --comparar benchmarks/linea_base/api.json
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from typing import NamedTuple
+
+from .entorno import argumentos_base, configurar_django, imprimir_resultados
+
+
+CONTRASENA = "benchmark-api"
+TOKEN_METRICAS = "benchmark-api"
+
+# Rutas que no se miden, con el motivo.
+EXCLUIDAS = {
+    "flujo-eventos": "flujo SSE que permanece abierto; su costo es por conexión, no por petición.",
+}
+
+
+class Escenario(NamedTuple):
+    ruta: str  # nombre de la URL, o el patrón si no tiene nombre
+    metodo: str = "get"
+    # "admin", "empleado" (dueño del turno activo) o None (anónimo).
+    usuario: str = "empleado"
+    kwargs: dict = None
+    params: dict = None  # query string de las peticiones GET
+    datos: dict = None  # cuerpo JSON de las demás
+    encabezados: dict = None
+    variante: str = ""
+
+    @property
+    def nombre(self):
+        nombre = f"{self.metodo.upper()} {self.ruta}"
+        return f"{nombre} [{self.variante}]" if self.variante else nombre
+
+
+# ==========================
+# Datos
+# ==========================
+
+class DatosInsuficientes(Exception):
+    """La base no tiene los objetos que necesitan los escenarios."""
+
+
+def preparar_contexto():
+    """Objetos de la base que usan los escenarios."""
+    from django.contrib.auth import get_user_model
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from apps.estancias.models import Estancia
+    from apps.habitaciones.models import Habitacion, TipoHabitacion
+    from apps.productos.models import Producto
+    from apps.reportes.models import ExportacionReporte
+    from apps.reportes.services_exportaciones import procesar_pendientes, solicitar_exportacion
+    from apps.tarifas.models import Tarifa
+    from apps.tarifas.resolucion import tarifas_aplicables
+    from apps.turnos.models import Turno
+
+    Usuario = get_user_model()
+    turno = Turno.objects.filter(activo=True).select_related("usuario").order_by("id").first()
+    admin = Usuario.objects.filter(rol=Usuario.Rol.ADMINISTRADOR).order_by("id").first()
+    estancia = Estancia.objects.filter(activa=True).order_by("id").first()
+    producto = Producto.objects.filter(activo=True, stock__gt=10).order_by("id").first()
+    faltantes = [
+        descripcion for objeto, descripcion in (
+            (turno, "un turno activo"),
+            (admin, "un administrador"),
+            (estancia, "una estancia activa"),
+            (producto, "un producto activo con stock"),
+        ) if objeto is None
+    ]
+    if faltantes:
+        raise DatosInsuficientes(
+            f"la base no tiene {', '.join(faltantes)}. Genera una base nueva (--db) con datos sintéticos."
+        )
+
+    empleado = turno.usuario
+    if not admin.check_password(CONTRASENA):
+        admin.set_password(CONTRASENA)
+        admin.save(update_fields=["password"])
+    libre = (
+        Usuario.objects.filter(rol=Usuario.Rol.EMPLEADO, is_active=True)
+        .exclude(turnos__activo=True).order_by("id").first()
+    )
+
+    habitacion_libre = Habitacion.objects.filter(
+        activa=True, estado=Habitacion.Estado.DISPONIBLE,
+    ).order_by("id").first()
+    en_limpieza = Habitacion.objects.filter(estado=Habitacion.Estado.LIMPIEZA).order_by("id").first()
+    # Una habitación libre para abrir estancias y otra en limpieza para
+    # marcarla disponible (si no hay, se toma una segunda libre).
+    disponibles = 1 if en_limpieza else 2
+    if Habitacion.objects.filter(activa=True, estado=Habitacion.Estado.DISPONIBLE).count() < disponibles:
+        raise DatosInsuficientes(
+            f"los escenarios necesitan {disponibles} habitación(es) disponible(s) y la base no las tiene "
+            "(con pocas habitaciones, los datos sintéticos las dejan ocupadas). "
+            "Genera una base nueva (--db) con más --habitaciones."
+        )
+    tarifa = tarifas_aplicables(habitacion_libre.id)[0]
+    if en_limpieza is None:
+        en_limpieza = Habitacion.objects.filter(
+            activa=True, estado=Habitacion.Estado.DISPONIBLE,
+        ).exclude(id=habitacion_libre.id).order_by("id").first()
+        en_limpieza.estado = Habitacion.Estado.LIMPIEZA
+        en_limpieza.save(update_fields=["estado"])
+
+    # Una exportación completada del empleado para medir la descarga.
+    exportacion = (
+        ExportacionReporte.objects.filter(usuario=empleado, estado=ExportacionReporte.Estado.COMPLETADA)
+        .order_by("-id").first()
+    )
+    if exportacion is None or not exportacion.archivo.storage.exists(exportacion.archivo.name):
+        hoy = turno.fecha_inicio.date()
+        exportacion = solicitar_exportacion(
+            usuario=empleado,
+            formato=ExportacionReporte.Formato.EXCEL,
+            fecha_desde=hoy - timedelta(days=7),
+            fecha_hasta=hoy,
+        )
+        # Como el worker: la exportación se toma de la cola antes de procesarla.
+        procesar_pendientes()
+        exportacion.refresh_from_db()
+
+    return {
+        "usuarios": {"admin": admin, "empleado": empleado},
+        "libre": libre,
+        "turno": turno,
+        "habitacion": Habitacion.objects.order_by("id").first(),
+        "habitacion_libre": habitacion_libre,
+        "en_limpieza": en_limpieza,
+        "tipo": TipoHabitacion.objects.order_by("id").first(),
+        "tarifa": Tarifa.objects.order_by("id").first(),
+        "tarifa_aplicable": tarifa["id"],
+        "estancia": estancia,
+        "producto": producto,
+        "exportacion": exportacion,
+        "refresh": str(RefreshToken.for_user(admin)),
+    }
+
+
+def escenarios(ctx):
+    hoy = ctx["turno"].fecha_inicio.date()
+    semana = {"fecha_desde": (hoy - timedelta(days=7)).isoformat(), "fecha_hasta": hoy.isoformat()}
+    habitacion, estancia, producto = ctx["habitacion"], ctx["estancia"], ctx["producto"]
+    abrir = {
+        "habitacion_id": ctx["habitacion_libre"].id,
+        "tarifa_id": ctx["tarifa_aplicable"],
+        "metodo_pago": "EFECTIVO",
+    }
+    horas = {"estancia_id": estancia.id, "cantidad_horas": 1, "precio_hora": "80.00", "metodo_pago": "EFECTIVO"}
+    venta = {"producto_id": producto.id, "cantidad": 1, "metodo_pago": "EFECTIVO", "estancia_id": estancia.id}
+
+    return [
+        # Core
+        Escenario("api/health/", usuario=None),
+        Escenario("rendimiento", usuario="admin"),
+        Escenario("metricas", usuario=None, encabezados={"HTTP_AUTHORIZATION": f"Bearer {TOKEN_METRICAS}"}),
+        Escenario("ticket-eventos", "post"),
+        Escenario("operaciones-lote", "post", datos={"operaciones": [
+            {"tipo": "abrir_estancia", "datos": abrir},
+            {"tipo": "agregar_horas", "datos": horas},
+            {"tipo": "vender_producto", "datos": venta},
+            {"tipo": "cerrar_estancia", "datos": {"estancia_id": estancia.id}},
+        ]}),
+
+        # Usuarios
+        Escenario("token_obtain_pair", "post", usuario=None,
+                  datos={"username": ctx["usuarios"]["admin"].username, "password": CONTRASENA}),
+        Escenario("current_user"),
+        Escenario("token_refresh", "post", usuario=None, datos={"refresh": ctx["refresh"]}),
+        Escenario("logout", "post", usuario="admin", datos={"refresh": ctx["refresh"]}),
+        Escenario("register", "post", usuario="admin",
+                  datos={"username": "benchmark_nuevo", "password": "Benchmark-123", "rol": "EMPLEADO"}),
+        Escenario("login_invitado", "post", usuario=None,
+                  datos={"nombre": "Invitado", "codigo_admin": CONTRASENA}),
+        Escenario("user-list", usuario="admin"),
+        Escenario("user-detail", usuario="admin", kwargs={"pk": ctx["libre"].id}),
+        Escenario("user-detail", "patch", usuario="admin", kwargs={"pk": ctx["libre"].id},
+                  datos={"first_name": "Benchmark"}),
+
+        # Turnos
+        Escenario("turnos-list", usuario="admin"),
+        Escenario("turno-activo"),
+        Escenario("turno-activo-async"),
+        # Solo puede haber un turno de empleado abierto; el administrador sí puede abrir el suyo.
+        Escenario("iniciar-turno", "post", usuario="admin",
+                  datos={"tipo_turno": "DIA", "caja_inicial": "500.00"}),
+        Escenario("cerrar-turno", "post", datos={"efectivo_reportado": "1000.00", "sueldo": "300.00"}),
+
+        # Caja
+        Escenario("movimientos-list-create", usuario="admin"),
+        Escenario("movimientos-list-create", usuario="admin", params={"paginacion": "cursor"}, variante="cursor"),
+        Escenario("movimientos-list-create", "post", datos=venta),
+        Escenario("venta-carrito", "post", datos={
+            "items": [{"producto_id": producto.id, "cantidad": 1}], "metodo_pago": "EFECTIVO",
+        }),
+
+        # Reportes
+        Escenario("reporte-turnos", usuario="admin"),
+        Escenario("reporte-turnos", usuario="admin", params=semana, variante="semana"),
+        Escenario("reporte-turnos-excel", usuario="admin", params=semana, variante="semana"),
+        Escenario("reporte-turnos-pdf", usuario="admin", params=semana, variante="semana"),
+        Escenario("exportaciones-reporte"),
+        Escenario("exportaciones-reporte", "post", datos={"formato": "PDF", **semana}),
+        Escenario("exportacion-reporte-detalle", kwargs={"pk": ctx["exportacion"].id}),
+        Escenario("exportacion-reporte-descarga", kwargs={"pk": ctx["exportacion"].id}),
+        Escenario("resumen-diario", usuario="admin", params={"fecha": hoy.isoformat()}),
+        Escenario("resumen-diario", usuario="admin", params=semana, variante="semana"),
+        Escenario("reporte-empleados", usuario="admin"),
+        Escenario("reporte-detalle-empleado", usuario="admin", kwargs={"empleado_id": ctx["usuarios"]["empleado"].id}),
+        Escenario("ranking-empleados", usuario="admin"),
+        Escenario("grafica-ingresos-empleados", usuario="admin"),
+
+        # Habitaciones, productos y tarifas
+        Escenario("tipos_list"),
+        Escenario("tipos_detail", kwargs={"pk": ctx["tipo"].id}),
+        Escenario("habitaciones_list"),
+        Escenario("habitaciones-tablero"),
+        Escenario("habitaciones-tablero-async"),
+        Escenario("habitaciones_detail", kwargs={"pk": habitacion.id}),
+        Escenario("habitaciones_detail", "patch", usuario="admin", kwargs={"pk": habitacion.id},
+                  datos={"activa": True}),
+        Escenario("habitacion-marcar-disponible", "post", kwargs={"pk": ctx["en_limpieza"].id}),
+        Escenario("productos_list"),
+        Escenario("productos_detail", kwargs={"pk": producto.id}),
+        Escenario("tarifas_list_create"),
+        Escenario("tarifas-aplicables", params={"habitacion": ctx["habitacion_libre"].id}),
+        Escenario("tarifas-aplicables-async", params={"habitacion": ctx["habitacion_libre"].id}),
+        Escenario("tarifas_detail", kwargs={"pk": ctx["tarifa"].id}),
+
+        # Estancias
+        Escenario("estancias-list", usuario="admin"),
+        Escenario("estancias-list-async", usuario="admin"),
+        Escenario("estancias-vencidas"),
+        Escenario("abrir-estancia", "post", datos=abrir),
+        Escenario("agregar-horas-extra", "post", datos=horas),
+        Escenario("cerrar-estancia", "post", datos={"estancia_id": estancia.id}),
+
+        # Documentación
+        Escenario("schema", usuario=None),
+        Escenario("swagger-ui", usuario=None),
+    ]
+
+
+def rutas_de_la_api():
+    """Nombre (o patrón, si no tiene) de cada ruta de `config/urls.py`, sin el admin de Django."""
+    from django.urls import URLResolver, get_resolver
+
+    def recorrer(patrones, prefijo):
+        for patron in patrones:
+            if isinstance(patron, URLResolver):
+                if patron.app_name != "admin":
+                    yield from recorrer(patron.url_patterns, prefijo + str(patron.pattern))
+            else:
+                yield patron.name or prefijo + str(patron.pattern)
+
+    return set(recorrer(get_resolver().url_patterns, ""))
+
+
+# ==========================
+# Medición
+# ==========================
+
+def _url(escenario):
+    from django.urls import reverse
+
+    if escenario.ruta.startswith("api/"):
+        return "/" + escenario.ruta
+    return reverse(escenario.ruta, kwargs=escenario.kwargs)
+
+
+def _peticion(cliente, escenario, url):
+    """Ejecuta la petición y consume la respuesta completa."""
+    from django.db import transaction
+
+    encabezados = escenario.encabezados or {}
+    if escenario.metodo == "get":
+        response = cliente.get(url, escenario.params, **encabezados)
+    else:
+        with transaction.atomic():
+            response = getattr(cliente, escenario.metodo)(url, escenario.datos, format="json", **encabezados)
+            transaction.set_rollback(True)
+    if response.streaming:
+        b"".join(response.streaming_content)
+        response.close()
+    return response
+
+
+def medir_escenario(cliente, escenario, repeticiones, segundos_maximos):
+    from django.db import connection
+    from apps.core.medicion import percentil
+
+    url = _url(escenario)
+    response = _peticion(cliente, escenario, url)  # calentamiento
+
+    consultas = []
+
+    def contar(execute, sql, params, many, context):
+        consultas.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(contar):
+        _peticion(cliente, escenario, url)
+
+    tracemalloc.start()
+    _peticion(cliente, escenario, url)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tiempos = []
+    limite = time.perf_counter() + segundos_maximos
+    while len(tiempos) < repeticiones and (len(tiempos) < 3 or time.perf_counter() < limite):
+        inicio = time.perf_counter()
+        _peticion(cliente, escenario, url)
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+
+    return {
+        "estado_http": response.status_code,
+        "muestras": len(tiempos),
+        "p50_ms": round(percentil(tiempos, 50) * 1000, 2),
+        "p95_ms": round(percentil(tiempos, 95) * 1000, 2),
+        "consultas": len(consultas),
+        "pico_memoria_kb": round(pico / 1024, 1),
+    }
+
+
+def ejecutar(lista, ctx, repeticiones, segundos_maximos, filtro=None):
+    from rest_framework.test import APIClient
+
+    clientes = {}
+    for clave in (None, *ctx["usuarios"]):
+        cliente = clientes[clave] = APIClient()
+        if clave is not None:
+            cliente.force_authenticate(ctx["usuarios"][clave])
+
+    resultados = {}
+    for escenario in lista:
+        if filtro and filtro not in escenario.nombre:
+            continue
+        resultados[escenario.nombre] = medir_escenario(
+            clientes[escenario.usuario], escenario, repeticiones, segundos_maximos,
+        )
+    return resultados
+
+
+# ==========================
+# Línea base
+# ==========================
+
+def volumen_de_datos():
+    from apps.caja.models import MovimientoCaja
+    from apps.estancias.models import Estancia
+    from apps.habitaciones.models import Habitacion
+    from apps.turnos.models import Turno
+
+    return {
+        "habitaciones": Habitacion.objects.count(),
+        "turnos": Turno.objects.count(),
+        "estancias": Estancia.objects.count(),
+        "movimientos": MovimientoCaja.objects.count(),
+    }
+
+
+def factor_de_carga(base, resultados):
+    """
+    Mediana de la razón entre la mediana actual y la de la línea base de cada
+    escenario. Refleja la diferencia de velocidad o de carga de la máquina,
+    que afecta por igual a todos los escenarios.
+    """
+    from statistics import median
+
+    razones = [
+        actual["p50_ms"] / base["escenarios"][nombre]["p50_ms"]
+        for nombre, actual in resultados.items()
+        if base["escenarios"].get(nombre, {}).get("p50_ms")
+    ]
+    return median(razones) if razones else 1.0
+
+
+def comparar(base, resultados, tolerancia, margen_ms):
+    """
+    Filas de la comparación y nombres de los escenarios con regresión. Los
+    tiempos de la línea base se ajustan por `factor_de_carga`, así que una
+    regresión es un escenario que empeoró más que el resto.
+    """
+    factor = factor_de_carga(base, resultados)
+    filas, regresiones = [], []
+    for nombre, actual in resultados.items():
+        anterior = base["escenarios"].get(nombre)
+        if anterior is None:
+            filas.append({"escenario": nombre, "p50_base": "-", "p50_actual": actual["p50_ms"],
+                          "p95_base": "-", "p95_actual": actual["p95_ms"],
+                          "cambio": "-", "consultas": f"- -> {actual['consultas']}", "resultado": "nuevo"})
+            continue
+
+        motivos = []
+        if actual["consultas"] > anterior["consultas"]:
+            motivos.append("consultas")
+        esperado = anterior["p50_ms"] * factor
+        if actual["p50_ms"] > esperado * (1 + tolerancia) and actual["p50_ms"] - esperado > margen_ms:
+            motivos.append("p50")
+        if actual["estado_http"] != anterior["estado_http"]:
+            motivos.append(f"HTTP {anterior['estado_http']} -> {actual['estado_http']}")
+        if motivos:
+            regresiones.append(nombre)
+
+        cambio = (actual["p50_ms"] / esperado - 1) * 100 if esperado else 0
+        filas.append({
+            "escenario": nombre,
+            "p50_base": anterior["p50_ms"],
+            "p50_actual": actual["p50_ms"],
+            "p95_base": anterior["p95_ms"],
+            "p95_actual": actual["p95_ms"],
+            "cambio": f"{cambio:+.0f}%",
+            "consultas": f"{anterior['consultas']} -> {actual['consultas']}",
+            "resultado": "REGRESIÓN: " + ", ".join(motivos) if motivos else "ok",
+        })
+    return filas, regresiones, factor
+
+
+def main():
+    parser = argumentos_base(__doc__)
+    parser.add_argument("--dias", type=int, default=60, help="Días de datos sintéticos si la base está vacía.")
+    parser.add_argument("--habitaciones", type=int, default=300)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument(
+        "--segundos-maximos", type=float, default=10,
+        help="Tiempo máximo de repeticiones por escenario (se hacen al menos 3).",
+    )
+    parser.add_argument("--filtro", help="Mide solo los escenarios cuyo nombre contiene este texto.")
+    parser.add_argument("--guardar", help="Escribe los resultados como línea base en este archivo JSON.")
+    parser.add_argument("--comparar", help="Compara contra la línea base de este archivo JSON.")
+    parser.add_argument("--tolerancia", type=float, default=0.5, help="Aumento relativo de la mediana tolerado.")
+    parser.add_argument("--margen-ms", type=float, default=10, help="Aumento absoluto de la mediana siempre tolerado.")
+    args = parser.parse_args()
+
+    ruta_db = configurar_django(args.db)
+    from django.conf import settings
+    from django.core.management import call_command
+    from apps.turnos.models import Turno
+
+    directorio = os.path.dirname(ruta_db) if os.path.exists(ruta_db) else tempfile.mkdtemp(prefix="hotel-bench-")
+    # Como en producción: sin DEBUG no se guarda el registro de consultas.
+    settings.DEBUG = False
+    settings.MEDIA_ROOT = os.path.join(directorio, "media")
+    settings.METRICAS_TOKEN = TOKEN_METRICAS
+    settings.CODIGO_ADMIN_INVITADO = CONTRASENA
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+    if not Turno.objects.exists():
+        call_command(
+            "generar_datos_sinteticos",
+            dias=args.dias, habitaciones=args.habitaciones, semilla=args.semilla,
+        )
+
+    try:
+        ctx = preparar_contexto()
+    except DatosInsuficientes as e:
+        parser.error(str(e))
+    lista = escenarios(ctx)
+    volumen = volumen_de_datos()
+    resultados = ejecutar(lista, ctx, args.repeticiones, args.segundos_maximos, args.filtro)
+
+    imprimir_resultados(
+        f"Endpoints de la API ({ruta_db}; " + ", ".join(f"{v} {k}" for k, v in volumen.items()) + ")",
+        [{"escenario": nombre, **r} for nombre, r in resultados.items()],
+    )
+
+    sin_escenario = rutas_de_la_api() - {e.ruta for e in lista} - set(EXCLUIDAS)
+    for ruta, motivo in EXCLUIDAS.items():
+        print(f"Excluida: {ruta}: {motivo}")
+    for ruta in sorted(sin_escenario):
+        print(f"Sin escenario: {ruta}")
+    fallidos = [nombre for nombre, r in resultados.items() if r["estado_http"] >= 400]
+    for nombre in fallidos:
+        print(f"Respuesta con error: {nombre} (HTTP {resultados[nombre]['estado_http']})")
+
+    if args.guardar:
+        linea_base = {
+            "volumen": volumen,
+            "repeticiones": args.repeticiones,
+            "escenarios": resultados,
+        }
+        with open(args.guardar, "w", encoding="utf-8") as archivo:
+            json.dump(linea_base, archivo, indent=2, ensure_ascii=False, sort_keys=True)
+            archivo.write("\n")
+        print(f"Línea base guardada en {args.guardar}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            base = json.load(archivo)
+        if base["volumen"] != volumen:
+            print(f"Aviso: la línea base se midió con otro volumen de datos: {base['volumen']}")
+        filas, regresiones, factor = comparar(base, resultados, args.tolerancia, args.margen_ms)
+        imprimir_resultados(
+            f"Comparación con {args.comparar} (factor de carga {factor:.2f}; cambio respecto a la base ajustada)",
+            filas,
+        )
+        if regresiones:
+            print(f"\n{len(regresiones)} escenario(s) con regresión.")
+            sys.exit(1)
+
+    if sin_escenario or fallidos:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Benchmark de concurrencia bajo ASGI de las vistas de recepción: cada endpoint
+síncrono (turno activo, tablero, tarifas aplicables, listado de estancias)
+frente a su variante asíncrona, y el flujo de eventos con muchas terminales
+conectadas (ver apps/core/asincrono.py).
+
+Llama a la aplicación ASGI de Django (`config.asgi`) desde un event loop, como
+lo hace un worker de uvicorn:
+- Para cada endpoint y cada nivel de `--concurrencias` (clientes simultáneos),
+  repite la petición durante `--segundos` e informa peticiones por segundo,
+  p50 y p95, y el máximo de hilos vivos durante la carga. Una vista síncrona
+  ocupa un hilo por petición en curso; una asíncrona, solo los del pool
+  compartido mientras consulta la base.
+- Abre `--conexiones` flujos de eventos a la vez e informa cuánto tardaron en
+  conectarse y el máximo de hilos vivos mientras siguen abiertos.
+Los clientes corren en el mismo event loop que el servidor, así que las
+latencias incluyen su costo (pequeño frente al de Django).
+
+Si la base no tiene turnos, la llena con el comando `generar_datos_sinteticos`.
+
+Uso (desde `src/`):
+    python -m benchmarks.asincrono --db /tmp/api.sqlite3 --concurrencias 1 10 50 200 --conexiones 500
+"""
+import asyncio
+import sys
+import threading
+import time
+
+from .entorno import argumentos_base, configurar_django, imprimir_resultados
+
+
+# (ruta síncrona, ruta asíncrona, usuario que las consulta)
+PARES = [
+    ("turno-activo", "turno-activo-async", "empleado"),
+    ("habitaciones-tablero", "habitaciones-tablero-async", "empleado"),
+    ("tarifas-aplicables", "tarifas-aplicables-async", "empleado"),
+    ("estancias-list", "estancias-list-async", "admin"),
+]
+
+
+def _scope(url, encabezados):
+    ruta, _, consulta = url.partition("?")
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": ruta,
+        "raw_path": ruta.encode(),
+        "query_string": consulta.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"127.0.0.1")] + [
+            (nombre.lower().encode(), valor.encode()) for nombre, valor in encabezados.items()
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 80),
+    }
+
+
+async def peticion(aplicacion, scope, primer_contenido=None, desconectar=None):
+    """
+    Atiende una petición con la aplicación ASGI y devuelve el código HTTP.
+    `primer_contenido` se activa al recibir el primer fragmento del cuerpo, y
+    el cliente se desconecta cuando se activa `desconectar` (para los flujos).
+    """
+    enviado = False
+    estado = None
+
+    async def recibir():
+        nonlocal enviado
+        if not enviado:
+            enviado = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        if desconectar is None:
+            # El cliente no se desconecta: Django deja de escuchar al responder.
+            await asyncio.Event().wait()
+        await desconectar.wait()
+        return {"type": "http.disconnect"}
+
+    async def enviar(mensaje):
+        nonlocal estado
+        if mensaje["type"] == "http.response.start":
+            estado = mensaje["status"]
+        elif mensaje.get("body") and primer_contenido is not None:
+            primer_contenido.set()
+
+    await aplicacion(scope, recibir, enviar)
+    return estado
+
+
+class MaximoDeHilos:
+    """Muestrea `threading.active_count()` en un hilo aparte mientras está activo."""
+
+    def __init__(self):
+        self.maximo = 0
+        self._fin = threading.Event()
+        self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+
+    def _muestrear(self):
+        while not self._fin.is_set():
+            self.maximo = max(self.maximo, threading.active_count())
+            time.sleep(0.001)
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._fin.set()
+        self._hilo.join()
+
+
+async def cargar(aplicacion, scope, clientes, segundos):
+    """`clientes` corrutinas que repiten la petición durante `segundos`."""
+    fin = time.monotonic() + segundos
+    tiempos, errores = [], 0
+
+    async def cliente():
+        nonlocal errores
+        while time.monotonic() < fin:
+            inicio = time.perf_counter()
+            estado = await peticion(aplicacion, scope)
+            tiempos.append(time.perf_counter() - inicio)
+            errores += estado != 200
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(clientes)))
+    return sorted(tiempos), errores, time.perf_counter() - inicio
+
+
+async def medir(aplicacion, peticiones, concurrencias, segundos):
+    from apps.core.medicion import percentil
+
+    filas = []
+    for sincrona, asincrona, _ in PARES:
+        for clientes in concurrencias:
+            for variante, ruta in (("sync", sincrona), ("async", asincrona)):
+                scope = _scope(*peticiones[ruta])
+                await cargar(aplicacion, scope, clientes, min(segundos, 1))  # calentamiento
+                hilos_base = threading.active_count()
+                with MaximoDeHilos() as hilos:
+                    tiempos, errores, total = await cargar(aplicacion, scope, clientes, segundos)
+                filas.append({
+                    "endpoint": sincrona,
+                    "variante": variante,
+                    "clientes": clientes,
+                    "peticiones_por_s": round(len(tiempos) / total, 1),
+                    "p50_ms": round(percentil(tiempos, 50) * 1000, 2),
+                    "p95_ms": round(percentil(tiempos, 95) * 1000, 2),
+                    # Hilos nuevos durante la carga, sin contar el que muestrea.
+                    "hilos_maximos": max(hilos.maximo - hilos_base - 1, 0),
+                    "errores": errores,
+                })
+    return filas
+
+
+async def medir_flujo(aplicacion, url, encabezados, conexiones):
+    """Abre `conexiones` flujos de eventos y mide los hilos mientras siguen abiertos."""
+    scope = _scope(url, encabezados)
+    desconectar = asyncio.Event()
+    conectados = [asyncio.Event() for _ in range(conexiones)]
+
+    hilos_base = threading.active_count()
+    with MaximoDeHilos() as hilos:
+        inicio = time.perf_counter()
+        clientes = [
+            asyncio.ensure_future(peticion(aplicacion, scope, conectado, desconectar))
+            for conectado in conectados
+        ]
+        await asyncio.wait_for(asyncio.gather(*(c.wait() for c in conectados)), timeout=60)
+        conexion = time.perf_counter() - inicio
+        # Los flujos quedan abiertos un momento, como terminales esperando eventos.
+        await asyncio.sleep(1)
+    # Al desconectarse, Django cierra cada respuesta en un hilo: no se cuentan.
+    desconectar.set()
+    estados = await asyncio.gather(*clientes)
+
+    return {
+        "endpoint": "flujo-eventos",
+        "conexiones": conexiones,
+        "segundos_para_conectar": round(conexion, 2),
+        "hilos_maximos": max(hilos.maximo - hilos_base - 1, 0),
+        "errores": sum(estado != 200 for estado in estados),
+    }
+
+
+def main():
+    parser = argumentos_base(__doc__)
+    parser.add_argument("--concurrencias", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--segundos", type=float, default=3, help="Duración de la carga por nivel.")
+    parser.add_argument("--conexiones", type=int, default=500, help="Flujos de eventos abiertos a la vez.")
+    parser.add_argument("--dias", type=int, default=60, help="Días de datos sintéticos si la base está vacía.")
+    parser.add_argument("--habitaciones", type=int, default=300)
+    args = parser.parse_args()
+
+    base = configurar_django(args.db)
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connections
+    from apps.turnos.models import Turno
+    from config.asgi import application
+
+    from .servidor import preparar_peticiones
+
+    # Como en producción: sin DEBUG no se guarda el registro de consultas.
+    settings.DEBUG = False
+    # Con muchos clientes, todas las peticiones superan el umbral de "lentas".
+    settings.MEDICION_UMBRAL_LENTO_MS = float("inf")
+    if not Turno.objects.exists():
+        call_command("generar_datos_sinteticos", dias=args.dias, habitaciones=args.habitaciones)
+    peticiones = preparar_peticiones(
+        [(ruta, usuario) for sincrona, asincrona, usuario in PARES for ruta in (sincrona, asincrona)]
+        + [("flujo-eventos", "empleado")]
+    )
+    connections.close_all()
+
+    async def ejecutar():
+        filas = await medir(application, peticiones, args.concurrencias, args.segundos)
+        flujo = await medir_flujo(application, *peticiones["flujo-eventos"], args.conexiones)
+        return filas, flujo
+
+    filas, flujo = asyncio.run(ejecutar())
+    imprimir_resultados(f"Vistas síncronas y asíncronas bajo ASGI ({base})", filas)
+    imprimir_resultados(f"Flujos de eventos abiertos a la vez ({base})", [flujo])
+    if any(f["errores"] for f in filas) or flujo["errores"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
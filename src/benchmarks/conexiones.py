@@ -0,0 +1,141 @@
+"""
+Benchmark de la latencia de las peticiones según el manejo de conexiones a
+PostgreSQL (ver config/base_de_datos.py):
+- sin_persistencia: una conexión nueva por petición (`DB_CONN_MAX_AGE=0`).
+- persistentes: cada hilo conserva su conexión (`DB_CONN_MAX_AGE=60`).
+- pool: el pool de psycopg 3 compartido por los hilos (`DB_POOL=true`).
+
+Cada modo se mide en un proceso aparte, con varios hilos que hacen peticiones
+autenticadas con JWT a la misma ruta a través del handler WSGI de Django, de
+modo que al terminar cada petición se aplica la política de conexiones como
+en un servidor real. Se informa la latencia, el rendimiento y cuántas
+conexiones se abrieron.
+
+Requiere PostgreSQL (`POSTGRES_DB` y demás variables de benchmarks/entorno.py):
+con SQLite no hay conexiones de red que reutilizar.
+
+Uso (desde `src/`):
+    POSTGRES_DB=hotel_bench POSTGRES_USER=postgres python -m benchmarks.conexiones --hilos 8
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from .entorno import argumentos_base, configurar_django, imprimir_resultados
+
+
+MODOS = {
+    "sin_persistencia": {"DB_POOL": "false", "DB_CONN_MAX_AGE": "0"},
+    "persistentes": {"DB_POOL": "false", "DB_CONN_MAX_AGE": "60"},
+    "pool": {"DB_POOL": "true"},
+}
+
+
+def preparar_peticion(ruta):
+    """Entorno WSGI de una petición GET autenticada a `ruta`."""
+    from django.test import RequestFactory
+    from django.urls import reverse
+    from rest_framework_simplejwt.tokens import AccessToken
+    from apps.users.models import Usuario
+
+    usuario, _ = Usuario.objects.get_or_create(
+        username="bench_conexiones", defaults={"rol": Usuario.Rol.EMPLEADO},
+    )
+    token = AccessToken.for_user(usuario)
+    return RequestFactory().get(reverse(ruta), HTTP_AUTHORIZATION=f"Bearer {token}").environ
+
+
+def medir_modo(modo, hilos, peticiones, ruta):
+    """Mide un modo en este proceso; las variables de entorno ya corresponden al modo."""
+    configurar_django()
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connections
+    from apps.core.medicion import conexiones_abiertas, percentil
+
+    environ = preparar_peticion(ruta)
+    # La conexión usada para migrar y preparar los datos no cuenta.
+    connections.close_all()
+    conexiones_iniciales = conexiones_abiertas()
+    handler = WSGIHandler()
+    tiempos, errores = [], []
+
+    def trabajador():
+        propios, fallidas = [], 0
+        for _ in range(peticiones):
+            inicio = time.perf_counter()
+            response = handler(dict(environ), lambda estado, encabezados: None)
+            b"".join(response)
+            # Emite `request_finished`: cierra o devuelve la conexión según el modo.
+            response.close()
+            propios.append(time.perf_counter() - inicio)
+            fallidas += response.status_code != 200
+        connections.close_all()
+        tiempos.extend(propios)
+        errores.append(fallidas)
+
+    inicio = time.perf_counter()
+    trabajadores = [threading.Thread(target=trabajador) for _ in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    total = time.perf_counter() - inicio
+
+    pool = getattr(connections["default"], "pool", None)
+    if pool is not None:
+        # Con el pool, Django "abre" una conexión por petición al tomarla del pool.
+        conexiones = pool.get_stats()["connections_num"]
+    else:
+        conexiones = conexiones_abiertas() - conexiones_iniciales
+
+    tiempos.sort()
+    return {
+        "modo": modo,
+        "hilos": hilos,
+        "peticiones": len(tiempos),
+        "p50_ms": round(percentil(tiempos, 50) * 1000, 2),
+        "p95_ms": round(percentil(tiempos, 95) * 1000, 2),
+        "peticiones_por_s": round(len(tiempos) / total, 1),
+        "conexiones_abiertas": conexiones,
+        "errores": sum(errores),
+    }
+
+
+def main():
+    parser = argumentos_base(__doc__)
+    parser.add_argument("--hilos", type=int, default=8)
+    parser.add_argument("--peticiones", type=int, default=200, help="Peticiones por hilo.")
+    parser.add_argument("--ruta", default="tipos_list", help="Nombre de la URL a consultar.")
+    parser.add_argument("--pool-maximo", type=int, help="Tamaño máximo del pool (por defecto, uno por hilo).")
+    # Uso interno: mide un solo modo e imprime el resultado en JSON.
+    parser.add_argument("--modo", choices=MODOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not os.environ.get("POSTGRES_DB"):
+        parser.error("este benchmark requiere PostgreSQL: define POSTGRES_DB y las demás variables de conexión.")
+
+    if args.modo:
+        print(json.dumps(medir_modo(args.modo, args.hilos, args.peticiones, args.ruta)))
+        return
+
+    filas = []
+    for modo, variables in MODOS.items():
+        entorno = {**os.environ, **variables, "DB_POOL_MAXIMO": str(args.pool_maximo or args.hilos)}
+        salida = subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.conexiones", "--modo", modo,
+                "--hilos", str(args.hilos), "--peticiones", str(args.peticiones), "--ruta", args.ruta,
+            ],
+            env=entorno, capture_output=True, text=True, check=True,
+        )
+        filas.append(json.loads(salida.stdout.strip().splitlines()[-1]))
+
+    imprimir_resultados(f"Conexiones a PostgreSQL ({args.ruta}, {args.hilos} hilos)", filas)
+
+
+if __name__ == "__main__":
+    main()
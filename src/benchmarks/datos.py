@@ -0,0 +1,83 @@
+"""
+Generación rápida de datos para los benchmarks mediante `bulk_create`.
+Los acumulados de los turnos se asignan directamente, sin pasar por `save()`.
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+
+def crear_empleados(cantidad=10):
+    from apps.users.models import Usuario
+
+    existentes = list(Usuario.objects.filter(username__startswith="bench_emp_"))
+    if len(existentes) >= cantidad:
+        return existentes[:cantidad]
+    nuevos = Usuario.objects.bulk_create(
+        Usuario(username=f"bench_emp_{i}", rol=Usuario.Rol.EMPLEADO)
+        for i in range(len(existentes), cantidad)
+    )
+    return existentes + nuevos
+
+
+def crear_turnos_cerrados(cantidad, *, empleados, con_movimientos=False, semilla=0, lote=5000):
+    """
+    Crea `cantidad` turnos cerrados, uno cada 12 horas hacia atrás desde hoy.
+    Los acumulados de cada turno corresponden a sus movimientos, que solo se
+    insertan si `con_movimientos` es verdadero.
+    """
+    from apps.turnos.models import Turno
+    from apps.caja.models import MovimientoCaja
+
+    aleatorio = random.Random(semilla)
+    ahora = timezone.now()
+    creados = 0
+    while creados < cantidad:
+        turnos, montos_por_turno = [], []
+        for i in range(creados, min(cantidad, creados + lote)):
+            montos = [
+                (Decimal(aleatorio.randint(50, 500)), aleatorio.choice(["EFECTIVO", "EFECTIVO", "TRANSFERENCIA"]))
+                for _ in range(aleatorio.randint(0, 30))
+            ]
+            efectivo = sum((monto for monto, metodo in montos if metodo == "EFECTIVO"), Decimal(0))
+            transferencia = sum((monto for monto, metodo in montos if metodo == "TRANSFERENCIA"), Decimal(0))
+            sueldo = Decimal(aleatorio.choice([0, 200, 300]))
+            caja_inicial = Decimal(1000)
+            esperado = caja_inicial + efectivo - sueldo
+            reportado = esperado + Decimal(aleatorio.randint(-20, 20))
+            inicio = ahora - timedelta(hours=12 * i)
+            turnos.append(Turno(
+                usuario=empleados[i % len(empleados)],
+                tipo_turno=Turno.TipoTurno.DIA if i % 2 else Turno.TipoTurno.NOCHE,
+                fecha_fin=inicio + timedelta(hours=11),
+                activo=False,
+                sueldo=sueldo,
+                caja_inicial=caja_inicial,
+                efectivo_esperado=esperado,
+                efectivo_reportado=reportado,
+                diferencia=reportado - esperado,
+                caja_final=reportado,
+                total_efectivo=efectivo,
+                total_transferencia=transferencia,
+                cantidad_movimientos=len(montos),
+            ))
+            montos_por_turno.append(montos)
+        Turno.objects.bulk_create(turnos)
+        # `fecha_inicio` es `auto_now_add`, así que `bulk_create` la sobrescribe con la hora actual.
+        for turno in turnos:
+            turno.fecha_inicio = turno.fecha_fin - timedelta(hours=11)
+        Turno.objects.bulk_update(turnos, ["fecha_inicio"], batch_size=1000)
+
+        if con_movimientos:
+            MovimientoCaja.objects.bulk_create(
+                (
+                    MovimientoCaja(turno=turno, tipo="EXTRA", monto=monto, metodo_pago=metodo)
+                    for turno, montos in zip(turnos, montos_por_turno)
+                    for monto, metodo in montos
+                ),
+                batch_size=5000,
+            )
+        creados += len(turnos)
+    return creados
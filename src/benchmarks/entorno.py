@@ -0,0 +1,101 @@
+"""
+Preparación del entorno de Django y utilidades de medición para los benchmarks.
+
+Cada benchmark usa su propia base de datos SQLite (temporal por defecto) para
+no tocar la base de desarrollo. Con `--db` se puede reutilizar una base ya
+poblada entre ejecuciones.
+
+Si está definida la variable `POSTGRES_DB` se usa PostgreSQL en su lugar, con
+la misma configuración que en producción (`POSTGRES_USER`, `POSTGRES_PASSWORD`,
+`POSTGRES_HOST`, `POSTGRES_PORT` y las opciones de conexión de
+config/base_de_datos.py). La base debe existir y conviene que sea exclusiva
+para los benchmarks.
+
+Uso (desde `src/`):
+    python -m benchmarks.excel_turnos --turnos 100000
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+def argumentos_base(descripcion):
+    """Parser con las opciones comunes a todos los benchmarks."""
+    parser = argparse.ArgumentParser(description=descripcion)
+    parser.add_argument(
+        "--db",
+        help="Ruta de la base SQLite a usar. Por defecto se crea una temporal.",
+    )
+    return parser
+
+
+def configurar_django(ruta_db=None, concurrente=False):
+    """
+    Inicializa Django apuntando a la base de benchmarks y aplica las migraciones.
+
+    Con `concurrente`, la base SQLite se abre en modo WAL y cada transacción toma
+    el candado de escritura al empezar (`BEGIN IMMEDIATE`), de modo que varios
+    hilos esperan su turno en lugar de fallar con "database is locked".
+    Devuelve la descripción de la base usada.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.dev")
+    os.environ.setdefault("SECRET_KEY", "benchmarks")
+
+    from django.conf import settings
+
+    if os.environ.get("POSTGRES_DB"):
+        from config.base_de_datos import configuracion_postgres
+        # Sin límite de tiempo por consulta, salvo que se pida: la carga de datos tarda.
+        settings.DATABASES["default"] = configuracion_postgres({"DB_LIMITE_CONSULTA_MS": "0", **os.environ})
+        ruta_db = f"postgresql:{os.environ['POSTGRES_DB']}"
+    else:
+        if ruta_db is None:
+            ruta_db = os.path.join(tempfile.mkdtemp(prefix="hotel-bench-"), "bench.sqlite3")
+        settings.DATABASES["default"]["NAME"] = ruta_db
+        if concurrente:
+            settings.DATABASES["default"]["OPTIONS"] = {
+                "timeout": 60,
+                "transaction_mode": "IMMEDIATE",
+                "init_command": "PRAGMA journal_mode=WAL;",
+            }
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command("migrate", verbosity=0)
+    return ruta_db
+
+
+@contextmanager
+def medir(resultado):
+    """
+    Mide el tiempo y el pico de memoria de Python (tracemalloc) del bloque.
+    Escribe los valores en el diccionario `resultado`.
+    """
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        yield resultado
+    finally:
+        resultado["segundos"] = round(time.perf_counter() - inicio, 3)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resultado["pico_memoria_mb"] = round(pico / 1024 / 1024, 2)
+        resultado["rss_maximo_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+
+
+def imprimir_resultados(titulo, filas):
+    """Imprime una tabla simple con los resultados de cada escenario."""
+    print(f"\n{titulo}")
+    if not filas:
+        return
+    columnas = list(filas[0].keys())
+    anchos = {c: max(len(c), *(len(str(f[c])) for f in filas)) for c in columnas}
+    print("  ".join(c.ljust(anchos[c]) for c in columnas))
+    for fila in filas:
+        print("  ".join(str(fila[c]).ljust(anchos[c]) for c in columnas))
@@ -0,0 +1,74 @@
+"""
+Benchmark de la exportación del reporte de turnos a Excel.
+
+Compara la implementación en streaming (`exportar_turnos_excel`) con la
+anterior, que cargaba todo el reporte y el libro en memoria. Reporta el
+tiempo total, el tiempo hasta el primer byte y el pico de memoria.
+
+Uso (desde `src/`):
+    python -m benchmarks.excel_turnos --turnos 100000
+"""
+import time
+
+from .entorno import argumentos_base, configurar_django, medir, imprimir_resultados
+from .datos import crear_empleados, crear_turnos_cerrados
+
+
+def exportacion_en_memoria(usuario):
+    """Réplica de la implementación previa: serializa todo y arma el libro en memoria."""
+    from io import BytesIO
+    from openpyxl import Workbook
+    from apps.reportes.services import reporte_turnos
+    from apps.reportes.serializers import ReporteTurnoSerializer
+    from apps.reportes.services_excel import ENCABEZADOS
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(ENCABEZADOS)
+    for item in ReporteTurnoSerializer(reporte_turnos(usuario=usuario), many=True).data:
+        ws.append(list(item.values()))
+    salida = BytesIO()
+    wb.save(salida)
+    return [salida.getvalue()]
+
+
+def exportacion_en_streaming(usuario):
+    from apps.reportes.services_excel import exportar_turnos_excel
+    return exportar_turnos_excel(usuario=usuario).streaming_content
+
+
+def ejecutar(nombre, generar, usuario):
+    resultado = {"escenario": nombre}
+    with medir(resultado):
+        inicio = time.perf_counter()
+        contenido = iter(generar(usuario))
+        primer_bloque = next(contenido)
+        resultado["primer_byte_s"] = round(time.perf_counter() - inicio, 3)
+        total = len(primer_bloque) + sum(len(bloque) for bloque in contenido)
+    resultado["tamano_mb"] = round(total / 1024 / 1024, 2)
+    return resultado
+
+
+def main():
+    parser = argumentos_base(__doc__)
+    parser.add_argument("--turnos", type=int, default=100_000)
+    parser.add_argument("--sin-comparar", action="store_true", help="Omite la implementación en memoria.")
+    args = parser.parse_args()
+
+    configurar_django(args.db)
+    from apps.turnos.models import Turno
+    from apps.users.models import Usuario
+
+    faltantes = args.turnos - Turno.objects.count()
+    if faltantes > 0:
+        crear_turnos_cerrados(faltantes, empleados=crear_empleados())
+    admin, _ = Usuario.objects.get_or_create(username="bench_admin", defaults={"rol": Usuario.Rol.ADMINISTRADOR})
+
+    resultados = [ejecutar("streaming", exportacion_en_streaming, admin)]
+    if not args.sin_comparar:
+        resultados.append(ejecutar("en_memoria", exportacion_en_memoria, admin))
+    imprimir_resultados(f"Exportación Excel de {Turno.objects.count()} turnos", resultados)
+
+
+if __name__ == "__main__":
+    main()
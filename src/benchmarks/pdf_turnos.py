@@ -0,0 +1,79 @@
+"""
+Benchmark de la exportación del reporte de turnos a PDF.
+
+Compara la implementación por páginas (`exportar_turnos_pdf`) con la anterior,
+que construía una sola tabla con todos los turnos en memoria. Como la anterior
+crece de forma cuadrática, solo se compara hasta `--comparar-hasta` filas.
+
+Uso (desde `src/`):
+    python -m benchmarks.pdf_turnos --filas 10000 100000
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .entorno import argumentos_base, configurar_django, imprimir_resultados
+from .datos import crear_empleados, crear_turnos_cerrados
+from .excel_turnos import ejecutar
+
+
+def exportacion_en_memoria(usuario, fecha_desde):
+    """Réplica de la implementación previa: una sola tabla y el PDF en un BytesIO."""
+    from io import BytesIO
+    from reportlab.platypus import SimpleDocTemplate, Table
+    from apps.reportes.services import reporte_turnos
+    from apps.reportes.serializers import ReporteTurnoSerializer
+    from apps.reportes.services_pdf import ENCABEZADOS, TAMANO_PAGINA
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=TAMANO_PAGINA, rightMargin=20, leftMargin=20, topMargin=20, bottomMargin=20)
+    tabla = [ENCABEZADOS]
+    for item in ReporteTurnoSerializer(reporte_turnos(usuario=usuario, fecha_desde=fecha_desde), many=True).data:
+        tabla.append([
+            item["turno_id"], item["empleado"], item["tipo_turno"], item["fecha_inicio"], item["fecha_fin"],
+            *(f"${item[campo]}" for campo in (
+                "caja_inicial", "total_efectivo", "total_transferencia", "total_tarjeta", "total_ingresos",
+                "sueldo", "efectivo_esperado", "efectivo_reportado", "diferencia",
+            )),
+        ])
+    doc.build([Table(tabla, repeatRows=1)])
+    return [buffer.getvalue()]
+
+
+def exportacion_por_paginas(usuario, fecha_desde):
+    from apps.reportes.services_pdf import exportar_turnos_pdf
+    return exportar_turnos_pdf(usuario=usuario, fecha_desde=fecha_desde).streaming_content
+
+
+def main():
+    parser = argumentos_base(__doc__)
+    parser.add_argument("--filas", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--comparar-hasta", type=int, default=10_000,
+                        help="Máximo de filas con las que se ejecuta la implementación anterior.")
+    args = parser.parse_args()
+
+    configurar_django(args.db)
+    from apps.turnos.models import Turno
+    from apps.users.models import Usuario
+
+    faltantes = max(args.filas) - Turno.objects.count()
+    if faltantes > 0:
+        crear_turnos_cerrados(faltantes, empleados=crear_empleados())
+    admin, _ = Usuario.objects.get_or_create(username="bench_admin", defaults={"rol": Usuario.Rol.ADMINISTRADOR})
+
+    resultados = []
+    for filas in sorted(args.filas):
+        # Los turnos de prueba inician cada 12 horas: se filtra el rango que contiene `filas` turnos.
+        fecha_desde = timezone.localdate(timezone.now() - timedelta(hours=12 * (filas - 1)))
+        escenarios = [("por_paginas", exportacion_por_paginas)]
+        if filas <= args.comparar_hasta:
+            escenarios.append(("en_memoria", exportacion_en_memoria))
+        for nombre, generar in escenarios:
+            resultado = ejecutar(nombre, lambda usuario: generar(usuario, fecha_desde), admin)
+            resultados.append({"filas": Turno.objects.filter(fecha_inicio__date__gte=fecha_desde).count(), **resultado})
+
+    imprimir_resultados("Exportación PDF del reporte de turnos", resultados)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark de regresión del reporte por empleado.
+
+Compara la consulta anterior, que unía turnos y movimientos de caja (y por lo
+tanto multiplicaba el sueldo y la diferencia de cada turno por su cantidad de
+movimientos), con la actual, que suma los acumulados de los turnos. Verifica
+que los ingresos coincidan y que los sueldos ya no estén inflados.
+
+Uso (desde `src/`):
+    python -m benchmarks.reporte_empleados --turnos 20000
+"""
+import time
+
+from .entorno import argumentos_base, configurar_django, imprimir_resultados
+from .datos import crear_empleados, crear_turnos_cerrados
+
+
+def queryset_anterior():
+    """Réplica de la consulta previa, con la unión turnos -> movimientos."""
+    from django.contrib.auth import get_user_model
+    from django.db.models import Count, DecimalField, Q, Sum, Value
+    from django.db.models.functions import Coalesce
+
+    User = get_user_model()
+
+    def suma(campo, **filtro):
+        return Coalesce(Sum(campo, **filtro), Value(0), output_field=DecimalField())
+
+    return User.objects.filter(rol=User.Rol.EMPLEADO).annotate(
+        turnos_count=Count('turnos', distinct=True),
+        total_efectivo=suma('turnos__movimientos__monto', filter=Q(turnos__movimientos__metodo_pago='EFECTIVO')),
+        total_transferencia=suma('turnos__movimientos__monto', filter=Q(turnos__movimientos__metodo_pago='TRANSFERENCIA')),
+        total_tarjeta=suma('turnos__movimientos__monto', filter=Q(turnos__movimientos__metodo_pago='TARJETA')),
+        total_ingresos=suma('turnos__movimientos__monto'),
+        total_sueldos=suma('turnos__sueldo'),
+        total_diferencias=suma('turnos__diferencia'),
+        turnos_sin_ingresos=Count('turnos', filter=Q(turnos__movimientos__isnull=True)),
+    ).order_by('username')
+
+
+def queryset_actual():
+    from apps.reportes.services_empleados import reporte_por_empleado
+    return reporte_por_empleado()
+
+
+def ejecutar(nombre, construir, repeticiones):
+    tiempos, filas = [], None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        filas = list(construir().values(
+            "username", "turnos_count", "total_ingresos", "total_sueldos", "total_diferencias",
+        ))
+        tiempos.append(time.perf_counter() - inicio)
+    return {"escenario": nombre, "mejor_s": round(min(tiempos), 3), "promedio_s": round(sum(tiempos) / len(tiempos), 3)}, filas
+
+
+def main():
+    parser = argumentos_base(__doc__)
+    parser.add_argument("--turnos", type=int, default=20_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--explicar", action="store_true", help="Muestra el plan de ejecución de ambas consultas.")
+    args = parser.parse_args()
+
+    configurar_django(args.db)
+    from django.db.models import Sum
+    from apps.caja.models import MovimientoCaja
+    from apps.turnos.models import Turno
+
+    faltantes = args.turnos - Turno.objects.count()
+    if faltantes > 0:
+        crear_turnos_cerrados(faltantes, empleados=crear_empleados(), con_movimientos=True)
+
+    anterior, filas_anteriores = ejecutar("union_con_movimientos", queryset_anterior, args.repeticiones)
+    actual, filas_actuales = ejecutar("acumulados_por_turno", queryset_actual, args.repeticiones)
+    imprimir_resultados(
+        f"Reporte por empleado ({Turno.objects.count()} turnos, {MovimientoCaja.objects.count()} movimientos)",
+        [anterior, actual],
+    )
+
+    # Regresión: los ingresos y el número de turnos deben coincidir; los sueldos anteriores estaban inflados.
+    sueldos_reales = {
+        fila["usuario__username"]: fila["total"]
+        for fila in Turno.objects.values("usuario__username").annotate(total=Sum("sueldo"))
+    }
+    for previa, nueva in zip(filas_anteriores, filas_actuales):
+        assert previa["username"] == nueva["username"]
+        assert previa["turnos_count"] == nueva["turnos_count"], (previa, nueva)
+        assert previa["total_ingresos"] == nueva["total_ingresos"], (previa, nueva)
+        assert nueva["total_sueldos"] == sueldos_reales[nueva["username"]], nueva
+    inflados = sum(1 for previa in filas_anteriores if previa["total_sueldos"] != sueldos_reales[previa["username"]])
+    print(f"\nIngresos y turnos coinciden; sueldos correctos. La consulta anterior inflaba {inflados} de {len(filas_anteriores)} empleados.")
+
+    if args.explicar:
+        print("\nPlan anterior:\n" + queryset_anterior().explain())
+        print("\nPlan actual:\n" + queryset_actual().explain())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Prueba de carga del servidor de producción (gunicorn.conf.py) sobre los
+endpoints de recepción: turno activo, tablero y listado de habitaciones,
+tarifas aplicables y listado de estancias, incluidas las variantes asíncronas
+(ver apps/core/asincrono.py).
+
+Para cada interfaz pedida (`asgi`, `wsgi` o ambas, ver config/servidor.py)
+arranca gunicorn con `config.settings.prod` en un puerto local y, para cada
+endpoint, mantiene `--clientes` clientes HTTP concurrentes (conexiones
+keep-alive, autenticadas con JWT) durante `--segundos`. Informa peticiones por
+segundo, p50 y p95 de la latencia vista por el cliente y las respuestas con
+error. Los demás ajustes del servidor (`SERVIDOR_HILOS`, `DB_POOL`, ...) se
+toman del entorno, así que se pueden comparar configuraciones.
+
+Los clientes corren en este proceso: con muchos clientes o pocos núcleos el
+propio generador de carga puede ser el límite. Para medir el techo del
+servidor conviene fijar `--workers` por debajo de los núcleos disponibles.
+
+Requiere PostgreSQL (`POSTGRES_DB` y demás variables de benchmarks/entorno.py),
+la misma base para el servidor y para preparar los datos: si no tiene turnos
+se llena con `generar_datos_sinteticos`.
+
+Uso (desde `src/`):
+    POSTGRES_DB=hotel_bench POSTGRES_USER=postgres python -m benchmarks.servidor --workers 4 --clientes 32
+"""
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from .entorno import argumentos_base, configurar_django, imprimir_resultados
+
+
+DIRECTORIO_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (nombre de la URL, usuario que la consulta)
+ENDPOINTS = [
+    ("turno-activo", "empleado"),
+    ("turno-activo-async", "empleado"),
+    ("habitaciones-tablero", "empleado"),
+    ("habitaciones-tablero-async", "empleado"),
+    ("habitaciones_list", "empleado"),
+    ("tarifas-aplicables", "empleado"),
+    ("tarifas-aplicables-async", "empleado"),
+    ("estancias-list", "admin"),
+    ("estancias-list-async", "admin"),
+]
+
+
+def preparar_peticiones(endpoints=ENDPOINTS):
+    """Ruta y encabezados de cada endpoint, con tokens recién emitidos."""
+    from django.urls import reverse
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from apps.habitaciones.models import Habitacion
+    from apps.turnos.models import Turno
+    from apps.users.models import Usuario
+
+    turno = Turno.objects.filter(activo=True).select_related("usuario").order_by("id").first()
+    usuarios = {
+        "empleado": turno.usuario,
+        "admin": Usuario.objects.filter(rol=Usuario.Rol.ADMINISTRADOR).order_by("id").first(),
+    }
+    habitacion = Habitacion.objects.filter(
+        activa=True, estado=Habitacion.Estado.DISPONIBLE,
+    ).order_by("id").first()
+    consulta = f"?habitacion={habitacion.id}"
+    parametros = {"tarifas-aplicables": consulta, "tarifas-aplicables-async": consulta}
+
+    peticiones = {}
+    for ruta, usuario in endpoints:
+        token = AccessToken.for_user(usuarios[usuario])
+        peticiones[ruta] = (
+            reverse(ruta) + parametros.get(ruta, ""),
+            {"Authorization": f"Bearer {token}"},
+        )
+    return peticiones
+
+
+def iniciar_servidor(interfaz, puerto, workers):
+    """Arranca gunicorn y espera a que acepte conexiones."""
+    entorno = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "config.settings.prod",
+        "ALLOWED_HOSTS": "127.0.0.1",
+        "SERVIDOR_INTERFAZ": interfaz,
+        "SERVIDOR_DIRECCION": f"127.0.0.1:{puerto}",
+        "SERVIDOR_WORKERS": str(workers),
+    }
+    # El registro va a un archivo: una tubería sin leer terminaría bloqueando al servidor.
+    registro = tempfile.TemporaryFile()
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn"],
+        cwd=DIRECTORIO_SRC, env=entorno, stdout=subprocess.DEVNULL, stderr=registro,
+    )
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            registro.seek(0)
+            raise RuntimeError(f"gunicorn terminó al arrancar:\n{registro.read().decode()}")
+        try:
+            socket.create_connection(("127.0.0.1", puerto), timeout=1).close()
+            return proceso
+        except OSError:
+            time.sleep(0.2)
+    detener_servidor(proceso)
+    raise RuntimeError("gunicorn no aceptó conexiones en 60 segundos.")
+
+
+def detener_servidor(proceso):
+    proceso.terminate()
+    try:
+        proceso.wait(timeout=40)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+        proceso.wait()
+
+
+def cargar(puerto, ruta, encabezados, clientes, segundos):
+    """Hace peticiones GET a `ruta` con `clientes` hilos durante `segundos`."""
+    fin = time.monotonic() + segundos
+    tiempos, errores = [], []
+
+    def cliente():
+        propios, fallidas = [], 0
+        conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=30)
+        while time.monotonic() < fin:
+            inicio = time.perf_counter()
+            try:
+                conexion.request("GET", ruta, headers=encabezados)
+                respuesta = conexion.getresponse()
+                respuesta.read()
+                fallidas += respuesta.status != 200
+            except (OSError, http.client.HTTPException):
+                # El servidor cerró la conexión (p. ej. al reciclar el worker).
+                fallidas += 1
+                conexion.close()
+                conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=30)
+            propios.append(time.perf_counter() - inicio)
+        conexion.close()
+        tiempos.extend(propios)
+        errores.append(fallidas)
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=cliente) for _ in range(clientes)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    total = time.perf_counter() - inicio
+    return sorted(tiempos), sum(errores), total
+
+
+def main():
+    parser = argumentos_base(__doc__)
+    parser.add_argument("--interfaces", nargs="+", choices=["asgi", "wsgi"], default=["asgi", "wsgi"])
+    parser.add_argument("--workers", type=int, default=2, help="Procesos de gunicorn.")
+    parser.add_argument("--clientes", type=int, default=16, help="Clientes concurrentes.")
+    parser.add_argument("--segundos", type=float, default=10, help="Duración de la carga por endpoint.")
+    parser.add_argument("--calentamiento", type=float, default=2, help="Segundos de carga previa sin medir.")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--dias", type=int, default=60, help="Días de datos sintéticos si la base está vacía.")
+    parser.add_argument("--habitaciones", type=int, default=300)
+    args = parser.parse_args()
+
+    if not os.environ.get("POSTGRES_DB"):
+        parser.error("este benchmark requiere PostgreSQL: define POSTGRES_DB y las demás variables de conexión.")
+
+    base = configurar_django()
+    from django.core.management import call_command
+    from django.db import connections
+    from apps.core.medicion import percentil
+    from apps.turnos.models import Turno
+
+    if not Turno.objects.exists():
+        call_command("generar_datos_sinteticos", dias=args.dias, habitaciones=args.habitaciones)
+    peticiones = preparar_peticiones()
+    connections.close_all()
+
+    filas = []
+    for interfaz in args.interfaces:
+        servidor = iniciar_servidor(interfaz, args.puerto, args.workers)
+        try:
+            for ruta, (url, encabezados) in peticiones.items():
+                if args.calentamiento:
+                    cargar(args.puerto, url, encabezados, args.clientes, args.calentamiento)
+                tiempos, errores, total = cargar(args.puerto, url, encabezados, args.clientes, args.segundos)
+                filas.append({
+                    "interfaz": interfaz,
+                    "endpoint": ruta,
+                    "peticiones": len(tiempos),
+                    "peticiones_por_s": round(len(tiempos) / total, 1),
+                    "p50_ms": round(percentil(tiempos, 50) * 1000, 2),
+                    "p95_ms": round(percentil(tiempos, 95) * 1000, 2),
+                    "errores": errores,
+                })
+        finally:
+            detener_servidor(servidor)
+
+    imprimir_resultados(
+        f"Servidor de producción ({base}; {args.workers} workers, {args.clientes} clientes)", filas,
+    )
+    if any(f["errores"] for f in filas):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Prueba de estrés de ventas concurrentes de un mismo producto.
+
+Varios hilos venden una unidad a la vez del mismo producto hasta agotarlo y se
+compara el descuento condicional de `vender_producto`
+(`UPDATE ... SET stock = stock - n WHERE stock >= n`) con una variante que
+bloquea la fila con `select_for_update` antes de validar. También se incluye
+la lógica anterior (leer, validar y guardar sin bloqueo) como referencia.
+
+En todos los casos se verifica que no se venda de más: las ventas exitosas
+deben ser exactamente el stock inicial, el stock final cero y debe haber un
+movimiento de caja por venta.
+
+La semántica de bloqueo por fila solo se reproduce en PostgreSQL (ver
+`POSTGRES_DB` en `benchmarks.entorno`). En SQLite las escrituras se
+serializan con el candado de la base, pero la lógica anterior vende de más
+igualmente, porque valida un stock leído antes de empezar a escribir.
+
+Uso (desde `src/`):
+    python -m benchmarks.stock_concurrente --hilos 8 --stock 500
+"""
+import threading
+import time
+
+from .entorno import argumentos_base, configurar_django, imprimir_resultados
+
+
+def vender_condicional(producto_id, turno):
+    from apps.caja.services import vender_producto
+    from apps.productos.models import Producto
+
+    # Igual que en la vista: el producto se carga antes de vender.
+    producto = Producto.objects.get(pk=producto_id)
+    vender_producto(producto=producto, cantidad=1, metodo_pago="EFECTIVO", turno=turno)
+
+
+def vender_con_bloqueo(producto_id, turno):
+    from django.core.exceptions import ValidationError
+    from django.db import transaction
+    from apps.caja.models import MovimientoCaja
+    from apps.productos.models import Producto
+
+    with transaction.atomic():
+        producto = Producto.objects.select_for_update().get(pk=producto_id)
+        if producto.stock < 1:
+            raise ValidationError("Stock insuficiente")
+        producto.stock -= 1
+        producto.save(update_fields=["stock"])
+        MovimientoCaja.objects.create(
+            turno=turno,
+            tipo=MovimientoCaja.TipoMovimiento.PRODUCTO,
+            monto=producto.precio,
+            metodo_pago="EFECTIVO",
+            producto=producto,
+        )
+
+
+def vender_sin_bloqueo(producto_id, turno):
+    """Réplica de la lógica anterior: el stock leído puede estar desactualizado al guardar."""
+    from django.core.exceptions import ValidationError
+    from django.db import transaction
+    from apps.caja.models import MovimientoCaja
+    from apps.productos.models import Producto
+
+    producto = Producto.objects.get(pk=producto_id)
+    with transaction.atomic():
+        if producto.stock < 1:
+            raise ValidationError("Stock insuficiente")
+        producto.stock -= 1
+        producto.save(update_fields=["stock"])
+        MovimientoCaja.objects.create(
+            turno=turno,
+            tipo=MovimientoCaja.TipoMovimiento.PRODUCTO,
+            monto=producto.precio,
+            metodo_pago="EFECTIVO",
+            producto=producto,
+        )
+
+
+VARIANTES = {
+    "condicional": vender_condicional,
+    "select_for_update": vender_con_bloqueo,
+    "sin_bloqueo": vender_sin_bloqueo,
+}
+
+
+def ejecutar(nombre, vender, *, hilos, stock, turno):
+    from django.core.exceptions import ValidationError
+    from django.db import connection
+    from apps.caja.models import MovimientoCaja
+    from apps.productos.models import Producto
+
+    producto = Producto.objects.create(nombre=f"bench_{nombre}", precio="10.00", stock=stock, activo=True)
+    barrera = threading.Barrier(hilos)
+    conteos = {"exitosas": 0, "rechazadas": 0, "errores": 0}
+    candado = threading.Lock()
+
+    def trabajador():
+        exitosas = rechazadas = errores = 0
+        barrera.wait()
+        try:
+            while True:
+                try:
+                    vender(producto.pk, turno)
+                    exitosas += 1
+                except ValidationError:
+                    # Stock agotado: el hilo termina.
+                    rechazadas += 1
+                    break
+                except Exception:
+                    # Conflictos de la base (p. ej. serialización o candados); se reintenta.
+                    errores += 1
+                    if errores > 10 * stock:
+                        raise
+        finally:
+            connection.close()
+            with candado:
+                conteos["exitosas"] += exitosas
+                conteos["rechazadas"] += rechazadas
+                conteos["errores"] += errores
+
+    trabajadores = [threading.Thread(target=trabajador) for _ in range(hilos)]
+    inicio = time.perf_counter()
+    for hilo in trabajadores:
+        hilo.start()
+    for hilo in trabajadores:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+
+    producto.refresh_from_db()
+    movimientos = MovimientoCaja.objects.filter(producto=producto).count()
+    return {
+        "variante": nombre,
+        "ventas": conteos["exitosas"],
+        "movimientos": movimientos,
+        "stock_final": producto.stock,
+        "vendido_de_mas": movimientos - stock,
+        "reintentos": conteos["errores"],
+        "segundos": round(segundos, 3),
+        "ventas_por_s": round(conteos["exitosas"] / segundos, 1),
+    }
+
+
+def main():
+    parser = argumentos_base(__doc__)
+    parser.add_argument("--hilos", type=int, default=8)
+    parser.add_argument("--stock", type=int, default=500)
+    parser.add_argument(
+        "--variantes", nargs="+", choices=list(VARIANTES), default=list(VARIANTES),
+    )
+    args = parser.parse_args()
+
+    base = configurar_django(args.db, concurrente=True)
+    from apps.turnos.models import Turno
+    from .datos import crear_empleados
+
+    turno = Turno.objects.create(usuario=crear_empleados(1)[0], tipo_turno=Turno.TipoTurno.DIA, activo=True)
+
+    resultados = [
+        ejecutar(nombre, VARIANTES[nombre], hilos=args.hilos, stock=args.stock, turno=turno)
+        for nombre in args.variantes
+    ]
+    imprimir_resultados(f"Ventas concurrentes ({args.hilos} hilos, stock {args.stock}, {base})", resultados)
+
+    for fila in resultados:
+        if fila["variante"] != "sin_bloqueo":
+            assert fila["vendido_de_mas"] == 0 and fila["stock_final"] == 0, fila
+    print("\nLas variantes con descuento condicional y con select_for_update no venden de más.")
+
+
+if __name__ == "__main__":
+    main()
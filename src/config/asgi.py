@@ -17,3 +17,9 @@ os.environ.setdefault(
 )
 
 application = get_asgi_application()
+
+# Sin receptores síncronos de `request_started`, las vistas asíncronas no
+# ocupan un hilo por petición (ver apps/core/asincrono.py).
+from apps.core.asincrono import retirar_receptores_sincronos  # noqa: E402
+
+retirar_receptores_sincronos()
@@ -0,0 +1,113 @@
+"""
+Configuración de PostgreSQL a partir de variables de entorno (ver prod.py).
+
+Conexión: `POSTGRES_DB`, `POSTGRES_USER`, `POSTGRES_PASSWORD`, `POSTGRES_HOST`
+y `POSTGRES_PORT`.
+
+Reutilización de conexiones, en uno de dos modos:
+- Pool de psycopg 3 (`DB_POOL=true`): cada proceso mantiene entre
+  `DB_POOL_MINIMO` y `DB_POOL_MAXIMO` conexiones abiertas, y cada petición
+  toma una mientras dura. Si todas están ocupadas, la petición espera hasta
+  `DB_POOL_ESPERA_SEGUNDOS` antes de fallar. Es el modo adecuado para workers
+  con muchos hilos o asíncronos, donde una conexión por hilo sería excesiva.
+- Conexiones persistentes: cada hilo conserva su conexión `DB_CONN_MAX_AGE`
+  segundos (0 la cierra al terminar cada petición).
+El modo por defecto depende de `SERVIDOR_INTERFAZ` (ver config/servidor.py).
+Con `asgi`, Django atiende cada petición en un hilo nuevo, así que una
+conexión persistente nunca se reutiliza y quedaría abierta hasta agotar
+`max_connections`: el pool está activo por defecto y, sin él, las conexiones
+se cierran al terminar cada petición (un `DB_CONN_MAX_AGE` mayor que 0 es un
+error de configuración). Con `wsgi`, los hilos de gthread se reutilizan y el
+modo por defecto son las conexiones persistentes de 60 segundos.
+En ambos modos la conexión se verifica antes de reutilizarla
+(`CONN_HEALTH_CHECKS`): después de un reinicio de la base o de un corte de
+red, la siguiente petición abre una conexión nueva en lugar de fallar.
+
+Tiempo máximo de cada consulta (`statement_timeout`) según el rol del proceso,
+`DB_ROL`: las peticiones de la API deben responder en segundos, mientras que
+los workers de reportes (`procesar_exportaciones`) recorren todo el
+historial. `DB_LIMITE_CONSULTA_MS` sustituye el límite del rol; 0 lo desactiva.
+
+Réplica de lectura: `POSTGRES_REPLICA_HOST` y, si difieren de los de la
+principal, `POSTGRES_REPLICA_PORT`, `POSTGRES_REPLICA_DB`,
+`POSTGRES_REPLICA_USER` y `POSTGRES_REPLICA_PASSWORD`. Sus consultas tienen
+el límite del rol `reportes`.
+"""
+import os
+
+from config.servidor import INTERFAZ_POR_DEFECTO, _booleano
+
+
+# Milisegundos por rol del proceso.
+LIMITE_CONSULTA_MS_POR_ROL = {
+    "api": 5_000,
+    "reportes": 300_000,
+}
+
+
+def configuracion_postgres(entorno=None):
+    """Diccionario para `DATABASES["default"]` según `entorno` (por defecto, `os.environ`)."""
+    entorno = os.environ if entorno is None else entorno
+
+    rol = entorno.get("DB_ROL", "api")
+    if rol not in LIMITE_CONSULTA_MS_POR_ROL:
+        raise ValueError(f"DB_ROL debe ser uno de: {', '.join(LIMITE_CONSULTA_MS_POR_ROL)}")
+    limite_ms = int(entorno.get("DB_LIMITE_CONSULTA_MS", LIMITE_CONSULTA_MS_POR_ROL[rol]))
+
+    # Parámetros de libpq. `application_name` identifica el rol en pg_stat_activity.
+    opciones = {"application_name": f"hotel-{rol}"}
+    if limite_ms:
+        opciones["options"] = f"-c statement_timeout={limite_ms}"
+
+    configuracion = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": entorno.get("POSTGRES_DB", ""),
+        "USER": entorno.get("POSTGRES_USER", ""),
+        "PASSWORD": entorno.get("POSTGRES_PASSWORD", ""),
+        "HOST": entorno.get("POSTGRES_HOST", ""),
+        "PORT": entorno.get("POSTGRES_PORT", ""),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": opciones,
+    }
+
+    asgi = entorno.get("SERVIDOR_INTERFAZ", INTERFAZ_POR_DEFECTO) == "asgi"
+    if _booleano(entorno.get("DB_POOL", "true" if asgi else "")):
+        opciones["pool"] = {
+            "min_size": int(entorno.get("DB_POOL_MINIMO", 2)),
+            "max_size": int(entorno.get("DB_POOL_MAXIMO", 10)),
+            "timeout": float(entorno.get("DB_POOL_ESPERA_SEGUNDOS", 10)),
+        }
+        # Django no admite conexiones persistentes junto con el pool.
+        configuracion["CONN_MAX_AGE"] = 0
+    elif asgi:
+        if int(entorno.get("DB_CONN_MAX_AGE", 0)):
+            raise ValueError(
+                "Con SERVIDOR_INTERFAZ=asgi las conexiones persistentes no se reutilizan: "
+                "usa DB_POOL=true o DB_CONN_MAX_AGE=0."
+            )
+        configuracion["CONN_MAX_AGE"] = 0
+    else:
+        configuracion["CONN_MAX_AGE"] = int(entorno.get("DB_CONN_MAX_AGE", 60))
+
+    return configuracion
+
+
+def configuracion_replica(entorno=None):
+    """Diccionario para la réplica de lectura: la configuración de la principal con los `POSTGRES_REPLICA_*`."""
+    entorno = os.environ if entorno is None else entorno
+    configuracion = configuracion_postgres(entorno)
+    for clave, variable in (
+        ("HOST", "POSTGRES_REPLICA_HOST"),
+        ("PORT", "POSTGRES_REPLICA_PORT"),
+        ("NAME", "POSTGRES_REPLICA_DB"),
+        ("USER", "POSTGRES_REPLICA_USER"),
+        ("PASSWORD", "POSTGRES_REPLICA_PASSWORD"),
+    ):
+        if entorno.get(variable):
+            configuracion[clave] = entorno[variable]
+    # A la réplica van los reportes y los listados, que recorren el historial:
+    # lleva el límite del rol "reportes" aunque el proceso sea de la API.
+    configuracion["OPTIONS"]["options"] = f"-c statement_timeout={LIMITE_CONSULTA_MS_POR_ROL['reportes']}"
+    # En las pruebas, la réplica es la misma base que la principal.
+    configuracion["TEST"] = {"MIRROR": "default"}
+    return configuracion
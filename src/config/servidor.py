@@ -0,0 +1,63 @@
+"""
+Configuración de gunicorn a partir de variables de entorno (ver gunicorn.conf.py).
+
+Interfaz, `SERVIDOR_INTERFAZ`:
+- `asgi` (por defecto): workers de uvicorn sobre `config.asgi`. Cada petición
+  síncrona corre en su propio hilo y las vistas asíncronas (el flujo de
+  eventos) no ocupan un hilo mientras esperan. Como los hilos no se
+  reutilizan entre peticiones, la base usa por defecto el pool de conexiones
+  en lugar de las conexiones persistentes (ver config/base_de_datos.py).
+- `wsgi`: workers `gthread` sobre `config.wsgi`, con `SERVIDOR_HILOS` hilos
+  por proceso. Cada conexión abierta del flujo de eventos ocupa un hilo.
+
+Procesos y tiempos:
+- `SERVIDOR_WORKERS`: procesos (por defecto, 2 × núcleos + 1). Con el pool,
+  la base recibe hasta `SERVIDOR_WORKERS` × `DB_POOL_MAXIMO` conexiones.
+- `SERVIDOR_TIMEOUT`: segundos sin responder tras los que se reinicia un worker.
+- `SERVIDOR_TIMEOUT_GRACIA`: segundos que tiene un worker para terminar sus
+  peticiones en curso al recibir SIGTERM (despliegues, escalado).
+- `SERVIDOR_KEEPALIVE`: segundos que se conserva una conexión HTTP inactiva.
+- `SERVIDOR_MAX_PETICIONES`: peticiones tras las que se recicla un worker,
+  con una variación aleatoria del 10 % para que no se reinicien juntos
+  (0 lo desactiva).
+- `SERVIDOR_PRECARGA` (por defecto, true): Django y las apps se importan una
+  vez en el proceso maestro y los workers comparten esas páginas de memoria.
+"""
+import os
+
+
+INTERFAZ_POR_DEFECTO = "asgi"
+INTERFACES = {
+    "asgi": {"wsgi_app": "config.asgi:application", "worker_class": "uvicorn_worker.UvicornWorker"},
+    "wsgi": {"wsgi_app": "config.wsgi:application", "worker_class": "gthread"},
+}
+
+
+def _booleano(valor):
+    return str(valor).strip().lower() in ("1", "true", "si", "sí")
+
+
+def configuracion_gunicorn(entorno=None, nucleos=None):
+    """Ajustes de gunicorn según `entorno` (por defecto, `os.environ`)."""
+    entorno = os.environ if entorno is None else entorno
+    nucleos = nucleos or os.cpu_count() or 1
+
+    interfaz = entorno.get("SERVIDOR_INTERFAZ", INTERFAZ_POR_DEFECTO)
+    if interfaz not in INTERFACES:
+        raise ValueError(f"SERVIDOR_INTERFAZ debe ser uno de: {', '.join(INTERFACES)}")
+
+    max_peticiones = int(entorno.get("SERVIDOR_MAX_PETICIONES", 1000))
+    configuracion = {
+        **INTERFACES[interfaz],
+        "bind": [entorno.get("SERVIDOR_DIRECCION", "0.0.0.0:8000")],
+        "workers": int(entorno.get("SERVIDOR_WORKERS", 2 * nucleos + 1)),
+        "timeout": int(entorno.get("SERVIDOR_TIMEOUT", 30)),
+        "graceful_timeout": int(entorno.get("SERVIDOR_TIMEOUT_GRACIA", 30)),
+        "keepalive": int(entorno.get("SERVIDOR_KEEPALIVE", 5)),
+        "max_requests": max_peticiones,
+        "max_requests_jitter": max_peticiones // 10,
+        "preload_app": _booleano(entorno.get("SERVIDOR_PRECARGA", "true")),
+    }
+    if interfaz == "wsgi":
+        configuracion["threads"] = int(entorno.get("SERVIDOR_HILOS", 4))
+    return configuracion
@@ -45,14 +45,19 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = "users.Usuario"
 
 MIDDLEWARE = [
-    "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    # Primero, para que el tiempo medido incluya a los demás middlewares.
+    "apps.core.medicion.MedicionMiddleware",
+    "apps.core.replicas.ReplicaMiddleware",
+    # Los middlewares de Django, en variantes que bajo ASGI no ocupan un hilo
+    # por petición (ver apps/core/asincrono.py).
+    "apps.core.asincrono.SecurityMiddleware",
+    "apps.core.asincrono.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
-    "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
-    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "apps.core.asincrono.CommonMiddleware",
+    "apps.core.asincrono.CsrfViewMiddleware",
+    "apps.core.asincrono.AuthenticationMiddleware",
+    "apps.core.asincrono.MessageMiddleware",
+    "apps.core.asincrono.XFrameOptionsMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -88,6 +93,43 @@ MEDIA_ROOT = BASE_DIR / "mediafiles"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Cada cuántos segundos, como máximo, un proceso compara su caché del turno
+# activo con el sello de versión de la base de datos (ver apps/turnos/turno_activo.py).
+TURNO_ACTIVO_VERIFICACION_SEGUNDOS = 2
+
+# Lo mismo para las tablas de tarifas aplicables (ver apps/tarifas/resolucion.py).
+TARIFAS_VERIFICACION_SEGUNDOS = 2
+
+# Flujo de eventos para las terminales (ver apps/core/eventos.py): cada cuántos
+# segundos se buscan en la base eventos publicados por otros procesos, y cuántas
+# horas se conservan para que los clientes puedan reanudar la conexión.
+EVENTOS_INTERVALO_SONDEO_SEGUNDOS = 2
+EVENTOS_RETENCION_HORAS = 24
+# Segundos de validez del ticket de un solo uso con el que se abre el flujo.
+EVENTOS_TICKET_SEGUNDOS = 30
+
+# Horas que se conservan las respuestas de las peticiones con `Idempotency-Key`
+# (ver apps/core/idempotencia.py): un reintento posterior vuelve a ejecutarse.
+IDEMPOTENCIA_RETENCION_HORAS = 24
+
+# Medición de peticiones (ver apps/core/medicion.py): a partir de cuántos
+# milisegundos se registra una petición como lenta, y cuántas peticiones
+# recientes de cada ruta se usan para calcular los percentiles.
+MEDICION_UMBRAL_LENTO_MS = 500
+MEDICION_MUESTRAS_POR_RUTA = 1000
+
+# Token fijo con el que Prometheus consulta `api/metrics/` (Authorization:
+# Bearer <token>). Sin él, solo los administradores pueden ver las métricas.
+METRICAS_TOKEN = os.getenv("METRICAS_TOKEN", "")
+
+# Réplica de lectura (ver apps/core/replicas.py): alias de DATABASES al que se
+# envían las lecturas de los reportes y de los listados (None: todo a la base
+# principal), y cuántos segundos lee de la principal un usuario después de
+# escribir, para que vea sus propios cambios aunque la réplica vaya atrasada.
+DATABASE_ROUTERS = ["apps.core.replicas.EnrutadorReplica"]
+REPLICA_LECTURA = None
+REPLICA_PERMANENCIA_SEGUNDOS = 10
+
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
@@ -146,5 +188,8 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:4200", # Angular
     "http://127.0.0.1:3000",
 ]
+# Encabezados de la respuesta que los frontends pueden leer desde JavaScript
+# (`Server-Timing`, ver apps/core/medicion.py).
+CORS_EXPOSE_HEADERS = ["Server-Timing"]
 
 ALLOWED_HOSTS = ["localhost", "127.0.0.1", "*"] # '*' permite cualquier IP (útil en dev)
@@ -8,5 +8,14 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+    },
+    # Réplica local: el mismo archivo por otra conexión. En las pruebas es una
+    # base aparte, así que se puede verificar de cuál se leyó.
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.sqlite3",
+    },
 }
+
+# Se activa con REPLICA_LECTURA=replica.
+REPLICA_LECTURA = os.getenv("REPLICA_LECTURA") or None
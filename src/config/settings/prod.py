@@ -1,5 +1,17 @@
 from .base import *
+from config.base_de_datos import configuracion_postgres, configuracion_replica
 
 DEBUG = False
 
-ALLOWED_HOSTS = []
+# Dominios del servidor, separados por comas.
+ALLOWED_HOSTS = [host.strip() for host in os.getenv("ALLOWED_HOSTS", "").split(",") if host.strip()]
+
+# PostgreSQL, pool de conexiones y límites de tiempo por rol del proceso (ver config/base_de_datos.py).
+DATABASES = {
+    "default": configuracion_postgres(),
+}
+
+# Réplica de lectura para reportes y listados, si está definida (ver apps/core/replicas.py).
+if os.getenv("POSTGRES_REPLICA_HOST"):
+    DATABASES["replica"] = configuracion_replica()
+    REPLICA_LECTURA = "replica"
@@ -0,0 +1,30 @@
+"""
+Servidor de producción. gunicorn lee este archivo al ejecutarse desde `src/`:
+
+    DJANGO_SETTINGS_MODULE=config.settings.prod gunicorn
+
+Los ajustes salen de las variables de entorno (ver config/servidor.py).
+"""
+import os
+import sys
+
+# El script `gunicorn` no agrega el directorio actual a la ruta de importación.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.servidor import configuracion_gunicorn
+
+
+globals().update(configuracion_gunicorn())
+
+# El archivo de latido de los workers, en memoria: en contenedores el disco
+# puede bloquearse lo suficiente para que el maestro crea que el worker murió.
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+
+def post_fork(server, worker):
+    # Con la precarga, cada worker hereda lo que el maestro abrió al importar
+    # Django; una conexión a la base no puede compartirse entre procesos.
+    if server.cfg.preload_app:
+        from django.db import connections
+        connections.close_all()